@@ -36,9 +36,11 @@ def migrate_index():
     """Migrate index.json to v2 format with new fields"""
 
     # Initialize recommendation manager
-    rec_manager = RecommendationManager(storage_path="data/recommendations")
+    # (index.json only exists in the JSON backend layout)
+    rec_manager = RecommendationManager(storage_path="data/recommendations", backend="json")
+    index = rec_manager.store.index
 
-    logger.info(f"Starting index migration for {len(rec_manager.index)} recommendations")
+    logger.info(f"Starting index migration for {len(index)} recommendations")
 
     # Track statistics
     migrated = 0
@@ -48,11 +50,11 @@ def migrate_index():
     # Backup original index
     backup_file = rec_manager.storage_path / f"index_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
     with open(backup_file, "w", encoding="utf-8") as f:
-        json.dump(rec_manager.index, f, indent=2, ensure_ascii=False)
+        json.dump(index, f, indent=2, ensure_ascii=False)
     logger.info(f"Created backup: {backup_file}")
 
     # Migrate each recommendation
-    for rec_id, meta in list(rec_manager.index.items()):
+    for rec_id, meta in list(index.items()):
         try:
             # Check if already migrated (has new fields)
             if "formulation" in meta and "confidence" in meta:
@@ -68,7 +70,7 @@ def migrate_index():
                 continue
 
             # Update index entry with new fields
-            rec_manager.index[rec_id].update({
+            index[rec_id].update({
                 "formulation_summary": rec_manager._get_formulation_summary(rec.formulation),
                 "formulation": rec.formulation,
                 "confidence": rec.confidence,
@@ -83,13 +85,13 @@ def migrate_index():
             errors += 1
 
     # Save updated index
-    rec_manager._save_index()
-    logger.info(f"Saved updated index to {rec_manager.index_file}")
+    rec_manager.store._save_index()
+    logger.info(f"Saved updated index to {rec_manager.store.index_file}")
 
     # Print summary
     logger.info("=" * 60)
     logger.info("Migration Summary:")
-    logger.info(f"  Total recommendations: {len(rec_manager.index)}")
+    logger.info(f"  Total recommendations: {len(index)}")
     logger.info(f"  Migrated: {migrated}")
     logger.info(f"  Skipped (already migrated): {skipped}")
     logger.info(f"  Errors: {errors}")
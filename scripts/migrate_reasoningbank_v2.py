@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Migrate ReasoningBank memory file to format 2.0 (one-time script)
+
+Format 1.0 stores every embedding as an indented JSON float list inside the
+memory file. Format 2.0 stores memory records as compact JSON and the
+embeddings in a binary .npy sidecar keyed by memory id:
+- {stem}.json: memory records (no vectors)
+- {stem}.embeddings.{tag}.npy: embedding matrix (float16 by default)
+
+ReasoningBank.load reads both formats, so running this script is optional:
+the file is also migrated on the next save.
+
+Usage:
+    python scripts/migrate_reasoningbank_v2.py
+    python scripts/migrate_reasoningbank_v2.py --memory-file data/memory/reasoning_bank.json --dtype float32
+"""
+
+import sys
+import json
+import shutil
+import logging
+import argparse
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from agent.reasoningbank import ReasoningBank
+from agent.config import get_config
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def migrate_memory_file(memory_file: Path, dtype: str) -> bool:
+    """Rewrite a format 1.0 memory file as format 2.0 (keeps a .v1.backup copy)"""
+
+    if not memory_file.exists():
+        logger.error(f"Memory file not found: {memory_file}")
+        return False
+
+    with open(memory_file, "r", encoding="utf-8") as f:
+        version = json.load(f).get("version", "1.0")
+
+    if version != "1.0":
+        logger.info(f"{memory_file} is already format {version}, nothing to do")
+        return True
+
+    # Backup original file
+    backup_file = memory_file.with_suffix(".v1.backup")
+    shutil.copy2(memory_file, backup_file)
+    logger.info(f"Created backup: {backup_file}")
+
+    bank = ReasoningBank(embedding_dtype=dtype)
+    bank.load(str(memory_file))
+    bank.save(str(memory_file))
+
+    with_embedding = sum(1 for m in bank.memories if m.embedding is not None)
+    old_size = backup_file.stat().st_size
+    new_size = memory_file.stat().st_size + sum(
+        p.stat().st_size for p in memory_file.parent.glob(f"{memory_file.stem}.embeddings.*.npy")
+    )
+
+    # Print summary
+    logger.info("=" * 60)
+    logger.info("Migration Summary:")
+    logger.info(f"  Memories: {len(bank.memories)} ({with_embedding} with embeddings)")
+    logger.info(f"  Embedding dtype: {dtype}")
+    logger.info(f"  Size: {old_size / 1024:.1f} KB -> {new_size / 1024:.1f} KB")
+    logger.info(f"  Backup saved to: {backup_file}")
+    logger.info("=" * 60)
+    return True
+
+
+if __name__ == "__main__":
+    config = get_config()
+    memory_config = config.get_memory_config()
+
+    parser = argparse.ArgumentParser(description="Migrate ReasoningBank memory file to format 2.0")
+    parser.add_argument(
+        "--memory-file",
+        type=Path,
+        default=config.resolve_path(memory_config["persist_path"]),
+        help="Memory file to migrate (default: memory.persist_path from config)"
+    )
+    parser.add_argument(
+        "--dtype",
+        choices=["float16", "float32"],
+        default=memory_config.get("embedding_dtype", "float16"),
+        help="Embedding sidecar dtype"
+    )
+    args = parser.parse_args()
+
+    logger.info("ReasoningBank Migration Script v2.0")
+    logger.info("=" * 60)
+
+    if migrate_memory_file(args.memory_file, args.dtype):
+        logger.info("✓ Memory file migrated successfully")
+        sys.exit(0)
+    else:
+        logger.error("✗ Migration failed")
+        sys.exit(1)
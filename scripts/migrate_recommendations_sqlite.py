@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Migrate recommendations from the JSON layout to SQLite (one-time script)
+
+Copies index.json + per-recommendation JSON files into recommendations.db
+in the same directory. The JSON files are kept as a backup and index.json is
+renamed to index.json.migrated.
+
+RecommendationManager(backend="sqlite") performs the same migration
+automatically on first use; this script lets it be run (and checked) ahead
+of a deployment.
+
+Usage:
+    python scripts/migrate_recommendations_sqlite.py [storage_path]
+"""
+
+import sys
+import logging
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from agent.reasoningbank.recommendation_store import (
+    JSON_INDEX_FILENAME,
+    SQLiteRecommendationStore,
+    migrate_json_to_sqlite,
+)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main(storage_path: Path) -> bool:
+    """Migrate storage_path to SQLite and verify the record count"""
+    index_file = storage_path / JSON_INDEX_FILENAME
+    if not index_file.exists():
+        logger.error(f"No {JSON_INDEX_FILENAME} in {storage_path} - nothing to migrate")
+        return False
+
+    store = SQLiteRecommendationStore(storage_path)
+    if len(store) > 0:
+        logger.error(f"{store.db_path} already contains {len(store)} recommendations - aborting")
+        store.close()
+        return False
+
+    migrated = migrate_json_to_sqlite(storage_path, store)
+    total = len(store)
+    store.close()
+
+    logger.info("=" * 60)
+    logger.info(f"Migrated: {migrated}")
+    logger.info(f"Rows in {store.db_path.name}: {total}")
+    logger.info("=" * 60)
+    return migrated == total
+
+
+if __name__ == "__main__":
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("data/recommendations")
+    sys.exit(0 if main(path) else 1)
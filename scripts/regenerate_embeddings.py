@@ -6,7 +6,6 @@ causing retrieval to fail (retriever skips memories with None embedding).
 """
 
 import sys
-import json
 import logging
 from pathlib import Path
 
@@ -18,8 +17,8 @@ sys.path.insert(0, str(project_root / "src"))
 from dotenv import load_dotenv
 load_dotenv(project_root / ".env")
 
-from agent.reasoningbank import ReasoningBank, MemoryItem
-from agent.utils.embedding_client import EmbeddingClient
+from agent.reasoningbank import ReasoningBank
+from agent.utils.embedding_client import EmbeddingClient, create_embedding_cache_from_config
 from agent.config import get_config
 
 logging.basicConfig(
@@ -41,7 +40,8 @@ def main():
     embedding_client = EmbeddingClient(
         provider=embedding_config["provider"],
         model=embedding_config["model"],
-        base_url=embedding_config.get("api_base")
+        base_url=embedding_config.get("api_base"),
+        cache=create_embedding_cache_from_config(embedding_config)  # same cache file as the backend
     )
 
     # Path to memory file
@@ -53,53 +53,42 @@ def main():
 
     logger.info(f"Loading memory file: {memory_file}")
 
-    # Load existing memories
-    with open(memory_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    memories_data = data.get("memories", [])
-    logger.info(f"Found {len(memories_data)} memories")
-
-    # Count memories without embeddings
-    no_embedding_count = sum(1 for m in memories_data if m.get("embedding") is None)
-    logger.info(f"Memories without embeddings: {no_embedding_count}")
-
-    if no_embedding_count == 0:
-        logger.info("All memories already have embeddings. Nothing to do.")
-        return 0
-
-    # Initialize ReasoningBank with embedding function
+    # Load existing memories (format 1.0 or 2.0)
     bank = ReasoningBank(
         embedding_func=embedding_client.embed,
-        max_items=data.get("max_items", 1000)
+        embedding_batch_func=embedding_client.embed_batch,
+        embedding_batch_size=embedding_client.max_batch_size,
+        embedding_workers=8
     )
+    bank.load(str(memory_file))
+    logger.info(f"Found {len(bank.memories)} memories")
 
-    # Convert to MemoryItem objects and regenerate embeddings
-    updated_count = 0
-    for mem_data in memories_data:
-        memory = MemoryItem.from_dict(mem_data)
-
-        if memory.embedding is None:
-            # Generate embedding
-            embed_text = f"{memory.title}. {memory.description}"
-            try:
-                memory.embedding = embedding_client.embed(embed_text)
-                updated_count += 1
-                logger.info(f"Generated embedding for: {memory.title[:50]}...")
-            except Exception as e:
-                logger.error(f"Failed to generate embedding for '{memory.title}': {e}")
+    # Count memories without embeddings
+    missing = [m for m in bank.memories if m.embedding is None]
+    logger.info(f"Memories without embeddings: {len(missing)}")
 
-        # Add to bank (will use existing embedding if already present)
-        bank.add_memory(memory, compute_embedding=False)
+    if not missing:
+        logger.info("All memories already have embeddings. Nothing to do.")
+        return 0
 
-    # Save updated bank
+    # Save a backup copy (written with its own embedding sidecar)
     backup_file = memory_file.with_suffix(".json.backup")
     logger.info(f"Creating backup: {backup_file}")
-    memory_file.rename(backup_file)
+    bank.save(str(backup_file))
+
+    # Regenerate missing embeddings (batched, concurrent)
+    # (failures are logged per memory and left without an embedding)
+    failures = bank.embed_memories(missing)
+    updated_count = len(missing) - len(failures)
 
+    # Save updated bank
     bank.save(str(memory_file))
     logger.info(f"Saved updated memory bank: {memory_file}")
     logger.info(f"✅ Successfully regenerated {updated_count} embeddings")
+    if embedding_client.cache is not None:
+        logger.info(f"Embedding cache: {embedding_client.cache.get_stats()}")
+    if failures:
+        logger.warning(f"{len(failures)} memories still have no embedding; re-run to retry")
 
     return 0
 
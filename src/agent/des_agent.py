@@ -10,6 +10,7 @@ import logging
 from datetime import datetime
 import asyncio
 import json
+from concurrent.futures import ThreadPoolExecutor
 import re
 
 from .reasoningbank import (
@@ -29,7 +30,11 @@ from .reasoningbank import (
 )
 
 from .prompts import (
+    OBSERVE_SYSTEM_PROMPT,
     OBSERVE_PROMPT,
+    THINK_SYSTEM_PROMPT,
+    THEORY_QUERY_SYSTEM_PROMPT,
+    LITERATURE_QUERY_SYSTEM_PROMPT,
     format_action_result_for_observe,
     parse_observe_output
 )
@@ -103,6 +108,13 @@ class DESAgent:
         self.rec_manager = rec_manager
         self.feedback_processor = FeedbackProcessor(self, rec_manager)
 
+        # Long-lived workers for the (blocking) CoreRAG/LargeRAG queries
+        # (2 per concurrently running task)
+        self._tool_executor = ThreadPoolExecutor(
+            max_workers=self.config.get("tools", {}).get("workers", 8),
+            thread_name_prefix="des-tools"
+        )
+
         logger.info("Initialized DESAgent with async experimental feedback support")
 
     # ===== ReAct Core Methods =====
@@ -157,9 +169,7 @@ class DESAgent:
             if len(knowledge_state['memories']) > 3:
                 memory_summary += f"  ... and {len(knowledge_state['memories']) - 3} more\n"
 
-        think_prompt = f"""You are a DES (Deep Eutectic Solvent) formulation expert planning your research approach.
-
-**Task**: {task['description']}
+        think_prompt = f"""**Task**: {task['description']}
 **Target Material**: {task['target_material']}
 **Target Temperature**: {task.get('target_temperature', 25)}°C
 **Constraints**: {task.get('constraints', {})}
@@ -180,39 +190,6 @@ class DESAgent:
 **Latest OBSERVE Analysis** (from previous iteration):
 {self._format_latest_observe_recommendation(knowledge_state['observations'])}
 
-**Available Actions**:
-1. **retrieve_memories** - Get past experiences from ReasoningBank (validated experimental data). NOTE: If returned empty in last iteration, you may skip and proceed with other tools.
-2. **query_theory** - Query CoreRAG ontology for theoretical principles
-3. **query_literature** - Query LargeRAG for literature data
-4. **query_parallel** - Query both CoreRAG and LargeRAG simultaneously
-5. **generate_formulation** - Generate DES formulation from accumulated knowledge
-6. **refine_formulation** - Refine existing formulation with more information
-7. **finish** - Complete task (only if formulation is ready)
-
-**Tool Characteristics**:
-- **ReasoningBank (retrieve_memories)**: Instant retrieval of validated past experiments - **MOST RELIABLE WHEN AVAILABLE**. If empty, no relevant memories exist - this is acceptable, proceed with other tools.
-- **LargeRAG (query_literature)**: Fast vector search (~1-2 seconds) across 10,000+ papers
-- **CoreRAG (query_theory)**: Deep ontology reasoning (~5-10 minutes per query)
-
-**Note: Use Memory to Guide Theory and Literature Queries**:
-1. **retrieve memories first** (in iteration 1) if not yet retrieved - memories contain validated experimental data
-2. **If retrieve_memories returns 0 results**: This is ACCEPTABLE - no relevant historical data exists. Immediately move on to theory/literature queries without retrying.
-3. Memories from real experiments are the **MOST RELIABLE** knowledge source when available
-4. Only query CoreRAG/LargeRAG if memories are insufficient or missing critical details
-
-**Research Requirements**:
-- **Preferred**: Memories + Theory (CoreRAG) + Literature (LargeRAG)
-- **Acceptable**: Memories + LLM parametric knowledge (if tools unavailable)
-- **Minimum**: Theory + Literature (if no relevant memories exist)
-- **Fallback**: LLM parametric knowledge (if all tools fail)
-
-**CoreRAG Usage Guidelines**:
-- CoreRAG is NECESSARY (DES design needs theoretical basis), but takes 5-10 minutes
-- **Use thoughtfully**: Craft comprehensive, well-structured queries to maximize information gain per query
-- **Avoid repeated similar queries**: Plan what theoretical knowledge you need, then query ONCE with a complete question
-- Good query: "What are the key principles for cellulose dissolution via DES? Include hydrogen bonding mechanisms, component selection criteria, and molar ratio considerations."
-- Poor query: Multiple narrow queries like "What is hydrogen bonding?" then "What about molar ratios?" (wasteful)
-
 **Decision Guidelines by Stage**:
 - **Early ({stage == 'Early' and '✓' or '✗'})**:
   - **Priority 1**: Retrieve memories if not yet done. If returns 0, immediately proceed to Priority 2.
@@ -231,17 +208,10 @@ class DESAgent:
 
 **Your Task**:
 Given your current progress ({iteration}/{max_iterations}, {stage} stage), analyze the knowledge state and decide the SINGLE most valuable next action.
-
-Output JSON:
-{{
-    "action": "action_name",
-    "reasoning": "Why this action is the best next step (2-3 sentences)",
-    "information_gaps": ["gap1", "gap2"]  // What critical info is still missing
-}}
 """
 
         try:
-            response = self.llm_client(think_prompt)
+            response = self._call_llm(think_prompt, THINK_SYSTEM_PROMPT)
             thought = self._parse_json_response(response)
 
             # Validate action
@@ -487,7 +457,7 @@ Output JSON:
 
         # Call LLM for observation analysis
         try:
-            llm_output = self.llm_client(observe_prompt)
+            llm_output = self._call_llm(observe_prompt, OBSERVE_SYSTEM_PROMPT)
             observation = parse_observe_output(llm_output)
 
             # Add metadata
@@ -515,6 +485,18 @@ Output JSON:
 
     # ===== Helper Methods =====
 
+    def _call_llm(self, prompt: str, system_prompt: str) -> str:
+        """
+        Call the LLM with a static system prompt and a per-call user prompt.
+
+        The system prompt is identical on every call, so it forms a stable
+        prefix for provider-side prompt caching. Plain callables (without
+        LLMClient's system_prompt support) get both parts in one prompt.
+        """
+        if hasattr(self.llm_client, "chat"):
+            return self.llm_client.chat(prompt, system_prompt=system_prompt)
+        return self.llm_client(f"{system_prompt}\n\n{prompt}")
+
     def _format_observations(self, observations: List[Dict]) -> str:
         """
         Format recent observations for display in prompts.
@@ -591,25 +573,30 @@ Output JSON:
         """
         Query CoreRAG and LargeRAG in parallel for efficiency.
 
+        Both queries run on the agent's shared tool executor (no event loop
+        is created per call).
+
         Returns:
             (theory_knowledge, literature_knowledge)
         """
-        try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(self._query_tools_parallel_async(task, knowledge_state))
-            loop.close()
-            return result
-        except Exception as e:
-            logger.error(f"Parallel query failed: {e}")
-            # Fallback to sequential
-            theory = self._query_corerag(task, knowledge_state)
-            literature = self._query_largerag(task, knowledge_state)
-            return theory, literature
+        futures = [
+            self._tool_executor.submit(query, task, knowledge_state) if tool else None
+            for tool, query in ((self.corerag, self._query_corerag), (self.largerag, self._query_largerag))
+        ]
+
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result() if future is not None else None)
+            except Exception as e:
+                logger.error(f"Parallel tool query failed: {e}")
+                results.append(None)
+        theory, literature = results
+        return theory, literature
 
     async def _query_tools_parallel_async(self, task: Dict, knowledge_state: Dict) -> Tuple[Optional[Dict], Optional[Dict]]:
-        """Async version of parallel tool query."""
-        loop = asyncio.get_event_loop()
+        """Async version of parallel tool query (for callers already inside an event loop)."""
+        loop = asyncio.get_running_loop()
 
         # Helper coroutine to return None when tool is unavailable
         async def return_none():
@@ -618,12 +605,12 @@ Output JSON:
         # Create tasks
         tasks = []
         if self.corerag:
-            tasks.append(loop.run_in_executor(None, self._query_corerag, task, knowledge_state))
+            tasks.append(loop.run_in_executor(self._tool_executor, self._query_corerag, task, knowledge_state))
         else:
             tasks.append(return_none())
 
         if self.largerag:
-            tasks.append(loop.run_in_executor(None, self._query_largerag, task, knowledge_state))
+            tasks.append(loop.run_in_executor(self._tool_executor, self._query_largerag, task, knowledge_state))
         else:
             tasks.append(return_none())
 
@@ -913,6 +900,13 @@ Output ONLY a JSON object:
         memories = self.retriever.retrieve(query)
         logger.info(f"[Memory Retrieval] Retrieved {len(memories)} memories (requested: {top_k}, available: {total_memories})")
 
+        # Log the retrieval counts (one WAL record) so eviction sees them after a restart
+        if memories and self.config.get("memory", {}).get("auto_save", False):
+            try:
+                self.memory.persist(self.config["memory"]["persist_path"])
+            except Exception as e:
+                logger.warning(f"[Memory Retrieval] Failed to persist retrieval counts: {e}")
+
         return memories
 
     def _query_corerag(self, task: Dict, knowledge_state: Dict) -> Optional[Dict]:
@@ -945,9 +939,7 @@ Output ONLY a JSON object:
             if knowledge_state["literature_knowledge"]:
                 literature_summary = f"\n**Literature knowledge acquired:** {len(knowledge_state['literature_knowledge'])} queries completed"
 
-            query_gen_prompt = f"""You are generating a query for CoreRAG (theoretical ontology database) to support DES formulation design.
-
-**Task**: {task['description']}
+            query_gen_prompt = f"""**Task**: {task['description']}
 **Target Material**: {task['target_material']}
 **Temperature**: {task.get('target_temperature', 25)}°C
 **Constraints**: {task.get('constraints', {})}
@@ -958,17 +950,11 @@ Output ONLY a JSON object:
 {prev_theory_summary}
 {literature_summary}
 
-**Your Goal**: Generate a comprehensive, well-structured CoreRAG query to retrieve theoretical knowledge.
-
-**Guidelines**:
-- If this is the FIRST theory query (query #{num_prev_queries + 1}): Ask for comprehensive theoretical foundations (hydrogen bonding, component selection, molar ratios, temperature effects)
-- If this is a SUBSEQUENT query: Ask for complementary theoretical insights not covered in previous queries
-- Be specific and detailed to maximize information gain
-- CoreRAG takes 5-10 minutes per query, so make it count!
+This is theory query #{num_prev_queries + 1}.
 
 Output ONLY the query text (no JSON, no explanation):"""
 
-            query_text = self.llm_client(query_gen_prompt).strip()
+            query_text = self._call_llm(query_gen_prompt, THEORY_QUERY_SYSTEM_PROMPT).strip()
             # Remove quotes if LLM added them
             query_text = query_text.strip('"').strip("'")
 
@@ -1019,9 +1005,16 @@ Output ONLY the query text (no JSON, no explanation):"""
             if knowledge_state["theory_knowledge"]:
                 theory_summary = f"\n**Theoretical knowledge available:** {len(knowledge_state['theory_knowledge'])} theory queries completed"
 
-            query_gen_prompt = f"""You are generating a query for LargeRAG (literature database with 10,000+ papers) to support DES formulation design.
+            num_queries = max(1, self.config.get("tools", {}).get("largerag", {}).get("queries_per_call", 1))
+            if num_queries > 1:
+                output_instruction = f"""- Generate {num_queries} DIFFERENT queries covering complementary angles
 
-**Task**: {task['description']}
+Output ONLY the {num_queries} query texts, one per line (no JSON, no numbering, no explanation):"""
+            else:
+                output_instruction = """
+Output ONLY the query text (no JSON, no explanation):"""
+
+            query_gen_prompt = f"""**Task**: {task['description']}
 **Target Material**: {task['target_material']}
 **Temperature**: {task.get('target_temperature', 25)}°C
 **Constraints**: {task.get('constraints', {})}
@@ -1032,26 +1025,26 @@ Output ONLY the query text (no JSON, no explanation):"""
 {prev_lit_summary}
 {theory_summary}
 
-**Your Goal**: Generate a literature search query to find relevant DES formulations and experimental data.
-
-**Guidelines**:
-- Query #{num_prev_queries + 1} of literature search
-- If first query: Search for direct DES formulation examples
-- If subsequent query: Explore DIFFERENT angles (e.g., component variations, property data, dissolution mechanisms, alternative formulations)
-- **IMPORTANT**: Make each query DIFFERENT from previous ones to maximize information coverage
-- Use specific keywords relevant to DES and {task['target_material']}
+This is query #{num_prev_queries + 1} of literature search.
+{output_instruction}"""
 
-Output ONLY the query text (no JSON, no explanation):"""
-
-            query_text = self.llm_client(query_gen_prompt).strip()
+            llm_output = self._call_llm(query_gen_prompt, LITERATURE_QUERY_SYSTEM_PROMPT).strip()
+            if num_queries > 1:
+                # One query per line; remove list markers if LLM added them
+                lines = [re.sub(r'^(?:[-*]|\d+[.)])\s+', '', line.strip()) for line in llm_output.splitlines()]
+                queries = [line for line in lines if line][:num_queries] or [llm_output]
+            else:
+                queries = [llm_output]
             # Remove quotes if LLM added them
-            query_text = query_text.strip('"').strip("'")
+            queries = [q.strip('"').strip("'") for q in queries]
+            query_text = queries[0]
 
-            logger.info(f"[LargeRAG Query #{num_prev_queries + 1}] LLM generated: {query_text[:100]}...")
+            logger.info(f"[LargeRAG Query #{num_prev_queries + 1}] LLM generated {len(queries)} queries: {query_text[:100]}...")
 
-            # Format query for LargeRAG
+            # Format query for LargeRAG (several queries are retrieved in one batch)
             query = {
                 "query": query_text,
+                "queries": queries,
                 "filters": {
                     "material_type": task.get("material_category", "polymer"),
                     "temperature_range": [task.get("target_temperature", 25) - 10, task.get("target_temperature", 25) + 10]
@@ -1306,7 +1299,7 @@ Format your response as JSON:
 
         try:
             # Check if this is an update (recommendation already has feedback)
-            existing_rec = self.rec_manager.get_recommendation(recommendation_id)
+            existing_rec = self.rec_manager.get_recommendation(recommendation_id, include_trajectory=False)
             is_update = (
                 existing_rec is not None and
                 existing_rec.experiment_result is not None and
@@ -1339,7 +1332,7 @@ Format your response as JSON:
             # Auto-save if configured
             if self.config.get("memory", {}).get("auto_save", False):
                 save_path = self.config["memory"]["persist_path"]
-                self.memory.save(save_path)
+                self.memory.persist(save_path)
                 logger.info(f"Auto-saved memory bank to {save_path}")
 
             # Build message using raw solubility
@@ -1477,7 +1470,7 @@ Format your response as JSON:
             # Auto-save if configured
             if self.config.get("memory", {}).get("auto_save", False):
                 save_path = self.config["memory"]["persist_path"]
-                self.memory.save(save_path)
+                self.memory.persist(save_path)
                 logger.info(f"Auto-saved memory bank to {save_path}")
 
             logger.info(
@@ -17,11 +17,18 @@ from .judge_prompts import (
 )
 
 from .observe_prompts import (
+    OBSERVE_SYSTEM_PROMPT,
     OBSERVE_PROMPT,
     format_action_result_for_observe,
     parse_observe_output
 )
 
+from .react_prompts import (
+    THINK_SYSTEM_PROMPT,
+    THEORY_QUERY_SYSTEM_PROMPT,
+    LITERATURE_QUERY_SYSTEM_PROMPT
+)
+
 __all__ = [
     "SUCCESS_EXTRACTION_PROMPT",
     "FAILURE_EXTRACTION_PROMPT",
@@ -31,7 +38,11 @@ __all__ = [
     "parse_extracted_memories",
     "JUDGE_PROMPT",
     "parse_judge_output",
+    "OBSERVE_SYSTEM_PROMPT",
     "OBSERVE_PROMPT",
     "format_action_result_for_observe",
     "parse_observe_output",
+    "THINK_SYSTEM_PROMPT",
+    "THEORY_QUERY_SYSTEM_PROMPT",
+    "LITERATURE_QUERY_SYSTEM_PROMPT",
 ]
@@ -3,33 +3,13 @@ Prompts for LLM-based OBSERVE phase in ReAct loop
 
 These prompts guide the LLM to analyze action results and generate
 structured observations with insights, gaps, and recommendations.
-"""
-
-OBSERVE_PROMPT = """You are analyzing the result of a research action in DES (Deep Eutectic Solvent) formulation design.
-
-**Task Context**:
-- **Task**: {task_description}
-- **Target Material**: {target_material}
-- **Target Temperature**: {target_temperature}°C
-- **Current Iteration**: {iteration}/{max_iterations} ({progress_pct}% complete, {stage} stage)
-
-**Action Executed**: {action}
-**Action Success**: {success}
-
-**Action Result Details**:
-{action_result_summary}
-
-**Current Knowledge State**:
-- Memories retrieved: {has_memories} ({num_memories} items)
-- Theoretical knowledge (CoreRAG): {num_theory} queries completed (failed: {failed_theory})
-- Literature knowledge (LargeRAG): {num_literature} queries completed (failed: {failed_literature})
-- Formulation candidates: {num_formulations} generated
-- Previous observations: {num_observations} recorded
 
-**Recent Observations** (last 2 iterations):
-{recent_observations}
+OBSERVE_SYSTEM_PROMPT holds the fixed instructions (sent identically on every
+call, so it can hit provider-side prompt caching); OBSERVE_PROMPT is the
+per-iteration context, formatted with the task and knowledge state.
+"""
 
----
+OBSERVE_SYSTEM_PROMPT = """You are analyzing the result of a research action in DES (Deep Eutectic Solvent) formulation design.
 
 ## Your Task
 
@@ -69,9 +49,9 @@ Analyze the action result and provide structured insights to guide the agent's n
 **Special Considerations**:
 
 - **Empty results are acceptable**: If retrieve_memories returns 0, this just means no historical data exists (not a failure)
-- **Tool failure tracking**: CoreRAG failed {failed_theory} times, LargeRAG failed {failed_literature} times
+- **Tool failure tracking**: Check the failure counts in the knowledge state
   - If failures >= 2, recommend alternative actions
-- **Progress awareness**: At {progress_pct}% complete, balance thoroughness vs. efficiency
+- **Progress awareness**: Use the current progress to balance thoroughness vs. efficiency
   - Early stage: Focus on knowledge gathering
   - Late stage: Prioritize formulation generation
 
@@ -81,7 +61,7 @@ Analyze the action result and provide structured insights to guide the agent's n
 
 Respond with ONLY a valid JSON object (no markdown, no explanation):
 
-{{
+{
     "summary": "<1-2 sentence summary of what was gained/lost>",
     "knowledge_updated": ["domain1", "domain2"],
     "key_insights": [
@@ -95,10 +75,10 @@ Respond with ONLY a valid JSON object (no markdown, no explanation):
     "information_sufficient": true/false,
     "recommended_next_action": "<action_name>",
     "recommendation_reasoning": "<1 sentence explaining why this action is recommended>"
-}}
+}
 
 **Example Output**:
-{{
+{
     "summary": "Retrieved 10 literature papers on cellulose-DES systems. All papers recommend ChCl as HBD, with glycerol (6/10) and urea (4/10) as top HBAs.",
     "knowledge_updated": ["literature"],
     "key_insights": [
@@ -114,7 +94,32 @@ Respond with ONLY a valid JSON object (no markdown, no explanation):
     "information_sufficient": false,
     "recommended_next_action": "query_theory",
     "recommendation_reasoning": "Have literature precedents but need theoretical understanding of why glycerol outperforms urea at low temperature to make informed selection"
-}}
+}"""
+
+
+OBSERVE_PROMPT = """**Task Context**:
+- **Task**: {task_description}
+- **Target Material**: {target_material}
+- **Target Temperature**: {target_temperature}°C
+- **Current Iteration**: {iteration}/{max_iterations} ({progress_pct}% complete, {stage} stage)
+
+**Action Executed**: {action}
+**Action Success**: {success}
+
+**Action Result Details**:
+{action_result_summary}
+
+**Current Knowledge State**:
+- Memories retrieved: {has_memories} ({num_memories} items)
+- Theoretical knowledge (CoreRAG): {num_theory} queries completed (failed: {failed_theory})
+- Literature knowledge (LargeRAG): {num_literature} queries completed (failed: {failed_literature})
+- Formulation candidates: {num_formulations} generated
+- Previous observations: {num_observations} recorded
+
+**Recent Observations** (last 2 iterations):
+{recent_observations}
+
+---
 
 Now analyze the action result:"""
 
@@ -14,7 +14,7 @@ Key Components:
 NEW (Async Experimental Feedback):
 - ExperimentResult: Real experimental measurements (is_liquid_formed, solubility, properties)
 - Recommendation: Persistent recommendation records with status tracking
-- RecommendationManager: JSON-based storage and indexing for recommendations
+- RecommendationManager: Storage and indexing for recommendations (SQLite or JSON backend)
 - FeedbackProcessor: Process experimental feedback and extract data-driven memories
 """
 
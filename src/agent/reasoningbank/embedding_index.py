@@ -0,0 +1,213 @@
+"""
+Embedding Index for ReasoningBank
+
+This module keeps memory embeddings in a contiguous, L2-normalised float32
+matrix so that similarity search is a single matrix-vector product instead of
+a per-memory Python loop.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingIndex:
+    """
+    Contiguous embedding matrix with a row <-> memory mapping.
+
+    Rows are pre-normalised, so cosine similarity against a normalised query
+    is a plain dot product. Adds append a row (amortised O(1), the buffer grows
+    by doubling); removals move the last row into the freed slot, so the live
+    rows always stay contiguous in ``matrix[:len(index)]``.
+
+    Memories are keyed by object identity; the index holds a reference to
+    each indexed memory so keys stay valid while they are indexed.
+
+    Attributes:
+        dim: Embedding dimension (fixed by the first embedding added)
+    """
+
+    def __init__(self, initial_capacity: int = 64):
+        self.dim: Optional[int] = None
+        self._initial_capacity = initial_capacity
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._items: List[object] = []          # row -> memory
+        self._rows: Dict[int, int] = {}         # id(memory) -> row
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, memory: object) -> bool:
+        return id(memory) in self._rows
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """View of the live rows, shape (len(index), dim)."""
+        return self._matrix[:len(self._items)]
+
+    def row_of(self, memory: object) -> Optional[int]:
+        return self._rows.get(id(memory))
+
+    def item_at(self, row: int) -> object:
+        return self._items[row]
+
+    # ============ Mutation ============
+    def add(self, memory: object, embedding: Sequence[float]) -> bool:
+        """
+        Index (or re-index) a memory's embedding.
+
+        Returns:
+            False if the embedding dimension does not match the index
+        """
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        if self.dim is None:
+            self.dim = vector.shape[0]
+            self._matrix = np.zeros((self._initial_capacity, self.dim), dtype=np.float32)
+        elif vector.shape[0] != self.dim:
+            logger.warning(
+                f"Embedding dimension {vector.shape[0]} does not match index dimension {self.dim}, "
+                f"memory not indexed"
+            )
+            self.remove(memory)
+            return False
+
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector = vector / norm
+
+        row = self._rows.get(id(memory))
+        if row is None:
+            row = len(self._items)
+            if row == self._matrix.shape[0]:
+                grown = np.zeros((max(row * 2, self._initial_capacity), self.dim), dtype=np.float32)
+                grown[:row] = self._matrix[:row]
+                self._matrix = grown
+            self._items.append(memory)
+            self._rows[id(memory)] = row
+
+        self._matrix[row] = vector
+        return True
+
+    def add_batch(self, memories: Sequence[object], vectors: np.ndarray) -> int:
+        """
+        Index many memories at once (vectorised normalisation, one copy).
+
+        Args:
+            memories: Memories not yet in the index
+            vectors: Array of shape (len(memories), dim), any float dtype
+
+        Returns:
+            Number of memories indexed
+        """
+        if len(memories) == 0:
+            return 0
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+            self._matrix = np.zeros((self._initial_capacity, self.dim), dtype=np.float32)
+        elif vectors.shape[1] != self.dim:
+            logger.warning(
+                f"Embedding dimension {vectors.shape[1]} does not match index dimension {self.dim}, "
+                f"{len(memories)} memories not indexed"
+            )
+            return 0
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+
+        start = len(self._items)
+        end = start + len(memories)
+        if end > self._matrix.shape[0]:
+            grown = np.zeros((max(end, start * 2, self._initial_capacity), self.dim), dtype=np.float32)
+            grown[:start] = self._matrix[:start]
+            self._matrix = grown
+        self._matrix[start:end] = vectors / norms
+
+        for offset, memory in enumerate(memories):
+            self._items.append(memory)
+            self._rows[id(memory)] = start + offset
+        return len(memories)
+
+    def remove(self, memory: object) -> bool:
+        row = self._rows.pop(id(memory), None)
+        if row is None:
+            return False
+
+        last = len(self._items) - 1
+        if row != last:
+            moved = self._items[last]
+            self._matrix[row] = self._matrix[last]
+            self._items[row] = moved
+            self._rows[id(moved)] = row
+        self._items.pop()
+        return True
+
+    def remove_many(self, memories: Iterable[object]) -> int:
+        return sum(1 for memory in memories if self.remove(memory))
+
+    def clear(self) -> None:
+        self.dim = None
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._items = []
+        self._rows = {}
+
+    # ============ Search ============
+    def mask_for(self, memories: Iterable[object]) -> np.ndarray:
+        """Boolean row mask selecting the given memories (unindexed ones are ignored)."""
+        mask = np.zeros(len(self._items), dtype=bool)
+        rows = [self._rows[id(m)] for m in memories if id(m) in self._rows]
+        if rows:
+            mask[rows] = True
+        return mask
+
+    def search(
+        self,
+        query_embedding: Sequence[float],
+        top_k: int,
+        mask: Optional[np.ndarray] = None,
+        min_similarity: float = 0.0,
+    ) -> List[Tuple[object, float]]:
+        """
+        Top-k cosine similarity search.
+
+        Args:
+            query_embedding: Query vector
+            top_k: Number of results
+            mask: Optional boolean row mask (True = candidate)
+            min_similarity: Minimum similarity (applied before top-k)
+
+        Returns:
+            List of (memory, score) tuples sorted by descending score; scores
+            are clamped to [0, 1]
+        """
+        if not self._items or top_k <= 0:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32).ravel()
+        if query.shape[0] != self.dim:
+            logger.warning(f"Query dimension {query.shape[0]} does not match index dimension {self.dim}")
+            return []
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            scores = np.zeros(len(self._items), dtype=np.float32)
+        else:
+            scores = self.matrix @ (query / norm)
+        np.clip(scores, 0.0, 1.0, out=scores)
+
+        valid = scores >= min_similarity
+        if mask is not None:
+            valid &= mask
+        candidates = np.flatnonzero(valid)
+        if candidates.size == 0:
+            return []
+
+        candidate_scores = scores[candidates]
+        if candidates.size > top_k:
+            top = np.argpartition(-candidate_scores, top_k - 1)[:top_k]
+            candidates, candidate_scores = candidates[top], candidate_scores[top]
+        order = np.argsort(-candidate_scores, kind="stable")
+
+        return [(self._items[candidates[i]], float(candidate_scores[i])) for i in order]
@@ -0,0 +1,144 @@
+"""
+Eviction Policies for ReasoningBank
+
+This module decides which memory ReasoningBank drops when it exceeds
+max_items. Policies score memories from the usage statistics recorded by
+MemoryRetriever (retrieval_count, last_retrieved_at) and from experiment
+validation; the memory with the lowest score is evicted.
+"""
+
+from typing import Dict, Iterable, Optional, Union
+from datetime import datetime
+import math
+
+from .memory import MemoryItem
+
+
+def _timestamp(iso: Optional[str]) -> float:
+    """ISO timestamp -> epoch seconds (0.0 if missing or malformed)."""
+    if not iso:
+        return 0.0
+    try:
+        return datetime.fromisoformat(iso).timestamp()
+    except ValueError:
+        return 0.0
+
+
+def is_validated(memory: MemoryItem) -> bool:
+    """Whether a memory was extracted from real experimental feedback."""
+    return memory.metadata.get("source") == "experiment_validated"
+
+
+def last_used(memory: MemoryItem) -> float:
+    """Epoch seconds of the last retrieval (creation time if never retrieved)."""
+    return _timestamp(memory.last_retrieved_at) or _timestamp(memory.created_at)
+
+
+class EvictionPolicy:
+    """
+    Base class: evicts the memory with the lowest score.
+
+    Subclasses override score(); ties are broken by insertion order (older
+    memories first), since candidates are passed oldest first.
+    """
+
+    name = "base"
+
+    def score(self, memory: MemoryItem, now: float) -> float:
+        raise NotImplementedError
+
+    def select_victim(self, candidates: Iterable[MemoryItem], now: Optional[float] = None) -> Optional[MemoryItem]:
+        """
+        Pick the memory to evict.
+
+        Args:
+            candidates: Evictable memories, oldest first
+            now: Current epoch seconds (default: time of call)
+
+        Returns:
+            Memory to evict, or None if there are no candidates
+        """
+        now = datetime.now().timestamp() if now is None else now
+        return min(candidates, key=lambda m: self.score(m, now), default=None)
+
+
+class FIFOPolicy(EvictionPolicy):
+    """Oldest memory first (ReasoningBank handles this case in O(1))."""
+
+    name = "fifo"
+
+    def score(self, memory: MemoryItem, now: float) -> float:
+        return 0.0
+
+
+class LRUPolicy(EvictionPolicy):
+    """Least recently retrieved first."""
+
+    name = "lru"
+
+    def score(self, memory: MemoryItem, now: float) -> float:
+        return last_used(memory)
+
+
+class LFUPolicy(EvictionPolicy):
+    """Least frequently retrieved first."""
+
+    name = "lfu"
+
+    def score(self, memory: MemoryItem, now: float) -> float:
+        return float(memory.retrieval_count)
+
+
+class ValidatedFirstPolicy(EvictionPolicy):
+    """Unvalidated memories before experiment-validated ones; LRU within each group."""
+
+    name = "validated_first"
+
+    def score(self, memory: MemoryItem, now: float) -> float:
+        # Validated memories are offset past any realistic timestamp
+        return last_used(memory) + (1e12 if is_validated(memory) else 0.0)
+
+
+class AgeDecayedUtilityPolicy(EvictionPolicy):
+    """
+    Utility = (1 + retrieval_count) * validation weight, halved every
+    half_life_days since the memory was last used.
+    """
+
+    name = "utility"
+
+    def __init__(self, half_life_days: float = 30.0, validated_weight: float = 2.0):
+        self.half_life_seconds = half_life_days * 86400
+        self.validated_weight = validated_weight
+
+    def score(self, memory: MemoryItem, now: float) -> float:
+        utility = 1.0 + memory.retrieval_count
+        if is_validated(memory):
+            utility *= self.validated_weight
+        age = max(0.0, now - last_used(memory))
+        return utility * math.pow(0.5, age / self.half_life_seconds)
+
+
+EVICTION_POLICIES: Dict[str, type] = {
+    policy.name: policy
+    for policy in (FIFOPolicy, LRUPolicy, LFUPolicy, ValidatedFirstPolicy, AgeDecayedUtilityPolicy)
+}
+
+
+def get_eviction_policy(policy: Union[str, EvictionPolicy], **kwargs) -> EvictionPolicy:
+    """
+    Resolve a policy name (see EVICTION_POLICIES) or pass an instance through.
+
+    Args:
+        policy: Policy name or EvictionPolicy instance
+        **kwargs: Constructor arguments for named policies that take them
+
+    Raises:
+        ValueError: If the name is unknown
+    """
+    if isinstance(policy, EvictionPolicy):
+        return policy
+    if policy not in EVICTION_POLICIES:
+        raise ValueError(f"Unknown eviction policy {policy!r}; choose from {sorted(EVICTION_POLICIES)}")
+    cls = EVICTION_POLICIES[policy]
+    return cls(**kwargs) if cls is AgeDecayedUtilityPolicy else cls()
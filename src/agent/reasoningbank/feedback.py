@@ -12,10 +12,12 @@ from dataclasses import dataclass, field, asdict
 from typing import Optional, List, Dict, Any, Callable
 from pathlib import Path
 from datetime import datetime
-import json
 import logging
+import threading
 
 from .memory import Trajectory, MemoryItem
+from .recommendation_stats import RecommendationStatistics
+from .recommendation_store import create_recommendation_store
 
 logger = logging.getLogger(__name__)
 
@@ -181,53 +183,64 @@ class RecommendationManager:
     """
     Manages persistent storage and retrieval of DES formulation recommendations.
 
-    Storage Strategy:
-    - Phase 1: JSON files (one per recommendation) + index.json
-    - Advantages: Simple, debuggable, Git-compatible, easy migration
+    Storage Strategy (see recommendation_store):
+    - "sqlite" (default): one SQLite database (WAL mode) with indexed header
+      columns; list, filter and statistics queries never load full records
+    - "json": one JSON file per recommendation + index.json (Git-friendly,
+      easy to inspect by hand)
+    - An existing JSON directory is migrated to SQLite on first use
+
+    Concurrency:
+    - Safe to share between request handlers and background task threads
+    - Read-modify-write operations (update_recommendation, update_status,
+      submit_feedback, rename_recommendation, replace_placeholder) are
+      serialised by a manager lock, so concurrent updates are not lost
+    - Backends write atomically (see recommendation_store)
     - Directory structure:
         data/recommendations/
-        ├── index.json
-        ├── REC_20251016_001.json
-        ├── REC_20251016_002.json
+        ├── recommendations.db      (sqlite)
+        ├── index.json              (json)
+        ├── REC_20251016_001.json   (json)
         └── ...
 
     Methods:
         save_recommendation: Persist recommendation to disk
         get_recommendation: Load recommendation by ID
+        delete_recommendation: Remove recommendation
+        update_recommendation: Atomically modify a recommendation
+        rename_recommendation: Atomically move a recommendation to a new ID
+        replace_placeholder: Atomically replace a placeholder with a recommendation
         list_recommendations: Query recommendations with filters
         update_status: Update recommendation status
         submit_feedback: Submit experimental feedback
         get_statistics: Get summary statistics
     """
 
-    def __init__(self, storage_path: str = "data/recommendations"):
+    def __init__(self, storage_path: str = "data/recommendations", backend: str = "sqlite"):
         """
         Initialize RecommendationManager.
 
         Args:
             storage_path: Directory path for storing recommendations
+            backend: Storage backend ("sqlite" or "json")
         """
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(parents=True, exist_ok=True)
-        self.index_file = self.storage_path / "index.json"
-        self._load_index()
-        logger.info(f"Initialized RecommendationManager at {self.storage_path}")
-
-    def _load_index(self):
-        """Load recommendation index"""
-        if self.index_file.exists():
-            with open(self.index_file, "r", encoding="utf-8") as f:
-                self.index = json.load(f)
-            logger.debug(f"Loaded index with {len(self.index)} entries")
-        else:
-            self.index = {}
-            logger.debug("Created new index")
+        self.backend = backend
+        self.store = create_recommendation_store(backend, self.storage_path)
+        self._lock = threading.RLock()
+        if self.store.statistics is None:
+            self.rebuild_statistics()
+        logger.info(
+            f"Initialized RecommendationManager at {self.storage_path} "
+            f"(backend={backend}, {len(self.store)} recommendations)"
+        )
 
-    def _save_index(self):
-        """Save recommendation index"""
-        with open(self.index_file, "w", encoding="utf-8") as f:
-            json.dump(self.index, f, indent=2, ensure_ascii=False)
-        logger.debug(f"Saved index with {len(self.index)} entries")
+    @property
+    def index(self) -> Dict[str, Dict[str, Any]]:
+        """Snapshot of all headers keyed by recommendation ID (read-only view)."""
+        items, _ = self.store.query()
+        return {item.pop("recommendation_id"): item for item in items}
 
     def _get_formulation_summary(self, formulation: Dict) -> str:
         """
@@ -251,73 +264,255 @@ class RecommendationManager:
             molar_ratio = formulation.get("molar_ratio", "?")
             return f"{hbd} : {hba} ({molar_ratio})"
 
-    def save_recommendation(self, rec: Recommendation) -> str:
-        """
-        Save recommendation to disk.
-
-        Args:
-            rec: Recommendation object
-
-        Returns:
-            str: Recommendation ID
-        """
-        rec_file = self.storage_path / f"{rec.recommendation_id}.json"
-
-        # Save recommendation
-        with open(rec_file, "w", encoding="utf-8") as f:
-            json.dump(rec.to_dict(), f, indent=2, ensure_ascii=False)
-
-        # Update index with extended fields for fast list access
-        self.index[rec.recommendation_id] = {
+    def _build_header(self, rec: Recommendation) -> Dict[str, Any]:
+        """Header fields stored next to the record for fast list access."""
+        return {
             "task_id": rec.task_id,
             "status": rec.status,
             "created_at": rec.created_at,
             "updated_at": rec.updated_at,
             "target_material": rec.task.get("target_material"),
             "target_temperature": rec.task.get("target_temperature"),
-            # New fields for list view (v2)
             "formulation_summary": self._get_formulation_summary(rec.formulation),
             "formulation": rec.formulation,  # Store full formulation dict
             "confidence": rec.confidence,
             "performance_score": rec.experiment_result.get_performance_score() if rec.experiment_result else None,
-            "file": str(rec_file),
+            # Experiment outcome (for materialized statistics)
+            "is_liquid_formed": rec.experiment_result.is_liquid_formed if rec.experiment_result else None,
+            "solubility": rec.experiment_result.solubility if rec.experiment_result else None,
+            "solubility_unit": rec.experiment_result.solubility_unit if rec.experiment_result else None,
         }
-        self._save_index()
+
+    @property
+    def statistics(self) -> RecommendationStatistics:
+        """
+        Materialized statistics, kept up to date on every save/delete.
+
+        Returns a snapshot; reading it costs the same regardless of how many
+        recommendations are stored.
+        """
+        return self.store.snapshot_statistics()
+
+    def rebuild_statistics(self):
+        """
+        Recompute headers and materialized statistics from the full records.
+
+        Runs automatically when a store has no (or stale) persisted
+        statistics, e.g. the first start after upgrading.
+        """
+        with self._lock:
+            headers = {}
+            for rec_id in self.store.ids():
+                rec = self.get_recommendation(rec_id, include_trajectory=False)
+                if rec:
+                    headers[rec_id] = self._build_header(rec)
+            self.store.rebuild_statistics(headers)
+        logger.info(f"Rebuilt statistics for {len(headers)} recommendations")
+
+    def save_recommendation(self, rec: Recommendation) -> str:
+        """
+        Save recommendation to disk.
+
+        Args:
+            rec: Recommendation object
+
+        Returns:
+            str: Recommendation ID
+        """
+        self.store.put(rec.recommendation_id, self._build_header(rec), rec.to_dict())
 
         logger.info(
             f"Saved recommendation {rec.recommendation_id} with status {rec.status}"
         )
         return rec.recommendation_id
 
-    def get_recommendation(self, rec_id: str) -> Optional[Recommendation]:
+    def get_recommendation(self, rec_id: str, include_trajectory: bool = True) -> Optional[Recommendation]:
         """
         Get recommendation by ID.
 
         Args:
             rec_id: Recommendation ID
+            include_trajectory: Load the trajectory payload (ReAct steps and
+                tool outputs). If False, trajectory.steps is None and
+                trajectory.metadata has no "tool_calls"; everything else
+                (final_result, outcome, other metadata) is present. Such a
+                recommendation can be saved; its stored payload is kept.
 
         Returns:
             Recommendation object or None if not found
         """
-        if rec_id not in self.index:
-            logger.warning(f"Recommendation {rec_id} not found in index")
+        data = self.store.get(rec_id, include_trajectory=include_trajectory)
+        if data is None:
+            logger.warning(f"Recommendation {rec_id} not found")
             return None
 
-        rec_file = Path(self.index[rec_id]["file"])
-        if not rec_file.exists():
-            logger.error(f"Recommendation file not found: {rec_file}")
+        return Recommendation.from_dict(data)
+
+    def load_trajectory(self, rec: Recommendation) -> Recommendation:
+        """
+        Load the trajectory payload of a recommendation fetched without it.
+
+        Args:
+            rec: Recommendation from get_recommendation(include_trajectory=False)
+
+        Returns:
+            The same Recommendation with trajectory steps and tool_calls filled in
+        """
+        if rec.trajectory.steps is None:
+            payload = self.store.get_payload(rec.recommendation_id) or {"steps": []}
+            rec.trajectory.steps = payload["steps"]
+            if "tool_calls" in payload:
+                rec.trajectory.metadata["tool_calls"] = payload["tool_calls"]
+        return rec
+
+    def get_fields(self, rec_id: str, fields: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Get selected top-level fields of a recommendation (field projection).
+
+        Fields available in the header (status, updated_at, formulation,
+        confidence, ...) are answered without reading the record; other
+        fields read the record body, and "trajectory" also its payload.
+
+        Args:
+            rec_id: Recommendation ID
+            fields: Recommendation field names
+
+        Returns:
+            Dict of the requested fields, or None if not found
+        """
+        header = self.store.get_header(rec_id)
+        if header is None:
             return None
+        if all(name in header for name in fields):
+            return {name: header[name] for name in fields}
 
-        with open(rec_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = self.store.get(rec_id, include_trajectory="trajectory" in fields)
+        return {name: data.get(name, header.get(name)) for name in fields}
 
-        return Recommendation.from_dict(data)
+    def delete_recommendation(self, rec_id: str) -> bool:
+        """
+        Delete a recommendation.
+
+        Args:
+            rec_id: Recommendation ID
+
+        Returns:
+            True if the recommendation existed
+        """
+        with self._lock:
+            deleted = self.store.delete(rec_id)
+        if deleted:
+            logger.info(f"Deleted recommendation {rec_id}")
+        return deleted
+
+    def update_recommendation(
+        self,
+        rec_id: str,
+        mutate: Callable[[Recommendation], None],
+        include_trajectory: bool = False,
+    ) -> Recommendation:
+        """
+        Atomically load, modify and save a recommendation.
+
+        Concurrent updates of the same manager are serialised, so each
+        mutate() sees the result of the previous one. updated_at is set
+        automatically.
+
+        Args:
+            rec_id: Recommendation ID
+            mutate: Function modifying the loaded Recommendation in place
+            include_trajectory: Load trajectory steps/tool outputs for mutate()
+                (not needed for status, feedback or trajectory metadata)
+
+        Returns:
+            The saved Recommendation
+
+        Raises:
+            ValueError: If the recommendation does not exist
+        """
+        with self._lock:
+            rec = self.get_recommendation(rec_id, include_trajectory=include_trajectory)
+            if not rec:
+                raise ValueError(f"Recommendation {rec_id} not found")
+
+            mutate(rec)
+            rec.updated_at = datetime.now().isoformat()
+            self.save_recommendation(rec)
+        return rec
+
+    def rename_recommendation(self, old_id: str, new_id: str) -> Recommendation:
+        """
+        Atomically move a recommendation to a new ID.
+
+        Args:
+            old_id: Current recommendation ID
+            new_id: New recommendation ID (must not exist)
+
+        Returns:
+            The renamed Recommendation
+
+        Raises:
+            ValueError: If old_id does not exist or new_id already exists
+        """
+        with self._lock:
+            if new_id in self.store:
+                raise ValueError(f"Recommendation {new_id} already exists")
+            return self._move(old_id, new_id)
+
+    def replace_placeholder(self, placeholder_id: str, rec_id: str) -> Optional[Recommendation]:
+        """
+        Atomically replace a placeholder with another recommendation.
+
+        Used when a background task finishes: the recommendation the agent
+        saved (rec_id) takes over the ID of the GENERATING placeholder that
+        was returned to the user, and rec_id disappears. Readers see either
+        the placeholder or the finished recommendation, never both or none.
+
+        If the placeholder was deleted or is no longer GENERATING (e.g. the
+        user cancelled it, or it was marked FAILED while the agent was still
+        running), it is left alone and rec_id is deleted instead.
+
+        Args:
+            placeholder_id: ID of the placeholder (overwritten)
+            rec_id: ID of the recommendation replacing it (removed)
+
+        Returns:
+            The Recommendation now stored under placeholder_id, or None if
+            the placeholder was no longer GENERATING and rec_id was discarded
+
+        Raises:
+            ValueError: If rec_id does not exist
+        """
+        with self._lock:
+            placeholder = self.get_fields(placeholder_id, ["status"])
+            if not placeholder or placeholder["status"] != "GENERATING":
+                state = placeholder["status"] if placeholder else "deleted"
+                self.store.delete(rec_id)
+                logger.warning(
+                    f"Placeholder {placeholder_id} is {state}, discarding recommendation {rec_id}"
+                )
+                return None
+            return self._move(rec_id, placeholder_id)
+
+    def _move(self, old_id: str, new_id: str) -> Recommendation:
+        """Store old_id's recommendation under new_id and remove old_id (caller holds the lock)."""
+        rec = self.get_recommendation(old_id)
+        if not rec:
+            raise ValueError(f"Recommendation {old_id} not found")
+
+        rec.recommendation_id = new_id
+        rec.updated_at = datetime.now().isoformat()
+        self.store.replace(old_id, new_id, self._build_header(rec), rec.to_dict())
+
+        logger.info(f"Moved recommendation {old_id} -> {new_id}")
+        return rec
 
     def list_recommendations(
         self,
         status: Optional[str] = None,
         target_material: Optional[str] = None,
         limit: int = 100,
+        include_trajectory: bool = True,
     ) -> List[Recommendation]:
         """
         Query recommendations with filters.
@@ -326,30 +521,19 @@ class RecommendationManager:
             status: Filter by status (PENDING, COMPLETED, CANCELLED)
             target_material: Filter by target material
             limit: Maximum number of results
+            include_trajectory: Load trajectory payloads (see get_recommendation)
 
         Returns:
-            List of Recommendation objects
+            List of Recommendation objects (newest first)
         """
-        filtered = []
+        headers, _ = self.store.query(status=status, target_material=target_material, limit=limit)
 
-        for rec_id, meta in self.index.items():
-            # Apply filters
-            if status and meta["status"] != status:
-                continue
-            if target_material and meta.get("target_material") != target_material:
-                continue
-
-            # Load recommendation
-            rec = self.get_recommendation(rec_id)
+        filtered = []
+        for meta in headers:
+            rec = self.get_recommendation(meta["recommendation_id"], include_trajectory=include_trajectory)
             if rec:
                 filtered.append(rec)
 
-            if len(filtered) >= limit:
-                break
-
-        # Sort by creation time (descending)
-        filtered.sort(key=lambda r: r.created_at, reverse=True)
-
         logger.debug(
             f"Listed {len(filtered)} recommendations "
             f"(status={status}, material={target_material})"
@@ -365,14 +549,10 @@ class RecommendationManager:
             rec_id: Recommendation ID
             status: New status (PENDING, COMPLETED, CANCELLED)
         """
-        rec = self.get_recommendation(rec_id)
-        if not rec:
-            raise ValueError(f"Recommendation {rec_id} not found")
-
-        rec.status = status
-        rec.updated_at = datetime.now().isoformat()
-        self.save_recommendation(rec)
+        def apply(rec: Recommendation):
+            rec.status = status
 
+        self.update_recommendation(rec_id, apply)
         logger.info(f"Updated {rec_id} status to {status}")
 
     def submit_feedback(self, rec_id: str, experiment_result: ExperimentResult):
@@ -383,15 +563,11 @@ class RecommendationManager:
             rec_id: Recommendation ID
             experiment_result: ExperimentResult object
         """
-        rec = self.get_recommendation(rec_id)
-        if not rec:
-            raise ValueError(f"Recommendation {rec_id} not found")
+        def apply(rec: Recommendation):
+            rec.experiment_result = experiment_result
+            rec.status = "COMPLETED"
 
-        rec.experiment_result = experiment_result
-        rec.status = "COMPLETED"
-        rec.updated_at = datetime.now().isoformat()
-
-        self.save_recommendation(rec)
+        self.update_recommendation(rec_id, apply)
         logger.info(f"Submitted experimental feedback for {rec_id}")
 
     def get_statistics(self) -> Dict:
@@ -401,22 +577,16 @@ class RecommendationManager:
         Returns:
             Dict with statistics
         """
-        stats = {"total": len(self.index), "by_status": {}, "by_material": {}}
-
-        for meta in self.index.values():
-            # Count by status
-            status = meta["status"]
-            stats["by_status"][status] = stats["by_status"].get(status, 0) + 1
-
-            # Count by material
-            material = meta.get("target_material", "unknown")
-            stats["by_material"][material] = stats["by_material"].get(material, 0) + 1
-
-        return stats
+        summary = self.statistics.summary()
+        return {
+            "total": summary["total"],
+            "by_status": summary["by_status"],
+            "by_material": summary["by_material"],
+        }
 
     def get_statistics_fast(self, material: Optional[str] = None) -> Dict[str, int]:
         """
-        Get lightweight statistics from index only (no file I/O).
+        Get lightweight statistics from headers only (no record I/O).
 
         Args:
             material: Optional material filter
@@ -433,15 +603,11 @@ class RecommendationManager:
             "CANCELLED": 0
         }
 
-        for rec_id, meta in self.index.items():
-            # Apply material filter if specified
-            if material and meta.get("target_material") != material:
-                continue
-
-            stats["all"] += 1
-            status = meta["status"]
+        by_status = self.store.count_by("status", target_material=material) if material else self.statistics.by_status
+        for status, count in by_status.items():
+            stats["all"] += count
             if status in stats:
-                stats[status] += 1
+                stats[status] += count
 
         logger.debug(f"Fast statistics: {stats} (material={material})")
         return stats
@@ -454,7 +620,7 @@ class RecommendationManager:
         page_size: int = 20
     ) -> Dict[str, Any]:
         """
-        Fast list recommendations using index only (no file I/O).
+        Fast list recommendations using headers only (no record I/O).
 
         Args:
             status: Filter by status
@@ -463,27 +629,14 @@ class RecommendationManager:
             page_size: Items per page
 
         Returns:
-            Dict with items (index metadata) and pagination info
+            Dict with items (header metadata) and pagination info
         """
-        # Filter from index
-        filtered = []
-        for rec_id, meta in self.index.items():
-            if status and meta["status"] != status:
-                continue
-            if target_material and meta.get("target_material") != target_material:
-                continue
-
-            # Add rec_id to meta for response
-            filtered.append({**meta, "recommendation_id": rec_id})
-
-        # Sort by created_at (descending)
-        filtered.sort(key=lambda x: x["created_at"], reverse=True)
-
-        # Pagination
-        total = len(filtered)
-        start_idx = (page - 1) * page_size
-        end_idx = start_idx + page_size
-        page_items = filtered[start_idx:end_idx]
+        page_items, total = self.store.query(
+            status=status,
+            target_material=target_material,
+            offset=(page - 1) * page_size,
+            limit=page_size,
+        )
 
         logger.debug(
             f"Fast list: {len(page_items)}/{total} items "
@@ -500,6 +653,10 @@ class RecommendationManager:
             }
         }
 
+    def close(self):
+        """Close the storage backend."""
+        self.store.close()
+
 
 class FeedbackProcessor:
     """
@@ -587,19 +744,26 @@ class FeedbackProcessor:
 
         # 5. Consolidate to ReasoningBank
         if new_memories:
-            self.agent.memory.consolidate(new_memories)
+            consolidation = self.agent.memory.consolidate(new_memories)
             logger.info(
-                f"Consolidated {len(new_memories)} experiment-validated memories"
+                f"Consolidated {len(new_memories)} experiment-validated memories "
+                f"(added={consolidation['added']}, merged={consolidation['merged']}, "
+                f"superseded={consolidation['superseded']})"
             )
 
             # Auto-save if configured
             if self.agent.config.get("memory", {}).get("auto_save", False):
                 save_path = self.agent.config["memory"]["persist_path"]
-                self.agent.memory.save(save_path)
+                self.agent.memory.persist(save_path)
                 logger.info(f"Auto-saved memory bank to {save_path}")
 
-        # 6. Save updated recommendation
-        self.rec_manager.save_recommendation(rec)
+        # 6. Save updated trajectory (onto the latest stored version, since the
+        # status may have changed while memories were being extracted)
+        def apply_trajectory(latest: Recommendation):
+            latest.trajectory.outcome = rec.trajectory.outcome
+            latest.trajectory.metadata.update(rec.trajectory.metadata)
+
+        self.rec_manager.update_recommendation(rec_id, apply_trajectory)
 
         result = {
             "recommendation_id": rec_id,
@@ -623,7 +787,7 @@ class FeedbackProcessor:
         Returns:
             List of processing results
         """
-        completed_recs = self.rec_manager.list_recommendations(status="COMPLETED")
+        completed_recs = self.rec_manager.list_recommendations(status="COMPLETED", include_trajectory=False)
 
         results = []
         for rec in completed_recs:
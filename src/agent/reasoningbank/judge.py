@@ -61,7 +61,11 @@ class LLMJudge:
 
         # Call LLM
         try:
-            llm_output = self.llm_client(prompt)
+            if hasattr(self.llm_client, "chat"):
+                # Pass the judge's temperature (0.0 makes the call deterministic and cacheable)
+                llm_output = self.llm_client.chat(prompt, temperature=self.temperature)
+            else:
+                llm_output = self.llm_client(prompt)
             logger.debug(f"Judge LLM output: {llm_output[:200]}...")
         except Exception as e:
             logger.error(f"LLM call failed during judging: {e}")
@@ -9,6 +9,7 @@ from dataclasses import dataclass, field, asdict
 from typing import Optional, List
 from datetime import datetime
 import json
+import uuid
 
 
 @dataclass
@@ -27,8 +28,14 @@ class MemoryItem:
         source_task_id: Optional identifier of the task that generated this memory
         is_from_success: Whether this memory was extracted from a successful (True) or failed (False) trajectory
         created_at: ISO timestamp of when this memory was created
-        embedding: Optional vector embedding for semantic similarity search
+        embedding: Optional vector embedding for semantic similarity search (a list of
+            floats, or a read-only numpy row view when loaded from a binary sidecar)
         metadata: Additional key-value pairs for filtering and organization
+        id: Stable identifier (survives save/load; keys the embedding sidecar)
+        cluster_id: Id of the cluster of semantically similar memories (assigned by
+            ReasoningBank.consolidate; None for memories added before clustering)
+        retrieval_count: Number of times MemoryRetriever returned this memory
+        last_retrieved_at: ISO timestamp of the last retrieval (None if never retrieved)
     """
 
     title: str
@@ -39,6 +46,10 @@ class MemoryItem:
     created_at: str = field(default_factory=lambda: datetime.now().isoformat())
     embedding: Optional[List[float]] = None
     metadata: dict = field(default_factory=dict)
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    cluster_id: Optional[str] = None
+    retrieval_count: int = 0
+    last_retrieved_at: Optional[str] = None
 
     def __post_init__(self):
         """Validate memory item fields"""
@@ -49,18 +60,28 @@ class MemoryItem:
         if not self.content or not self.content.strip():
             raise ValueError("Memory content cannot be empty")
 
-    def to_dict(self) -> dict:
+    def to_dict(self, include_embedding: bool = True) -> dict:
         """Convert memory item to dictionary for serialization"""
-        return {
+        embedding = self.embedding if include_embedding else None
+        if embedding is not None and not isinstance(embedding, list):
+            embedding = [float(x) for x in embedding]
+        data = {
+            "id": self.id,
             "title": self.title,
             "description": self.description,
             "content": self.content,
             "source_task_id": self.source_task_id,
             "is_from_success": self.is_from_success,
             "created_at": self.created_at,
-            "embedding": self.embedding,
+            "embedding": embedding,
             "metadata": self.metadata,
+            "cluster_id": self.cluster_id,
+            "retrieval_count": self.retrieval_count,
+            "last_retrieved_at": self.last_retrieved_at,
         }
+        if not include_embedding:
+            del data["embedding"]
+        return data
 
     @classmethod
     def from_dict(cls, data: dict) -> "MemoryItem":
@@ -74,6 +95,10 @@ class MemoryItem:
             created_at=data.get("created_at", datetime.now().isoformat()),
             embedding=data.get("embedding"),
             metadata=data.get("metadata", {}),
+            id=data.get("id") or uuid.uuid4().hex,
+            cluster_id=data.get("cluster_id"),
+            retrieval_count=data.get("retrieval_count", 0),
+            last_retrieved_at=data.get("last_retrieved_at"),
         )
 
     def to_prompt_string(self) -> str:
@@ -5,16 +5,40 @@ This module implements the central memory storage and management system for
 the ReasoningBank framework.
 """
 
-from typing import List, Optional, Dict, Callable
+from typing import Any, List, Optional, Dict, Callable, Iterable, Tuple, Union
+from collections import Counter
+from dataclasses import fields
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import json
 import os
+import threading
+import uuid
 from pathlib import Path
 import logging
 
+import numpy as np
+
 from .memory import MemoryItem, MemoryQuery
+from .embedding_index import EmbeddingIndex
+from .eviction import EvictionPolicy, get_eviction_policy
+from .memory_wal import MemoryWAL, decode_embedding, encode_embedding
 
 logger = logging.getLogger(__name__)
 
+# On-disk format written by ReasoningBank.save (load also reads "1.0")
+FORMAT_VERSION = "2.0"
+
+# Filter keys with a secondary index (MemoryItem attributes or metadata keys)
+DEFAULT_INDEXED_KEYS = ("title", "source_task_id", "is_from_success", "recommendation_id", "cluster_id")
+
+# What consolidate() does with a new memory that duplicates a stored one
+DEDUP_POLICIES = ("append", "merge", "supersede")
+
+_MEMORY_FIELDS = frozenset(f.name for f in fields(MemoryItem))
+_MISSING = object()      # memory lacks the (metadata) key
+_UNHASHABLE = object()   # index bucket for unhashable values (verified by equality)
+
 
 class ReasoningBank:
     """
@@ -23,20 +47,46 @@ class ReasoningBank:
     ReasoningBank maintains a collection of MemoryItem objects that represent
     distilled reasoning strategies extracted from past experiences. It supports:
     - Adding new memories with automatic embedding
-    - Retrieving relevant memories via similarity search
-    - Persisting memories to disk for long-term storage
-    - Simple consolidation (currently append-only)
+    - Retrieving relevant memories via similarity search (vectorised over a
+      contiguous, pre-normalised embedding matrix kept in sync on add/delete)
+    - O(1) lookups by id/title and indexed filtering on title, source_task_id,
+      is_from_success, recommendation_id and registered metadata keys
+    - Persisting memories to disk for long-term storage (compact JSON records
+      plus a memory-mapped .npy embedding sidecar keyed by memory id)
+    - Incremental auto-save: persist() appends mutations to a write-ahead log
+      and only rewrites the snapshot when the log is compacted
+    - Consolidation with semantic deduplication (append / merge / supersede)
+      and cluster ids for diverse retrieval
+    - Pluggable eviction when full (FIFO, LRU, LFU, validated-first or
+      age-decayed utility over the retrieval statistics of each memory)
 
     Attributes:
-        memories: List of all stored MemoryItem objects
+        memories: List of all stored MemoryItem objects, oldest first (a copy;
+            mutate through the bank's methods so the indexes stay in sync)
         embedding_func: Optional function to compute embeddings (query_text) -> List[float]
-        max_items: Maximum number of memories to store (oldest removed if exceeded)
+        embedding_batch_func: Optional batch variant (texts) -> List[List[float]]
+        max_items: Maximum number of memories to store (eviction_policy picks the
+            memory removed when exceeded)
+        eviction_policy: EvictionPolicy applied when the bank is full
+        embedding_dtype: dtype of the on-disk embedding sidecar
     """
 
     def __init__(
         self,
         embedding_func: Optional[Callable[[str], List[float]]] = None,
         max_items: int = 1000,
+        embedding_batch_func: Optional[Callable[[List[str]], List[List[float]]]] = None,
+        embedding_batch_size: int = 10,
+        embedding_workers: int = 4,
+        embedding_dtype: str = "float16",
+        wal_fsync_interval: float = 1.0,
+        wal_compact_threshold: int = 500,
+        indexed_metadata_keys: Iterable[str] = (),
+        dedup_policy: str = "append",
+        dedup_threshold: float = 0.95,
+        cluster_threshold: float = 0.85,
+        eviction_policy: Union[str, EvictionPolicy] = "fifo",
+        eviction_half_life_days: float = 30.0,
     ):
         """
         Initialize ReasoningBank.
@@ -44,11 +94,66 @@ class ReasoningBank:
         Args:
             embedding_func: Function that takes a string and returns an embedding vector
             max_items: Maximum capacity of the memory bank
+            embedding_batch_func: Function that embeds a list of strings in one call
+                (used by add_memories/consolidate/embed_memories)
+            embedding_batch_size: Texts per embedding_batch_func call (provider request limit)
+            embedding_workers: Concurrent batch calls when embedding many memories
+            embedding_dtype: Storage dtype of the embedding sidecar ("float16" or "float32")
+            wal_fsync_interval: Minimum seconds between WAL fsyncs (0 = fsync every persist)
+            wal_compact_threshold: WAL records after which persist() writes a full snapshot
+            indexed_metadata_keys: Extra metadata keys to index for filter_memories
+            dedup_policy: consolidate() handling of near-duplicates: "append" (keep
+                both), "merge" (fold the new one into the stored one) or
+                "supersede" (replace the stored one)
+            dedup_threshold: Cosine similarity at which memories count as duplicates
+            cluster_threshold: Cosine similarity at which a new memory joins the
+                cluster of its nearest stored neighbour
+            eviction_policy: Which memory to drop when max_items is exceeded: "fifo"
+                (oldest), "lru", "lfu", "validated_first", "utility" (see eviction.py)
+                or an EvictionPolicy instance
+            eviction_half_life_days: Half-life of the "utility" policy's recency decay
         """
-        self.memories: List[MemoryItem] = []
+        if embedding_dtype not in ("float16", "float32"):
+            raise ValueError(f"embedding_dtype must be 'float16' or 'float32', got {embedding_dtype!r}")
+        if dedup_policy not in DEDUP_POLICIES:
+            raise ValueError(f"dedup_policy must be one of {DEDUP_POLICIES}, got {dedup_policy!r}")
         self.embedding_func = embedding_func
+        self.embedding_batch_func = embedding_batch_func
+        self.embedding_batch_size = embedding_batch_size
+        self.embedding_workers = embedding_workers
         self.max_items = max_items
-        logger.info(f"Initialized ReasoningBank with max_items={max_items}")
+        self.embedding_dtype = embedding_dtype
+        self.wal_fsync_interval = wal_fsync_interval
+        self.wal_compact_threshold = wal_compact_threshold
+        self.dedup_policy = dedup_policy
+        self.dedup_threshold = dedup_threshold
+        self.cluster_threshold = cluster_threshold
+        self.eviction_policy = get_eviction_policy(eviction_policy, half_life_days=eviction_half_life_days)
+        self._embedding_index = EmbeddingIndex()
+
+        # Storage and secondary indexes (see _insert/_remove). _memories keeps
+        # insertion order, so the oldest memory (next FIFO victim) is its first key.
+        self._indexed_keys = tuple(dict.fromkeys([*DEFAULT_INDEXED_KEYS, *indexed_metadata_keys]))
+        self._memories: Dict[str, MemoryItem] = {}
+        self._seq: Dict[str, int] = {}
+        self._next_seq = 0
+        self._indexes: Dict[str, Dict[Any, Dict[str, MemoryItem]]] = {}
+        self._index_values: Dict[str, Dict[str, Any]] = {}
+        self._reset([])
+
+        # Write-ahead log state (see persist()). _lock serialises mutations with
+        # persist/save, so no mutation can fall between a snapshot (or WAL append)
+        # and the reset of _pending_ops. search/filter_memories take it too, so a
+        # read never sees the embedding matrix and the indexes mid-update.
+        self._lock = threading.RLock()
+        self._pending_ops: List[Tuple] = []     # mutations not yet in the WAL
+        self._wal_seq = 0                       # seq of the last logged mutation
+        self._wal: Optional[MemoryWAL] = None   # log of the snapshot at _snapshot_path
+        self._snapshot_path: Optional[str] = None
+        logger.info(
+            f"Initialized ReasoningBank with max_items={max_items}, "
+            f"eviction_policy={self.eviction_policy.name}"
+        )
 
     def add_memory(self, memory: MemoryItem, compute_embedding: bool = True) -> None:
         """
@@ -68,37 +173,249 @@ class ReasoningBank:
         # Compute embedding if requested and function is available
         if compute_embedding and self.embedding_func and memory.embedding is None:
             try:
-                # Use title + description for embedding
-                embed_text = f"{memory.title}. {memory.description}"
-                memory.embedding = self.embedding_func(embed_text)
+                memory.embedding = self.embedding_func(self.embedding_text(memory))
                 logger.debug(f"Computed embedding for memory: {memory.title}")
             except Exception as e:
                 logger.warning(f"Failed to compute embedding: {e}")
                 # Continue without embedding
 
-        # Add to collection
-        self.memories.append(memory)
-        logger.info(f"Added memory '{memory.title}' (total: {len(self.memories)})")
+        with self._lock:
+            if memory.id in self._memories:
+                raise ValueError(f"Memory '{memory.title}' (id={memory.id}) is already in the bank")
 
-        # Enforce max_items limit (remove oldest)
-        if len(self.memories) > self.max_items:
-            removed = self.memories.pop(0)
-            logger.info(
-                f"Removed oldest memory '{removed.title}' (limit: {self.max_items})"
+            # Add to collection
+            self._add(memory)
+            logger.info(f"Added memory '{memory.title}' (total: {len(self._memories)})")
+
+            # Enforce max_items limit (never evicts the memory just added)
+            if len(self._memories) > self.max_items:
+                self._evict(exclude=memory)
+
+    def _add(self, memory: MemoryItem) -> None:
+        self._insert(memory)
+        if memory.embedding is not None:
+            self._embedding_index.add(memory, memory.embedding)
+        self._pending_ops.append(("add", memory))
+
+    def _evict(self, exclude: MemoryItem) -> None:
+        """Remove one memory chosen by the eviction policy."""
+        if self.eviction_policy.name == "fifo":
+            removed = next(iter(self._memories.values()))  # oldest, O(1)
+        else:
+            removed = self.eviction_policy.select_victim(
+                m for m in self._memories.values() if m is not exclude
             )
+        self._remove([removed])
+        self._pending_ops.append(("delete", [removed.id]))
+        logger.info(
+            f"Evicted memory '{removed.title}' ({self.eviction_policy.name}, "
+            f"retrievals: {removed.retrieval_count}, limit: {self.max_items})"
+        )
+
+    def record_retrieval(self, memories: Iterable[MemoryItem]) -> None:
+        """
+        Record that memories were retrieved (feeds the eviction policy).
+
+        Increments retrieval_count and sets last_retrieved_at; memories no
+        longer in the bank are ignored.
+
+        Args:
+            memories: Retrieved MemoryItem objects
+        """
+        now = datetime.now().isoformat()
+        ids = []
+        with self._lock:
+            for memory in memories:
+                if self._memories.get(memory.id) is memory:
+                    memory.retrieval_count += 1
+                    memory.last_retrieved_at = now
+                    ids.append(memory.id)
+            if ids:
+                self._pending_ops.append(("touch", ids, now))
 
     def add_memories(
         self, memories: List[MemoryItem], compute_embeddings: bool = True
-    ) -> None:
+    ) -> Dict[str, str]:
         """
         Add multiple memory items in batch.
 
+        Missing embeddings are computed together via embed_memories() instead
+        of one embedding call per memory.
+
         Args:
             memories: List of MemoryItem objects to add
             compute_embeddings: Whether to compute embeddings
+
+        Returns:
+            Embedding failures as {memory id: error message} (those memories
+            are still added, without an embedding)
         """
+        failures = self.embed_memories(memories) if compute_embeddings else {}
         for memory in memories:
-            self.add_memory(memory, compute_embedding=compute_embeddings)
+            self.add_memory(memory, compute_embedding=False)
+        return failures
+
+    @staticmethod
+    def embedding_text(memory: MemoryItem) -> str:
+        """Text embedded for a memory (title + description)."""
+        return f"{memory.title}. {memory.description}"
+
+    def embed_memories(self, memories: List[MemoryItem]) -> Dict[str, str]:
+        """
+        Compute embeddings for every memory that lacks one, in batches.
+
+        Texts are sent in chunks of embedding_batch_size through
+        embedding_batch_func (up to embedding_workers chunks concurrently). A
+        failed chunk is retried item by item with embedding_func, so one bad
+        input only fails itself. Memories already stored in the bank are
+        updated via update_embedding().
+
+        Args:
+            memories: Memories to embed (ones with an embedding are skipped)
+
+        Returns:
+            Failures as {memory id: error message}
+        """
+        pending = [m for m in memories if m.embedding is None]
+        if not pending or not (self.embedding_func or self.embedding_batch_func):
+            return {}
+
+        size = max(1, self.embedding_batch_size)
+        chunks = [pending[i:i + size] for i in range(0, len(pending), size)]
+        workers = min(self.embedding_workers, len(chunks))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(self._embed_chunk, chunks))
+        else:
+            results = [self._embed_chunk(chunk) for chunk in chunks]
+
+        failures = {}
+        for chunk_results in results:
+            for memory, embedding, error in chunk_results:
+                if error is not None:
+                    failures[memory.id] = error
+                    logger.warning(f"Failed to compute embedding for '{memory.title}': {error}")
+                elif self._memories.get(memory.id) is memory:
+                    self.update_embedding(memory, embedding)
+                else:
+                    memory.embedding = embedding
+
+        logger.info(
+            f"Computed {len(pending) - len(failures)}/{len(pending)} embeddings "
+            f"in {len(chunks)} batches"
+        )
+        return failures
+
+    def _embed_chunk(self, chunk: List[MemoryItem]) -> List[Tuple[MemoryItem, Optional[List[float]], Optional[str]]]:
+        texts = [self.embedding_text(m) for m in chunk]
+        if self.embedding_batch_func:
+            try:
+                embeddings = self.embedding_batch_func(texts)
+                if len(embeddings) != len(chunk):
+                    raise ValueError(f"expected {len(chunk)} embeddings, got {len(embeddings)}")
+                return [(m, e, None) for m, e in zip(chunk, embeddings)]
+            except Exception as e:
+                if not self.embedding_func:
+                    return [(m, None, str(e)) for m in chunk]
+                logger.warning(f"Batch embedding of {len(chunk)} memories failed ({e}), retrying one by one")
+
+        results = []
+        for memory, text in zip(chunk, texts):
+            try:
+                results.append((memory, self.embedding_func(text), None))
+            except Exception as e:
+                results.append((memory, None, str(e)))
+        return results
+
+    def update_embedding(self, memory: MemoryItem, embedding: Optional[List[float]]) -> None:
+        """
+        Replace a stored memory's embedding and keep the search index in sync.
+
+        Args:
+            memory: MemoryItem already stored in the bank
+            embedding: New embedding (None removes it from similarity search)
+        """
+        with self._lock:
+            memory.embedding = embedding
+            if embedding is None:
+                self._embedding_index.remove(memory)
+            else:
+                self._embedding_index.add(memory, embedding)
+            self._pending_ops.append(("update", memory))
+
+    def update_memory(self, memory: MemoryItem, **changes) -> None:
+        """
+        Update fields of a stored memory (recorded for incremental persistence).
+
+        Use update_embedding() to change the embedding.
+
+        Args:
+            memory: MemoryItem already stored in the bank
+            **changes: MemoryItem attributes to set (e.g. description, content, metadata)
+
+        Raises:
+            ValueError: If a field is unknown or is the embedding
+        """
+        for name in changes:
+            if name in ("embedding", "id") or name not in _MEMORY_FIELDS:
+                raise ValueError(f"Cannot update memory field: {name}")
+        with self._lock:
+            self._unindex(memory)
+            for name, value in changes.items():
+                setattr(memory, name, value)
+            self._index(memory)
+            self._pending_ops.append(("update", memory))
+
+    @property
+    def num_searchable(self) -> int:
+        """Number of memories in the embedding matrix (reachable by search)."""
+        return len(self._embedding_index)
+
+    def rebuild_embedding_index(self) -> None:
+        """Rebuild the embedding matrix from scratch (e.g. after bulk edits)."""
+        self._embedding_index.clear()
+        for memory in self._memories.values():
+            if memory.embedding is not None:
+                self._embedding_index.add(memory, memory.embedding)
+
+    def search(
+        self,
+        query_embedding: List[float],
+        top_k: int,
+        candidates: Optional[List[MemoryItem]] = None,
+        min_similarity: float = 0.0,
+    ) -> List[Tuple[MemoryItem, float]]:
+        """
+        Cosine similarity search over stored embeddings.
+
+        One matrix-vector product over the embedding matrix plus argpartition;
+        memories without embeddings are never returned.
+
+        Args:
+            query_embedding: Query embedding vector
+            top_k: Number of results
+            candidates: Optional subset of memories to search (applied as a boolean mask)
+            min_similarity: Minimum cosine similarity
+
+        Returns:
+            List of (MemoryItem, score) tuples sorted by descending score
+        """
+        with self._lock:
+            mask = None
+            if candidates is not None:
+                mask = self._embedding_index.mask_for(candidates)
+            return self._embedding_index.search(
+                query_embedding, top_k, mask=mask, min_similarity=min_similarity
+            )
+
+    @property
+    def memories(self) -> List[MemoryItem]:
+        return list(self._memories.values())
+
+    @memories.setter
+    def memories(self, memories: List[MemoryItem]) -> None:
+        self._reset(memories)
+        self.rebuild_embedding_index()
 
     def get_all_memories(self) -> List[MemoryItem]:
         """
@@ -107,7 +424,11 @@ class ReasoningBank:
         Returns:
             List of all MemoryItem objects
         """
-        return self.memories.copy()
+        return list(self._memories.values())
+
+    def get_memory_by_id(self, memory_id: str) -> Optional[MemoryItem]:
+        """Retrieve a memory by its id (O(1))."""
+        return self._memories.get(memory_id)
 
     def get_memory_by_title(self, title: str) -> Optional[MemoryItem]:
         """
@@ -117,68 +438,217 @@ class ReasoningBank:
             title: Exact title to match
 
         Returns:
-            MemoryItem if found, None otherwise
+            MemoryItem if found (the oldest one if titles repeat), None otherwise
         """
-        for memory in self.memories:
-            if memory.title == title:
-                return memory
-        return None
+        bucket = self._indexes["title"].get(title)
+        if not bucket:
+            return None
+        return min(bucket.values(), key=lambda m: self._seq[m.id])
 
     def filter_memories(self, filters: Dict) -> List[MemoryItem]:
         """
         Filter memories by metadata criteria.
 
+        Keys are MemoryItem attributes or metadata keys. When any key is
+        indexed, only the smallest matching index bucket is checked instead of
+        the whole bank.
+
         Args:
             filters: Dictionary of criteria (e.g., {"is_from_success": True})
 
         Returns:
-            List of matching MemoryItem objects
+            List of matching MemoryItem objects (oldest first)
         """
-        filtered = []
-        for memory in self.memories:
-            match = True
+        with self._lock:
+            candidates = None
             for key, value in filters.items():
-                # Check top-level attributes
-                if hasattr(memory, key):
-                    if getattr(memory, key) != value:
-                        match = False
-                        break
-                # Check metadata
-                elif key in memory.metadata:
-                    if memory.metadata[key] != value:
-                        match = False
-                        break
-                else:
-                    match = False
-                    break
-
-            if match:
-                filtered.append(memory)
-
-        logger.debug(
-            f"Filtered {len(filtered)}/{len(self.memories)} memories with {filters}"
+                if key not in self._indexes:
+                    continue
+                index = self._indexes[key]
+                try:
+                    bucket = list(index.get(value, {}).values())
+                except TypeError:
+                    bucket = []
+                bucket.extend(index.get(_UNHASHABLE, {}).values())
+                if candidates is None or len(bucket) < len(candidates):
+                    candidates = bucket
+
+            if candidates is None:
+                filtered = [m for m in self._memories.values() if self._matches(m, filters)]
+            else:
+                filtered = sorted(
+                    (m for m in candidates if self._matches(m, filters)),
+                    key=lambda m: self._seq[m.id],
+                )
+
+            logger.debug(
+                f"Filtered {len(filtered)}/{len(self._memories)} memories with {filters}"
+            )
+            return filtered
+
+    # ============ Storage and secondary indexes ============
+    @staticmethod
+    def _field_value(memory: MemoryItem, key: str) -> Any:
+        if key in _MEMORY_FIELDS:
+            return getattr(memory, key)
+        return memory.metadata.get(key, _MISSING)
+
+    @classmethod
+    def _matches(cls, memory: MemoryItem, filters: Dict) -> bool:
+        return all(
+            (value := cls._field_value(memory, key)) is not _MISSING and value == expected
+            for key, expected in filters.items()
         )
-        return filtered
 
-    def consolidate(self, new_memories: List[MemoryItem]) -> None:
+    def _reset(self, memories: Iterable[MemoryItem]) -> None:
+        self._memories = {}
+        self._seq = {}
+        self._indexes = {key: {} for key in self._indexed_keys}
+        self._index_values = {}
+        for memory in memories:
+            self._insert(memory)
+
+    def _insert(self, memory: MemoryItem) -> None:
+        self._memories[memory.id] = memory
+        self._seq[memory.id] = self._next_seq
+        self._next_seq += 1
+        self._index(memory)
+
+    def _index(self, memory: MemoryItem) -> None:
+        values = {}
+        for key in self._indexed_keys:
+            value = self._field_value(memory, key)
+            if value is _MISSING:
+                continue
+            try:
+                hash(value)
+            except TypeError:
+                value = _UNHASHABLE
+            self._indexes[key].setdefault(value, {})[memory.id] = memory
+            values[key] = value
+        self._index_values[memory.id] = values
+
+    def _unindex(self, memory: MemoryItem) -> None:
+        # Uses the values recorded at index time, so in-place edits can't leave stale entries
+        for key, value in self._index_values.pop(memory.id, {}).items():
+            bucket = self._indexes[key].get(value)
+            if bucket is not None:
+                bucket.pop(memory.id, None)
+                if not bucket:
+                    del self._indexes[key][value]
+
+    def _remove(self, memories: Iterable[MemoryItem]) -> List[MemoryItem]:
+        removed = []
+        for memory in memories:
+            if self._memories.pop(memory.id, None) is not None:
+                self._unindex(memory)
+                del self._seq[memory.id]
+                removed.append(memory)
+        self._embedding_index.remove_many(removed)
+        return removed
+
+    def consolidate(self, new_memories: List[MemoryItem]) -> Dict[str, int]:
         """
         Consolidate new memories into the bank.
 
-        Currently implements simple append strategy. Future versions may include:
-        - Duplicate detection and merging
-        - Clustering similar memories
-        - Forgetting low-utility memories
+        Each new memory is compared with the stored memories of the same
+        outcome (is_from_success) by one similarity search over the embedding
+        matrix; new memories are visible to the ones after them.
+
+        - Similarity >= dedup_threshold: handled by dedup_policy ("append" adds
+          it anyway, "merge" records it on the stored memory's metadata,
+          "supersede" replaces the stored memory). Only memories with the same
+          provenance (recommendation_id and source metadata) are merged or
+          superseded, so delete_by_recommendation_id and the validated-first
+          eviction policies still find experiment-validated memories.
+        - Similarity >= cluster_threshold: joins the neighbour's cluster
+        - Otherwise: starts a new cluster
 
         Args:
             new_memories: List of MemoryItem objects to consolidate
+
+        Returns:
+            Counts of added, merged and superseded memories
         """
-        logger.info(f"Consolidating {len(new_memories)} new memories")
-        self.add_memories(new_memories, compute_embeddings=True)
-        logger.info(f"Consolidation complete. Total memories: {len(self.memories)}")
+        logger.info(f"Consolidating {len(new_memories)} new memories (policy={self.dedup_policy})")
+        failures = self.embed_memories(new_memories)
+        if failures:
+            logger.warning(f"{len(failures)} consolidated memories have no embedding")
+
+        stats = {"added": 0, "merged": 0, "superseded": 0}
+        with self._lock:
+            for memory in new_memories:
+                neighbour, score = self._nearest_neighbour(memory)
+                duplicate = (
+                    neighbour is not None
+                    and score >= self.dedup_threshold
+                    and self._provenance(neighbour) == self._provenance(memory)
+                )
+                if duplicate and self.dedup_policy == "merge":
+                    self._merge_into(neighbour, memory, score)
+                    stats["merged"] += 1
+                    continue
+
+                if neighbour is not None and score >= self.cluster_threshold:
+                    memory.cluster_id = neighbour.cluster_id or neighbour.id
+                else:
+                    memory.cluster_id = memory.id
+
+                if duplicate and self.dedup_policy == "supersede":
+                    memory.metadata["supersedes"] = neighbour.id
+                    self._remove([neighbour])
+                    self._pending_ops.append(("delete", [neighbour.id]))
+                    logger.info(f"Memory '{memory.title}' supersedes '{neighbour.title}' (similarity {score:.3f})")
+                    stats["superseded"] += 1
+
+                self.add_memory(memory, compute_embedding=False)
+                stats["added"] += 1
+
+        logger.info(f"Consolidation complete: {stats}. Total memories: {len(self._memories)}")
+        return stats
+
+    def _nearest_neighbour(self, memory: MemoryItem) -> Tuple[Optional[MemoryItem], float]:
+        """Most similar stored memory with the same outcome (None below cluster_threshold)."""
+        if memory.embedding is None or not self._embedding_index:
+            return None, 0.0
+        same_outcome = list(self._indexes["is_from_success"].get(memory.is_from_success, {}).values())
+        if not same_outcome:
+            return None, 0.0
+        results = self.search(
+            memory.embedding, top_k=1, candidates=same_outcome,
+            min_similarity=min(self.cluster_threshold, self.dedup_threshold),
+        )
+        return results[0] if results else (None, 0.0)
+
+    @staticmethod
+    def _provenance(memory: MemoryItem) -> Tuple[Optional[str], Optional[str]]:
+        """What a memory was derived from; only memories with equal provenance are deduplicated."""
+        return memory.metadata.get("recommendation_id"), memory.metadata.get("source")
+
+    def _merge_into(self, existing: MemoryItem, duplicate: MemoryItem, score: float) -> None:
+        """Fold a duplicate into a stored memory (provenance is kept in metadata)."""
+        merged_from = list(existing.metadata.get("merged_from", []))
+        merged_from.append({
+            "title": duplicate.title,
+            "source_task_id": duplicate.source_task_id,
+            "recommendation_id": duplicate.metadata.get("recommendation_id"),
+            "similarity": round(score, 4),
+        })
+        self.update_memory(existing, metadata={**existing.metadata, "merged_from": merged_from})
+        logger.info(f"Merged '{duplicate.title}' into '{existing.title}' (similarity {score:.3f})")
 
     def save(self, filepath: str) -> None:
         """
-        Persist memory bank to disk in JSON format.
+        Persist memory bank to disk (format 2.0).
+
+        Memory records go into a compact JSON file; embeddings go into a
+        binary ``.npy`` sidecar next to it (``{stem}.embeddings.{tag}.npy``),
+        one row per memory id listed in the JSON header. The sidecar is
+        written first and the JSON last (both via rename), so a crash never
+        leaves the JSON pointing at a missing or partial sidecar.
+
+        Embeddings whose dimension differs from the majority are kept inline
+        in their record.
 
         Args:
             filepath: Path to save file (will create parent directories if needed)
@@ -186,32 +656,88 @@ class ReasoningBank:
         Raises:
             IOError: If file cannot be written
         """
-        # Create parent directory if needed
-        Path(filepath).parent.mkdir(parents=True, exist_ok=True)
-
-        # Serialize memories
-        data = {
-            "version": "1.0",
-            "max_items": self.max_items,
-            "num_memories": len(self.memories),
-            "memories": [memory.to_dict() for memory in self.memories],
-        }
+        with self._lock:
+            path = Path(filepath)
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+            dims = Counter(len(m.embedding) for m in self._memories.values() if m.embedding is not None)
+            dim = dims.most_common(1)[0][0] if dims else None
+
+            records = []
+            sidecar_ids = []
+            sidecar_rows = []
+            for memory in self._memories.values():
+                record = memory.to_dict(include_embedding=False)
+                if memory.embedding is not None:
+                    if len(memory.embedding) == dim:
+                        sidecar_ids.append(memory.id)
+                        sidecar_rows.append(memory.embedding)
+                    else:
+                        record["embedding"] = [float(x) for x in memory.embedding]
+                records.append(record)
+
+            data = {
+                "version": FORMAT_VERSION,
+                "max_items": self.max_items,
+                "num_memories": len(self._memories),
+                "wal_seq": self._wal_seq,
+                "embeddings": None,
+                "memories": records,
+            }
 
-        # Write to file
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+            sidecar = None
+            if sidecar_rows:
+                sidecar = path.with_name(f"{path.stem}.embeddings.{uuid.uuid4().hex[:8]}.npy")
+                matrix = np.asarray(sidecar_rows, dtype=self.embedding_dtype)
+                tmp = sidecar.with_name(sidecar.name + ".tmp")
+                with open(tmp, "wb") as f:
+                    np.save(f, matrix)
+                os.replace(tmp, sidecar)
+                data["embeddings"] = {
+                    "file": sidecar.name,
+                    "dtype": self.embedding_dtype,
+                    "dim": dim,
+                    "ids": sidecar_ids,
+                }
+
+            tmp = path.with_name(path.name + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, path)
+
+            # The snapshot now covers every mutation: start a fresh log for it
+            self._bind_wal(str(path))
+            self._wal.reset()
+            self._pending_ops = []
+
+            # Drop sidecars from earlier saves (the JSON no longer references them)
+            for old in path.parent.glob(f"{path.stem}.embeddings.*.npy"):
+                if sidecar is None or old.name != sidecar.name:
+                    try:
+                        old.unlink()
+                    except OSError as e:
+                        # e.g. still memory-mapped on Windows; removed by a later save
+                        logger.debug(f"Could not remove old embedding sidecar {old}: {e}")
 
-        logger.info(f"Saved {len(self.memories)} memories to {filepath}")
+        logger.info(
+            f"Saved {len(self._memories)} memories to {filepath} "
+            f"({len(sidecar_ids)} embeddings in {sidecar.name if sidecar else 'no sidecar'})"
+        )
 
     def load(self, filepath: str) -> None:
         """
         Load memory bank from disk.
 
+        Reads both formats: "1.0" (embeddings inline as JSON float lists; the
+        file is rewritten as "2.0" on the next save) and "2.0" (embeddings in a
+        memory-mapped ``.npy`` sidecar, so no vector is parsed from text).
+        Mutations logged by persist() after the snapshot are replayed.
+
         Args:
             filepath: Path to load file
 
         Raises:
-            FileNotFoundError: If file does not exist
+            FileNotFoundError: If file (or its embedding sidecar) does not exist
             JSONDecodeError: If file is not valid JSON
         """
         if not os.path.exists(filepath):
@@ -220,20 +746,177 @@ class ReasoningBank:
         with open(filepath, "r", encoding="utf-8") as f:
             data = json.load(f)
 
-        # Validate version (future-proofing)
         version = data.get("version", "1.0")
-        if version != "1.0":
-            logger.warning(f"Loading memory file with version {version} (expected 1.0)")
+        if version not in ("1.0", FORMAT_VERSION):
+            logger.warning(f"Loading memory file with version {version} (expected {FORMAT_VERSION})")
+        elif version == "1.0":
+            logger.info(
+                f"Memory file {filepath} uses format 1.0; "
+                f"it will be migrated to {FORMAT_VERSION} on next save"
+            )
+
+        with self._lock:
+            # Load memories
+            memories_data = data.get("memories", [])
+            self._reset(MemoryItem.from_dict(m) for m in memories_data)
+
+            self._embedding_index.clear()
+            sidecar_info = data.get("embeddings")
+            if sidecar_info:
+                sidecar = Path(filepath).with_name(sidecar_info["file"])
+                if not sidecar.exists():
+                    raise FileNotFoundError(f"Embedding sidecar not found: {sidecar}")
+                matrix = np.load(sidecar, mmap_mode="r")
+                row_of = {memory_id: row for row, memory_id in enumerate(sidecar_info["ids"])}
+
+                indexed, rows = [], []
+                for memory in self._memories.values():
+                    row = row_of.get(memory.id)
+                    if row is not None:
+                        # Read-only row view into the mmap; materialised only when used
+                        memory.embedding = matrix[row]
+                        indexed.append(memory)
+                        rows.append(row)
+                if indexed:
+                    self._embedding_index.add_batch(indexed, matrix[rows])
+
+            for memory in self._memories.values():
+                if memory.embedding is not None and memory not in self._embedding_index:
+                    self._embedding_index.add(memory, memory.embedding)
+
+            # Update max_items if specified
+            if "max_items" in data:
+                self.max_items = data["max_items"]
+
+            # Crash recovery: replay mutations appended after this snapshot.
+            # WAL records are keyed by memory id; a snapshot whose ids were
+            # made up during this load (format 1.0 has none) would not match
+            # them next time, so the log stays unbound and the first persist()
+            # writes a full snapshot with stable ids instead.
+            self._wal_seq = data.get("wal_seq", 0)
+            replayed = 0
+            if version == FORMAT_VERSION and all(m.get("id") for m in memories_data):
+                self._bind_wal(filepath)
+                replayed = self._replay(self._wal.recover())
+            else:
+                self._unbind_wal()
+            self._pending_ops = []
+
+        logger.info(
+            f"Loaded {len(self._memories)} memories from {filepath} (format {version}"
+            f"{f', replayed {replayed} WAL records' if replayed else ''})"
+        )
 
-        # Load memories
-        memories_data = data.get("memories", [])
-        self.memories = [MemoryItem.from_dict(m) for m in memories_data]
+    def persist(self, filepath: str) -> None:
+        """
+        Incrementally persist changes made since the last save/persist.
 
-        # Update max_items if specified
-        if "max_items" in data:
-            self.max_items = data["max_items"]
+        Mutations (add, delete, update, clear, retrieval touches) are appended to a write-ahead
+        log next to the snapshot (``{filepath}.wal``), so the cost is
+        proportional to the change rather than to the bank. A full snapshot is
+        written on the first call for a path and whenever the log reaches
+        ``wal_compact_threshold`` records; load() replays the log.
 
-        logger.info(f"Loaded {len(self.memories)} memories from {filepath}")
+        Args:
+            filepath: Snapshot path (same as for save/load)
+        """
+        with self._lock:
+            if self._snapshot_path != os.path.abspath(filepath) or not os.path.exists(filepath):
+                self.save(filepath)
+                return
+            ops, self._pending_ops = self._pending_ops, []
+            if not ops:
+                return
+
+            records = []
+            for op in ops:
+                self._wal_seq += 1
+                record = {"seq": self._wal_seq, "op": op[0]}
+                if op[0] in ("add", "update"):
+                    record["memory"] = self._encode_memory(op[1])
+                elif op[0] == "delete":
+                    record["ids"] = op[1]
+                elif op[0] == "touch":
+                    record["ids"] = op[1]
+                    record["ts"] = op[2]
+                records.append(record)
+            self._wal.append(records)
+            logger.debug(f"Appended {len(records)} records to {self._wal.path}")
+
+            if len(self._wal) >= self.wal_compact_threshold:
+                logger.info(f"Compacting WAL ({len(self._wal)} records) into snapshot {filepath}")
+                self.save(filepath)
+
+    def flush(self) -> None:
+        """fsync the write-ahead log (e.g. on shutdown)."""
+        with self._lock:
+            if self._wal is not None:
+                self._wal.sync()
+
+    def _bind_wal(self, filepath: str) -> None:
+        path = os.path.abspath(filepath)
+        if self._snapshot_path != path:
+            if self._wal is not None:
+                self._wal.close()
+            self._snapshot_path = path
+            self._wal = MemoryWAL(path + ".wal", fsync_interval=self.wal_fsync_interval)
+
+    def _unbind_wal(self) -> None:
+        if self._wal is not None:
+            self._wal.close()
+        self._wal = None
+        self._snapshot_path = None
+
+    def _encode_memory(self, memory: MemoryItem) -> Dict:
+        record = memory.to_dict(include_embedding=False)
+        if memory.embedding is not None:
+            record["embedding"] = encode_embedding(memory.embedding, self.embedding_dtype)
+        return record
+
+    @staticmethod
+    def _decode_memory(record: Dict) -> MemoryItem:
+        embedding = record.get("embedding")
+        if isinstance(embedding, dict):
+            record = {**record, "embedding": decode_embedding(embedding)}
+        return MemoryItem.from_dict(record)
+
+    def _replay(self, records: List[Dict]) -> int:
+        """Apply WAL records newer than the loaded snapshot; returns the number applied."""
+        applied = 0
+        for record in records:
+            if record.get("seq", 0) <= self._wal_seq:
+                continue  # already in the snapshot (crash between snapshot and log reset)
+
+            op = record.get("op")
+            if op == "add":
+                # Evictions were logged as their own delete records
+                memory = self._decode_memory(record["memory"])
+                if memory.id not in self._memories:
+                    self._add(memory)
+            elif op == "update":
+                updated = self._decode_memory(record["memory"])
+                memory = self._memories.get(updated.id)
+                if memory is not None:
+                    self.update_memory(memory, **{
+                        k: v for k, v in vars(updated).items() if k not in ("id", "embedding")
+                    })
+                    self.update_embedding(memory, updated.embedding)
+            elif op == "delete":
+                self._remove([self._memories[i] for i in record["ids"] if i in self._memories])
+            elif op == "touch":
+                for memory_id in record["ids"]:
+                    memory = self._memories.get(memory_id)
+                    if memory is not None:
+                        memory.retrieval_count += 1
+                        memory.last_retrieved_at = record["ts"]
+            elif op == "clear":
+                self.clear()
+            else:
+                logger.warning(f"Skipping unknown WAL op: {op}")
+
+            self._wal_seq = record["seq"]
+            applied += 1
+        return applied
 
     def delete_by_title(self, title: str) -> bool:
         """
@@ -245,9 +928,11 @@ class ReasoningBank:
         Returns:
             True if memory was deleted, False if not found
         """
-        original_count = len(self.memories)
-        self.memories = [m for m in self.memories if m.title != title]
-        deleted = len(self.memories) < original_count
+        with self._lock:
+            removed = self._remove(list(self._indexes["title"].get(title, {}).values()))
+            deleted = bool(removed)
+            if deleted:
+                self._pending_ops.append(("delete", [m.id for m in removed]))
 
         if deleted:
             logger.info(f"Deleted memory with title: {title}")
@@ -269,23 +954,27 @@ class ReasoningBank:
         Returns:
             Number of memories deleted
         """
-        original_count = len(self.memories)
-        self.memories = [
-            m for m in self.memories
-            if m.metadata.get("recommendation_id") != recommendation_id
-        ]
-        deleted_count = original_count - len(self.memories)
+        with self._lock:
+            removed = self._remove(
+                list(self._indexes["recommendation_id"].get(recommendation_id, {}).values())
+            )
+            deleted_count = len(removed)
+            if deleted_count:
+                self._pending_ops.append(("delete", [m.id for m in removed]))
 
         logger.info(
             f"Deleted {deleted_count} memories for recommendation {recommendation_id} "
-            f"(remaining: {len(self.memories)})"
+            f"(remaining: {len(self._memories)})"
         )
         return deleted_count
 
     def clear(self) -> None:
         """Clear all memories from the bank."""
-        count = len(self.memories)
-        self.memories = []
+        with self._lock:
+            count = len(self._memories)
+            self._reset([])
+            self._embedding_index.clear()
+            self._pending_ops.append(("clear",))
         logger.info(f"Cleared {count} memories from ReasoningBank")
 
     def get_statistics(self) -> Dict:
@@ -295,7 +984,7 @@ class ReasoningBank:
         Returns:
             Dictionary with statistics
         """
-        if not self.memories:
+        if not self._memories:
             return {
                 "total_memories": 0,
                 "from_success": 0,
@@ -303,21 +992,23 @@ class ReasoningBank:
                 "with_embeddings": 0,
             }
 
-        success_count = sum(1 for m in self.memories if m.is_from_success)
-        with_embedding = sum(1 for m in self.memories if m.embedding is not None)
+        success_count = len(self._indexes["is_from_success"].get(True, {}))
+        with_embedding = sum(1 for m in self._memories.values() if m.embedding is not None)
 
         return {
-            "total_memories": len(self.memories),
+            "total_memories": len(self._memories),
             "from_success": success_count,
-            "from_failure": len(self.memories) - success_count,
+            "from_failure": len(self._memories) - success_count,
             "with_embeddings": with_embedding,
             "max_capacity": self.max_items,
-            "utilization": f"{len(self.memories) / self.max_items * 100:.1f}%",
+            "utilization": f"{len(self._memories) / self.max_items * 100:.1f}%",
+            "eviction_policy": self.eviction_policy.name,
+            "total_retrievals": sum(m.retrieval_count for m in self._memories.values()),
         }
 
     def __len__(self) -> int:
         """Return number of memories in the bank."""
-        return len(self.memories)
+        return len(self._memories)
 
     def __repr__(self) -> str:
         """String representation of ReasoningBank."""
@@ -0,0 +1,142 @@
+"""
+Write-Ahead Log for ReasoningBank
+
+This module implements the append-only mutation log behind
+``ReasoningBank.persist``: each auto-save appends only the records changed
+since the previous one, instead of rewriting the whole bank.
+"""
+
+from typing import Dict, List, Optional, Sequence
+import base64
+import json
+import os
+import time
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def encode_embedding(embedding: Sequence[float], dtype: str) -> Dict:
+    """Encode an embedding as base64 bytes (much smaller than a JSON float list)."""
+    data = np.asarray(embedding, dtype=dtype).tobytes()
+    return {"dtype": dtype, "data": base64.b64encode(data).decode("ascii")}
+
+
+def decode_embedding(encoded: Dict) -> np.ndarray:
+    """Inverse of encode_embedding."""
+    return np.frombuffer(base64.b64decode(encoded["data"]), dtype=encoded["dtype"])
+
+
+class MemoryWAL:
+    """
+    Append-only JSON Lines log with batched fsync.
+
+    Every ``append`` is a single write + flush, so a crashed process never loses
+    an acknowledged record. ``fsync`` (protection against OS crash / power loss)
+    is issued at most once per ``fsync_interval`` seconds and always on
+    ``sync``/``close``; ``fsync_interval=0`` syncs on every append.
+
+    A torn final line (crash in the middle of a write) is ignored on read.
+
+    Attributes:
+        path: Log file path
+        fsync_interval: Minimum seconds between fsyncs
+    """
+
+    def __init__(self, path: str, fsync_interval: float = 1.0):
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self._file = None
+        self._dirty = False
+        self._last_sync = 0.0
+        self._num_records: Optional[int] = None
+
+    def __len__(self) -> int:
+        """Number of records in the log file."""
+        if self._num_records is None:
+            self.recover()
+        return self._num_records
+
+    def append(self, records: List[Dict]) -> None:
+        """
+        Append records to the log (one write for the whole batch).
+
+        Args:
+            records: JSON-serialisable records
+        """
+        if not records:
+            return
+        count = len(self)
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(
+            "".join(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in records)
+        )
+        self._file.flush()
+        self._num_records = count + len(records)
+        self._dirty = True
+
+        if time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self) -> None:
+        """fsync pending appends to stable storage."""
+        if self._file is not None and self._dirty:
+            os.fsync(self._file.fileno())
+            self._dirty = False
+        self._last_sync = time.monotonic()
+
+    def recover(self) -> List[Dict]:
+        """
+        Read all complete records and truncate a torn or corrupt tail.
+
+        Truncating keeps later appends readable: they would otherwise follow
+        the partial line and be dropped along with it.
+
+        Returns:
+            Records in append order
+        """
+        if not os.path.exists(self.path):
+            self._num_records = 0
+            return []
+
+        records = []
+        valid_size = 0
+        with open(self.path, "rb") as f:
+            for line_no, line in enumerate(f, start=1):
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("missing newline")
+                    records.append(json.loads(line.decode("utf-8")))
+                except ValueError:
+                    logger.warning(
+                        f"Dropping corrupt WAL record at {self.path}:{line_no} "
+                        f"and everything after it (interrupted write?)"
+                    )
+                    break
+                valid_size += len(line)
+
+        if valid_size < os.path.getsize(self.path):
+            self.close()
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_size)
+        self._num_records = len(records)
+        return records
+
+    def reset(self) -> None:
+        """Delete the log (after its records are covered by a snapshot)."""
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        self._num_records = 0
+
+    def close(self) -> None:
+        """Sync and close the log file."""
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
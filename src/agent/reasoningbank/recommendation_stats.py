@@ -0,0 +1,193 @@
+"""
+Materialized Statistics for Recommendations
+
+RecommendationStatistics keeps the aggregates behind the statistics
+dashboard (status/material counts, daily experiment buckets, per-formulation
+solubility sums) up to date incrementally: every header written to or
+removed from a recommendation store is applied with +1/-1, so reading the
+statistics never touches individual recommendations.
+
+Each recommendation contributes only through its header (see
+RecommendationManager._build_header), which the stores keep for exactly this
+purpose.
+"""
+
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+STATS_VERSION = 1
+
+
+def _bucket() -> Dict[str, Any]:
+    return {
+        "count": 0,               # completed experiments
+        "performance_sum": 0.0,
+        "liquid_count": 0,
+        "solubility_sum": 0.0,
+        "solubility_count": 0,
+        "units": {},              # solubility unit -> count
+    }
+
+
+def _add_to_bucket(bucket: Dict[str, Any], header: Dict[str, Any], sign: int) -> None:
+    bucket["count"] += sign
+    bucket["performance_sum"] += sign * (header.get("performance_score") or 0.0)
+    bucket["liquid_count"] += sign * bool(header.get("is_liquid_formed"))
+    if header.get("solubility") is not None:
+        bucket["solubility_sum"] += sign * header["solubility"]
+        bucket["solubility_count"] += sign
+        unit = header.get("solubility_unit") or "g/L"
+        bucket["units"][unit] = bucket["units"].get(unit, 0) + sign
+        if bucket["units"][unit] <= 0:
+            del bucket["units"][unit]
+
+
+def _bucket_averages(bucket: Dict[str, Any]) -> Dict[str, Any]:
+    count = bucket["count"]
+    units = bucket["units"]
+    return {
+        "avg_solubility": bucket["solubility_sum"] / bucket["solubility_count"] if bucket["solubility_count"] else 0.0,
+        "solubility_unit": max(units, key=units.get) if units else "g/L",
+        "avg_performance_score": bucket["performance_sum"] / count if count else 0.0,
+        "experiment_count": count,
+        "liquid_formation_rate": bucket["liquid_count"] / count if count else 0.0,
+    }
+
+
+class RecommendationStatistics:
+    """
+    Incrementally maintained recommendation aggregates.
+
+    Attributes:
+        total: Number of recommendations
+        by_status: Count per status
+        by_material: Count per target material
+        experiments: Bucket over all completed experiments
+        daily: Bucket per creation date (YYYY-MM-DD) of completed experiments
+        formulations: Bucket per formulation summary of completed experiments
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.by_status: Dict[str, int] = defaultdict(int)
+        self.by_material: Dict[str, int] = defaultdict(int)
+        self.experiments = _bucket()
+        self.daily: Dict[str, Dict[str, Any]] = defaultdict(_bucket)
+        self.formulations: Dict[str, Dict[str, Any]] = defaultdict(_bucket)
+
+    @staticmethod
+    def _has_experiment(header: Dict[str, Any]) -> bool:
+        return header.get("status") == "COMPLETED" and header.get("is_liquid_formed") is not None
+
+    @staticmethod
+    def _adjust(counts: Dict[str, Any], key: str, sign: int) -> None:
+        counts[key] += sign
+        if counts[key] <= 0:
+            del counts[key]
+
+    def apply(self, header: Optional[Dict[str, Any]], sign: int = 1) -> None:
+        """
+        Add (sign=+1) or remove (sign=-1) one recommendation's contribution.
+
+        Args:
+            header: Recommendation header (None is ignored)
+            sign: +1 when the header is stored, -1 when it is replaced or deleted
+        """
+        if header is None:
+            return
+
+        self.total += sign
+        self._adjust(self.by_status, header.get("status"), sign)
+        self._adjust(self.by_material, header.get("target_material") or "unknown", sign)
+
+        if not self._has_experiment(header):
+            return
+
+        date = header.get("created_at", "")[:10]
+        formulation = header.get("formulation_summary", "")
+        _add_to_bucket(self.experiments, header, sign)
+        for buckets, key in ((self.daily, date), (self.formulations, formulation)):
+            _add_to_bucket(buckets[key], header, sign)
+            if buckets[key]["count"] <= 0:
+                del buckets[key]
+
+    def replace(self, old_header: Optional[Dict[str, Any]], new_header: Optional[Dict[str, Any]]) -> None:
+        """Swap one header for another (either may be None)."""
+        self.apply(old_header, -1)
+        self.apply(new_header, +1)
+
+    # ===== Views =====
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals, status/material counts and overall experiment averages."""
+        averages = _bucket_averages(self.experiments)
+        return {
+            "total": self.total,
+            "by_status": dict(self.by_status),
+            "by_material": dict(self.by_material),
+            "completed_experiments": averages["experiment_count"],
+            "average_performance_score": averages["avg_performance_score"],
+            "liquid_formation_rate": averages["liquid_formation_rate"],
+        }
+
+    def trend(self) -> List[Dict[str, Any]]:
+        """Experiment averages per creation date, oldest first."""
+        return [
+            {"date": date, **_bucket_averages(self.daily[date])}
+            for date in sorted(self.daily)
+        ]
+
+    def top_formulations(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Formulations with the highest average solubility."""
+        ranked = [
+            {"formulation": formulation, **_bucket_averages(bucket)}
+            for formulation, bucket in self.formulations.items()
+        ]
+        ranked.sort(key=lambda item: item["avg_solubility"], reverse=True)
+        return ranked[:limit]
+
+    # ===== Serialization =====
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for persistence"""
+        return {
+            "version": STATS_VERSION,
+            "total": self.total,
+            "by_status": dict(self.by_status),
+            "by_material": dict(self.by_material),
+            "experiments": self.experiments,
+            "daily": dict(self.daily),
+            "formulations": dict(self.formulations),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> Optional["RecommendationStatistics"]:
+        """
+        Restore persisted statistics.
+
+        Returns:
+            RecommendationStatistics, or None if the data has an older format
+            (the caller then rebuilds from the headers)
+        """
+        if data.get("version") != STATS_VERSION:
+            return None
+
+        stats = cls()
+        stats.total = data["total"]
+        stats.by_status.update(data["by_status"])
+        stats.by_material.update(data["by_material"])
+        stats.experiments = data["experiments"]
+        stats.daily.update(data["daily"])
+        stats.formulations.update(data["formulations"])
+        return stats
+
+    @classmethod
+    def from_headers(cls, headers: Dict[str, Dict[str, Any]]) -> "RecommendationStatistics":
+        """Compute statistics from scratch."""
+        stats = cls()
+        for header in headers.values():
+            stats.apply(header)
+        return stats
@@ -0,0 +1,765 @@
+"""
+Storage Backends for RecommendationManager
+
+RecommendationManager keeps, per recommendation, a small header (the fields
+shown in lists and used for filtering/statistics) and the full record. This
+module provides the backends that persist them:
+- SQLiteRecommendationStore (default): one SQLite database in WAL mode with
+  indexed header columns; trajectories are stored as zlib-compressed blobs
+- JSONRecommendationStore: the original layout (one pretty-printed JSON file
+  per recommendation plus index.json), kept for Git-friendly/debug setups
+
+Both backends also maintain the materialized RecommendationStatistics
+(see recommendation_stats) from the headers they write, persisted with them.
+
+Records are stored in two parts (split_record/join_record): the body, which
+includes the trajectory outline (task, outcome, final_result, metadata), and
+the trajectory payload (ReAct steps and tool outputs), which is read only
+when requested.
+
+migrate_json_to_sqlite() converts the JSON layout in place.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from pathlib import Path
+from contextlib import contextmanager
+import copy
+import json
+import logging
+import os
+import sqlite3
+import threading
+import zlib
+
+from .recommendation_stats import RecommendationStatistics
+
+logger = logging.getLogger(__name__)
+
+# Header fields that can be filtered on / grouped by
+FILTER_COLUMNS = ("status", "target_material")
+
+# Heavy trajectory parts stored apart from the record body
+PAYLOAD_KEYS = ("steps", "tool_calls")
+
+SQLITE_FILENAME = "recommendations.db"
+JSON_INDEX_FILENAME = "index.json"
+JSON_STATISTICS_FILENAME = "statistics.json"
+
+
+def split_record(record: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    Split a record into body and trajectory payload.
+
+    The body keeps the trajectory with steps=None and without
+    metadata["tool_calls"]; the payload holds those two.
+
+    Returns:
+        (body, payload); payload is None if the record was loaded without its
+        trajectory (steps is None), meaning "keep the stored payload"
+    """
+    trajectory = dict(record["trajectory"])
+    metadata = dict(trajectory.get("metadata") or {})
+    tool_calls = metadata.pop("tool_calls", None)
+    steps = trajectory.get("steps")
+    trajectory.update(steps=None, metadata=metadata)
+
+    payload = None
+    if steps is not None:
+        payload = {"steps": steps}
+        if tool_calls is not None:
+            payload["tool_calls"] = tool_calls
+    return {**record, "trajectory": trajectory}, payload
+
+
+def join_record(body: Dict[str, Any], payload: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Inverse of split_record (payload None leaves steps=None)."""
+    if payload is None:
+        return body
+    trajectory = body["trajectory"]
+    trajectory["steps"] = payload["steps"]
+    if "tool_calls" in payload:
+        trajectory.setdefault("metadata", {})["tool_calls"] = payload["tool_calls"]
+    return body
+
+
+class RecommendationStore:
+    """
+    Interface of a recommendation storage backend.
+
+    Headers are plain dicts (the former index.json entries); records are
+    Recommendation.to_dict() dicts. A record whose trajectory has
+    steps=None (loaded with include_trajectory=False) can be put back; the
+    stored trajectory payload is then kept.
+
+    Every store maintains `statistics` (RecommendationStatistics) from the
+    headers it writes and deletes, persisted together with them. It is None
+    until materialized with rebuild_statistics() (new stores, stores from
+    before statistics existed, or persisted statistics found inconsistent).
+    """
+
+    statistics: Optional[RecommendationStatistics] = None
+    _lock: threading.RLock  # guards statistics (set by subclasses)
+
+    def put(self, rec_id: str, header: Dict[str, Any], record: Dict[str, Any]) -> None:
+        """Insert or replace a recommendation."""
+        raise NotImplementedError
+
+    def get(self, rec_id: str, include_trajectory: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Record, or None if not found.
+
+        Args:
+            rec_id: Recommendation ID
+            include_trajectory: Also read the trajectory payload; if False the
+                trajectory has steps=None and no tool_calls
+        """
+        raise NotImplementedError
+
+    def get_payload(self, rec_id: str) -> Optional[Dict[str, Any]]:
+        """Trajectory payload ({"steps", "tool_calls"}), or None if not found."""
+        record = self.get(rec_id)
+        return None if record is None else split_record(record)[1]
+
+    def get_header(self, rec_id: str) -> Optional[Dict[str, Any]]:
+        """Header, or None if not found."""
+        raise NotImplementedError
+
+    def delete(self, rec_id: str) -> bool:
+        """Delete a recommendation; returns whether it existed."""
+        raise NotImplementedError
+
+    def replace(self, old_id: str, new_id: str, header: Dict[str, Any], record: Dict[str, Any]) -> None:
+        """
+        Atomically store a record under new_id and remove old_id.
+
+        Readers never observe both ids or neither. new_id may already exist
+        (it is overwritten). The record must include its trajectory.
+        """
+        raise NotImplementedError
+
+    def query(
+        self,
+        status: Optional[str] = None,
+        target_material: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Headers matching the filters, newest first.
+
+        Returns:
+            (page of headers with "recommendation_id" added, total number of matches)
+        """
+        raise NotImplementedError
+
+    def count_by(self, column: str, target_material: Optional[str] = None) -> Dict[Any, int]:
+        """Number of recommendations per value of a FILTER_COLUMNS header field."""
+        raise NotImplementedError
+
+    def ids(self) -> List[str]:
+        """All recommendation ids."""
+        raise NotImplementedError
+
+    def snapshot_statistics(self) -> Optional[RecommendationStatistics]:
+        """Consistent copy of the statistics, safe to read while writers continue."""
+        with self._lock:
+            if self.statistics is None:
+                return None
+            return RecommendationStatistics.from_dict(copy.deepcopy(self.statistics.to_dict()))
+
+    def rebuild_statistics(self, headers: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Rewrite the headers of existing recommendations and recompute statistics.
+
+        Args:
+            headers: Up-to-date header for every stored recommendation
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release resources."""
+
+    def __contains__(self, rec_id: str) -> bool:
+        return self.get_header(rec_id) is not None
+
+    def __len__(self) -> int:
+        return len(self.ids())
+
+
+def _atomic_write_text(path: Path, text: str) -> None:
+    """
+    Write a file atomically: temp file in the same directory, fsync, rename.
+
+    Readers (and a crash) see either the old or the new content, never a
+    partially written file.
+    """
+    tmp_path = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class JSONRecommendationStore(RecommendationStore):
+    """
+    One JSON file per recommendation plus index.json (the original layout).
+
+    Directory structure:
+        data/recommendations/
+        ├── index.json
+        ├── statistics.json
+        ├── REC_20251016_001.json              (record body)
+        ├── REC_20251016_001.trajectory.json   (steps + tool outputs)
+        └── ...
+
+    Files written before the split keep the whole trajectory inline and are
+    read as they are.
+
+    Thread-safe: the in-memory index is guarded by a lock and every file is
+    written atomically. Index writes are group-committed: a writer that
+    finds its change already covered by a concurrent writer's flush skips
+    its own, so N parallel saves cost far fewer than N rewrites+fsyncs of
+    index.json. Write cost still grows with history; use the SQLite backend
+    for large or busy deployments.
+    """
+
+    def __init__(self, storage_path: Path):
+        self.storage_path = Path(storage_path)
+        self.index_file = self.storage_path / JSON_INDEX_FILENAME
+        self.statistics_file = self.storage_path / JSON_STATISTICS_FILENAME
+        self._lock = threading.RLock()        # guards self.index and self.statistics
+        self._flush_lock = threading.Lock()   # single writer of index.json
+        self._version = 0                     # bumped on every index change
+        self._flushed_version = 0             # last version written to disk
+        self._load_index()
+        self._load_statistics()
+
+    def _load_index(self):
+        """Load recommendation index"""
+        if self.index_file.exists():
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                self.index = json.load(f)
+            logger.debug(f"Loaded index with {len(self.index)} entries")
+        else:
+            self.index = {}
+            logger.debug("Created new index")
+
+    def _load_statistics(self):
+        """Load materialized statistics (None if missing or out of sync with the index)"""
+        self.statistics = None
+        if self.statistics_file.exists():
+            with open(self.statistics_file, "r", encoding="utf-8") as f:
+                stats = RecommendationStatistics.from_dict(json.load(f))
+            if stats is not None and stats.total == len(self.index):
+                self.statistics = stats
+            else:
+                logger.warning("Persisted recommendation statistics are stale; they will be rebuilt")
+
+    def _save_index(self):
+        """Save recommendation index and statistics (group commit, see class docstring)"""
+        with self._lock:
+            self._version += 1
+            version = self._version
+
+        with self._flush_lock:
+            if self._flushed_version >= version:
+                return  # Already persisted by a concurrent writer
+            with self._lock:
+                snapshot = json.dumps(self.index, indent=2, ensure_ascii=False)
+                stats = json.dumps(self.statistics.to_dict()) if self.statistics is not None else None
+                version = self._version
+            _atomic_write_text(self.index_file, snapshot)
+            if stats is not None:
+                _atomic_write_text(self.statistics_file, stats)
+            self._flushed_version = version
+        logger.debug(f"Saved index (version {version})")
+
+    def _record_file(self, rec_id: str) -> Path:
+        return self.storage_path / f"{rec_id}.json"
+
+    def _payload_file(self, rec_id: str) -> Path:
+        return self.storage_path / f"{rec_id}.trajectory.json"
+
+    def _write_record(self, rec_id: str, record: Dict[str, Any]) -> Path:
+        body, payload = split_record(record)
+        # Payload first: a body never points at a payload that is not on disk yet
+        if payload is not None:
+            _atomic_write_text(self._payload_file(rec_id), json.dumps(payload, indent=2, ensure_ascii=False))
+        rec_file = self._record_file(rec_id)
+        _atomic_write_text(rec_file, json.dumps(body, indent=2, ensure_ascii=False))
+        return rec_file
+
+    def _remove_files(self, rec_id: str, meta: Dict[str, Any]) -> None:
+        for path in (Path(meta.get("file", self._record_file(rec_id))), self._payload_file(rec_id)):
+            if path.exists():
+                path.unlink()
+
+    def put(self, rec_id: str, header: Dict[str, Any], record: Dict[str, Any]) -> None:
+        rec_file = self._write_record(rec_id, record)
+        with self._lock:
+            self._set_entry(rec_id, {**header, "file": str(rec_file)})
+        self._save_index()
+
+    def _set_entry(self, rec_id: str, meta: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Set (or remove, meta=None) an index entry and update statistics; returns the old entry."""
+        old_meta = self.index.pop(rec_id, None)
+        if meta is not None:
+            self.index[rec_id] = meta
+        if self.statistics is not None:
+            self.statistics.replace(old_meta, meta)
+        return old_meta
+
+    def replace(self, old_id: str, new_id: str, header: Dict[str, Any], record: Dict[str, Any]) -> None:
+        # The index flip is the commit point: a crash before it leaves the old
+        # entry intact, a crash after it at worst leaves an orphaned old file.
+        if record["trajectory"].get("steps") is None:
+            raise ValueError("replace() needs the record with its trajectory")
+        rec_file = self._write_record(new_id, record)
+        with self._lock:
+            old_meta = self._set_entry(old_id, None) if old_id != new_id else None
+            self._set_entry(new_id, {**header, "file": str(rec_file)})
+        self._save_index()
+
+        if old_meta is not None and old_id != new_id:
+            self._remove_files(old_id, old_meta)
+
+    def get(self, rec_id: str, include_trajectory: bool = True) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            meta = self.index.get(rec_id)
+        if meta is None:
+            return None
+
+        rec_file = Path(meta["file"])
+        if not rec_file.exists():
+            logger.error(f"Recommendation file not found: {rec_file}")
+            return None
+
+        with open(rec_file, "r", encoding="utf-8") as f:
+            record = json.load(f)
+        if include_trajectory and record["trajectory"].get("steps") is None:
+            record = join_record(record, self.get_payload(rec_id))
+        return record
+
+    def get_payload(self, rec_id: str) -> Optional[Dict[str, Any]]:
+        payload_file = self._payload_file(rec_id)
+        if not payload_file.exists():
+            return super().get_payload(rec_id)  # Pre-split file with inline trajectory
+        with open(payload_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def get_header(self, rec_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            meta = self.index.get(rec_id)
+            return dict(meta) if meta is not None else None
+
+    def delete(self, rec_id: str) -> bool:
+        with self._lock:
+            meta = self._set_entry(rec_id, None)
+        if meta is None:
+            return False
+        self._save_index()
+
+        self._remove_files(rec_id, meta)
+        return True
+
+    def query(
+        self,
+        status: Optional[str] = None,
+        target_material: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        with self._lock:
+            entries = list(self.index.items())
+
+        filtered = []
+        for rec_id, meta in entries:
+            if status and meta["status"] != status:
+                continue
+            if target_material and meta.get("target_material") != target_material:
+                continue
+            filtered.append({**meta, "recommendation_id": rec_id})
+
+        filtered.sort(key=lambda x: x["created_at"], reverse=True)
+        end = None if limit is None else offset + limit
+        return filtered[offset:end], len(filtered)
+
+    def count_by(self, column: str, target_material: Optional[str] = None) -> Dict[Any, int]:
+        if column not in FILTER_COLUMNS:
+            raise ValueError(f"Cannot group by {column!r}; choose from {FILTER_COLUMNS}")
+        with self._lock:
+            metas = list(self.index.values())
+
+        counts: Dict[Any, int] = {}
+        for meta in metas:
+            if target_material and meta.get("target_material") != target_material:
+                continue
+            value = meta.get(column, "unknown")
+            counts[value] = counts.get(value, 0) + 1
+        return counts
+
+    def ids(self) -> List[str]:
+        with self._lock:
+            return list(self.index)
+
+    def rebuild_statistics(self, headers: Dict[str, Dict[str, Any]]) -> None:
+        with self._lock:
+            for rec_id, header in headers.items():
+                if rec_id in self.index:
+                    self.index[rec_id] = {**header, "file": self.index[rec_id]["file"]}
+            self.statistics = RecommendationStatistics.from_headers(self.index)
+        self._save_index()
+
+    def __contains__(self, rec_id: str) -> bool:
+        with self._lock:
+            return rec_id in self.index
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self.index)
+
+
+class SQLiteRecommendationStore(RecommendationStore):
+    """
+    SQLite database (WAL mode) with one row per recommendation.
+
+    status, target_material, created_at and performance_score are indexed
+    columns; the header is kept as JSON next to them so list views need no
+    decoding of the record. The trajectory payload (steps and tool outputs,
+    the bulk of a recommendation) is stored separately as a zlib-compressed
+    JSON blob and only read when requested. Rows written before the split
+    have no trajectory in the record column and the whole trajectory in the
+    blob.
+
+    Concurrency: a single connection is shared by all threads behind a lock,
+    so there is exactly one writer and every operation is its own
+    transaction. Rows are serialised and compressed before the lock is
+    taken. With synchronous=NORMAL, WAL commits are not fsynced
+    individually; the log is synced at checkpoints, batching fsyncs across
+    many commits (a crash may lose the last few commits but never corrupts
+    the database).
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS recommendations (
+            recommendation_id TEXT PRIMARY KEY,
+            task_id TEXT,
+            status TEXT NOT NULL,
+            target_material TEXT,
+            created_at TEXT NOT NULL,
+            updated_at TEXT,
+            performance_score REAL,
+            header TEXT NOT NULL,
+            record TEXT NOT NULL,
+            trajectory BLOB
+        );
+        CREATE INDEX IF NOT EXISTS idx_rec_status ON recommendations (status);
+        CREATE INDEX IF NOT EXISTS idx_rec_material ON recommendations (target_material);
+        CREATE INDEX IF NOT EXISTS idx_rec_created ON recommendations (created_at);
+        CREATE INDEX IF NOT EXISTS idx_rec_score ON recommendations (performance_score);
+        CREATE TABLE IF NOT EXISTS statistics (
+            name TEXT PRIMARY KEY,
+            data TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, storage_path: Path):
+        self.storage_path = Path(storage_path)
+        self.db_path = self.storage_path / SQLITE_FILENAME
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")  # other processes (scripts) sharing the file
+        self._conn.executescript(self.SCHEMA)
+        self._conn.commit()
+        self.statistics = self._load_statistics()
+
+    def _load_statistics(self) -> Optional[RecommendationStatistics]:
+        """Load materialized statistics (None if missing or out of sync with the table)"""
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM statistics WHERE name = 'recommendations'").fetchone()
+            count = self._conn.execute("SELECT COUNT(*) FROM recommendations").fetchone()[0]
+        if row is None:
+            return None
+
+        stats = RecommendationStatistics.from_dict(json.loads(row[0]))
+        if stats is None or stats.total != count:
+            logger.warning("Persisted recommendation statistics are stale; they will be rebuilt")
+            return None
+        return stats
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Locked transaction that also persists the statistics it changed.
+
+        If the transaction fails, the in-memory statistics are reloaded from
+        the database so they match the rolled-back state.
+        """
+        with self._lock:
+            try:
+                with self._conn:
+                    yield
+                    if self.statistics is not None:
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO statistics VALUES ('recommendations', ?)",
+                            (json.dumps(self.statistics.to_dict()),),
+                        )
+            except Exception:
+                self.statistics = self._load_statistics()
+                raise
+
+    def _update_statistics(self, rec_id: str, new_header: Optional[Dict[str, Any]]) -> None:
+        """Swap rec_id's stored header for new_header in the statistics (inside a transaction)."""
+        if self.statistics is not None:
+            self.statistics.replace(self.get_header(rec_id), new_header)
+
+    @staticmethod
+    def _compress(value: Any) -> bytes:
+        return zlib.compress(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+    @staticmethod
+    def _decompress(blob: Optional[bytes]) -> Any:
+        return None if blob is None else json.loads(zlib.decompress(blob).decode("utf-8"))
+
+    UPSERT = """
+        INSERT INTO recommendations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (recommendation_id) DO UPDATE SET
+            task_id = excluded.task_id,
+            status = excluded.status,
+            target_material = excluded.target_material,
+            created_at = excluded.created_at,
+            updated_at = excluded.updated_at,
+            performance_score = excluded.performance_score,
+            header = excluded.header,
+            record = excluded.record,
+            trajectory = COALESCE(excluded.trajectory, recommendations.trajectory)
+    """
+
+    def _row(self, rec_id: str, header: Dict[str, Any], record: Dict[str, Any]) -> tuple:
+        body, payload = split_record(record)
+        return (
+            rec_id,
+            header.get("task_id"),
+            header["status"],
+            header.get("target_material"),
+            header["created_at"],
+            header.get("updated_at"),
+            header.get("performance_score"),
+            json.dumps(header, ensure_ascii=False),
+            json.dumps(body, ensure_ascii=False),
+            None if payload is None else self._compress(payload),  # None keeps the stored payload
+        )
+
+    def put(self, rec_id: str, header: Dict[str, Any], record: Dict[str, Any]) -> None:
+        self.put_many([(rec_id, header, record)])
+
+    def put_many(self, items: Iterable[Tuple[str, Dict[str, Any], Dict[str, Any]]]) -> int:
+        """Insert or replace several recommendations in one transaction."""
+        items = list(items)
+        rows = [self._row(rec_id, header, record) for rec_id, header, record in items]
+        with self._transaction():
+            for (rec_id, header, _), row in zip(items, rows):
+                self._update_statistics(rec_id, header)
+                self._conn.execute(self.UPSERT, row)
+        return len(rows)
+
+    def replace(self, old_id: str, new_id: str, header: Dict[str, Any], record: Dict[str, Any]) -> None:
+        row = self._row(new_id, header, record)
+        if row[-1] is None:
+            raise ValueError("replace() needs the record with its trajectory")
+        with self._transaction():
+            if old_id != new_id:
+                self._update_statistics(old_id, None)
+                self._conn.execute("DELETE FROM recommendations WHERE recommendation_id = ?", (old_id,))
+            self._update_statistics(new_id, header)
+            self._conn.execute("INSERT OR REPLACE INTO recommendations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+
+    def get(self, rec_id: str, include_trajectory: bool = True) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT record FROM recommendations WHERE recommendation_id = ?", (rec_id,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        body = json.loads(row[0])
+        if "trajectory" not in body:
+            # Pre-split row: the blob is the whole trajectory
+            body["trajectory"] = self._read_blob(rec_id)
+            return body
+        if include_trajectory:
+            body = join_record(body, self._read_blob(rec_id))
+        return body
+
+    def _read_blob(self, rec_id: str) -> Any:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT trajectory FROM recommendations WHERE recommendation_id = ?", (rec_id,)
+            ).fetchone()
+        return None if row is None else self._decompress(row[0])
+
+    def get_payload(self, rec_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT record, trajectory FROM recommendations WHERE recommendation_id = ?", (rec_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        if "trajectory" not in json.loads(row[0]):
+            return super().get_payload(rec_id)  # Pre-split row
+        return self._decompress(row[1])
+
+    def get_header(self, rec_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT header FROM recommendations WHERE recommendation_id = ?", (rec_id,)
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def delete(self, rec_id: str) -> bool:
+        with self._transaction():
+            self._update_statistics(rec_id, None)
+            cursor = self._conn.execute("DELETE FROM recommendations WHERE recommendation_id = ?", (rec_id,))
+        return cursor.rowcount > 0
+
+    @staticmethod
+    def _where(status: Optional[str], target_material: Optional[str]) -> Tuple[str, list]:
+        clauses, params = [], []
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if target_material:
+            clauses.append("target_material = ?")
+            params.append(target_material)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(
+        self,
+        status: Optional[str] = None,
+        target_material: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        where, params = self._where(status, target_material)
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM recommendations{where}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT recommendation_id, header FROM recommendations{where} "
+                f"ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                [*params, -1 if limit is None else limit, offset],
+            ).fetchall()
+        return [{**json.loads(header), "recommendation_id": rec_id} for rec_id, header in rows], total
+
+    def count_by(self, column: str, target_material: Optional[str] = None) -> Dict[Any, int]:
+        if column not in FILTER_COLUMNS:
+            raise ValueError(f"Cannot group by {column!r}; choose from {FILTER_COLUMNS}")
+        where, params = self._where(None, target_material)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {column}, COUNT(*) FROM recommendations{where} GROUP BY {column}", params
+            ).fetchall()
+        return dict(rows)
+
+    def ids(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT recommendation_id FROM recommendations")]
+
+    def rebuild_statistics(self, headers: Dict[str, Dict[str, Any]]) -> None:
+        with self._transaction():
+            self._conn.executemany(
+                "UPDATE recommendations SET header = ?, performance_score = ? WHERE recommendation_id = ?",
+                [
+                    (json.dumps(header, ensure_ascii=False), header.get("performance_score"), rec_id)
+                    for rec_id, header in headers.items()
+                ],
+            )
+            stored = {
+                rec_id: json.loads(header)
+                for rec_id, header in self._conn.execute("SELECT recommendation_id, header FROM recommendations")
+            }
+            self.statistics = RecommendationStatistics.from_headers(stored)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __contains__(self, rec_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM recommendations WHERE recommendation_id = ?", (rec_id,)
+            ).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM recommendations").fetchone()[0]
+
+
+STORAGE_BACKENDS = {
+    "sqlite": SQLiteRecommendationStore,
+    "json": JSONRecommendationStore,
+}
+
+
+def create_recommendation_store(backend: str, storage_path: Path) -> RecommendationStore:
+    """
+    Create a storage backend by name.
+
+    A new SQLite store next to an existing JSON layout (index.json) is
+    populated from it once (see migrate_json_to_sqlite).
+
+    Args:
+        backend: "sqlite" or "json"
+        storage_path: Directory of the store
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown recommendation storage backend {backend!r}; choose from {sorted(STORAGE_BACKENDS)}")
+
+    storage_path = Path(storage_path)
+    if backend == "sqlite":
+        store = SQLiteRecommendationStore(storage_path)
+        if len(store) == 0 and (storage_path / JSON_INDEX_FILENAME).exists():
+            migrate_json_to_sqlite(storage_path, store)
+        return store
+    return STORAGE_BACKENDS[backend](storage_path)
+
+
+def migrate_json_to_sqlite(storage_path: Path, store: Optional[SQLiteRecommendationStore] = None) -> int:
+    """
+    Copy the JSON layout (index.json + per-recommendation files) into SQLite.
+
+    The JSON files are left in place as a backup; index.json is renamed to
+    index.json.migrated so the migration runs only once.
+
+    Args:
+        storage_path: Directory containing index.json
+        store: Target store (default: the SQLite store in storage_path)
+
+    Returns:
+        Number of recommendations migrated
+    """
+    storage_path = Path(storage_path)
+    source = JSONRecommendationStore(storage_path)
+    target = store or SQLiteRecommendationStore(storage_path)
+
+    items = []
+    for rec_id in source.ids():
+        record = source.get(rec_id)
+        if record is None:
+            logger.warning(f"Skipping {rec_id} during migration: file missing")
+            continue
+        header = {k: v for k, v in source.get_header(rec_id).items() if k != "file"}
+        items.append((rec_id, header, record))
+
+    migrated = target.put_many(items)
+    source.index_file.rename(source.index_file.with_name(JSON_INDEX_FILENAME + ".migrated"))
+    logger.info(f"Migrated {migrated} recommendations from JSON files to {target.db_path}")
+
+    if store is None:
+        target.close()
+    return migrated
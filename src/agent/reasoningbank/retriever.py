@@ -20,20 +20,30 @@ class MemoryRetriever:
     Retrieves relevant memories from ReasoningBank using embedding-based similarity search.
 
     The retriever supports:
-    - Cosine similarity search
-    - Filtering by metadata
+    - Cosine similarity search (one matrix-vector product over the bank's
+      pre-normalised embedding matrix, top-k via argpartition)
+    - Filtering by metadata (applied as a boolean mask over the matrix)
     - Minimum similarity thresholds
     - Configurable top-k retrieval
+    - Optional cluster diversity (at most one memory per consolidation cluster
+      while enough distinct clusters match)
+    - Usage tracking: returned memories are reported to the bank
+      (ReasoningBank.record_retrieval), which drives utility-based eviction
 
     Attributes:
         bank: ReasoningBank instance to retrieve from
         embedding_func: Function to compute query embeddings
+        diversify_clusters: Whether to prefer one memory per cluster
     """
 
+    # Extra candidates fetched per requested memory when diversifying
+    DIVERSITY_OVERSAMPLE = 4
+
     def __init__(
         self,
         bank: ReasoningBank,
-        embedding_func: Callable[[str], List[float]]
+        embedding_func: Callable[[str], List[float]],
+        diversify_clusters: bool = False
     ):
         """
         Initialize MemoryRetriever.
@@ -41,9 +51,11 @@ class MemoryRetriever:
         Args:
             bank: ReasoningBank instance
             embedding_func: Function that takes text and returns embedding vector
+            diversify_clusters: Prefer one memory per cluster_id in the top-k
         """
         self.bank = bank
         self.embedding_func = embedding_func
+        self.diversify_clusters = diversify_clusters
         logger.info("Initialized MemoryRetriever")
 
     def retrieve(self, query: MemoryQuery) -> List[MemoryItem]:
@@ -58,8 +70,9 @@ class MemoryRetriever:
         """
         # Get candidate memories (apply filters first)
         candidates = self._get_candidates(query.filters)
+        num_candidates = len(self.bank) if candidates is None else len(candidates)
 
-        if not candidates:
+        if not num_candidates:
             logger.warning("No candidate memories found after filtering")
             return []
 
@@ -70,23 +83,16 @@ class MemoryRetriever:
             logger.error(f"Failed to compute query embedding: {e}")
             return []
 
-        # Compute similarities
-        scored_memories = self._score_memories(query_embedding, candidates)
-
-        # Filter by minimum similarity
-        if query.min_similarity > 0:
-            scored_memories = [
-                (mem, score) for mem, score in scored_memories
-                if score >= query.min_similarity
-            ]
-
-        # Sort by score (descending) and return top-k
-        scored_memories.sort(key=lambda x: x[1], reverse=True)
-        top_k_memories = [mem for mem, score in scored_memories[:query.top_k]]
+        # Score, threshold and select top-k in one vectorised pass
+        scored_memories = self._score_memories(
+            query_embedding, candidates, query.top_k, query.min_similarity
+        )
+        top_k_memories = [mem for mem, score in scored_memories]
+        self.bank.record_retrieval(top_k_memories)
 
         logger.info(
             f"Retrieved {len(top_k_memories)} memories for query "
-            f"(candidates: {len(candidates)})"
+            f"(candidates: {num_candidates})"
         )
 
         return top_k_memories
@@ -106,7 +112,7 @@ class MemoryRetriever:
         """
         candidates = self._get_candidates(query.filters)
 
-        if not candidates:
+        if (len(self.bank) if candidates is None else len(candidates)) == 0:
             return []
 
         try:
@@ -115,63 +121,86 @@ class MemoryRetriever:
             logger.error(f"Failed to compute query embedding: {e}")
             return []
 
-        scored_memories = self._score_memories(query_embedding, candidates)
-
-        # Filter by minimum similarity
-        if query.min_similarity > 0:
-            scored_memories = [
-                (mem, score) for mem, score in scored_memories
-                if score >= query.min_similarity
-            ]
-
-        # Sort by score
-        scored_memories.sort(key=lambda x: x[1], reverse=True)
-
-        return scored_memories[:query.top_k]
+        scored_memories = self._score_memories(
+            query_embedding, candidates, query.top_k, query.min_similarity
+        )
+        self.bank.record_retrieval(mem for mem, score in scored_memories)
+        return scored_memories
 
-    def _get_candidates(self, filters: dict) -> List[MemoryItem]:
+    def _get_candidates(self, filters: dict) -> Optional[List[MemoryItem]]:
         """
-        Get candidate memories by applying filters.
+        Get candidate memories by applying filters (uses the bank's indexes).
 
         Args:
             filters: Dictionary of filter criteria
 
         Returns:
-            List of candidate MemoryItem objects
+            List of candidate MemoryItem objects, or None for the whole bank
         """
         if not filters:
-            return self.bank.get_all_memories()
+            return None
 
         return self.bank.filter_memories(filters)
 
     def _score_memories(
         self,
         query_embedding: List[float],
-        candidates: List[MemoryItem]
+        candidates: Optional[List[MemoryItem]],
+        top_k: int,
+        min_similarity: float = 0.0,
     ) -> List[Tuple[MemoryItem, float]]:
         """
-        Compute similarity scores for candidate memories.
+        Score candidate memories and select the top-k.
 
         Args:
             query_embedding: Query embedding vector
-            candidates: List of candidate MemoryItem objects
+            candidates: Filtered subset of the bank (turned into a boolean mask),
+                or None to search the whole embedding matrix
+            top_k: Number of memories to return
+            min_similarity: Minimum similarity threshold
 
         Returns:
-            List of (MemoryItem, score) tuples
+            List of (MemoryItem, score) tuples sorted by descending score
         """
-        scored = []
-        query_vec = np.array(query_embedding)
-
-        for memory in candidates:
-            if memory.embedding is None:
-                logger.warning(f"Memory '{memory.title}' has no embedding, skipping")
-                continue
-
-            memory_vec = np.array(memory.embedding)
-            similarity = self._cosine_similarity(query_vec, memory_vec)
-            scored.append((memory, float(similarity)))
+        if candidates is None:
+            missing = len(self.bank) - self.bank.num_searchable
+        else:
+            missing = sum(1 for memory in candidates if memory.embedding is None)
+        if missing:
+            logger.warning(f"{missing} candidate memories have no embedding, skipping")
+
+        if not self.diversify_clusters:
+            return self.bank.search(
+                query_embedding,
+                top_k,
+                candidates=candidates,
+                min_similarity=min_similarity,
+            )
+
+        ranked = self.bank.search(
+            query_embedding,
+            top_k * self.DIVERSITY_OVERSAMPLE,
+            candidates=candidates,
+            min_similarity=min_similarity,
+        )
+        return self._diversify(ranked, top_k)
 
-        return scored
+    @staticmethod
+    def _diversify(
+        ranked: List[Tuple[MemoryItem, float]], top_k: int
+    ) -> List[Tuple[MemoryItem, float]]:
+        """Best memory of each cluster first, then the rest by score."""
+        seen = set()
+        diverse, redundant = [], []
+        for memory, score in ranked:
+            cluster = memory.cluster_id or memory.id
+            if cluster in seen:
+                redundant.append((memory, score))
+            else:
+                seen.add(cluster)
+                diverse.append((memory, score))
+        selected = diverse[:top_k] + redundant[:max(0, top_k - len(diverse))]
+        return sorted(selected, key=lambda x: x[1], reverse=True)
 
     @staticmethod
     def _cosine_similarity(vec1: np.ndarray, vec2: np.ndarray) -> float:
@@ -0,0 +1,148 @@
+"""
+Unit tests for the API client plumbing (retries, accounting, aembed_batch, response cache)
+"""
+
+import asyncio
+import pytest
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add parent directory to path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+openai = pytest.importorskip("openai")
+import httpx
+
+from agent.utils.api_support import APICallStats, aretry, backoff_delay
+from agent.utils.embedding_client import EmbeddingClient
+from agent.utils.llm_client import LLMClient
+from agent.utils.response_cache import ResponseCache
+
+
+def connection_error():
+    return openai.APIConnectionError(request=httpx.Request("POST", "https://example.invalid"))
+
+
+class TestRetry:
+    """Test jittered backoff and retry of transient errors"""
+
+    def test_backoff_is_capped(self):
+        """Test that the jittered delay never exceeds the cap"""
+        assert all(0 <= backoff_delay(attempt, base=1.0, cap=5.0) <= 5.0 for attempt in range(10))
+
+    def test_retries_transient_errors(self, monkeypatch):
+        """Test that connection errors are retried and counted"""
+        monkeypatch.setattr("agent.utils.api_support.backoff_delay", lambda attempt: 0)
+        stats = APICallStats()
+        attempts = []
+
+        async def call():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise connection_error()
+            return "ok"
+
+        assert asyncio.run(aretry(call, max_retries=3, stats=stats)) == "ok"
+        assert stats.snapshot()["retries"] == 2
+
+    def test_gives_up_after_max_retries(self, monkeypatch):
+        """Test that the last error is raised once retries are exhausted"""
+        monkeypatch.setattr("agent.utils.api_support.backoff_delay", lambda attempt: 0)
+
+        async def call():
+            raise connection_error()
+
+        with pytest.raises(openai.APIConnectionError):
+            asyncio.run(aretry(call, max_retries=1))
+
+    def test_stats_timer(self):
+        """Test that the timer records calls, tokens and errors"""
+        stats = APICallStats()
+        with stats.timer() as timer:
+            timer.usage = SimpleNamespace(prompt_tokens=10, completion_tokens=5)
+        with pytest.raises(ValueError):
+            with stats.timer():
+                raise ValueError("boom")
+
+        snapshot = stats.snapshot()
+        assert snapshot["calls"] == 1
+        assert snapshot["errors"] == 1
+        assert snapshot["total_tokens"] == 15
+
+
+class TestAsyncEmbedding:
+    """Test aembed_batch chunking and ordering"""
+
+    def test_aembed_batch_chunks_concurrently(self, monkeypatch):
+        """Test that chunks are embedded concurrently and reassembled in order"""
+        client = EmbeddingClient(provider="openai", model="m", api_key="test", max_batch_size=2)
+        in_flight = []
+        peak = []
+
+        async def fake_request(texts, **kwargs):
+            in_flight.append(1)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.pop()
+            return [[float(len(t))] for t in texts]
+
+        monkeypatch.setattr(client, "_aembed_request", fake_request)
+
+        result = asyncio.run(client.aembed_batch(["a", "bb", "ccc", "dddd", "eeeee"]))
+        assert result == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+        assert max(peak) > 1
+
+
+class TestResponseCache:
+    """Test caching of deterministic LLM calls"""
+
+    def _client(self, monkeypatch, **kwargs):
+        client = LLMClient(provider="openai", model="m", api_key="test", temperature=0.7, **kwargs)
+        calls = []
+
+        def create(**params):
+            calls.append(params)
+            message = SimpleNamespace(content=f"answer {len(calls)}")
+            usage = SimpleNamespace(prompt_tokens=100, completion_tokens=10)
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+        monkeypatch.setattr(client, "client", SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+        ))
+        return client, calls
+
+    def test_only_deterministic_calls_are_cached(self, monkeypatch):
+        """Test that temperature-0 calls hit the cache and sampled calls do not"""
+        client, calls = self._client(monkeypatch, response_cache=ResponseCache())
+
+        assert client.chat("judge this", temperature=0) == "answer 1"
+        assert client.chat("judge this", temperature=0) == "answer 1"
+        client.chat("judge this")  # default temperature 0.7
+        client.chat("judge this")
+
+        assert len(calls) == 3
+        stats = client.get_usage_stats()["response_cache"]
+        assert stats["hits"] == 1
+        assert stats["saved_prompt_tokens"] == 100
+
+    def test_key_includes_system_prompt(self, monkeypatch):
+        """Test that different messages are cached separately"""
+        client, calls = self._client(monkeypatch, response_cache=ResponseCache())
+        client.chat("q", system_prompt="A", temperature=0)
+        client.chat("q", system_prompt="B", temperature=0)
+        assert len(calls) == 2
+
+    def test_lru_and_ttl(self, monkeypatch):
+        """Test size limit and expiry"""
+        cache = ResponseCache(max_entries=1, ttl_seconds=10)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        assert cache.get("a") is None
+
+        monkeypatch.setattr("agent.utils.response_cache.time.monotonic", lambda: 1e12)
+        assert cache.get("b") is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,73 @@
+"""
+Unit tests for EmbeddingCache and its use by EmbeddingClient
+"""
+
+import pytest
+from pathlib import Path
+
+# Add parent directory to path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+pytest.importorskip("openai")  # agent.utils imports the OpenAI-based clients
+
+from agent.utils.embedding_cache import EmbeddingCache
+from agent.utils.embedding_client import EmbeddingClient
+
+
+class TestEmbeddingCache:
+    """Test the two-level embedding cache"""
+
+    def test_key_depends_on_model(self):
+        """Test that the same text under different models gets different keys"""
+        a = EmbeddingCache.make_key("dashscope", "text-embedding-v3", None, "ChCl")
+        b = EmbeddingCache.make_key("dashscope", "text-embedding-v4", None, "ChCl")
+        assert a != b
+        assert a == EmbeddingCache.make_key("dashscope", "text-embedding-v3", None, "ChCl")
+
+    def test_lru_eviction_and_stats(self):
+        """Test that the in-memory LRU is bounded and hits/misses are counted"""
+        cache = EmbeddingCache(max_entries=2)
+        cache.put_many({"a": [1.0], "b": [2.0]})
+        cache.get("a")
+        cache.put_many({"c": [3.0]})  # evicts "b" (least recently used)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == [1.0]
+        stats = cache.get_stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+
+    def test_persists_across_instances(self, tmp_path):
+        """Test that vectors written to disk are served by a new instance"""
+        path = str(tmp_path / "embeddings.sqlite")
+        cache = EmbeddingCache(path=path)
+        cache.put_many({"a": [0.5, 0.25]})
+        cache.close()
+
+        reopened = EmbeddingCache(path=path)
+        assert reopened.get("a") == [0.5, 0.25]
+        assert reopened.get_stats()["disk_hits"] == 1
+
+
+class TestCachedEmbeddingClient:
+    """Test that EmbeddingClient only sends uncached texts to the API"""
+
+    def test_embed_batch_uses_cache(self, monkeypatch):
+        """Test that repeated and duplicate texts are embedded once"""
+        client = EmbeddingClient(provider="openai", model="m", api_key="test", cache=EmbeddingCache())
+        requests = []
+
+        def fake_request(texts, **kwargs):
+            requests.append(list(texts))
+            return [[float(len(t))] for t in texts]
+
+        monkeypatch.setattr(client, "_embed_request", fake_request)
+
+        assert client.embed_batch(["aa", "b"]) == [[2.0], [1.0]]
+        assert client.embed_batch(["b", "ccc", "ccc"]) == [[1.0], [3.0], [3.0]]
+        assert requests == [["aa", "b"], ["ccc"]]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
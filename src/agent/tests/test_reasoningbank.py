@@ -197,6 +197,52 @@ class TestReasoningBank:
             if os.path.exists(temp_path):
                 os.remove(temp_path)
 
+    def test_save_writes_embedding_sidecar(self, tmp_path):
+        """Test format 2.0: compact JSON without vectors plus .npy sidecar keyed by id"""
+        import json
+
+        bank = ReasoningBank(embedding_func=mock_embedding)
+        for i in range(3):
+            bank.add_memory(MemoryItem(title=f"Memory {i}", description=f"Desc {i}", content="c"))
+        bank.add_memory(MemoryItem(title="No embedding", description="d", content="c"), compute_embedding=False)
+
+        path = tmp_path / "bank.json"
+        bank.save(str(path))
+        bank.save(str(path))  # second save replaces the sidecar
+
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        assert data["version"] == "2.0"
+        assert all("embedding" not in m for m in data["memories"])
+        assert [p.name for p in tmp_path.glob("bank.embeddings.*.npy")] == [data["embeddings"]["file"]]
+
+        new_bank = ReasoningBank()
+        new_bank.load(str(path))
+
+        assert [m.id for m in new_bank.memories] == [m.id for m in bank.memories]
+        assert new_bank.get_memory_by_title("No embedding").embedding is None
+        query = mock_embedding("Memory 1. Desc 1")
+        assert new_bank.search(query, top_k=1)[0][0].title == "Memory 1"
+        assert new_bank.search(query, top_k=1)[0][1] == pytest.approx(1.0, abs=1e-3)
+
+    def test_load_v1_format(self, tmp_path):
+        """Test that format 1.0 files (inline float lists) still load"""
+        import json
+
+        memory = MemoryItem(title="Old", description="d", content="c", embedding=mock_embedding("old"))
+        record = memory.to_dict()
+        del record["id"]
+        path = tmp_path / "bank.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"version": "1.0", "max_items": 50, "memories": [record]}, f)
+
+        bank = ReasoningBank()
+        bank.load(str(path))
+
+        assert bank.max_items == 50
+        assert bank.memories[0].id
+        assert bank.search(mock_embedding("old"), top_k=1)[0][0].title == "Old"
+
 
 class TestMemoryRetriever:
     """Test MemoryRetriever"""
@@ -285,6 +331,528 @@ class TestMemoryRetriever:
         assert retrieved[0].title == "Success 1"
 
 
+class TestEmbeddingIndex:
+    """Test the vectorised embedding matrix behind ReasoningBank.search"""
+
+    def _bank(self, n=20, max_items=1000):
+        bank = ReasoningBank(embedding_func=mock_embedding, max_items=max_items)
+        for i in range(n):
+            bank.add_memory(MemoryItem(
+                title=f"Memory {i}",
+                description=f"Desc {i}",
+                content=f"Content {i}",
+                is_from_success=(i % 2 == 0),
+            ))
+        return bank
+
+    def test_matches_bruteforce_cosine(self):
+        """Test that matrix search returns the same ranking as per-memory cosine"""
+        import numpy as np
+
+        bank = self._bank()
+        query_vec = mock_embedding("dissolve cellulose")
+
+        expected = sorted(
+            (
+                (m.title, float(np.dot(query_vec, m.embedding) / (np.linalg.norm(query_vec) * np.linalg.norm(m.embedding))))
+                for m in bank.get_all_memories()
+            ),
+            key=lambda x: x[1],
+            reverse=True,
+        )[:5]
+        results = bank.search(query_vec, top_k=5)
+
+        assert [m.title for m, _ in results] == [title for title, _ in expected]
+        assert [score for _, score in results] == pytest.approx([score for _, score in expected], rel=1e-5)
+
+    def test_index_follows_eviction_and_deletes(self):
+        """Test that evicted and deleted memories are never returned"""
+        bank = self._bank(n=6, max_items=4)
+        bank.delete_by_title("Memory 3")
+
+        titles = {m.title for m, _ in bank.search(mock_embedding("q"), top_k=10)}
+        assert titles == {"Memory 2", "Memory 4", "Memory 5"}
+
+    def test_filters_and_dimension_mismatch(self):
+        """Test filter masks and that mismatched embeddings are skipped"""
+        bank = self._bank(n=10)
+        bank.add_memory(MemoryItem(
+            title="Wrong dim", description="d", content="c", embedding=[1.0, 0.0]
+        ))
+        retriever = MemoryRetriever(bank, embedding_func=mock_embedding)
+
+        results = retriever.retrieve_with_scores(MemoryQuery(
+            query_text="q", top_k=10, filters={"is_from_success": False}
+        ))
+
+        assert len(results) == 5
+        assert all(not m.is_from_success for m, _ in results)
+        assert "Wrong dim" not in [m.title for m, _ in bank.search(mock_embedding("q"), top_k=20)]
+
+
+class TestSecondaryIndexes:
+    """Test indexed lookups and filters stay consistent with a linear scan"""
+
+    def _bank(self, n=30, **kwargs):
+        bank = ReasoningBank(embedding_func=mock_embedding, **kwargs)
+        for i in range(n):
+            bank.add_memory(MemoryItem(
+                title=f"Memory {i % 10}",
+                description=f"Desc {i}",
+                content=f"Content {i}",
+                source_task_id=f"task_{i % 4}",
+                is_from_success=(i % 3 != 0),
+                metadata={"recommendation_id": f"REC_{i % 5}", "material": ["a", "b"][i % 2]},
+            ))
+        return bank
+
+    @staticmethod
+    def _scan(bank, filters):
+        return [
+            m for m in bank.get_all_memories()
+            if all(getattr(m, k, m.metadata.get(k)) == v for k, v in filters.items())
+        ]
+
+    def test_filters_match_linear_scan(self):
+        """Test indexed, mixed and unindexed filters against a full scan"""
+        bank = self._bank(indexed_metadata_keys=["material"])
+        for filters in [
+            {"is_from_success": False},
+            {"source_task_id": "task_1", "is_from_success": True},
+            {"recommendation_id": "REC_2", "material": "a"},
+            {"content": "Content 7"},
+            {"recommendation_id": "REC_missing"},
+        ]:
+            assert bank.filter_memories(filters) == self._scan(bank, filters)
+
+    def test_updates_and_deletes_keep_indexes_in_sync(self):
+        """Test title lookup and deletes after updates"""
+        bank = self._bank()
+        memory = bank.get_memory_by_title("Memory 3")
+        assert memory.description == "Desc 3"  # oldest of the duplicates
+
+        bank.update_memory(memory, title="Renamed", metadata={"recommendation_id": "REC_new"})
+        assert bank.get_memory_by_title("Renamed") is memory
+        assert bank.get_memory_by_id(memory.id) is memory
+        assert bank.filter_memories({"recommendation_id": "REC_new"}) == [memory]
+
+        assert bank.delete_by_recommendation_id("REC_0") == 6
+        assert bank.delete_by_title("Memory 3") is True
+        assert bank.filter_memories({"recommendation_id": "REC_0"}) == []
+        assert bank.get_memory_by_title("Memory 3") is None
+        assert len(bank) == 30 - 6 - 2
+
+    def test_eviction_order(self):
+        """Test that the oldest memory is evicted and indexes forget it"""
+        bank = self._bank(n=12, max_items=10)
+        assert [m.description for m in bank.memories] == [f"Desc {i}" for i in range(2, 12)]
+        assert [m.description for m in bank.filter_memories({"title": "Memory 0"})] == ["Desc 10"]
+        assert bank.get_memory_by_title("Memory 1").description == "Desc 11"
+
+    def test_reads_during_concurrent_writes(self):
+        """Test that search and filter_memories stay consistent while other threads write"""
+        import threading
+
+        bank = self._bank(max_items=40)
+        query = mock_embedding("Memory 1")
+        stop = threading.Event()
+        errors = []
+
+        def reader():
+            try:
+                while not stop.is_set():
+                    candidates = bank.filter_memories({"is_from_success": True})
+                    for memory, _ in bank.search(query, top_k=5, candidates=candidates):
+                        assert memory.is_from_success
+            except Exception as e:  # surfaced in the main thread
+                errors.append(e)
+
+        def writer(worker):
+            for i in range(150):
+                bank.add_memory(MemoryItem(
+                    title=f"W{worker}-{i}", description="d", content=f"c{i}",
+                    is_from_success=(i % 2 == 0),
+                ))
+                if i % 10 == 0:
+                    bank.delete_by_title(f"W{worker}-{i - 5}")
+
+        readers = [threading.Thread(target=reader) for _ in range(2)]
+        writers = [threading.Thread(target=writer, args=(w,)) for w in range(3)]
+        for t in readers + writers:
+            t.start()
+        for t in writers:
+            t.join()
+        stop.set()
+        for t in readers:
+            t.join()
+
+        assert errors == []
+
+
+class TestConsolidation:
+    """Test semantic deduplication and clustering in consolidate"""
+
+    @staticmethod
+    def _memory(title, embedding, is_from_success=True):
+        return MemoryItem(
+            title=title, description=f"{title} desc", content="c",
+            embedding=embedding, is_from_success=is_from_success,
+        )
+
+    def test_merge_policy(self):
+        """Test that duplicates are merged and distinct memories start new clusters"""
+        bank = ReasoningBank(dedup_policy="merge")
+        bank.consolidate([self._memory("A", [1.0, 0.0, 0.0])])
+
+        stats = bank.consolidate([
+            self._memory("A again", [1.0, 0.01, 0.0]),
+            self._memory("Failure A", [1.0, 0.0, 0.0], is_from_success=False),
+            self._memory("C", [0.0, 0.0, 1.0]),
+        ])
+
+        assert stats == {"added": 2, "merged": 1, "superseded": 0}
+        stored = bank.get_memory_by_title("A")
+        assert [m["title"] for m in stored.metadata["merged_from"]] == ["A again"]
+        assert bank.get_memory_by_title("C").cluster_id == bank.get_memory_by_title("C").id
+
+    def test_supersede_policy(self):
+        """Test that a duplicate replaces the stored memory and keeps its cluster"""
+        bank = ReasoningBank(dedup_policy="supersede")
+        bank.consolidate([self._memory("Old", [1.0, 0.0])])
+        old = bank.get_memory_by_title("Old")
+
+        stats = bank.consolidate([self._memory("New", [1.0, 0.01])])
+
+        assert stats["superseded"] == 1
+        assert [m.title for m in bank.memories] == ["New"]
+        new = bank.get_memory_by_title("New")
+        assert new.cluster_id == old.cluster_id
+        assert new.metadata["supersedes"] == old.id
+
+    @pytest.mark.parametrize("policy", ["merge", "supersede"])
+    def test_provenance_is_never_merged_away(self, policy):
+        """Test that duplicates from another recommendation/source are kept as separate memories"""
+        bank = ReasoningBank(dedup_policy=policy)
+        bank.consolidate([self._memory("Agent", [1.0, 0.0])])
+
+        validated = self._memory("Validated", [1.0, 0.01])
+        validated.metadata.update({"recommendation_id": "R1", "source": "experiment_validated"})
+        stats = bank.consolidate([validated])
+
+        assert stats == {"added": 1, "merged": 0, "superseded": 0}
+        assert sorted(m.title for m in bank.memories) == ["Agent", "Validated"]
+        assert bank.get_memory_by_title("Validated").cluster_id == bank.get_memory_by_title("Agent").cluster_id
+        assert bank.delete_by_recommendation_id("R1") == 1
+        assert [m.title for m in bank.memories] == ["Agent"]
+
+    def test_clusters_diversify_retrieval(self):
+        """Test that near (non-duplicate) memories share a cluster and are spread out on retrieval"""
+        bank = ReasoningBank(dedup_policy="append", dedup_threshold=0.99, cluster_threshold=0.85)
+        bank.consolidate([
+            self._memory("A", [1.0, 0.0]),
+            self._memory("A near", [1.0, 0.3]),   # cos ~ 0.96
+            self._memory("B", [0.6, 0.8]),        # cos(A) = 0.6
+        ])
+        assert bank.get_memory_by_title("A near").cluster_id == bank.get_memory_by_title("A").cluster_id
+        assert bank.get_memory_by_title("B").cluster_id != bank.get_memory_by_title("A").cluster_id
+
+        query = MemoryQuery(query_text="q", top_k=2)
+        plain = MemoryRetriever(bank, embedding_func=lambda text: [1.0, 0.1])
+        diverse = MemoryRetriever(bank, embedding_func=lambda text: [1.0, 0.1], diversify_clusters=True)
+
+        assert [m.title for m in plain.retrieve(query)] == ["A", "A near"]
+        assert [m.title for m in diverse.retrieve(query)] == ["A", "B"]
+
+
+class TestBatchEmbedding:
+    """Test batched embedding in add_memories/consolidate"""
+
+    def _memories(self, n):
+        return [
+            MemoryItem(title=f"Memory {i}", description=f"Desc {i}", content="c")
+            for i in range(n)
+        ]
+
+    def test_consolidate_uses_batches(self):
+        """Test that missing embeddings are computed in chunks of embedding_batch_size"""
+        calls = []
+
+        def batch_embedding(texts):
+            calls.append(len(texts))
+            return [mock_embedding(t) for t in texts]
+
+        def single_embedding(text):
+            raise AssertionError("single-text path should not be used")
+
+        bank = ReasoningBank(
+            embedding_func=single_embedding,
+            embedding_batch_func=batch_embedding,
+            embedding_batch_size=4,
+        )
+        bank.consolidate(self._memories(10))
+
+        assert sorted(calls) == [2, 4, 4]
+        assert all(m.embedding == mock_embedding(f"{m.title}. {m.description}") for m in bank.memories)
+
+    def test_partial_failures_reported_per_item(self):
+        """Test that a failed batch is retried item by item and only bad items fail"""
+        def batch_embedding(texts):
+            raise RuntimeError("batch rejected")
+
+        def single_embedding(text):
+            if text.startswith("Memory 3."):
+                raise RuntimeError("bad input")
+            return mock_embedding(text)
+
+        bank = ReasoningBank(
+            embedding_func=single_embedding,
+            embedding_batch_func=batch_embedding,
+            embedding_batch_size=4,
+        )
+        memories = self._memories(6)
+        failures = bank.add_memories(memories)
+
+        assert failures == {memories[3].id: "bad input"}
+        assert len(bank) == 6
+        assert [m.embedding is None for m in bank.memories] == [False, False, False, True, False, False]
+
+        # Backfill of stored memories goes through the search index
+        bank.embedding_func = mock_embedding
+        assert bank.embed_memories(bank.memories) == {}
+        assert bank.search(mock_embedding("Memory 3. Desc 3"), top_k=1)[0][0] is memories[3]
+
+
+class TestMemoryWAL:
+    """Test incremental persistence through the write-ahead log"""
+
+    def _bank(self, **kwargs):
+        bank = ReasoningBank(embedding_func=mock_embedding, wal_fsync_interval=0, **kwargs)
+        for i in range(3):
+            bank.add_memory(MemoryItem(
+                title=f"Memory {i}",
+                description=f"Desc {i}",
+                content=f"Content {i}",
+                metadata={"recommendation_id": f"REC_{i}"},
+            ))
+        return bank
+
+    def test_persist_appends_only_changes(self, tmp_path):
+        """Test that persist leaves the snapshot alone and load replays the log"""
+        path = tmp_path / "bank.json"
+        bank = self._bank()
+        bank.persist(str(path))  # first call writes the snapshot
+        snapshot = path.read_bytes()
+
+        bank.add_memory(MemoryItem(title="New", description="New desc", content="c"))
+        bank.update_memory(bank.get_memory_by_title("Memory 0"), content="Edited")
+        bank.delete_by_title("Memory 1")
+        bank.delete_by_recommendation_id("REC_2")
+        bank.persist(str(path))
+
+        assert path.read_bytes() == snapshot
+        assert len((tmp_path / "bank.json.wal").read_text(encoding="utf-8").splitlines()) == 4
+
+        loaded = ReasoningBank()
+        loaded.load(str(path))
+        assert [m.title for m in loaded.memories] == ["Memory 0", "New"]
+        assert loaded.get_memory_by_title("Memory 0").content == "Edited"
+        assert loaded.search(mock_embedding("New. New desc"), top_k=1)[0][0].title == "New"
+
+    def test_torn_tail_and_replay_after_snapshot(self, tmp_path):
+        """Test crash recovery: torn last record dropped, snapshot-covered records skipped"""
+        path = tmp_path / "bank.json"
+        wal_path = tmp_path / "bank.json.wal"
+        bank = self._bank()
+        bank.persist(str(path))
+        bank.add_memory(MemoryItem(title="Logged", description="d", content="c"))
+        bank.persist(str(path))
+        logged = wal_path.read_text(encoding="utf-8")
+
+        # Crash after the snapshot was replaced but before the log was reset
+        bank.save(str(path))
+        wal_path.write_text(logged + '{"seq": 99, "op": "ad', encoding="utf-8")
+
+        loaded = ReasoningBank(wal_fsync_interval=0)
+        loaded.load(str(path))
+        assert [m.title for m in loaded.memories].count("Logged") == 1
+        assert wal_path.read_text(encoding="utf-8") == logged
+
+        loaded.delete_by_title("Logged")
+        loaded.persist(str(path))
+        reloaded = ReasoningBank()
+        reloaded.load(str(path))
+        assert "Logged" not in [m.title for m in reloaded.memories]
+
+    def test_compaction(self, tmp_path):
+        """Test that the snapshot is rewritten once the log reaches the threshold"""
+        path = tmp_path / "bank.json"
+        bank = self._bank(wal_compact_threshold=3)
+        bank.persist(str(path))
+
+        for i in range(3):
+            bank.add_memory(MemoryItem(title=f"Extra {i}", description="d", content="c"))
+            bank.persist(str(path))
+
+        assert not (tmp_path / "bank.json.wal").exists()
+        loaded = ReasoningBank()
+        loaded.load(str(path))
+        assert len(loaded) == 6
+
+    def test_persist_after_loading_v1_rewrites_snapshot(self, tmp_path):
+        """Test that a 1.0 file (no ids) is rewritten, not logged against throwaway ids"""
+        import json
+
+        records = []
+        for i in range(3):
+            record = MemoryItem(title=f"t{i}", description="d", content="c").to_dict()
+            del record["id"]
+            records.append(record)
+        path = tmp_path / "bank.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"version": "1.0", "max_items": 50, "memories": records}, f)
+
+        bank = ReasoningBank(wal_fsync_interval=0)
+        bank.load(str(path))
+        bank.delete_by_title("t0")
+        bank.persist(str(path))
+
+        with open(path, encoding="utf-8") as f:
+            assert json.load(f)["version"] == "2.0"
+        loaded = ReasoningBank(wal_fsync_interval=0)
+        loaded.load(str(path))
+        assert sorted(m.title for m in loaded.memories) == ["t1", "t2"]
+
+        # From now on changes go to the log and survive a reload
+        loaded.delete_by_title("t1")
+        loaded.persist(str(path))
+        assert (tmp_path / "bank.json.wal").exists()
+        reloaded = ReasoningBank()
+        reloaded.load(str(path))
+        assert [m.title for m in reloaded.memories] == ["t2"]
+
+    def test_concurrent_persist_and_add(self, tmp_path, monkeypatch):
+        """Test that memories added while another thread persists are not lost"""
+        import threading
+        import time
+        from agent.reasoningbank.memory_wal import MemoryWAL
+
+        # Widen the window between building the WAL records and clearing the op list
+        wal_append = MemoryWAL.append
+
+        def slow_append(wal, records):
+            time.sleep(0.001)
+            wal_append(wal, records)
+
+        monkeypatch.setattr(MemoryWAL, "append", slow_append)
+
+        path = tmp_path / "bank.json"
+        bank = self._bank(wal_compact_threshold=10000)
+        bank.persist(str(path))
+        stop = threading.Event()
+
+        def persister():
+            while not stop.is_set():
+                bank.persist(str(path))
+
+        def writer(worker):
+            for i in range(100):
+                bank.add_memory(
+                    MemoryItem(title=f"W{worker}-{i}", description="d", content="c"),
+                    compute_embedding=False,
+                )
+                time.sleep(0)
+
+        persist_thread = threading.Thread(target=persister)
+        persist_thread.start()
+        writers = [threading.Thread(target=writer, args=(w,)) for w in range(4)]
+        for t in writers:
+            t.start()
+        for t in writers:
+            t.join()
+        stop.set()
+        persist_thread.join()
+        bank.persist(str(path))
+
+        loaded = ReasoningBank()
+        loaded.load(str(path))
+        assert len(loaded) == 403
+
+
+class TestEviction:
+    """Test usage tracking and eviction policies"""
+
+    def _bank(self, policy, n=3, **kwargs):
+        bank = ReasoningBank(embedding_func=mock_embedding, max_items=n, eviction_policy=policy, **kwargs)
+        for i in range(n):
+            bank.add_memory(MemoryItem(title=f"Memory {i}", description=f"Desc {i}", content=f"Content {i}"))
+        return bank
+
+    def test_retriever_records_usage(self):
+        """Test that retrieved memories get hit counters and timestamps"""
+        bank = self._bank("fifo")
+        retriever = MemoryRetriever(bank=bank, embedding_func=mock_embedding)
+        results = retriever.retrieve(MemoryQuery(query_text="Memory 0. Desc 0", top_k=1))
+
+        assert results[0].retrieval_count == 1
+        assert results[0].last_retrieved_at is not None
+        assert bank.get_statistics()["total_retrievals"] == 1
+
+    def test_fifo_evicts_oldest(self):
+        """Test that the default policy still drops the oldest memory"""
+        bank = self._bank("fifo")
+        bank.record_retrieval([bank.get_memory_by_title("Memory 0")])
+        bank.add_memory(MemoryItem(title="New", description="d", content="c"))
+
+        assert bank.get_memory_by_title("Memory 0") is None
+
+    def test_lfu_keeps_frequently_retrieved(self):
+        """Test that LFU evicts the least retrieved memory, never the new one"""
+        bank = self._bank("lfu")
+        bank.record_retrieval([bank.get_memory_by_title("Memory 0"), bank.get_memory_by_title("Memory 2")])
+        bank.add_memory(MemoryItem(title="New", description="d", content="c"))
+
+        titles = {m.title for m in bank.get_all_memories()}
+        assert titles == {"Memory 0", "Memory 2", "New"}
+
+    def test_validated_first_keeps_validated(self):
+        """Test that experiment-validated memories outlive unvalidated ones"""
+        bank = self._bank("validated_first")
+        bank.update_memory(bank.get_memory_by_title("Memory 0"), metadata={"source": "experiment_validated"})
+        bank.record_retrieval([bank.get_memory_by_title("Memory 2")])
+        bank.add_memory(MemoryItem(title="New", description="d", content="c"))
+
+        assert bank.get_memory_by_title("Memory 0") is not None
+        assert bank.get_memory_by_title("Memory 1") is None
+
+    def test_utility_decays_with_age(self):
+        """Test that stale hits count for less than recent ones"""
+        from agent.reasoningbank.eviction import AgeDecayedUtilityPolicy
+
+        policy = AgeDecayedUtilityPolicy(half_life_days=1)
+        stale = MemoryItem(title="Stale", description="d", content="c", retrieval_count=3,
+                           last_retrieved_at="2020-01-01T00:00:00")
+        fresh = MemoryItem(title="Fresh", description="d", content="c", retrieval_count=1)
+
+        assert policy.select_victim([stale, fresh]) is stale
+
+    def test_unknown_policy(self):
+        """Test that an unknown policy name is rejected"""
+        with pytest.raises(ValueError):
+            ReasoningBank(eviction_policy="random")
+
+    def test_usage_survives_persist(self, tmp_path):
+        """Test that retrieval touches are logged and replayed"""
+        path = tmp_path / "bank.json"
+        bank = self._bank("lfu", wal_fsync_interval=0)
+        bank.persist(str(path))
+        bank.record_retrieval([bank.get_memory_by_title("Memory 1")] * 2)
+        bank.persist(str(path))
+
+        loaded = ReasoningBank()
+        loaded.load(str(path))
+        assert loaded.get_memory_by_title("Memory 1").retrieval_count == 2
+
+
 class TestTrajectory:
     """Test Trajectory data structure"""
 
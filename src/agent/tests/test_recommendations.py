@@ -0,0 +1,338 @@
+"""
+Unit tests for RecommendationManager and its storage backends
+"""
+
+import json
+import pytest
+import sqlite3
+import threading
+import zlib
+from pathlib import Path
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from agent.reasoningbank.memory import Trajectory
+from agent.reasoningbank.feedback import ExperimentResult, Recommendation, RecommendationManager
+
+
+def make_recommendation(rec_id, material="cellulose", status="PENDING", minutes=0):
+    """Create a recommendation created `minutes` after a fixed start time"""
+    timestamp = (datetime(2025, 10, 16, 12, 0) + timedelta(minutes=minutes)).isoformat()
+    formulation = {"HBD": "Urea", "HBA": "ChCl", "molar_ratio": "1:2"}
+    return Recommendation(
+        recommendation_id=rec_id,
+        task={"target_material": material, "target_temperature": 25},
+        task_id=f"task_{rec_id}",
+        formulation=formulation,
+        reasoning="Strong H-bond network",
+        confidence=0.8,
+        trajectory=Trajectory(
+            task_id=f"task_{rec_id}",
+            task_description=f"Design DES for {material}",
+            steps=[{"action": "think", "observation": "x" * 200}],
+            outcome="pending",
+            final_result={"formulation": formulation},
+            metadata={"tool_calls": [{"tool": "largerag", "output": "y" * 200}], "iterations_used": 2},
+        ),
+        status=status,
+        created_at=timestamp,
+        updated_at=timestamp,
+    )
+
+
+@pytest.fixture(params=["sqlite", "json"])
+def manager(request, tmp_path):
+    """RecommendationManager for each storage backend"""
+    rec_manager = RecommendationManager(str(tmp_path), backend=request.param)
+    yield rec_manager
+    rec_manager.close()
+
+
+class TestRecommendationManager:
+    """Test the public API against both backends"""
+
+    def test_round_trip(self, manager):
+        """Test that a saved recommendation loads back unchanged"""
+        rec = make_recommendation("REC_001")
+        manager.save_recommendation(rec)
+
+        loaded = manager.get_recommendation("REC_001")
+        assert loaded.to_dict() == rec.to_dict()
+        assert manager.get_recommendation("REC_missing") is None
+
+    def test_feedback_updates_header(self, manager):
+        """Test that feedback updates status and performance score"""
+        manager.save_recommendation(make_recommendation("REC_001"))
+        manager.submit_feedback("REC_001", ExperimentResult(is_liquid_formed=True, solubility=6.5))
+
+        item = manager.list_recommendations_fast()["items"][0]
+        assert item["status"] == "COMPLETED"
+        assert item["performance_score"] == 6.5
+        assert manager.get_recommendation("REC_001").experiment_result.solubility == 6.5
+
+    def test_fast_list_filters_and_pages(self, manager):
+        """Test filtering, newest-first order and pagination"""
+        for i in range(5):
+            manager.save_recommendation(make_recommendation(f"REC_{i}", minutes=i))
+        manager.save_recommendation(make_recommendation("REC_lignin", material="lignin", minutes=10))
+
+        result = manager.list_recommendations_fast(target_material="cellulose", page=2, page_size=2)
+        assert [item["recommendation_id"] for item in result["items"]] == ["REC_2", "REC_1"]
+        assert result["pagination"]["total"] == 5
+        assert result["pagination"]["total_pages"] == 3
+        assert result["items"][0]["formulation_summary"] == "Urea : ChCl (1:2)"
+
+        recs = manager.list_recommendations(limit=2)
+        assert [rec.recommendation_id for rec in recs] == ["REC_lignin", "REC_4"]
+
+    def test_statistics(self, manager):
+        """Test status and material counts"""
+        manager.save_recommendation(make_recommendation("REC_1"))
+        manager.save_recommendation(make_recommendation("REC_2", status="FAILED"))
+        manager.save_recommendation(make_recommendation("REC_3", material="lignin"))
+
+        fast = manager.get_statistics_fast(material="cellulose")
+        assert fast["all"] == 2
+        assert fast["PENDING"] == 1
+        assert fast["FAILED"] == 1
+
+        stats = manager.get_statistics()
+        assert stats["total"] == 3
+        assert stats["by_material"] == {"cellulose": 2, "lignin": 1}
+
+    def test_delete(self, manager):
+        """Test that deleted recommendations disappear from every query"""
+        manager.save_recommendation(make_recommendation("REC_1"))
+        assert manager.delete_recommendation("REC_1")
+        assert not manager.delete_recommendation("REC_1")
+        assert manager.get_recommendation("REC_1") is None
+        assert manager.get_statistics_fast()["all"] == 0
+
+
+class TestConcurrency:
+    """Test atomic updates and ID moves under concurrent writers"""
+
+    def test_concurrent_updates_are_not_lost(self, manager):
+        """Test that parallel read-modify-write updates all survive"""
+        manager.save_recommendation(make_recommendation("REC_1"))
+        for i in range(10):
+            manager.save_recommendation(make_recommendation(f"REC_other_{i}"))
+
+        def tag(i):
+            manager.update_recommendation("REC_1", lambda rec: rec.metadata.setdefault("tags", []).append(i))
+            manager.save_recommendation(make_recommendation(f"REC_new_{i}"))
+
+        threads = [threading.Thread(target=tag, args=(i,)) for i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(manager.get_recommendation("REC_1").metadata["tags"]) == list(range(20))
+        assert manager.get_statistics()["total"] == 31
+        assert not list(manager.storage_path.glob("*.tmp"))
+
+        # A fresh manager sees everything that was written
+        reopened = RecommendationManager(str(manager.storage_path), backend=manager.backend)
+        assert reopened.get_statistics()["total"] == 31
+        reopened.close()
+
+    def test_replace_placeholder(self, manager):
+        """Test that the agent's recommendation takes over the placeholder ID"""
+        manager.save_recommendation(make_recommendation("REC_task", status="GENERATING"))
+        manager.save_recommendation(make_recommendation("REC_agent", minutes=5))
+
+        rec = manager.replace_placeholder("REC_task", "REC_agent")
+        assert rec.recommendation_id == "REC_task"
+        assert manager.get_recommendation("REC_agent") is None
+        assert manager.get_recommendation("REC_task").status == "PENDING"
+        assert manager.get_statistics_fast()["all"] == 1
+
+        manager.save_recommendation(make_recommendation("REC_task2", status="GENERATING"))
+        with pytest.raises(ValueError):
+            manager.replace_placeholder("REC_task2", "REC_agent")
+
+    def test_replace_placeholder_keeps_cancelled(self, manager):
+        """Test that a placeholder which left GENERATING is not overwritten"""
+        manager.save_recommendation(make_recommendation("REC_task", status="GENERATING"))
+        manager.save_recommendation(make_recommendation("REC_agent", minutes=5))
+        manager.update_status("REC_task", "CANCELLED")
+
+        assert manager.replace_placeholder("REC_task", "REC_agent") is None
+        assert manager.get_recommendation("REC_task").status == "CANCELLED"
+        assert manager.get_recommendation("REC_agent") is None
+
+        # Placeholder deleted by the user: the agent's recommendation goes too
+        manager.save_recommendation(make_recommendation("REC_agent2"))
+        assert manager.replace_placeholder("REC_gone", "REC_agent2") is None
+        assert manager.get_recommendation("REC_agent2") is None
+        assert manager.get_statistics_fast()["all"] == 1
+
+    def test_rename_refuses_to_overwrite(self, manager):
+        """Test that rename moves a recommendation but never clobbers another"""
+        manager.save_recommendation(make_recommendation("REC_1"))
+        manager.save_recommendation(make_recommendation("REC_2"))
+
+        with pytest.raises(ValueError):
+            manager.rename_recommendation("REC_1", "REC_2")
+
+        manager.rename_recommendation("REC_1", "REC_3")
+        assert sorted(manager.index) == ["REC_2", "REC_3"]
+
+
+class TestStatistics:
+    """Test materialized statistics"""
+
+    def _populate(self, manager):
+        for i in range(6):
+            manager.save_recommendation(make_recommendation(f"REC_{i}", minutes=i * 24 * 60))
+        manager.save_recommendation(make_recommendation("REC_lignin", material="lignin"))
+        manager.submit_feedback("REC_0", ExperimentResult(is_liquid_formed=True, solubility=4.0))
+        manager.submit_feedback("REC_1", ExperimentResult(is_liquid_formed=True, solubility=8.0))
+        manager.submit_feedback("REC_2", ExperimentResult(is_liquid_formed=False))
+        manager.submit_feedback("REC_3", ExperimentResult(is_liquid_formed=True, solubility=2.0))
+        manager.submit_feedback("REC_3", ExperimentResult(is_liquid_formed=True, solubility=6.0))  # resubmitted
+        manager.update_status("REC_4", "CANCELLED")
+        manager.delete_recommendation("REC_1")
+
+    def test_incremental_matches_recomputed(self, manager):
+        """Test that incremental updates equal a from-scratch computation"""
+        self._populate(manager)
+        incremental = manager.statistics.to_dict()
+
+        manager.rebuild_statistics()
+        assert manager.statistics.to_dict() == incremental
+
+        summary = manager.statistics.summary()
+        assert summary["total"] == 6
+        assert summary["by_status"] == {"COMPLETED": 3, "CANCELLED": 1, "PENDING": 2}
+        assert summary["completed_experiments"] == 3
+        assert summary["liquid_formation_rate"] == pytest.approx(2 / 3)
+
+        trend = manager.statistics.trend()
+        assert [point["date"] for point in trend] == ["2025-10-16", "2025-10-18", "2025-10-19"]
+        top = manager.statistics.top_formulations()
+        assert top[0]["avg_solubility"] == pytest.approx(5.0)  # failed formation has no solubility
+        assert top[0]["experiment_count"] == 3
+
+    def test_persisted_with_store(self, manager):
+        """Test that statistics survive a restart"""
+        self._populate(manager)
+        expected = manager.statistics.to_dict()
+
+        reopened = RecommendationManager(str(manager.storage_path), backend=manager.backend)
+        assert reopened.statistics.to_dict() == expected
+        reopened.close()
+
+    def test_replace_placeholder_updates_statistics(self, manager):
+        """Test that moving a recommendation does not double count it"""
+        manager.save_recommendation(make_recommendation("REC_task", status="GENERATING"))
+        manager.save_recommendation(make_recommendation("REC_agent"))
+        manager.replace_placeholder("REC_task", "REC_agent")
+
+        assert manager.statistics.summary()["by_status"] == {"PENDING": 1}
+        assert manager.get_statistics()["total"] == 1
+
+
+class TestLazyTrajectory:
+    """Test the header/trajectory split and field projection"""
+
+    def test_load_without_trajectory(self, manager):
+        """Test that steps and tool outputs are skipped but the outline is kept"""
+        original = make_recommendation("REC_1")
+        manager.save_recommendation(original)
+
+        rec = manager.get_recommendation("REC_1", include_trajectory=False)
+        assert rec.trajectory.steps is None
+        assert "tool_calls" not in rec.trajectory.metadata
+        assert rec.trajectory.metadata["iterations_used"] == 2
+        assert rec.trajectory.final_result == original.trajectory.final_result
+
+        assert manager.load_trajectory(rec).to_dict() == original.to_dict()
+
+    def test_partial_save_keeps_payload(self, manager):
+        """Test that status/feedback updates do not drop the stored trajectory"""
+        original = make_recommendation("REC_1")
+        manager.save_recommendation(original)
+        manager.update_status("REC_1", "CANCELLED")
+        manager.submit_feedback("REC_1", ExperimentResult(is_liquid_formed=False))
+
+        rec = manager.get_recommendation("REC_1")
+        assert rec.status == "COMPLETED"
+        assert rec.trajectory.steps == original.trajectory.steps
+        assert rec.trajectory.metadata["tool_calls"] == original.trajectory.metadata["tool_calls"]
+
+    def test_get_fields(self, manager):
+        """Test projection from the header, the body and the payload"""
+        manager.save_recommendation(make_recommendation("REC_1"))
+
+        assert manager.get_fields("REC_1", ["status", "confidence"]) == {"status": "PENDING", "confidence": 0.8}
+        assert manager.get_fields("REC_1", ["reasoning"]) == {"reasoning": "Strong H-bond network"}
+        assert len(manager.get_fields("REC_1", ["trajectory"])["trajectory"]["steps"]) == 1
+        assert manager.get_fields("REC_missing", ["status"]) is None
+
+    def test_reads_records_stored_before_the_split(self, tmp_path):
+        """Test that whole-trajectory JSON files and SQLite rows are still readable"""
+        original = make_recommendation("REC_json")
+        json_manager = RecommendationManager(str(tmp_path / "json"), backend="json")
+        json_manager.save_recommendation(original)
+        (tmp_path / "json" / "REC_json.trajectory.json").unlink()
+        (tmp_path / "json" / "REC_json.json").write_text(json.dumps(original.to_dict()), encoding="utf-8")
+
+        rec = json_manager.get_recommendation("REC_json", include_trajectory=False)
+        assert rec.to_dict() == original.to_dict()
+
+        original = make_recommendation("REC_sqlite")
+        sqlite_manager = RecommendationManager(str(tmp_path / "sqlite"))
+        sqlite_manager.save_recommendation(original)
+        body = {k: v for k, v in original.to_dict().items() if k != "trajectory"}
+        blob = zlib.compress(json.dumps(original.trajectory.to_dict()).encode("utf-8"))
+        with sqlite3.connect(str(tmp_path / "sqlite" / "recommendations.db")) as conn:
+            conn.execute(
+                "UPDATE recommendations SET record = ?, trajectory = ? WHERE recommendation_id = ?",
+                (json.dumps(body), blob, "REC_sqlite"),
+            )
+
+        assert sqlite_manager.get_recommendation("REC_sqlite", include_trajectory=False).to_dict() == original.to_dict()
+        sqlite_manager.update_status("REC_sqlite", "CANCELLED")
+        assert sqlite_manager.get_recommendation("REC_sqlite").trajectory.steps == original.trajectory.steps
+        sqlite_manager.close()
+
+
+class TestMigration:
+    """Test migration of the JSON layout to SQLite"""
+
+    def test_json_directory_is_migrated_on_first_use(self, tmp_path):
+        """Test that a SQLite manager imports existing JSON recommendations"""
+        json_manager = RecommendationManager(str(tmp_path), backend="json")
+        for i in range(3):
+            json_manager.save_recommendation(make_recommendation(f"REC_{i}", minutes=i))
+        original = json_manager.get_recommendation("REC_1").to_dict()
+
+        json_manager.submit_feedback("REC_2", ExperimentResult(is_liquid_formed=True, solubility=5.0))
+        expected_stats = json_manager.statistics.to_dict()
+
+        sqlite_manager = RecommendationManager(str(tmp_path), backend="sqlite")
+        assert sqlite_manager.get_statistics_fast()["all"] == 3
+        assert sqlite_manager.statistics.to_dict() == expected_stats
+        assert sqlite_manager.get_recommendation("REC_1").to_dict() == original
+        assert (tmp_path / "index.json.migrated").exists()
+        assert not (tmp_path / "index.json").exists()
+        sqlite_manager.close()
+
+        # Reopening does not migrate again
+        reopened = RecommendationManager(str(tmp_path), backend="sqlite")
+        assert reopened.get_statistics()["total"] == 3
+        reopened.close()
+
+    def test_unknown_backend(self, tmp_path):
+        """Test that an unknown backend is rejected"""
+        with pytest.raises(ValueError):
+            RecommendationManager(str(tmp_path), backend="redis")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -13,11 +13,12 @@ DESAgent expects:
 
 LargeRAG provides:
     largerag.get_similar_docs(query_text, top_k) -> List[Dict]
+    largerag.get_similar_docs_batch(queries, top_k) -> List[List[Dict]]
 
 This adapter bridges the gap and follows the standard tool interface.
 """
 
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any
 import logging
 import sys
 from pathlib import Path
@@ -78,7 +79,10 @@ class LargeRAGAdapter:
         Args:
             query_dict: Query parameters with keys:
                 - query (str): Query text
-                - top_k (int, optional): Number of documents to retrieve (default: 5)
+                - queries (list, optional): Several query texts retrieved in one batch
+                  (one embedding request, one vector search, concurrent rerank).
+                  Documents are merged and deduplicated across queries.
+                - top_k (int, optional): Number of documents to retrieve per query (default: 5)
                 - filters (dict, optional): Metadata filters (not yet implemented)
 
         Returns:
@@ -86,6 +90,7 @@ class LargeRAGAdapter:
                 - documents: List of retrieved documents
                 - num_results: Number of documents found
                 - query: Original query text
+                - queries: All query texts (only for batched queries)
 
             Returns None if RAG is not initialized or query fails.
 
@@ -104,10 +109,11 @@ class LargeRAGAdapter:
         try:
             # Extract parameters
             query_text = query_dict.get("query", "")
+            queries = [q for q in query_dict.get("queries") or [query_text] if q]
             top_k = query_dict.get("top_k", 5)
             filters = query_dict.get("filters", {})
 
-            if not query_text:
+            if not queries:
                 logger.warning("Empty query text provided")
                 return None
 
@@ -116,8 +122,16 @@ class LargeRAGAdapter:
                 logger.debug(f"Filters provided but not yet implemented: {filters}")
 
             # Query LargeRAG
-            logger.debug(f"Querying LargeRAG: '{query_text}' (top_k={top_k})")
-            documents = self.rag.get_similar_docs(query_text, top_k=top_k)
+            if len(queries) == 1:
+                query_text = queries[0]
+                logger.debug(f"Querying LargeRAG: '{query_text}' (top_k={top_k})")
+                documents = self.rag.get_similar_docs(query_text, top_k=top_k)
+            else:
+                query_text = query_text or " | ".join(queries)
+                logger.debug(f"Querying LargeRAG with {len(queries)} queries (top_k={top_k})")
+                documents = self._merge_documents(
+                    self.rag.get_similar_docs_batch(queries, top_k=top_k)
+                )
 
             # Format result for DESAgent
             result = {
@@ -126,6 +140,8 @@ class LargeRAGAdapter:
                 "query": query_text,
                 "formatted_text": self._format_documents(documents)
             }
+            if len(queries) > 1:
+                result["queries"] = queries
 
             logger.info(f"Retrieved {len(documents)} documents from LargeRAG")
             return result
@@ -134,6 +150,26 @@ class LargeRAGAdapter:
             logger.error(f"LargeRAG query failed: {e}", exc_info=True)
             return None
 
+    def _merge_documents(self, results: List[List[Dict]]) -> List[Dict]:
+        """
+        Merge per-query results, keeping the best score for documents
+        retrieved by several queries.
+
+        Args:
+            results: Document lists from get_similar_docs_batch
+
+        Returns:
+            Deduplicated documents sorted by score (descending)
+        """
+        merged = {}
+        for documents in results:
+            for doc in documents:
+                key = (doc.get('metadata', {}).get('doc_hash'), doc.get('text'))
+                if key not in merged or (doc.get('score') or 0.0) > (merged[key].get('score') or 0.0):
+                    merged[key] = doc
+
+        return sorted(merged.values(), key=lambda d: d.get('score') or 0.0, reverse=True)
+
     def _format_documents(self, documents: list) -> str:
         """
         Format retrieved documents for display in agent prompt.
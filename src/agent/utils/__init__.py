@@ -4,14 +4,20 @@ Utility modules for DES Agent
 Provides:
 - LLMClient: OpenAI-compatible LLM client supporting DashScope and OpenAI
 - EmbeddingClient: OpenAI-compatible embedding client supporting DashScope and OpenAI
+- EmbeddingCache: Persistent content-hash keyed cache of embeddings
+- ResponseCache: LRU/TTL cache of deterministic (temperature 0) LLM responses
 """
 
 from .llm_client import LLMClient, create_llm_client_from_config
 from .embedding_client import EmbeddingClient, create_embedding_client_from_config
+from .embedding_cache import EmbeddingCache
+from .response_cache import ResponseCache
 
 __all__ = [
     "LLMClient",
     "EmbeddingClient",
+    "EmbeddingCache",
+    "ResponseCache",
     "create_llm_client_from_config",
     "create_embedding_client_from_config",
 ]
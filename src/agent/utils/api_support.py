@@ -0,0 +1,218 @@
+"""
+Shared plumbing for the OpenAI-compatible API clients
+
+Provides:
+- Tuned HTTP connection pools (sync and async) shared per client
+- Retry with jittered exponential backoff for transient API errors
+- Thread-safe per-client call accounting (latency, tokens, retries, errors)
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+import httpx
+import openai
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Errors worth retrying (rate limits, 5xx, network); anything else is raised at once
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,  # includes APITimeoutError
+    openai.InternalServerError,
+)
+
+DEFAULT_TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+
+
+def http_limits(pool_size: int) -> httpx.Limits:
+    """Connection pool limits: up to pool_size connections, all kept alive."""
+    return httpx.Limits(
+        max_connections=pool_size,
+        max_keepalive_connections=pool_size,
+        keepalive_expiry=60.0,
+    )
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 20.0) -> float:
+    """
+    Full-jitter exponential backoff.
+
+    Args:
+        attempt: Retry number (0 for the first retry)
+        base: Delay scale in seconds
+        cap: Maximum delay in seconds
+
+    Returns:
+        Seconds to sleep, uniform in [0, min(cap, base * 2**attempt)]
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+async def aretry(
+    call: Callable[[], Awaitable[T]],
+    max_retries: int,
+    stats: Optional["APICallStats"] = None,
+    description: str = "API call",
+) -> T:
+    """
+    Await call(), retrying transient errors with jittered backoff.
+
+    Args:
+        call: Zero-argument coroutine factory (a new coroutine per attempt)
+        max_retries: Retries after the first attempt
+        stats: Accounting to record retries in
+        description: Label for log messages
+
+    Raises:
+        The last error once retries are exhausted, or any non-retryable error
+    """
+    attempt = 0
+    while True:
+        try:
+            return await call()
+        except RETRYABLE_ERRORS as e:
+            if attempt >= max_retries:
+                raise
+            delay = backoff_delay(attempt)
+            if stats is not None:
+                stats.record_retry()
+            logger.warning(
+                f"{description} failed ({type(e).__name__}: {e}); "
+                f"retry {attempt + 1}/{max_retries} in {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+class APICallStats:
+    """
+    Thread-safe accounting of API calls made by one client.
+
+    Token counts come from the responses' ``usage`` field (when the
+    provider reports it).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Zero every counter."""
+        with self._lock:
+            self._calls = 0
+            self._errors = 0
+            self._retries = 0
+            self._prompt_tokens = 0
+            self._completion_tokens = 0
+            self._latency_total = 0.0
+            self._latency_max = 0.0
+
+    def record_call(self, latency: float, usage: Any = None) -> None:
+        """Record a successful call (latency in seconds, response usage object)."""
+        with self._lock:
+            self._calls += 1
+            self._latency_total += latency
+            self._latency_max = max(self._latency_max, latency)
+            if usage is not None:
+                self._prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+                self._completion_tokens += getattr(usage, "completion_tokens", 0) or 0
+
+    def record_error(self) -> None:
+        """Record a call that failed after all retries."""
+        with self._lock:
+            self._errors += 1
+
+    def record_retry(self) -> None:
+        """Record a retried attempt."""
+        with self._lock:
+            self._retries += 1
+
+    def timer(self) -> "_CallTimer":
+        """Context manager timing one call: ``with stats.timer() as t: ...; t.usage = response.usage``."""
+        return _CallTimer(self)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the counters.
+
+        Returns:
+            Dictionary with calls, errors, retries, token totals and latency (seconds)
+        """
+        with self._lock:
+            return {
+                "calls": self._calls,
+                "errors": self._errors,
+                "retries": self._retries,
+                "prompt_tokens": self._prompt_tokens,
+                "completion_tokens": self._completion_tokens,
+                "total_tokens": self._prompt_tokens + self._completion_tokens,
+                "avg_latency": round(self._latency_total / self._calls, 4) if self._calls else 0.0,
+                "max_latency": round(self._latency_max, 4),
+            }
+
+
+class _CallTimer:
+    """Times a call and records it (or an error) in APICallStats on exit."""
+
+    def __init__(self, stats: APICallStats):
+        self.stats = stats
+        self.usage = None
+        self._start = 0.0
+
+    def __enter__(self) -> "_CallTimer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is None:
+            self.stats.record_call(time.perf_counter() - self._start, self.usage)
+        else:
+            self.stats.record_error()
+        return False
+
+
+class AsyncClientPool:
+    """
+    Lazily created AsyncOpenAI client plus concurrency semaphore.
+
+    Both are bound to the event loop of first use; if a later call runs
+    on a different loop (e.g. successive asyncio.run() calls in scripts),
+    they are recreated for it.
+    """
+
+    def __init__(self, api_key: str, base_url: str, pool_size: int, max_concurrency: int):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.pool_size = pool_size
+        self.max_concurrency = max_concurrency
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[openai.AsyncOpenAI] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def get(self):
+        """Return (AsyncOpenAI client, semaphore) for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._client = openai.AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                max_retries=0,  # retried by aretry() with jitter
+                http_client=httpx.AsyncClient(limits=http_limits(self.pool_size), timeout=DEFAULT_TIMEOUT),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client, self._semaphore
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP connections."""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+            self._loop = None
@@ -0,0 +1,195 @@
+"""
+Embedding Cache for EmbeddingClient
+
+Two-level cache of embedding vectors keyed by a hash of
+(provider, model, dimension, text):
+- In-memory LRU for hot texts (e.g. the task description embedded on every task)
+- Optional SQLite file so embeddings survive restarts and are shared by the
+  backend, the agent and the maintenance scripts
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    Content-hash keyed embedding cache (LRU in memory, SQLite on disk).
+
+    Vectors are stored as float32. The cache is thread-safe, so it can sit
+    behind EmbeddingClient.embed_batch's worker threads.
+
+    Attributes:
+        path: SQLite file (None = memory only)
+        max_entries: Capacity of the in-memory LRU
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 10000):
+        """
+        Initialize the cache.
+
+        Args:
+            path: SQLite file for the persistent store (created if missing);
+                None keeps the cache in memory only
+            max_entries: Maximum vectors held in the in-memory LRU
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self._lru: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+            self._db.commit()
+
+        logger.info(f"Initialized EmbeddingCache (path={path or 'memory only'}, max_entries={max_entries})")
+
+    @staticmethod
+    def make_key(provider: str, model: str, dimension: Optional[int], text: str) -> str:
+        """Cache key for a text embedded by a given provider/model/dimension."""
+        raw = "\x00".join([provider, model, str(dimension or ""), text])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        """
+        Look up several keys (memory first, then disk).
+
+        Args:
+            keys: Cache keys (see make_key)
+
+        Returns:
+            Dict of key -> vector for the keys that were found
+        """
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            missing = []
+            for key in keys:
+                vector = self._lru.get(key)
+                if vector is None:
+                    missing.append(key)
+                else:
+                    self._lru.move_to_end(key)
+                    found[key] = vector
+
+            if missing and self._db is not None:
+                unique = list(dict.fromkeys(missing))
+                for start in range(0, len(unique), 500):  # SQLite host parameter limit
+                    chunk = unique[start:start + 500]
+                    rows = self._db.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                        chunk,
+                    ).fetchall()
+                    for key, blob in rows:
+                        vector = np.frombuffer(blob, dtype=np.float32).tolist()
+                        self._remember(key, vector)
+                        found[key] = vector
+                self._disk_hits += sum(1 for key in missing if key in found)
+
+            for key in keys:
+                if key in found:
+                    self._hits += 1
+                else:
+                    self._misses += 1
+        return found
+
+    def get(self, key: str) -> Optional[List[float]]:
+        """Look up a single key; None on a miss."""
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items: Dict[str, Sequence[float]]) -> None:
+        """
+        Store vectors in memory and (if configured) on disk.
+
+        Args:
+            items: Dict of key -> vector
+        """
+        if not items:
+            return
+        with self._lock:
+            rows = []
+            for key, vector in items.items():
+                vector = [float(x) for x in vector]
+                self._remember(key, vector)
+                rows.append((key, np.asarray(vector, dtype=np.float32).tobytes()))
+            if self._db is not None:
+                try:
+                    self._db.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows)
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Failed to write {len(rows)} embeddings to cache {self.path}: {e}")
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached vector (memory and disk) and reset the counters."""
+        with self._lock:
+            self._lru.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM embeddings")
+                self._db.commit()
+            self._hits = self._disk_hits = self._misses = 0
+
+    def close(self) -> None:
+        """Close the SQLite connection."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def get_stats(self) -> Dict:
+        """
+        Get hit/miss statistics.
+
+        Returns:
+            Dictionary with hits (of which disk_hits came from SQLite), misses,
+            hit_rate and the number of entries in memory / on disk
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            disk_entries = None
+            if self._db is not None:
+                disk_entries = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            return {
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._lru),
+                "disk_entries": disk_entries,
+            }
+
+    def __len__(self) -> int:
+        """Number of vectors in the in-memory LRU."""
+        return len(self._lru)
+
+
+# Example usage
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    cache = EmbeddingCache(max_entries=2)
+    key = EmbeddingCache.make_key("dashscope", "text-embedding-v4", None, "Choline chloride")
+    print(f"Before put: {cache.get(key)}")
+    cache.put_many({key: [0.1, 0.2, 0.3]})
+    print(f"After put: {cache.get(key)}")
+    print(f"Stats: {cache.get_stats()}")
@@ -8,13 +8,26 @@ Supports:
 """
 
 import os
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Dict, Any
 from openai import OpenAI
+import httpx
 import numpy as np
 
+from .api_support import APICallStats, AsyncClientPool, DEFAULT_TIMEOUT, aretry, http_limits
+from .embedding_cache import EmbeddingCache
+
 logger = logging.getLogger(__name__)
 
+# Maximum number of inputs per embeddings request
+PROVIDER_BATCH_LIMITS = {
+    "openai": 2048,
+    "dashscope": 10,  # text-embedding-v3/v4 via compatible mode
+}
+DEFAULT_BATCH_LIMIT = 10
+
 
 class EmbeddingClient:
     """
@@ -25,10 +38,17 @@ class EmbeddingClient:
     - DashScope/Aliyun (text-embedding-v3, etc.)
     - Custom OpenAI-compatible endpoints
 
+    Embeddings can be cached (see EmbeddingCache) so repeated texts, such as
+    a task description embedded on every task or a memory re-embedded with
+    unchanged text, never reach the API twice. aembed_batch() is the asyncio
+    counterpart of embed_batch(), backed by a pooled AsyncOpenAI client.
+
     Attributes:
         client: OpenAI client instance
         model: Embedding model name
         dimension: Embedding dimension (if supported)
+        cache: Optional EmbeddingCache shared by every caller of this client
+        stats: Call accounting (latency, tokens, retries) of API requests
     """
 
     def __init__(
@@ -37,7 +57,12 @@ class EmbeddingClient:
         model: str = "text-embedding-v3",
         dimension: Optional[int] = None,
         api_key: Optional[str] = None,
-        base_url: Optional[str] = None
+        base_url: Optional[str] = None,
+        max_batch_size: Optional[int] = None,
+        max_workers: int = 4,
+        cache: Optional[EmbeddingCache] = None,
+        pool_size: int = 10,
+        max_retries: int = 3
     ):
         """
         Initialize embedding client.
@@ -48,10 +73,20 @@ class EmbeddingClient:
             dimension: Output dimension (if model supports it)
             api_key: API key (if None, read from env)
             base_url: Custom base URL
+            max_batch_size: Inputs per request (default: provider limit)
+            max_workers: Concurrent requests when a batch spans several requests
+            cache: EmbeddingCache to consult before calling the API (None = no cache)
+            pool_size: HTTP connections kept open to the provider (sync and async each)
+            max_retries: Retries of rate-limited / 5xx / network failures
         """
         self.provider = provider
         self.model = model
         self.dimension = dimension
+        self.max_batch_size = max_batch_size or PROVIDER_BATCH_LIMITS.get(provider, DEFAULT_BATCH_LIMIT)
+        self.max_workers = max_workers
+        self.cache = cache
+        self.max_retries = max_retries
+        self.stats = APICallStats()
 
         # Determine API key and base URL
         if provider == "openai":
@@ -74,15 +109,19 @@ class EmbeddingClient:
                 f"Set {provider.upper()}_API_KEY in environment or .env file."
             )
 
-        # Initialize OpenAI client
+        # Initialize OpenAI clients (the async one is created on first use;
+        # max_workers bounds its in-flight requests like the sync thread pool)
         self.client = OpenAI(
             api_key=self.api_key,
-            base_url=self.base_url
+            base_url=self.base_url,
+            max_retries=max_retries,
+            http_client=httpx.Client(limits=http_limits(pool_size), timeout=DEFAULT_TIMEOUT)
         )
+        self._async_pool = AsyncClientPool(self.api_key, self.base_url, pool_size, max_workers)
 
         logger.info(
             f"Initialized Embedding client: provider={provider}, model={model}, "
-            f"dimension={dimension or 'default'}"
+            f"dimension={dimension or 'default'}, cache={'on' if cache else 'off'}"
         )
 
     def embed(
@@ -110,33 +149,124 @@ class EmbeddingClient:
         """
         Generate embeddings for multiple texts.
 
+        Cached texts are served from the cache; the remaining (distinct) texts
+        are split into requests of at most max_batch_size inputs and, when
+        there are several, up to max_workers requests run concurrently.
+
         Args:
             texts: List of input texts
             **kwargs: Additional parameters
 
         Returns:
-            List of embedding vectors
+            List of embedding vectors (same order as texts)
+
+        Raises:
+            Exception: If any request fails
         """
         if not texts:
             return []
+        if self.cache is None or kwargs:
+            return self._embed_uncached(texts, **kwargs)
 
-        # Prepare parameters
-        params = {
-            "model": self.model,
-            "input": texts,
-            **kwargs
-        }
+        keys, cached, pending = self._lookup_cache(texts)
+        if pending:
+            fresh = dict(zip(pending, self._embed_uncached(list(pending.values()))))
+            self.cache.put_many(fresh)
+            cached.update(fresh)
 
-        # Add dimension if specified and supported
-        if self.dimension and self.provider == "openai":
-            params["dimensions"] = self.dimension
+        return [list(cached[key]) for key in keys]
+
+    async def aembed(self, text: str, **kwargs) -> List[float]:
+        """Async variant of embed()."""
+        return (await self.aembed_batch([text], **kwargs))[0]
+
+    async def aembed_batch(self, texts: List[str], **kwargs) -> List[List[float]]:
+        """
+        Async variant of embed_batch().
+
+        Requests run concurrently on the event loop (at most max_workers in
+        flight); rate limits, 5xx and network errors are retried with
+        jittered backoff.
+
+        Args:
+            texts: List of input texts
+            **kwargs: Additional parameters
+
+        Returns:
+            List of embedding vectors (same order as texts)
+        """
+        if not texts:
+            return []
+        if self.cache is None or kwargs:
+            return await self._aembed_uncached(texts, **kwargs)
+
+        keys, cached, pending = self._lookup_cache(texts)
+        if pending:
+            fresh = dict(zip(pending, await self._aembed_uncached(list(pending.values()))))
+            self.cache.put_many(fresh)
+            cached.update(fresh)
+
+        return [list(cached[key]) for key in keys]
+
+    def _lookup_cache(self, texts: List[str]):
+        """Cache keys of texts, the cached vectors, and the distinct uncached texts by key."""
+        keys = [EmbeddingCache.make_key(self.provider, self.model, self.dimension, text) for text in texts]
+        cached = self.cache.get_many(keys)
+        pending = {key: text for key, text in zip(keys, texts) if key not in cached}
+        logger.debug(f"Embedding cache: {len(texts) - len(pending)}/{len(texts)} texts served from cache")
+        return keys, cached, pending
+
+    async def _aembed_uncached(self, texts: List[str], **kwargs) -> List[List[float]]:
+        """Embed texts through the async API, one request per chunk, concurrently."""
+        chunks = [texts[i:i + self.max_batch_size] for i in range(0, len(texts), self.max_batch_size)]
+        results = await asyncio.gather(*(self._aembed_request(chunk, **kwargs) for chunk in chunks))
+        return [embedding for chunk_embeddings in results for embedding in chunk_embeddings]
+
+    async def _aembed_request(self, texts: List[str], **kwargs) -> List[List[float]]:
+        """Single async embeddings API request (len(texts) <= max_batch_size)."""
+        params = self._request_params(texts, **kwargs)
+        client, semaphore = self._async_pool.get()
+
+        async def attempt():
+            async with semaphore:
+                return await client.embeddings.create(**params)
+
+        try:
+            with self.stats.timer() as timer:
+                response = await aretry(attempt, self.max_retries, self.stats, "Embedding API call")
+                timer.usage = response.usage
+            embeddings = [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+            logger.debug(f"Generated {len(embeddings)} embeddings")
+            return embeddings
+
+        except Exception as e:
+            logger.error(f"Embedding API call failed: {e}")
+            raise
+
+    def _embed_uncached(self, texts: List[str], **kwargs) -> List[List[float]]:
+        """Embed texts through the API (chunked, concurrent when several chunks)."""
+        chunks = [texts[i:i + self.max_batch_size] for i in range(0, len(texts), self.max_batch_size)]
+        if len(chunks) == 1 or self.max_workers <= 1:
+            results = [self._embed_request(chunk, **kwargs) for chunk in chunks]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks))) as executor:
+                results = list(executor.map(lambda chunk: self._embed_request(chunk, **kwargs), chunks))
+
+        return [embedding for chunk_embeddings in results for embedding in chunk_embeddings]
+
+    def _embed_request(self, texts: List[str], **kwargs) -> List[List[float]]:
+        """Single embeddings API request (len(texts) <= max_batch_size)."""
+        params = self._request_params(texts, **kwargs)
 
         # Make API call
         try:
-            response = self.client.embeddings.create(**params)
+            with self.stats.timer() as timer:
+                response = self.client.embeddings.create(**params)
+                timer.usage = response.usage
 
-            # Extract embeddings
-            embeddings = [item.embedding for item in response.data]
+            # Extract embeddings (ordered by input index)
+            embeddings = [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
 
             logger.debug(f"Generated {len(embeddings)} embeddings")
             return embeddings
@@ -145,6 +275,26 @@ class EmbeddingClient:
             logger.error(f"Embedding API call failed: {e}")
             raise
 
+    def _request_params(self, texts: List[str], **kwargs) -> Dict[str, Any]:
+        params = {
+            "model": self.model,
+            "input": texts,
+            **kwargs
+        }
+
+        # Add dimension if specified and supported
+        if self.dimension and self.provider == "openai":
+            params["dimensions"] = self.dimension
+        return params
+
+    def get_usage_stats(self) -> Dict[str, Any]:
+        """Latency/token/retry accounting of embedding requests (cache hits excluded)."""
+        return self.stats.snapshot()
+
+    async def aclose(self) -> None:
+        """Close the async client's pooled connections."""
+        await self._async_pool.aclose()
+
     def __call__(self, text: str, **kwargs) -> List[float]:
         """
         Shorthand for embed() method.
@@ -201,6 +351,12 @@ def create_embedding_client_from_config(config: Dict[str, Any]) -> EmbeddingClie
             - dimension (optional): Output dimension
             - api_key (optional): API key
             - base_url (optional): Custom base URL
+            - max_batch_size (optional): Inputs per request
+            - max_workers (optional): Concurrent requests
+            - cache_path (optional): SQLite file of the persistent embedding cache
+            - cache_max_entries (optional): In-memory cache size (0 disables the cache)
+            - pool_size (optional): HTTP connection pool size
+            - max_retries (optional): Retries of transient API errors
 
     Returns:
         Configured EmbeddingClient instance
@@ -210,10 +366,31 @@ def create_embedding_client_from_config(config: Dict[str, Any]) -> EmbeddingClie
         model=config.get("model", "text-embedding-v3"),
         dimension=config.get("dimension"),
         api_key=config.get("api_key"),
-        base_url=config.get("base_url")
+        base_url=config.get("base_url"),
+        max_batch_size=config.get("max_batch_size"),
+        max_workers=config.get("max_workers", 4),
+        cache=create_embedding_cache_from_config(config),
+        pool_size=config.get("pool_size", 10),
+        max_retries=config.get("max_retries", 3)
     )
 
 
+def create_embedding_cache_from_config(config: Dict[str, Any]) -> Optional[EmbeddingCache]:
+    """
+    Create the embedding cache described by an embedding config section.
+
+    Args:
+        config: Embedding configuration dict (keys cache_path, cache_max_entries)
+
+    Returns:
+        EmbeddingCache, or None if cache_max_entries is 0
+    """
+    max_entries = config.get("cache_max_entries", 10000)
+    if not max_entries:
+        return None
+    return EmbeddingCache(path=config.get("cache_path"), max_entries=max_entries)
+
+
 # Example usage
 if __name__ == "__main__":
     # Configure logging
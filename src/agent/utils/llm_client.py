@@ -11,6 +11,10 @@ import os
 import logging
 from typing import Optional, Dict, Any
 from openai import OpenAI
+import httpx
+
+from .api_support import APICallStats, AsyncClientPool, DEFAULT_TIMEOUT, aretry, http_limits
+from .response_cache import ResponseCache
 
 logger = logging.getLogger(__name__)
 
@@ -24,11 +28,22 @@ class LLMClient:
     - DashScope/Aliyun (dashscope.aliyuncs.com/compatible-mode/v1)
     - Custom OpenAI-compatible endpoints
 
+    chat() is synchronous; achat() is its asyncio counterpart, backed by a
+    pooled AsyncOpenAI client with a concurrency limit and jittered retries,
+    so callers can fan out many requests without a thread per request.
+
+    Deterministic calls (temperature 0) can be answered from an opt-in
+    ResponseCache. Pass static instructions as system_prompt: the system
+    message is sent first and byte-identical across calls, so providers
+    with prompt caching can reuse it.
+
     Attributes:
         client: OpenAI client instance
         model: Model name
         temperature: Sampling temperature
         max_tokens: Maximum completion tokens
+        stats: Call accounting (latency, tokens, retries) for chat() and achat()
+        response_cache: Optional ResponseCache for temperature-0 calls
     """
 
     def __init__(
@@ -38,7 +53,11 @@ class LLMClient:
         temperature: float = 0.7,
         max_tokens: int = 2000,
         api_key: Optional[str] = None,
-        base_url: Optional[str] = None
+        base_url: Optional[str] = None,
+        pool_size: int = 20,
+        max_concurrency: int = 8,
+        max_retries: int = 3,
+        response_cache: Optional[ResponseCache] = None
     ):
         """
         Initialize LLM client.
@@ -50,11 +69,18 @@ class LLMClient:
             max_tokens: Maximum tokens in response
             api_key: API key (if None, read from env)
             base_url: Custom base URL (for custom providers)
+            pool_size: HTTP connections kept open to the provider (sync and async each)
+            max_concurrency: Maximum in-flight achat() requests
+            max_retries: Retries of rate-limited / 5xx / network failures
+            response_cache: Cache for deterministic (temperature 0) calls (None = off)
         """
         self.provider = provider
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
+        self.max_retries = max_retries
+        self.stats = APICallStats()
+        self.response_cache = response_cache
 
         # Determine API key and base URL
         if provider == "openai":
@@ -77,11 +103,14 @@ class LLMClient:
                 f"Set {provider.upper()}_API_KEY in environment or .env file."
             )
 
-        # Initialize OpenAI client
+        # Initialize OpenAI clients (the async one is created on first use)
         self.client = OpenAI(
             api_key=self.api_key,
-            base_url=self.base_url
+            base_url=self.base_url,
+            max_retries=max_retries,
+            http_client=httpx.Client(limits=http_limits(pool_size), timeout=DEFAULT_TIMEOUT)
         )
+        self._async_pool = AsyncClientPool(self.api_key, self.base_url, pool_size, max_concurrency)
 
         logger.info(
             f"Initialized LLM client: provider={provider}, model={model}, "
@@ -109,7 +138,84 @@ class LLMClient:
         Returns:
             Generated text response
         """
-        # Build messages
+        params = self._build_params(prompt, system_prompt, temperature, max_tokens, **kwargs)
+        cache_key = self._cache_key(params)
+        if cache_key is not None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                logger.debug("LLM response served from cache")
+                return cached
+
+        # Make API call
+        try:
+            with self.stats.timer() as timer:
+                response = self.client.chat.completions.create(**params)
+                timer.usage = response.usage
+            content = response.choices[0].message.content
+            if cache_key is not None and content is not None:
+                self.response_cache.put(cache_key, content, response.usage)
+
+            logger.debug(f"LLM response: {content[:100]}...")
+            return content
+
+        except Exception as e:
+            logger.error(f"LLM API call failed: {e}")
+            raise
+
+    async def achat(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> str:
+        """
+        Async chat completion request (same arguments as chat()).
+
+        At most max_concurrency requests are in flight per client; rate
+        limits, 5xx and network errors are retried with jittered backoff.
+
+        Returns:
+            Generated text response
+        """
+        params = self._build_params(prompt, system_prompt, temperature, max_tokens, **kwargs)
+        cache_key = self._cache_key(params)
+        if cache_key is not None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                logger.debug("LLM response served from cache")
+                return cached
+        client, semaphore = self._async_pool.get()
+
+        async def attempt():
+            async with semaphore:
+                return await client.chat.completions.create(**params)
+
+        try:
+            with self.stats.timer() as timer:
+                response = await aretry(attempt, self.max_retries, self.stats, "LLM API call")
+                timer.usage = response.usage
+            content = response.choices[0].message.content
+            if cache_key is not None and content is not None:
+                self.response_cache.put(cache_key, content, response.usage)
+
+            logger.debug(f"LLM response: {content[:100]}...")
+            return content
+
+        except Exception as e:
+            logger.error(f"LLM API call failed: {e}")
+            raise
+
+    def _build_params(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Chat completion parameters (explicit temperature=0 is respected)."""
         messages = []
 
         if system_prompt:
@@ -117,26 +223,40 @@ class LLMClient:
 
         messages.append({"role": "user", "content": prompt})
 
-        # Prepare parameters
-        params = {
+        return {
             "model": self.model,
             "messages": messages,
-            "temperature": temperature or self.temperature,
+            "temperature": self.temperature if temperature is None else temperature,
             "max_tokens": max_tokens or self.max_tokens,
             **kwargs
         }
 
-        # Make API call
-        try:
-            response = self.client.chat.completions.create(**params)
-            content = response.choices[0].message.content
+    def _cache_key(self, params: Dict[str, Any]) -> Optional[str]:
+        """Response cache key, or None if the call is not cacheable (cache off or non-deterministic)."""
+        if self.response_cache is None:
+            return None
+        deterministic = (
+            params.get("temperature") == 0
+            and params.get("n", 1) == 1
+            and not params.get("stream", False)
+        )
+        return ResponseCache.make_key(params) if deterministic else None
 
-            logger.debug(f"LLM response: {content[:100]}...")
-            return content
+    def get_usage_stats(self) -> Dict[str, Any]:
+        """
+        Latency/token/retry accounting of chat() and achat() calls.
 
-        except Exception as e:
-            logger.error(f"LLM API call failed: {e}")
-            raise
+        API calls are counted under "calls"; responses served from the
+        response cache (hits, hit rate, tokens saved) under "response_cache".
+        """
+        stats = self.stats.snapshot()
+        if self.response_cache is not None:
+            stats["response_cache"] = self.response_cache.get_stats()
+        return stats
+
+    async def aclose(self) -> None:
+        """Close the async client's pooled connections."""
+        await self._async_pool.aclose()
 
     def __call__(self, prompt: str, **kwargs) -> str:
         """
@@ -164,6 +284,11 @@ def create_llm_client_from_config(config: Dict[str, Any]) -> LLMClient:
             - max_tokens: Max tokens
             - api_key (optional): API key
             - base_url (optional): Custom base URL
+            - pool_size (optional): HTTP connection pool size
+            - max_concurrency (optional): Maximum in-flight async requests
+            - max_retries (optional): Retries of transient API errors
+            - response_cache_size (optional): Cached temperature-0 responses (0 = off)
+            - response_cache_ttl (optional): Seconds a cached response stays valid
 
     Returns:
         Configured LLMClient instance
@@ -174,10 +299,30 @@ def create_llm_client_from_config(config: Dict[str, Any]) -> LLMClient:
         temperature=config.get("temperature", 0.7),
         max_tokens=config.get("max_tokens", 2000),
         api_key=config.get("api_key"),
-        base_url=config.get("base_url")
+        base_url=config.get("base_url"),
+        pool_size=config.get("pool_size", 20),
+        max_concurrency=config.get("max_concurrency", 8),
+        max_retries=config.get("max_retries", 3),
+        response_cache=create_response_cache_from_config(config)
     )
 
 
+def create_response_cache_from_config(config: Dict[str, Any]) -> Optional[ResponseCache]:
+    """
+    Create the response cache described by an LLM config section.
+
+    Args:
+        config: LLM configuration dict (keys response_cache_size, response_cache_ttl)
+
+    Returns:
+        ResponseCache, or None if response_cache_size is 0 (the default)
+    """
+    max_entries = config.get("response_cache_size", 0)
+    if not max_entries:
+        return None
+    return ResponseCache(max_entries=max_entries, ttl_seconds=config.get("response_cache_ttl", 3600))
+
+
 # Example usage
 if __name__ == "__main__":
     # Configure logging
@@ -0,0 +1,124 @@
+"""
+Response Cache for LLMClient
+
+Caches chat completions of deterministic calls (temperature 0), keyed by a
+hash of (model, messages, parameters), with a size limit and a TTL. Repeated
+judge/evaluation prompts and retried steps are then answered without an API
+call.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    In-memory LRU cache of LLM responses with expiry.
+
+    Thread-safe. Tracks hits/misses and the prompt/completion tokens that
+    cache hits saved (the usage recorded when the response was first
+    generated).
+
+    Attributes:
+        max_entries: Maximum cached responses (least recently used dropped first)
+        ttl_seconds: Lifetime of a cached response (None = no expiry)
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: Optional[float] = 3600.0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum cached responses
+            ttl_seconds: Seconds a response stays valid (None = forever)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str, int, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._saved_prompt_tokens = 0
+        self._saved_completion_tokens = 0
+
+    @staticmethod
+    def make_key(params: Dict[str, Any]) -> str:
+        """Cache key of a chat completion request (model, messages and parameters)."""
+        raw = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a response.
+
+        Args:
+            key: Cache key (see make_key)
+
+        Returns:
+            Cached response text, or None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds is not None and time.monotonic() - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            self._saved_prompt_tokens += entry[2]
+            self._saved_completion_tokens += entry[3]
+            return entry[1]
+
+    def put(self, key: str, content: str, usage: Any = None) -> None:
+        """
+        Store a response.
+
+        Args:
+            key: Cache key (see make_key)
+            content: Response text
+            usage: Usage object of the response (token counts credited on hits)
+        """
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        with self._lock:
+            self._entries[key] = (time.monotonic(), content, prompt_tokens, completion_tokens)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hits, misses, hit_rate, entries and the tokens saved by hits
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "saved_prompt_tokens": self._saved_prompt_tokens,
+                "saved_completion_tokens": self._saved_completion_tokens,
+            }
+
+    def __len__(self) -> int:
+        """Number of cached responses (including not yet evicted expired ones)."""
+        return len(self._entries)
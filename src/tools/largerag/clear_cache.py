@@ -20,7 +20,7 @@ def clear_cache():
     print(f"正在清除缓存目录: {cache_dir}")
 
     # 统计缓存文件
-    cache_files = list(cache_dir.rglob("*.pkl"))
+    cache_files = [f for f in cache_dir.rglob("*") if f.is_file()]
     total_size = sum(f.stat().st_size for f in cache_files if f.is_file())
 
     print(f"\n找到:")
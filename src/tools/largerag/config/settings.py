@@ -67,6 +67,10 @@ class EmbeddingConfig:
     text_type: str
     batch_size: int
     dimension: int
+    # 并发 embedding 配置（仅 LargeRAGIndexerV2 增量构建使用）
+    max_in_flight: int = 4           # 同时在途的 embedding 请求数上限（1 = 串行）
+    rate_limit_rps: float = 0.0      # 令牌桶速率（请求/秒，0 = 禁用限流）
+    rate_limit_burst: int = 1        # 令牌桶容量（允许的突发请求数）
 
 
 @dataclass
@@ -75,6 +79,11 @@ class VectorStoreConfig:
     persist_directory: str
     collection_name: str
     distance_metric: str
+    # 进程内检索后端配置（type = "numpy" / "hnsw" 时生效）
+    snapshot_dir: Optional[str] = None   # 快照根目录（None 时使用 {persist_directory}/snapshots）
+    dtype: str = "float32"               # 快照矩阵精度：float32 / float16
+    hnsw_ef_search: int = 64             # HNSW 检索宽度（仅 type = "hnsw"）
+    manifest_dir: Optional[str] = None   # 文档清单目录（None 时使用 {persist_directory}/manifests）
 
 
 @dataclass
@@ -86,6 +95,7 @@ class DocumentProcessingConfig:
     aggregate_small_chunks: bool = False  # 是否聚合小于chunk_size的JSON分块
     semantic_breakpoint_threshold: Optional[float] = 0.5
     semantic_buffer_size: Optional[int] = 1
+    parse_workers: int = 1  # JSON 解析进程数（1 = 主进程串行；0 = 按 CPU 核数，最多 8）
 
 
 @dataclass
@@ -94,6 +104,7 @@ class RetrievalConfig:
     rerank_top_n: int
     similarity_threshold: float  # 向量检索相似度阈值（0 = 禁用）
     rerank_threshold: float      # Reranker 分数阈值（0 = 禁用）
+    batch_rerank_workers: int = 4  # 批量检索时 Reranker 并发请求数
 
 
 @dataclass
@@ -101,6 +112,7 @@ class RerankerConfig:
     provider: str
     model: str
     enabled: bool
+    timeout: float = 30.0  # 单次重排请求超时（秒）
 
 
 @dataclass
@@ -120,6 +132,13 @@ class CacheConfig:
 
     # 本地缓存配置
     local_cache_dir: Optional[str] = None
+    embedding_store: bool = True  # 内容寻址 embedding 存储（仅 local 模式，修改分块参数后复用相同文本的 embedding）
+
+    # 查询缓存（查询 embedding + Reranker 分数，与 enabled/type 无关）
+    query_cache: bool = True
+    query_cache_max_entries: int = 10000   # 每级缓存的内存条目上限（LRU 淘汰）
+    query_cache_ttl: int = 86400           # 条目过期时间（秒，0 = 不过期）
+    query_cache_persist: bool = False      # 是否持久化到 {local_cache_dir}/query_cache
 
     # Redis 缓存配置
     redis_host: Optional[str] = None
@@ -7,45 +7,71 @@ import pickle
 import hashlib
 import logging
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterator, Optional, Tuple
 
+import numpy as np
 from llama_index.core.storage.kvstore.types import BaseKVStore
 
+from .segment_store import SegmentStore
+
 logger = logging.getLogger(__name__)
 
 
 class LocalFileCache:
     """
-    本地文件系统缓存
+    本地文件系统缓存（分段存储）
 
     特点：
     - 无需额外服务（Redis）
     - 持久化存储（重启后仍有效）
-    - 简单易用，零维护成本
+    - 追加写入的分段文件（见 segment_store.py），不再一个 key 一个 .pkl 文件
+    - embedding 向量以 float32 连续存储并通过 mmap 读取
     - 适合单机部署场景
+
+    兼容性：
+    - 旧版一个 key 一个 {md5}.pkl 的缓存在首次命中时自动迁移到分段存储
+      （旧文件名为 MD5，无法反推原始 key，因此只能按需迁移）
     """
 
-    def __init__(self, cache_dir: str, collection_name: str = "default"):
+    def __init__(self, cache_dir: str, collection_name: str = "default", max_segment_mb: int = 256):
         """
         初始化本地缓存
 
         Args:
             cache_dir: 缓存目录路径
             collection_name: 集合名称（用于隔离不同类型的缓存）
+            max_segment_mb: 单个段文件的大小上限（MB），超过后滚动到新段
         """
         self.cache_dir = Path(cache_dir) / collection_name
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        logger.info(f"Local file cache initialized at: {self.cache_dir}")
-
-    def _get_cache_path(self, key: str) -> Path:
-        """
-        生成缓存文件路径
-
-        使用 MD5 哈希确保文件名安全且长度固定
-        """
+        self._store = SegmentStore(
+            str(self.cache_dir),
+            max_segment_bytes=max_segment_mb * 1024 * 1024,
+        )
+        logger.info(f"Local file cache initialized at: {self.cache_dir} ({len(self._store)} entries)")
+
+    def _get_legacy_cache_path(self, key: str) -> Path:
+        """旧版缓存文件路径（MD5 文件名）"""
         key_hash = hashlib.md5(key.encode('utf-8')).hexdigest()
         return self.cache_dir / f"{key_hash}.pkl"
 
+    def _migrate_legacy(self, key: str) -> Optional[Any]:
+        """按需迁移旧版 .pkl 缓存"""
+        legacy_path = self._get_legacy_cache_path(key)
+        if not legacy_path.exists():
+            return None
+
+        try:
+            with open(legacy_path, 'rb') as f:
+                value = pickle.load(f)
+            self._store.put(key, value)
+            legacy_path.unlink()
+            logger.debug(f"Migrated legacy cache entry: {key[:50]}...")
+            return value
+        except Exception as e:
+            logger.warning(f"Failed to migrate legacy cache for key {key[:50]}...: {e}")
+            return None
+
     def get(self, key: str) -> Optional[Any]:
         """
         从缓存获取值
@@ -54,62 +80,83 @@ class LocalFileCache:
             key: 缓存键
 
         Returns:
-            缓存的值，如果不存在返回 None
+            缓存的值，如果不存在返回 None（向量以 List[float] 返回）
         """
-        cache_path = self._get_cache_path(key)
-
-        if not cache_path.exists():
-            return None
-
         try:
-            with open(cache_path, 'rb') as f:
-                value = pickle.load(f)
-            logger.debug(f"Cache hit: {key[:50]}...")
-            return value
+            value = self._store.get(key)
         except Exception as e:
             logger.warning(f"Failed to load cache for key {key[:50]}...: {e}")
-            # 损坏的缓存文件，删除它
-            try:
-                cache_path.unlink()
-            except:
-                pass
             return None
 
+        if value is None:
+            value = self._migrate_legacy(key)
+        if value is not None:
+            logger.debug(f"Cache hit: {key[:50]}...")
+        return value
+
+    def get_vector(self, key: str) -> Optional[np.ndarray]:
+        """获取向量的 float32 只读视图（零拷贝，不存在或非向量返回 None）"""
+        return self._store.get_vector(key)
+
     def set(self, key: str, value: Any) -> bool:
         """
         设置缓存值
 
         Args:
             key: 缓存键
-            value: 要缓存的值
+            value: 要缓存的值（一维浮点列表/数组按 float32 向量存储）
 
         Returns:
             是否成功
         """
-        cache_path = self._get_cache_path(key)
-
         try:
-            with open(cache_path, 'wb') as f:
-                pickle.dump(value, f)
+            self._store.put(key, value)
             logger.debug(f"Cache set: {key[:50]}...")
             return True
         except Exception as e:
             logger.warning(f"Failed to set cache for key {key[:50]}...: {e}")
             return False
 
+    def delete(self, key: str) -> bool:
+        """删除缓存键"""
+        try:
+            deleted = self._store.delete(key)
+            legacy_path = self._get_legacy_cache_path(key)
+            if legacy_path.exists():
+                legacy_path.unlink()
+                deleted = True
+            return deleted
+        except Exception as e:
+            logger.warning(f"Failed to delete cache key {key[:50]}...: {e}")
+            return False
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        """遍历所有 (key, value)（不含尚未迁移的旧版 .pkl）"""
+        return self._store.items()
+
+    def flush(self) -> None:
+        """将活跃段 fsync 到磁盘"""
+        self._store.flush()
+
+    def compact(self) -> dict:
+        """压缩分段存储，回收覆盖/删除产生的失效记录"""
+        return self._store.compact()
+
     def clear(self) -> int:
         """
         清空所有缓存
 
         Returns:
-            删除的文件数量
+            删除的条目数量
         """
         count = 0
         try:
+            count = self._store.clear()
+            # 清理旧版 .pkl 文件
             for cache_file in self.cache_dir.glob("*.pkl"):
                 cache_file.unlink()
                 count += 1
-            logger.info(f"Cleared {count} cache files")
+            logger.info(f"Cleared {count} cache entries")
         except Exception as e:
             logger.error(f"Failed to clear cache: {e}")
         return count
@@ -119,16 +166,12 @@ class LocalFileCache:
         获取缓存统计信息
 
         Returns:
-            包含缓存文件数量和总大小的字典
+            包含条目数量、段数量和总大小的字典（由索引计算，不扫描目录）
         """
         try:
-            cache_files = list(self.cache_dir.glob("*.pkl"))
-            total_size = sum(f.stat().st_size for f in cache_files)
-            return {
-                "cache_dir": str(self.cache_dir),
-                "file_count": len(cache_files),
-                "total_size_mb": round(total_size / (1024 * 1024), 2),
-            }
+            stats = {"cache_dir": str(self.cache_dir)}
+            stats.update(self._store.get_stats())
+            return stats
         except Exception as e:
             logger.error(f"Failed to get cache stats: {e}")
             return {"error": str(e)}
@@ -156,22 +199,13 @@ class LlamaIndexLocalCache(BaseKVStore):
         return self._cache.get(key)
 
     def get_all(self, collection: str = "default") -> dict:
-        """LlamaIndex KVStore 接口：获取所有（不支持）"""
-        # 文件缓存不高效支持此操作，返回空字典
-        logger.warning("get_all() not efficiently supported by LocalFileCache")
-        return {}
+        """LlamaIndex KVStore 接口：获取所有"""
+        # collection 参数被忽略，使用构造时的 collection_name
+        return dict(self._cache.items())
 
     def delete(self, key: str, collection: str = "default") -> bool:
         """LlamaIndex KVStore 接口：删除"""
-        cache_path = self._cache._get_cache_path(key)
-        try:
-            if cache_path.exists():
-                cache_path.unlink()
-                return True
-            return False
-        except Exception as e:
-            logger.warning(f"Failed to delete cache key {key}: {e}")
-            return False
+        return self._cache.delete(key)
 
     # Async 版本（简单包装同步版本）
     async def aput(self, key: str, val: Any, collection: str = "default") -> None:
@@ -0,0 +1,395 @@
+"""
+文档清单模块（已索引文献的持久化记录）
+要求：
+1. 记录 doc_hash → node ids、内容哈希、分块配置、embedding 模型
+2. 与 Chroma 写入事务配合：写入前标记 pending，写入成功后标记 complete
+3. 断点续传 / 跳过 / 变更检测只读清单（O(文献数)），不扫描 Chroma 元数据（O(向量数)）
+4. 启动时对账：清理未完成写入的 pending 文献；向量数不一致时从 Chroma 重建一次
+5. 记录文献源文件指纹，增量同步时未变化的文件夹无需解析
+
+存储：SQLite（WAL 模式），位于 {manifest_dir}/{collection_name}.sqlite3
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+from pathlib import Path
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+STATUS_PENDING = "pending"
+STATUS_COMPLETE = "complete"
+
+# Chroma get / delete 分页大小
+_CHROMA_PAGE_SIZE = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_hash TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    content_hash TEXT,
+    chunker_config TEXT,
+    embed_model TEXT,
+    node_count INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS nodes (
+    node_id TEXT PRIMARY KEY,
+    doc_hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_nodes_doc_hash ON nodes(doc_hash);
+CREATE INDEX IF NOT EXISTS idx_documents_status ON documents(status);
+CREATE TABLE IF NOT EXISTS sources (
+    doc_hash TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_ENTRY_COLUMNS = ("doc_hash", "status", "content_hash", "chunker_config", "embed_model", "node_count", "updated_at")
+
+
+def compute_content_hash(documents: Sequence[Any]) -> str:
+    """计算一篇文献（同一 doc_hash 的全部 Document）的内容哈希（文本 + 元数据）"""
+    hasher = hashlib.sha256()
+    for doc in documents:
+        payload = json.dumps([doc.text, doc.metadata], ensure_ascii=False, sort_keys=True, default=str)
+        hasher.update(payload.encode("utf-8"))
+        hasher.update(b"\x1e")
+    return hasher.hexdigest()
+
+
+def chunker_fingerprint(settings) -> str:
+    """分块配置指纹（参数变化时已索引文献视为过期）"""
+    dp = settings.document_processing
+    config = {
+        "splitter_type": dp.splitter_type,
+        "chunk_size": dp.chunk_size,
+        "chunk_overlap": dp.chunk_overlap,
+        "separator": dp.separator,
+    }
+    if dp.splitter_type == "semantic":
+        config["semantic_breakpoint_threshold"] = dp.semantic_breakpoint_threshold
+        config["semantic_buffer_size"] = dp.semantic_buffer_size
+    return json.dumps(config, sort_keys=True)
+
+
+def embed_model_id(settings) -> str:
+    return f"{settings.embedding.model}:{settings.embedding.dimension}"
+
+
+def get_manifest_path(settings, collection_name: str) -> Path:
+    """清单文件路径（未配置 manifest_dir 时放在 Chroma 持久化目录下）"""
+    vs_settings = settings.vector_store
+    root = vs_settings.manifest_dir or str(Path(vs_settings.persist_directory) / "manifests")
+    return Path(root) / f"{collection_name}.sqlite3"
+
+
+class DocumentManifest:
+    """
+    已索引文献清单
+
+    写入协议（与 Chroma 写入配合）：
+        manifest.begin([{"doc_hash": ..., "node_ids": [...], ...}])   # 标记 pending
+        collection.add(...)                                             # 写入 Chroma
+        manifest.complete([doc_hash, ...])                              # 标记 complete
+
+    中断发生在两步之间时，下次 reconcile() 删除 pending 文献已写入的 node，
+    文献随后被重新处理，因此不会出现“部分写入却被当作已处理”的文献。
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    # ============ 查询 ============
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM documents WHERE status = ?", (STATUS_COMPLETE,)
+            ).fetchone()[0]
+
+    def get(self, doc_hash: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(_ENTRY_COLUMNS)} FROM documents WHERE doc_hash = ?",
+                (doc_hash,),
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(_ENTRY_COLUMNS, row))
+
+    def get_entries(self) -> Dict[str, Dict[str, Any]]:
+        """全部已完成文献的记录（doc_hash → entry，一次查询）"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_ENTRY_COLUMNS)} FROM documents WHERE status = ?",
+                (STATUS_COMPLETE,),
+            ).fetchall()
+        return {row[0]: dict(zip(_ENTRY_COLUMNS, row)) for row in rows}
+
+    def completed_doc_hashes(self) -> Set[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT doc_hash FROM documents WHERE status = ?", (STATUS_COMPLETE,)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def is_current(self, doc_hash: str, content_hash: str, chunker_config: str, embed_model: str) -> bool:
+        """文献已完整索引，且内容、分块配置和 embedding 模型都未变化"""
+        entry = self.get(doc_hash)
+        return (
+            entry is not None
+            and entry["status"] == STATUS_COMPLETE
+            and entry["content_hash"] == content_hash
+            and entry["chunker_config"] == chunker_config
+            and entry["embed_model"] == embed_model
+        )
+
+    def node_ids(self, doc_hash: str) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT node_id FROM nodes WHERE doc_hash = ?", (doc_hash,)).fetchall()
+        return [row[0] for row in rows]
+
+    def total_nodes(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM nodes").fetchone()[0]
+
+    def get_fingerprints(self) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._conn.execute("SELECT doc_hash, fingerprint FROM sources").fetchall())
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    # ============ 写入 ============
+    def begin(self, entries: Iterable[Dict[str, Any]]) -> None:
+        """
+        标记文献为 pending（Chroma 写入前调用，同一事务内替换旧的 node 记录）
+
+        entries: [{"doc_hash", "node_ids", "content_hash", "chunker_config", "embed_model"}]
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            for entry in entries:
+                doc_hash = entry["doc_hash"]
+                node_ids = list(entry["node_ids"])
+                self._conn.execute("DELETE FROM nodes WHERE doc_hash = ?", (doc_hash,))
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO nodes (node_id, doc_hash) VALUES (?, ?)",
+                    [(node_id, doc_hash) for node_id in node_ids],
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO documents "
+                    "(doc_hash, status, content_hash, chunker_config, embed_model, node_count, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        doc_hash,
+                        STATUS_PENDING,
+                        entry.get("content_hash"),
+                        entry.get("chunker_config"),
+                        entry.get("embed_model"),
+                        len(node_ids),
+                        now,
+                    ),
+                )
+
+    def complete(self, doc_hashes: Iterable[str]) -> None:
+        """标记文献为 complete（对应 node 已全部写入 Chroma 后调用）"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE documents SET status = ?, updated_at = ? WHERE doc_hash = ?",
+                [(STATUS_COMPLETE, now, doc_hash) for doc_hash in doc_hashes],
+            )
+
+    def update_hashes(self, doc_hash: str, content_hash: str, chunker_config: str, embed_model: str) -> None:
+        """更新已完成文献的内容哈希和配置（内容未变、只需补全记录时使用）"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE documents SET content_hash = ?, chunker_config = ?, embed_model = ?, updated_at = ? "
+                "WHERE doc_hash = ?",
+                (content_hash, chunker_config, embed_model, time.time(), doc_hash),
+            )
+
+    def set_fingerprints(self, fingerprints: Dict[str, str]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO sources (doc_hash, fingerprint) VALUES (?, ?)",
+                list(fingerprints.items()),
+            )
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def mark_pending(self, doc_hashes: Iterable[str]) -> List[str]:
+        """
+        将已完成文献重新标记为 pending，返回其 node ids
+
+        删除文献时先调用本方法、再从 Chroma 删除、最后 remove()：
+        中断时 reconcile() 回滚这些 pending 文献（删除残留 node、清除记录），
+        文献随后被视为新增，不会留下清单中没有记录的过期 node。
+        """
+        doc_hashes = list(doc_hashes)
+        node_ids = []
+        with self._lock, self._conn:
+            for doc_hash in doc_hashes:
+                rows = self._conn.execute("SELECT node_id FROM nodes WHERE doc_hash = ?", (doc_hash,)).fetchall()
+                node_ids.extend(row[0] for row in rows)
+            self._conn.executemany(
+                "UPDATE documents SET status = ?, updated_at = ? WHERE doc_hash = ?",
+                [(STATUS_PENDING, time.time(), doc_hash) for doc_hash in doc_hashes],
+            )
+        return node_ids
+
+    def remove(self, doc_hashes: Iterable[str]) -> List[str]:
+        """删除文献记录，返回其 node ids（调用方负责从 Chroma 删除）"""
+        removed = []
+        with self._lock, self._conn:
+            for doc_hash in doc_hashes:
+                rows = self._conn.execute("SELECT node_id FROM nodes WHERE doc_hash = ?", (doc_hash,)).fetchall()
+                removed.extend(row[0] for row in rows)
+                self._conn.execute("DELETE FROM nodes WHERE doc_hash = ?", (doc_hash,))
+                self._conn.execute("DELETE FROM documents WHERE doc_hash = ?", (doc_hash,))
+                self._conn.execute("DELETE FROM sources WHERE doc_hash = ?", (doc_hash,))
+        return removed
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM nodes")
+            self._conn.execute("DELETE FROM documents")
+            self._conn.execute("DELETE FROM sources")
+
+    # ============ 与 Chroma 对账 ============
+    def reconcile(self, collection) -> Dict[str, int]:
+        """
+        启动时与 Chroma collection 对账
+
+        1. pending 文献（上次写入中断）：从 Chroma 删除其 node，清除记录
+        2. 清单 node 总数与 collection.count() 不一致（如清单缺失、collection 被其他路径写入或重建）：
+           从 Chroma 元数据重建清单（仅此时扫描一次）
+
+        Args:
+            collection: Chroma collection（不存在时传 None）
+        """
+        stats = {"rolled_back_docs": 0, "rolled_back_nodes": 0, "rebuilt": 0}
+
+        with self._lock:
+            pending = [
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT doc_hash FROM documents WHERE status = ?", (STATUS_PENDING,)
+                ).fetchall()
+            ]
+        if pending:
+            node_ids = self.remove(pending)
+            if collection is not None:
+                delete_from_collection(collection, node_ids)
+            stats["rolled_back_docs"] = len(pending)
+            stats["rolled_back_nodes"] = len(node_ids)
+            logger.warning(
+                f"Rolled back {len(pending)} partially written documents ({len(node_ids)} nodes)"
+            )
+
+        vector_count = collection.count() if collection is not None else 0
+        manifest_count = self.total_nodes()
+        if vector_count != manifest_count:
+            logger.warning(
+                f"Manifest out of sync with Chroma ({manifest_count} vs {vector_count} nodes), "
+                f"rebuilding from collection metadata"
+            )
+            stats["rebuilt"] = self.rebuild_from_collection(collection)
+
+        return stats
+
+    def rebuild_from_collection(self, collection) -> int:
+        """
+        分页扫描 Chroma 元数据重建清单（node id 集合未变的文献保留原有内容哈希等信息）
+
+        Returns:
+            重建后的文献数
+        """
+        doc_nodes: Dict[str, List[str]] = {}
+        untracked: List[str] = []  # 缺少 doc_hash 的 node，仅计入 node 总数，避免每次启动都重建
+        if collection is not None:
+            total = collection.count()
+            for offset in range(0, total, _CHROMA_PAGE_SIZE):
+                page = collection.get(limit=_CHROMA_PAGE_SIZE, offset=offset, include=["metadatas"])
+                for node_id, meta in zip(page.get("ids", []), page.get("metadatas", [])):
+                    if meta and "doc_hash" in meta:
+                        doc_nodes.setdefault(meta["doc_hash"], []).append(node_id)
+                    else:
+                        untracked.append(node_id)
+
+        previous = {}
+        for doc_hash in self.completed_doc_hashes() & set(doc_nodes):
+            entry = self.get(doc_hash)
+            if set(self.node_ids(doc_hash)) == set(doc_nodes[doc_hash]):
+                previous[doc_hash] = entry
+        fingerprints = self.get_fingerprints()
+
+        self.clear()
+        entries = []
+        for doc_hash, node_ids in doc_nodes.items():
+            entry = previous.get(doc_hash, {})
+            entries.append({
+                "doc_hash": doc_hash,
+                "node_ids": node_ids,
+                "content_hash": entry.get("content_hash"),
+                "chunker_config": entry.get("chunker_config"),
+                "embed_model": entry.get("embed_model"),
+            })
+        self.begin(entries)
+        self.complete(doc_nodes)
+        self.set_fingerprints({h: fp for h, fp in fingerprints.items() if h in previous})
+        if untracked:
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO nodes (node_id, doc_hash) VALUES (?, '')",
+                    [(node_id,) for node_id in untracked],
+                )
+            logger.warning(f"{len(untracked)} nodes in collection have no doc_hash metadata")
+
+        logger.info(f"Manifest rebuilt: {len(doc_nodes)} documents")
+        return len(doc_nodes)
+
+    # ============ 统计 / 资源 ============
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM documents GROUP BY status"
+            ).fetchall())
+            nodes = self._conn.execute("SELECT COUNT(*) FROM nodes").fetchone()[0]
+        return {
+            "manifest_path": str(self.db_path),
+            "documents": counts.get(STATUS_COMPLETE, 0),
+            "pending_documents": counts.get(STATUS_PENDING, 0),
+            "nodes": nodes,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def delete_from_collection(collection, node_ids: Sequence[str]) -> None:
+    """分批从 Chroma collection 删除 node"""
+    node_ids = list(node_ids)
+    for start in range(0, len(node_ids), _CHROMA_PAGE_SIZE):
+        collection.delete(ids=node_ids[start:start + _CHROMA_PAGE_SIZE])
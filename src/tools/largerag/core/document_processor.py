@@ -6,23 +6,291 @@
 3. 自动提取元数据（文档哈希、页码、文本层级）
 4. 处理缺失字段和异常文件
 5. 记录处理日志（跳过的文档、错误）
+6. 流式模式：按文件夹顺序逐个产出 Document，JSON 解析在进程池中并行（可用时使用 orjson）
+7. 文件夹指纹（源文件名 + 大小 + 修改时间），供增量同步检测变化
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import json
 import logging
+import os
 from llama_index.core import Document
 
 from ..config.settings import SETTINGS
 
 logger = logging.getLogger(__name__)
 
+# orjson 作为可选依赖（解析速度约为标准库 json 的数倍）
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+# 按优先级排列的源文件（与 _parse_folder 的选择顺序一致）
+SOURCE_FILES = ("content_list_process.json", "article.json")
+
+
+def folder_fingerprint(folder: Path) -> Optional[str]:
+    """
+    文件夹指纹：实际被解析的源文件的名称、大小和修改时间（只 stat，不读取内容）
+
+    Returns:
+        指纹字符串；没有可用源文件时返回 None
+    """
+    for name in SOURCE_FILES:
+        source = Path(folder) / name
+        try:
+            stat = source.stat()
+        except FileNotFoundError:
+            continue
+        return f"{name}:{stat.st_size}:{stat.st_mtime_ns}"
+    return None
+
+
+def load_json(file_path: Path) -> Any:
+    """读取 JSON 文件（优先使用 orjson）"""
+    if ORJSON_AVAILABLE:
+        with open(file_path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _parse_folder(folder: str, aggregate_small_chunks: bool, separator: str) -> Dict[str, Any]:
+    """
+    解析单个文献文件夹（可在子进程中运行，只返回可 pickle 的基础类型）
+
+    Returns:
+        {
+            "doc_hash": 文件夹名,
+            "records": [(text, metadata), ...],
+            "skipped": 是否计为跳过,
+            "logs": [(level, message), ...]  # 由主进程统一输出
+        }
+    """
+    folder_path = Path(folder)
+    doc_hash = folder_path.name
+    content_file = folder_path / "content_list_process.json"
+    article_file = folder_path / "article.json"
+    result = {"doc_hash": doc_hash, "records": [], "skipped": False, "logs": []}
+
+    # 优先使用 content_list_process.json
+    if content_file.exists():
+        _parse_content_list(content_file, doc_hash, aggregate_small_chunks, separator, result)
+    elif article_file.exists():
+        result["logs"].append((logging.WARNING, f"[{doc_hash}] content_list_process.json not found, using article.json"))
+        _parse_article(article_file, doc_hash, aggregate_small_chunks, separator, result)
+    else:
+        result["logs"].append((logging.ERROR, f"[{doc_hash}] No valid JSON file found, skipping"))
+        result["skipped"] = True
+    return result
+
+
+def _parse_content_list(
+    file_path: Path,
+    doc_hash: str,
+    aggregate_small_chunks: bool,
+    separator: str,
+    result: Dict[str, Any],
+) -> None:
+    """
+    从 content_list_process.json 解析记录（只提取 text 类型）
+
+    JSON 格式：
+    [
+        {
+            "type": "text",
+            "text": "Deep eutectic solvents...",
+            "text_level": 1,
+            "page_idx": 0,
+            "cites": [...]  # 可选
+        },
+        {
+            "type": "image",  # 忽略
+            ...
+        }
+    ]
+
+    行为模式：
+    - aggregate_small_chunks=False: 每个text条目一条记录（保留JSON分块点）
+    - aggregate_small_chunks=True: 所有text条目合并为一条记录（消除JSON分块点）
+    """
+    logs = result["logs"]
+    try:
+        content_list = load_json(file_path)
+
+        # 收集所有text片段
+        text_items = []
+        for idx, item in enumerate(content_list):
+            # 只处理 text 类型
+            if item.get("type") != "text":
+                continue
+
+            text = item.get("text", "").strip()
+            if not text:
+                logs.append((logging.WARNING, f"[{doc_hash}] Item {idx}: empty text, skipping"))
+                continue
+
+            text_items.append({
+                "text": text,
+                "page_idx": item.get("page_idx", -1),
+                "text_level": item.get("text_level", 0),
+                "has_citations": bool(item.get("cites")),
+                "item_idx": idx,
+            })
+
+        if not text_items:
+            logs.append((logging.WARNING, f"[{doc_hash}] No valid text items found"))
+            return
+
+        records = result["records"]
+
+        if aggregate_small_chunks:
+            # 聚合模式：合并所有text为一条记录
+            combined_text = separator.join([item["text"] for item in text_items])
+
+            metadata = {
+                "doc_hash": doc_hash,
+                "source_file": "content_list_process.json",
+                "aggregated": True,
+                "num_segments": len(text_items),
+                "page_idx_range": f"{text_items[0]['page_idx']}-{text_items[-1]['page_idx']}",
+            }
+            records.append((combined_text, metadata))
+
+            logs.append((logging.INFO, f"[{doc_hash}] Aggregated {len(text_items)} text segments into 1 document"))
+
+        else:
+            # 非聚合模式：每个text条目一条记录
+            for item in text_items:
+                metadata = {
+                    "doc_hash": doc_hash,
+                    "page_idx": item["page_idx"],
+                    "text_level": item["text_level"],
+                    "has_citations": item["has_citations"],
+                    "source_file": "content_list_process.json",
+                    "item_idx": item["item_idx"],
+                    "aggregated": False,
+                }
+                records.append((item["text"], metadata))
+
+            logs.append((logging.INFO, f"[{doc_hash}] Loaded {len(records)} text segments from content_list_process.json"))
+
+    except json.JSONDecodeError as e:
+        # orjson.JSONDecodeError 是 json.JSONDecodeError 的子类
+        logs.append((logging.ERROR, f"[{doc_hash}] Invalid JSON in content_list_process.json: {e}"))
+        result["skipped"] = True
+    except Exception as e:
+        logs.append((logging.ERROR, f"[{doc_hash}] Error loading content_list_process.json: {e}"))
+        result["skipped"] = True
+
+
+def _parse_article(
+    file_path: Path,
+    doc_hash: str,
+    aggregate_small_chunks: bool,
+    separator: str,
+    result: Dict[str, Any],
+) -> None:
+    """
+    从 article.json 解析记录（备选方案）
+
+    JSON 格式：
+    {
+        "paragraphs": [
+            {
+                "paragraph": "Dissolution of...",
+                "type": "body_div",
+                "paragraph_idx": 0,
+                "pagenum": 0,
+                "head": "",
+                "text_level": 1
+            }
+        ]
+    }
+
+    行为模式：
+    - aggregate_small_chunks=False: 每个paragraph一条记录
+    - aggregate_small_chunks=True: 所有paragraphs合并为一条记录
+    """
+    logs = result["logs"]
+    try:
+        article_data = load_json(file_path)
+
+        paragraphs = article_data.get("paragraphs", [])
+
+        # 收集所有有效段落
+        valid_paras = []
+        for para in paragraphs:
+            text = para.get("paragraph", "").strip()
+            if text:
+                valid_paras.append({
+                    "text": text,
+                    "pagenum": para.get("pagenum", -1),
+                    "text_level": para.get("text_level", 0),
+                    "paragraph_type": para.get("type", ""),
+                    "paragraph_idx": para.get("paragraph_idx", -1),
+                })
+
+        if not valid_paras:
+            logs.append((logging.WARNING, f"[{doc_hash}] No valid paragraphs found"))
+            return
+
+        records = result["records"]
+
+        if aggregate_small_chunks:
+            # 聚合模式：合并所有paragraphs为一条记录
+            combined_text = separator.join([p["text"] for p in valid_paras])
+
+            metadata = {
+                "doc_hash": doc_hash,
+                "source_file": "article.json",
+                "aggregated": True,
+                "num_paragraphs": len(valid_paras),
+                "page_idx_range": f"{valid_paras[0]['pagenum']}-{valid_paras[-1]['pagenum']}",
+            }
+            records.append((combined_text, metadata))
+
+            logs.append((logging.INFO, f"[{doc_hash}] Aggregated {len(valid_paras)} paragraphs into 1 document"))
+
+        else:
+            # 非聚合模式：每个paragraph一条记录
+            for para in valid_paras:
+                metadata = {
+                    "doc_hash": doc_hash,
+                    "page_idx": para["pagenum"],
+                    "text_level": para["text_level"],
+                    "paragraph_type": para["paragraph_type"],
+                    "source_file": "article.json",
+                    "paragraph_idx": para["paragraph_idx"],
+                    "aggregated": False,
+                }
+                records.append((para["text"], metadata))
+
+            logs.append((logging.INFO, f"[{doc_hash}] Loaded {len(records)} paragraphs from article.json"))
+
+    except json.JSONDecodeError as e:
+        logs.append((logging.ERROR, f"[{doc_hash}] Invalid JSON in article.json: {e}"))
+        result["skipped"] = True
+    except Exception as e:
+        logs.append((logging.ERROR, f"[{doc_hash}] Error loading article.json: {e}"))
+        result["skipped"] = True
+
 
 class DocumentProcessor:
     """文献文件夹到 LlamaIndex Document 的转换器"""
 
-    def __init__(self, aggregate_small_chunks: Optional[bool] = None, separator: Optional[str] = None):
+    def __init__(
+        self,
+        aggregate_small_chunks: Optional[bool] = None,
+        separator: Optional[str] = None,
+        parse_workers: Optional[int] = None,
+    ):
         """
         Args:
             aggregate_small_chunks: 是否聚合JSON文件内的所有片段为一个Document
@@ -30,6 +298,7 @@ class DocumentProcessor:
                 - True: 一个JSON文件的所有text条目合并为一个Document
                 - None: 从 SETTINGS 读取配置
             separator: 聚合时使用的分隔符（None 时从 SETTINGS 读取）
+            parse_workers: JSON 解析进程数（1 = 主进程串行，0 = 按 CPU 核数，None 时从 SETTINGS 读取）
         """
         # 如果未指定，从 SETTINGS 读取配置
         self.aggregate_small_chunks = (
@@ -42,6 +311,11 @@ class DocumentProcessor:
             if separator is not None
             else SETTINGS.document_processing.separator
         )
+        self.parse_workers = (
+            parse_workers
+            if parse_workers is not None
+            else SETTINGS.document_processing.parse_workers
+        )
         self.processed_count = 0
         self.skipped_count = 0
 
@@ -67,232 +341,88 @@ class DocumentProcessor:
 
         Raises:
             FileNotFoundError: 如果目录不存在
+
+        注意：
+        - 大型文献库请使用 iter_from_folders()，避免一次性物化所有 Document
+        """
+        return list(self.iter_from_folders(literature_dir))
+
+    def iter_from_folders(self, literature_dir: str) -> Iterator[Document]:
+        """
+        流式加载：按文件夹顺序逐个产出 Document（文件夹结构同 process_from_folders）
+
+        - 解析完成一个文件夹就产出其 Document，下游（分块、embedding）无需等待全部解析完成
+        - parse_workers > 1 时 JSON 解析在进程池中进行，最多预取 parse_workers * 4 个文件夹
+        - 内存占用与预取窗口相关，与文献总数无关
+
+        Raises:
+            FileNotFoundError: 如果目录不存在（调用时立即检查）
         """
         literature_path = Path(literature_dir)
         if not literature_path.exists():
             raise FileNotFoundError(f"Literature directory not found: {literature_dir}")
 
-        documents = []
-
         # 遍历所有哈希文件夹（排序确保顺序一致，避免缓存失效）
-        for folder in sorted(literature_path.iterdir()):
-            if not folder.is_dir():
-                continue
+        folders = [str(folder) for folder in sorted(literature_path.iterdir()) if folder.is_dir()]
+        return self.iter_documents(folders)
 
-            doc_hash = folder.name
-            content_file = folder / "content_list_process.json"
-            article_file = folder / "article.json"
-
-            # 优先使用 content_list_process.json
-            if content_file.exists():
-                docs = self._load_from_content_list(content_file, doc_hash)
-                documents.extend(docs)
-            elif article_file.exists():
-                logger.warning(f"[{doc_hash}] content_list_process.json not found, using article.json")
-                docs = self._load_from_article(article_file, doc_hash)
-                documents.extend(docs)
-            else:
-                logger.error(f"[{doc_hash}] No valid JSON file found, skipping")
-                self.skipped_count += 1
+    def iter_documents(self, folders: List[str]) -> Iterator[Document]:
+        """流式加载指定的文献文件夹（增量同步只解析发生变化的文件夹）"""
+        for result in self._iter_parsed(folders):
+            yield from self._to_documents(result)
 
         logger.info(f"Total processed: {self.processed_count}, skipped: {self.skipped_count}")
-        return documents
 
-    def _load_from_content_list(self, file_path: Path, doc_hash: str) -> List[Document]:
-        """
-        从 content_list_process.json 加载数据（只提取 text 类型）
-
-        JSON 格式：
-        [
-            {
-                "type": "text",
-                "text": "Deep eutectic solvents...",
-                "text_level": 1,
-                "page_idx": 0,
-                "cites": [...]  # 可选
-            },
-            {
-                "type": "image",  # 忽略
-                ...
-            }
-        ]
+    def _iter_parsed(self, folders: List[str]) -> Iterator[Dict[str, Any]]:
+        """按输入顺序产出各文件夹的解析结果"""
+        workers = self.parse_workers or min(os.cpu_count() or 1, 8)
+        if workers <= 1 or len(folders) <= 1:
+            for folder in folders:
+                yield _parse_folder(folder, self.aggregate_small_chunks, self.separator)
+            return
 
-        行为模式：
-        - aggregate_small_chunks=False: 每个text条目创建一个Document（保留JSON分块点）
-        - aggregate_small_chunks=True: 所有text条目合并为一个Document（消除JSON分块点）
-        """
+        max_pending = workers * 4
+        executor = ProcessPoolExecutor(max_workers=workers)
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content_list = json.load(f)
-
-            # 收集所有text片段
-            text_items = []
-            for idx, item in enumerate(content_list):
-                # 只处理 text 类型
-                if item.get("type") != "text":
-                    continue
-
-                text = item.get("text", "").strip()
-                if not text:
-                    logger.warning(f"[{doc_hash}] Item {idx}: empty text, skipping")
-                    continue
-
-                text_items.append({
-                    "text": text,
-                    "page_idx": item.get("page_idx", -1),
-                    "text_level": item.get("text_level", 0),
-                    "has_citations": bool(item.get("cites")),
-                    "item_idx": idx,
-                })
-
-            if not text_items:
-                logger.warning(f"[{doc_hash}] No valid text items found")
-                return []
-
-            documents = []
-
-            if self.aggregate_small_chunks:
-                # 聚合模式：合并所有text为一个Document
-                combined_text = self.separator.join([item["text"] for item in text_items])
-
-                metadata = {
-                    "doc_hash": doc_hash,
-                    "source_file": "content_list_process.json",
-                    "aggregated": True,
-                    "num_segments": len(text_items),
-                    "page_idx_range": f"{text_items[0]['page_idx']}-{text_items[-1]['page_idx']}",
-                }
-
-                doc = Document(text=combined_text, metadata=metadata)
-                documents.append(doc)
-                self.processed_count += 1
-
-                logger.info(f"[{doc_hash}] Aggregated {len(text_items)} text segments into 1 document")
-
-            else:
-                # 非聚合模式：每个text条目一个Document（当前行为）
-                for item in text_items:
-                    metadata = {
-                        "doc_hash": doc_hash,
-                        "page_idx": item["page_idx"],
-                        "text_level": item["text_level"],
-                        "has_citations": item["has_citations"],
-                        "source_file": "content_list_process.json",
-                        "item_idx": item["item_idx"],
-                        "aggregated": False,
-                    }
-
-                    doc = Document(text=item["text"], metadata=metadata)
-                    documents.append(doc)
-                    self.processed_count += 1
-
-                logger.info(f"[{doc_hash}] Loaded {len(documents)} text segments from content_list_process.json")
-
-            return documents
-
-        except json.JSONDecodeError as e:
-            logger.error(f"[{doc_hash}] Invalid JSON in content_list_process.json: {e}")
-            self.skipped_count += 1
-            return []
-        except Exception as e:
-            logger.error(f"[{doc_hash}] Error loading content_list_process.json: {e}")
+            pending = deque()
+            folder_iter = iter(folders)
+            for folder in folder_iter:
+                pending.append(executor.submit(_parse_folder, folder, self.aggregate_small_chunks, self.separator))
+                if len(pending) >= max_pending:
+                    break
+
+            while pending:
+                result = pending.popleft().result()
+                next_folder = next(folder_iter, None)
+                if next_folder is not None:
+                    pending.append(executor.submit(_parse_folder, next_folder, self.aggregate_small_chunks, self.separator))
+                yield result
+        finally:
+            # 下游提前停止消费时，取消尚未开始的解析任务
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _to_documents(self, result: Dict[str, Any]) -> List[Document]:
+        """将解析结果转换为 Document，并输出解析日志、更新统计"""
+        for level, message in result["logs"]:
+            logger.log(level, message)
+        if result["skipped"]:
             self.skipped_count += 1
-            return []
-
-    def _load_from_article(self, file_path: Path, doc_hash: str) -> List[Document]:
-        """
-        从 article.json 加载数据（备选方案）
-
-        JSON 格式：
-        {
-            "paragraphs": [
-                {
-                    "paragraph": "Dissolution of...",
-                    "type": "body_div",
-                    "paragraph_idx": 0,
-                    "pagenum": 0,
-                    "head": "",
-                    "text_level": 1
-                }
-            ]
-        }
-
-        行为模式：
-        - aggregate_small_chunks=False: 每个paragraph一个Document
-        - aggregate_small_chunks=True: 所有paragraphs合并为一个Document
-        """
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                article_data = json.load(f)
-
-            paragraphs = article_data.get("paragraphs", [])
-
-            # 收集所有有效段落
-            valid_paras = []
-            for para in paragraphs:
-                text = para.get("paragraph", "").strip()
-                if text:
-                    valid_paras.append({
-                        "text": text,
-                        "pagenum": para.get("pagenum", -1),
-                        "text_level": para.get("text_level", 0),
-                        "paragraph_type": para.get("type", ""),
-                        "paragraph_idx": para.get("paragraph_idx", -1),
-                    })
-
-            if not valid_paras:
-                logger.warning(f"[{doc_hash}] No valid paragraphs found")
-                return []
-
-            documents = []
-
-            if self.aggregate_small_chunks:
-                # 聚合模式：合并所有paragraphs为一个Document
-                combined_text = self.separator.join([p["text"] for p in valid_paras])
-
-                metadata = {
-                    "doc_hash": doc_hash,
-                    "source_file": "article.json",
-                    "aggregated": True,
-                    "num_paragraphs": len(valid_paras),
-                    "page_idx_range": f"{valid_paras[0]['pagenum']}-{valid_paras[-1]['pagenum']}",
-                }
-
-                doc = Document(text=combined_text, metadata=metadata)
-                documents.append(doc)
-                self.processed_count += 1
-
-                logger.info(f"[{doc_hash}] Aggregated {len(valid_paras)} paragraphs into 1 document")
-
-            else:
-                # 非聚合模式：每个paragraph一个Document
-                for para in valid_paras:
-                    metadata = {
-                        "doc_hash": doc_hash,
-                        "page_idx": para["pagenum"],
-                        "text_level": para["text_level"],
-                        "paragraph_type": para["paragraph_type"],
-                        "source_file": "article.json",
-                        "paragraph_idx": para["paragraph_idx"],
-                        "aggregated": False,
-                    }
 
-                    doc = Document(text=para["text"], metadata=metadata)
-                    documents.append(doc)
-                    self.processed_count += 1
-
-                logger.info(f"[{doc_hash}] Loaded {len(documents)} paragraphs from article.json")
+        documents = [Document(text=text, metadata=metadata) for text, metadata in result["records"]]
+        self.processed_count += len(documents)
+        return documents
 
-            return documents
+    def _load_from_content_list(self, file_path: Path, doc_hash: str) -> List[Document]:
+        """从 content_list_process.json 加载数据（格式和行为见 _parse_content_list）"""
+        result = {"doc_hash": doc_hash, "records": [], "skipped": False, "logs": []}
+        _parse_content_list(file_path, doc_hash, self.aggregate_small_chunks, self.separator, result)
+        return self._to_documents(result)
 
-        except json.JSONDecodeError as e:
-            logger.error(f"[{doc_hash}] Invalid JSON in article.json: {e}")
-            self.skipped_count += 1
-            return []
-        except Exception as e:
-            logger.error(f"[{doc_hash}] Error loading article.json: {e}")
-            self.skipped_count += 1
-            return []
+    def _load_from_article(self, file_path: Path, doc_hash: str) -> List[Document]:
+        """从 article.json 加载数据（备选方案，格式和行为见 _parse_article）"""
+        result = {"doc_hash": doc_hash, "records": [], "skipped": False, "logs": []}
+        _parse_article(file_path, doc_hash, self.aggregate_small_chunks, self.separator, result)
+        return self._to_documents(result)
 
     def get_statistics(self) -> Dict[str, int]:
         """返回处理统计信息"""
@@ -0,0 +1,196 @@
+"""
+并发 Embedding 流水线模块
+要求：
+1. 有界的在途请求窗口（避免无限制地堆积请求）
+2. 令牌桶限流（遵守 DashScope QPS 配额）
+3. 按输入顺序交付结果（保证下游 Chroma 写入和文档级缓存的顺序语义）
+"""
+
+from typing import Any, Callable, Deque, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucketRateLimiter:
+    """
+    线程安全的令牌桶限流器
+
+    - rate: 每秒补充的令牌数（<= 0 表示不限流）
+    - capacity: 桶容量，即允许的最大突发请求数
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity and capacity > 0 else max(self.rate, 1.0)
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        获取令牌（不足时阻塞等待）
+
+        Returns:
+            本次等待的秒数
+        """
+        if not self.enabled:
+            return 0.0
+
+        tokens = min(tokens, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                wait_time = (tokens - self._tokens) / self.rate
+            time.sleep(wait_time)
+            waited += wait_time
+
+
+class ConcurrentEmbeddingPipeline:
+    """
+    并发 Embedding 流水线
+
+    将每个文档的 nodes 按 batch_size 切分为多个请求，最多 max_in_flight 个请求同时在途，
+    每个请求发出前先从令牌桶获取令牌。文档按输入顺序交付，
+    只有当一个文档的所有 batch 都完成后才会被交付。
+
+    使用示例：
+        pipeline = ConcurrentEmbeddingPipeline(embed_model._get_text_embeddings, batch_size=10)
+        for doc_hash, nodes in pipeline.run((h, nodes) for h, nodes in items):
+            ...  # nodes 已带 embedding，顺序与输入一致
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], List[List[float]]],
+        batch_size: int,
+        max_in_flight: int = 4,
+        rate_limiter: Optional[TokenBucketRateLimiter] = None,
+    ):
+        if batch_size <= 0:
+            raise ValueError(f"batch_size must be positive, got {batch_size}")
+
+        self.embed_fn = embed_fn
+        self.batch_size = batch_size
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.rate_limiter = rate_limiter
+        # 窗口内最多积压的文档数（限制内存占用）
+        self.max_pending_docs = self.max_in_flight * 8
+
+        # 统计信息
+        self.requests_sent = 0
+        self.texts_embedded = 0
+        self.rate_limit_wait = 0.0
+        self._stats_lock = threading.Lock()
+
+    def _embed_batch(self, batch_nodes: Sequence[Any]) -> None:
+        """在工作线程中执行一次 embedding 请求，并把结果写回 nodes"""
+        waited = self.rate_limiter.acquire() if self.rate_limiter else 0.0
+
+        texts = [node.get_content() for node in batch_nodes]
+        embeddings = self.embed_fn(texts)
+
+        if len(embeddings) != len(batch_nodes):
+            raise RuntimeError(
+                f"Embedding count mismatch: sent {len(batch_nodes)} texts, "
+                f"received {len(embeddings)} embeddings"
+            )
+
+        for node, embedding in zip(batch_nodes, embeddings):
+            node.embedding = embedding
+
+        with self._stats_lock:
+            self.requests_sent += 1
+            self.texts_embedded += len(texts)
+            self.rate_limit_wait += waited
+
+    def run(self, items: Iterable[Tuple[Hashable, List[Any]]]) -> Iterator[Tuple[Hashable, List[Any]]]:
+        """
+        并发计算 embedding，并按输入顺序交付
+
+        Args:
+            items: (key, nodes) 迭代器，nodes 需支持 get_content() 和 embedding 属性；
+                   embedding 已存在的 node 会被跳过
+
+        Yields:
+            (key, nodes)：nodes 已全部写入 embedding
+
+        注意：
+        - 任一请求最终失败时异常会向上抛出，尚未交付的文档不会被交付，
+          调用方可以依赖“已交付 = 已完整 embedding”实现断点续传
+        """
+        window: Deque[Tuple[Hashable, List[Any], List[Future]]] = deque()
+
+        def in_flight() -> List[Future]:
+            return [f for _, _, futures in window for f in futures if not f.done()]
+
+        def pop_ready(block: bool, limit: Optional[int] = None) -> Iterator[Tuple[Hashable, List[Any]]]:
+            # 只交付窗口头部已完成的文档，保证顺序
+            delivered = 0
+            while window and (limit is None or delivered < limit):
+                key, nodes, futures = window[0]
+                if not block and not all(f.done() for f in futures):
+                    return
+                for future in futures:
+                    future.result()  # 传播异常
+                window.popleft()
+                delivered += 1
+                yield key, nodes
+
+        executor = ThreadPoolExecutor(
+            max_workers=self.max_in_flight,
+            thread_name_prefix="largerag-embed",
+        )
+        try:
+            for key, nodes in items:
+                futures: List[Future] = []
+                window.append((key, nodes, futures))
+
+                # 已有 embedding 的 node（如缓存命中）不再请求
+                todo = [node for node in nodes if node.embedding is None]
+                for start in range(0, len(todo), self.batch_size):
+                    # 在途请求已满：等待任意一个完成后再提交
+                    pending = in_flight()
+                    while len(pending) >= self.max_in_flight:
+                        wait(pending, return_when=FIRST_COMPLETED)
+                        pending = in_flight()
+
+                    batch_nodes = todo[start:start + self.batch_size]
+                    futures.append(executor.submit(self._embed_batch, batch_nodes))
+
+                yield from pop_ready(block=False)
+
+                # 头部文档未完成时积压过多（如大量缓存命中排在慢请求之后）：阻塞等待头部
+                while len(window) > self.max_pending_docs:
+                    yield from pop_ready(block=True, limit=1)
+
+            yield from pop_ready(block=True)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def get_stats(self) -> dict:
+        """获取流水线统计信息"""
+        return {
+            "requests_sent": self.requests_sent,
+            "texts_embedded": self.texts_embedded,
+            "max_in_flight": self.max_in_flight,
+            "rate_limit_wait_s": round(self.rate_limit_wait, 2),
+        }
@@ -0,0 +1,172 @@
+"""
+内容寻址的 Embedding 存储模块
+要求：
+1. 以 (model, dimension, 规范化文本哈希) 为键，与分块参数无关
+2. 修改 chunk_size / chunk_overlap / splitter_type 后，文本相同的 chunk 不再重复计算 embedding
+3. 所有索引路径（LargeRAGIndexer、LargeRAGIndexerV2、Semantic Splitter）共享同一存储
+"""
+
+from typing import Callable, List, Optional, Sequence
+import hashlib
+import logging
+import threading
+import unicodedata
+
+from .cache import LocalFileCache
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """
+    规范化 chunk 文本（用于计算内容哈希）
+
+    - Unicode NFC 规范化
+    - 合并连续空白并去除首尾空白
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class EmbeddingStore:
+    """
+    内容寻址的 Embedding 存储
+
+    与 DocumentLevelCache（按 doc_hash）和 IngestionCache（按 pipeline hash）不同，
+    这里的键只取决于 embedding 模型、维度和 chunk 文本本身。
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        model: str,
+        dimension: int,
+        collection_name: str = "embedding_store",
+    ):
+        """
+        Args:
+            cache_dir: 缓存根目录（不同 collection 共享同一存储）
+            model: embedding 模型名称
+            dimension: 向量维度
+            collection_name: 存储子目录名称
+        """
+        self.model = model
+        self.dimension = dimension
+        self._cache = LocalFileCache(cache_dir, collection_name)
+
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def make_key(self, text: str) -> str:
+        """生成 (model, dimension, 文本哈希) 键"""
+        text_hash = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+        return f"{self.model}:{self.dimension}:{text_hash}"
+
+    def get(self, text: str) -> Optional[List[float]]:
+        """获取单条文本的 embedding"""
+        return self.get_many([text])[0]
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """批量获取 embedding，未命中的位置为 None"""
+        results = [self._cache.get(self.make_key(text)) for text in texts]
+
+        hits = sum(1 for r in results if r is not None)
+        with self._stats_lock:
+            self.hits += hits
+            self.misses += len(results) - hits
+
+        return results
+
+    def put_many(self, texts: Sequence[str], embeddings: Sequence[List[float]]) -> None:
+        """批量写入 embedding"""
+        for text, embedding in zip(texts, embeddings):
+            self._cache.set(self.make_key(text), list(embedding))
+
+    def flush(self) -> None:
+        """将已写入的 embedding fsync 到磁盘"""
+        self._cache.flush()
+
+    def get_or_embed(
+        self,
+        texts: List[str],
+        embed_fn: Callable[[List[str]], List[List[float]]],
+    ) -> List[List[float]]:
+        """
+        先查存储，只对未命中的文本调用 embed_fn，并写回存储
+
+        Args:
+            texts: 待 embedding 的文本
+            embed_fn: 实际请求 embedding 的函数
+
+        Returns:
+            与 texts 一一对应的 embedding 列表
+        """
+        results = self.get_many(texts)
+        missing_idx = [i for i, r in enumerate(results) if r is None]
+
+        if missing_idx:
+            missing_texts = [texts[i] for i in missing_idx]
+            new_embeddings = embed_fn(missing_texts)
+            self.put_many(missing_texts, new_embeddings)
+            for i, embedding in zip(missing_idx, new_embeddings):
+                results[i] = embedding
+
+        return results
+
+    def fill_nodes(self, nodes: Sequence) -> int:
+        """
+        为尚无 embedding 的 nodes 填充已存储的 embedding
+
+        Returns:
+            填充的 node 数量
+        """
+        todo = [node for node in nodes if node.embedding is None]
+        if not todo:
+            return 0
+
+        filled = 0
+        for node, embedding in zip(todo, self.get_many([node.get_content() for node in todo])):
+            if embedding is not None:
+                node.embedding = embedding
+                filled += 1
+        return filled
+
+    def get_stats(self) -> dict:
+        """获取存储统计信息（含命中率）"""
+        total = self.hits + self.misses
+        stats = {
+            "model": self.model,
+            "dimension": self.dimension,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+        stats.update(self._cache.get_stats())
+        return stats
+
+
+def create_embedding_store(settings) -> Optional[EmbeddingStore]:
+    """
+    根据配置创建 EmbeddingStore
+
+    仅在 cache.enabled、cache.type == "local" 且 cache.embedding_store 启用时创建；
+    存储目录为 {local_cache_dir}/embedding_store，不按 collection 隔离
+    """
+    cache_settings = settings.cache
+    if not (cache_settings.enabled and cache_settings.type == "local" and cache_settings.embedding_store):
+        return None
+
+    try:
+        store = EmbeddingStore(
+            cache_dir=cache_settings.local_cache_dir,
+            model=settings.embedding.model,
+            dimension=settings.embedding.dimension,
+        )
+        logger.info(
+            f"Embedding store enabled (model={settings.embedding.model}, "
+            f"dimension={settings.embedding.dimension})"
+        )
+        return store
+    except Exception as e:
+        logger.warning(f"Failed to initialize embedding store: {e}. Proceeding without it.")
+        return None
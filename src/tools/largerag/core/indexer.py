@@ -3,8 +3,9 @@
 要求：
 1. 使用 IngestionPipeline 实现批处理和缓存
 2. 支持 Redis 缓存避免重复计算
-3. Chroma 持久化存储
-4. 提供索引统计信息
+3. 内容寻址 embedding 存储（修改分块参数后只为新文本计算 embedding）
+4. Chroma 持久化存储（查询可切换到进程内 numpy / hnsw 快照后端）
+5. 提供索引统计信息
 """
 
 from typing import List, Optional, Dict, Any
@@ -15,14 +16,19 @@ from llama_index.embeddings.dashscope import (
     DashScopeEmbedding,
     DashScopeTextEmbeddingType
 )
+from llama_index.embeddings.dashscope.base import get_text_embedding
 from llama_index.vector_stores.chroma import ChromaVectorStore
 import chromadb
+import json
 import logging
 import time
 from requests.exceptions import ConnectionError, Timeout
 
 from ..config.settings import SETTINGS, DASHSCOPE_API_KEY
+from .embedding_store import EmbeddingStore, create_embedding_store
 from .cache import LlamaIndexLocalCache
+from .numpy_vector_store import get_snapshot_dir, load_snapshot_vector_store
+from .vector_snapshot import export_chroma_snapshot
 
 logger = logging.getLogger(__name__)
 
@@ -38,17 +44,55 @@ except ImportError:
 class RetryableDashScopeEmbedding(DashScopeEmbedding):
     """带重试机制的 DashScope Embedding"""
 
-    def __init__(self, *args, max_retries: int = 3, retry_delay: float = 2.0, **kwargs):
+    def __init__(
+        self,
+        *args,
+        max_retries: int = 3,
+        retry_delay: float = 2.0,
+        embedding_store: Optional[EmbeddingStore] = None,
+        **kwargs
+    ):
         super().__init__(*args, **kwargs)
         # 使用 object.__setattr__ 绕过 Pydantic 的字段验证
         object.__setattr__(self, 'max_retries', max_retries)
         object.__setattr__(self, 'retry_delay', retry_delay)
+        object.__setattr__(self, 'embedding_store', embedding_store)
 
     def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """批量 embedding（优先查内容寻址存储，只请求未命中的文本）"""
+        if self.embedding_store is not None:
+            return self.embedding_store.get_or_embed(texts, self._request_text_embeddings)
+        return self._request_text_embeddings(texts)
+
+    def _request_text_embeddings(self, texts: List[str]) -> List[List[float]]:
         """带重试的批量 embedding"""
+        return self._with_retry(super()._get_text_embeddings, texts)
+
+    def get_query_embedding_batch(self, queries: List[str]) -> List[List[float]]:
+        """
+        批量查询 embedding（text_type="query"，与 get_query_embedding 一致）
+
+        每 embed_batch_size 条查询合并为一次请求，多查询检索时避免逐条请求
+        """
+        embeddings = []
+        for start in range(0, len(queries), self.embed_batch_size):
+            batch = queries[start:start + self.embed_batch_size]
+            embeddings.extend(self._with_retry(self._request_query_embeddings, batch))
+        return embeddings
+
+    def _request_query_embeddings(self, queries: List[str]) -> List[List[float]]:
+        embeddings = get_text_embedding(
+            self.model_name, queries, api_key=self._api_key, text_type="query"
+        )
+        if len(embeddings) != len(queries) or any(e is None for e in embeddings):
+            raise ValueError(f"Query embedding failed for batch of {len(queries)}")
+        return embeddings
+
+    def _with_retry(self, func, texts: List[str]) -> List[List[float]]:
+        """指数退避重试"""
         for attempt in range(self.max_retries):
             try:
-                return super()._get_text_embeddings(texts)
+                return func(texts)
             except (ConnectionError, Timeout, Exception) as e:
                 if attempt < self.max_retries - 1:
                     wait_time = self.retry_delay * (2 ** attempt)  # 指数退避
@@ -78,6 +122,9 @@ class LargeRAGIndexer:
                 "Please set it in .env file."
             )
 
+        # 初始化内容寻址 Embedding 存储（与分块参数无关，所有 collection 共享）
+        self.embedding_store = create_embedding_store(self.settings)
+
         # 初始化 Embedding 模型（带重试机制，使用配置文件中的模型）
         self.embed_model = RetryableDashScopeEmbedding(
             model_name=self.settings.embedding.model,
@@ -86,6 +133,7 @@ class LargeRAGIndexer:
             embed_batch_size=self.settings.embedding.batch_size,  # 显式设置批处理大小
             max_retries=3,  # 最多重试3次
             retry_delay=2.0,  # 初始延迟2秒，指数退避
+            embedding_store=self.embedding_store,
         )
 
         # 初始化 Chroma 客户端
@@ -208,6 +256,9 @@ class LargeRAGIndexer:
         nodes = self.pipeline.run(documents=documents, show_progress=True)
         logger.info(f"Generated {len(nodes)} nodes from {len(documents)} documents")
 
+        if self.embedding_store:
+            self.embedding_store.flush()
+
         # 创建 Chroma collection（添加距离度量配置）
         collection = self.chroma_client.get_or_create_collection(
             name=self.collection_name,
@@ -227,15 +278,42 @@ class LargeRAGIndexer:
         )
 
         logger.info("Index build completed and persisted to Chroma")
+
+        # 进程内检索后端：重新导出快照，查询走快照
+        if self.settings.vector_store.type != "chroma":
+            self.export_snapshot()
+            return self.load_index()
+
         return index
 
+    def export_snapshot(self) -> Dict[str, Any]:
+        """将 Chroma collection 导出为进程内检索快照（numpy / hnsw 后端使用）"""
+        collection = self.chroma_client.get_collection(name=self.collection_name)
+        return export_chroma_snapshot(
+            collection,
+            str(get_snapshot_dir(self.settings, self.collection_name)),
+            metric=self.settings.vector_store.distance_metric,
+            dtype=self.settings.vector_store.dtype,
+            dimension=self.settings.embedding.dimension,
+        )
+
+    def _load_vector_store(self):
+        """按 vector_store.type 选择查询后端"""
+        store_type = self.settings.vector_store.type
+        if store_type in ("numpy", "hnsw"):
+            return load_snapshot_vector_store(self.settings, self.chroma_client, self.collection_name)
+        if store_type != "chroma":
+            logger.warning(f"Unknown vector store type: {store_type}. Using chroma.")
+
+        collection = self.chroma_client.get_collection(
+            name=self.collection_name
+        )
+        return ChromaVectorStore(chroma_collection=collection)
+
     def load_index(self) -> Optional[VectorStoreIndex]:
         """从持久化存储加载索引"""
         try:
-            collection = self.chroma_client.get_collection(
-                name=self.collection_name
-            )
-            vector_store = ChromaVectorStore(chroma_collection=collection)
+            vector_store = self._load_vector_store()
 
             # 创建 StorageContext
             storage_context = StorageContext.from_defaults(vector_store=vector_store)
@@ -247,7 +325,10 @@ class LargeRAGIndexer:
                 embed_model=self.embed_model,
             )
 
-            logger.info(f"Index loaded from Chroma successfully (collection: {self.collection_name})")
+            logger.info(
+                f"Index loaded successfully (collection: {self.collection_name}, "
+                f"backend: {self.settings.vector_store.type})"
+            )
             return index
         except Exception as e:
             logger.error(f"Failed to load index from collection '{self.collection_name}': {e}")
@@ -259,10 +340,17 @@ class LargeRAGIndexer:
             collection = self.chroma_client.get_collection(
                 name=self.collection_name
             )
-            return {
+            stats = {
                 "collection_name": self.collection_name,
                 "document_count": collection.count(),
                 "persist_directory": self.settings.vector_store.persist_directory,
             }
+            if self.embedding_store:
+                stats["embedding_store_stats"] = self.embedding_store.get_stats()
+            snapshot_manifest = get_snapshot_dir(self.settings, self.collection_name) / "snapshot.json"
+            if self.settings.vector_store.type != "chroma" and snapshot_manifest.exists():
+                with open(snapshot_manifest, 'r', encoding='utf-8') as f:
+                    stats["snapshot"] = json.load(f)
+            return stats
         except:
             return {"error": "Index not found", "collection_name": self.collection_name}
@@ -4,9 +4,16 @@
 1. Document-level 缓存（真正的断点续传）
 2. 分批写入Chroma（每N个nodes写一次，降低中断风险）
 3. 自动跳过已处理的文献
+4. 并发 embedding（有界在途窗口 + 令牌桶限流，按文档顺序写入）
+5. 内容寻址 embedding 存储（修改分块参数后只为新文本计算 embedding）
+6. 支持流式文档输入（解析、分块、embedding 重叠进行）
+7. 文档清单（SQLite）记录已索引文献，跳过判断不再扫描 Chroma 元数据
+8. 增量同步：检测新增 / 修改 / 删除的文献，只删除过期 node、只为变化的文献计算 embedding
 """
 
-from typing import List, Optional, Dict, Any, Set
+from typing import Iterable, List, Optional, Dict, Any, Set
+from collections import deque
+from itertools import chain, groupby
 from llama_index.core import VectorStoreIndex, Document, StorageContext
 from llama_index.core.node_parser import SentenceSplitter
 from llama_index.core.schema import BaseNode, TextNode
@@ -23,6 +30,17 @@ from pathlib import Path
 from requests.exceptions import ConnectionError, Timeout
 
 from ..config.settings import SETTINGS, DASHSCOPE_API_KEY
+from .embedding_store import EmbeddingStore, create_embedding_store
+from .embedding_pipeline import ConcurrentEmbeddingPipeline, TokenBucketRateLimiter
+from .doc_manifest import (
+    DocumentManifest,
+    chunker_fingerprint,
+    compute_content_hash,
+    delete_from_collection,
+    embed_model_id,
+    get_manifest_path,
+)
+from .document_processor import DocumentProcessor, folder_fingerprint
 
 logger = logging.getLogger(__name__)
 
@@ -35,13 +53,15 @@ class DocumentLevelCache:
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         logger.info(f"Document-level cache initialized at: {self.cache_dir}")
 
-    def _get_cache_path(self, doc_hash: str) -> Path:
-        """获取文档缓存文件路径"""
+    def _get_cache_path(self, doc_hash: str, content_hash: Optional[str] = None) -> Path:
+        """获取文档缓存文件路径（带内容哈希时，文献内容变化后不会命中旧缓存）"""
+        if content_hash:
+            return self.cache_dir / f"{doc_hash}.{content_hash[:16]}.pkl"
         return self.cache_dir / f"{doc_hash}.pkl"
 
-    def get(self, doc_hash: str) -> Optional[List[BaseNode]]:
+    def get(self, doc_hash: str, content_hash: Optional[str] = None) -> Optional[List[BaseNode]]:
         """获取缓存的nodes"""
-        cache_path = self._get_cache_path(doc_hash)
+        cache_path = self._get_cache_path(doc_hash, content_hash)
 
         if not cache_path.exists():
             return None
@@ -61,9 +81,9 @@ class DocumentLevelCache:
                 pass
             return None
 
-    def put(self, doc_hash: str, nodes: List[BaseNode]) -> bool:
+    def put(self, doc_hash: str, nodes: List[BaseNode], content_hash: Optional[str] = None) -> bool:
         """保存nodes到缓存"""
-        cache_path = self._get_cache_path(doc_hash)
+        cache_path = self._get_cache_path(doc_hash, content_hash)
 
         try:
             # 直接pickle nodes对象（保留embedding）
@@ -76,6 +96,14 @@ class DocumentLevelCache:
             logger.warning(f"Failed to cache nodes for {doc_hash[:16]}...: {e}")
             return False
 
+    def remove(self, doc_hash: str) -> None:
+        """删除文献的全部缓存（含各内容版本）"""
+        for cache_path in chain(self.cache_dir.glob(f"{doc_hash}.pkl"), self.cache_dir.glob(f"{doc_hash}.*.pkl")):
+            try:
+                cache_path.unlink()
+            except OSError:
+                pass
+
     def get_stats(self) -> Dict[str, Any]:
         """获取缓存统计"""
         cache_files = list(self.cache_dir.glob("*.pkl"))
@@ -91,12 +119,26 @@ class DocumentLevelCache:
 class RetryableDashScopeEmbedding(DashScopeEmbedding):
     """带重试机制的 DashScope Embedding"""
 
-    def __init__(self, *args, max_retries: int = 3, retry_delay: float = 2.0, **kwargs):
+    def __init__(
+        self,
+        *args,
+        max_retries: int = 3,
+        retry_delay: float = 2.0,
+        embedding_store: Optional[EmbeddingStore] = None,
+        **kwargs
+    ):
         super().__init__(*args, **kwargs)
         object.__setattr__(self, 'max_retries', max_retries)
         object.__setattr__(self, 'retry_delay', retry_delay)
+        object.__setattr__(self, 'embedding_store', embedding_store)
 
     def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """批量 embedding（优先查内容寻址存储，只请求未命中的文本）"""
+        if self.embedding_store is not None:
+            return self.embedding_store.get_or_embed(texts, self._request_text_embeddings)
+        return self._request_text_embeddings(texts)
+
+    def _request_text_embeddings(self, texts: List[str]) -> List[List[float]]:
         """带重试的批量 embedding"""
         for attempt in range(self.max_retries):
             try:
@@ -117,7 +159,17 @@ class RetryableDashScopeEmbedding(DashScopeEmbedding):
 class LargeRAGIndexerV2:
     """向量索引构建和管理器 V2"""
 
-    def __init__(self, collection_name: Optional[str] = None):
+    def __init__(
+        self,
+        collection_name: Optional[str] = None,
+        embedding_store: Optional[EmbeddingStore] = None,
+    ):
+        """
+        Args:
+            collection_name: Collection 名称（默认使用配置文件中的值）
+            embedding_store: 已打开的 Embedding 存储（同一进程内与其他索引器共享，
+                避免同一目录被打开两次）；默认按配置新建
+        """
         self.settings = SETTINGS
         self.api_key = DASHSCOPE_API_KEY
         self.collection_name = collection_name or self.settings.vector_store.collection_name
@@ -128,6 +180,11 @@ class LargeRAGIndexerV2:
                 "Please set it in .env file."
             )
 
+        # 初始化内容寻址 Embedding 存储（与分块参数无关，所有 collection 共享）
+        if embedding_store is None:
+            embedding_store = create_embedding_store(self.settings)
+        self.embedding_store = embedding_store
+
         # 初始化 Embedding 模型
         self.embed_model = RetryableDashScopeEmbedding(
             model_name=self.settings.embedding.model,
@@ -136,6 +193,7 @@ class LargeRAGIndexerV2:
             embed_batch_size=self.settings.embedding.batch_size,
             max_retries=3,
             retry_delay=2.0,
+            embedding_store=self.embedding_store,
         )
 
         # 初始化 Chroma 客户端
@@ -152,6 +210,12 @@ class LargeRAGIndexerV2:
             cache_dir = Path(self.settings.cache.local_cache_dir) / "document_level_cache" / self.collection_name
             self.doc_cache = DocumentLevelCache(str(cache_dir))
 
+        # 初始化文档清单（按collection隔离）
+        self.manifest = DocumentManifest(str(get_manifest_path(self.settings, self.collection_name)))
+        self.chunker_config = chunker_fingerprint(self.settings)
+        self.embed_model_id = embed_model_id(self.settings)
+        self.last_build_stats: Dict[str, Any] = {}
+
     def _init_splitter(self):
         """初始化文档分块器"""
         splitter_type = self.settings.document_processing.splitter_type
@@ -194,23 +258,50 @@ class LargeRAGIndexerV2:
             )
             logger.info(f"Using token-based splitter (size={self.settings.document_processing.chunk_size}, overlap={self.settings.document_processing.chunk_overlap})")
 
-    def _get_processed_doc_hashes(self) -> Set[str]:
-        """从Chroma collection中提取已处理的文献哈希"""
+    def _get_collection(self):
+        """获取已有的Chroma collection（不存在时返回 None）"""
         try:
-            collection = self.chroma_client.get_collection(name=self.collection_name)
-            results = collection.get(include=['metadatas'])
-            metadatas = results.get('metadatas', [])
+            return self.chroma_client.get_collection(name=self.collection_name)
+        except Exception:
+            return None
 
-            doc_hashes = set()
-            for meta in metadatas:
-                if meta and 'doc_hash' in meta:
-                    doc_hashes.add(meta['doc_hash'])
+    def _get_processed_doc_hashes(self) -> Set[str]:
+        """
+        从文档清单中读取已处理的文献哈希
 
-            logger.info(f"Found {len(doc_hashes)} already processed documents in Chroma")
-            return doc_hashes
-        except:
+        先与Chroma对账：回滚上次中断时未写完的文献；清单缺失或与向量数不一致时
+        从Chroma元数据重建一次（旧collection首次使用清单时发生）
+        """
+        collection = self._get_collection()
+        if collection is None:
             logger.info("No existing collection found, will process all documents")
-            return set()
+        self.manifest.reconcile(collection)
+
+        doc_hashes = self.manifest.completed_doc_hashes()
+        logger.info(f"Found {len(doc_hashes)} already processed documents in manifest")
+        return doc_hashes
+
+    def _create_embedding_pipeline(self) -> ConcurrentEmbeddingPipeline:
+        """根据 embedding 配置创建并发 embedding 流水线（含令牌桶限流）"""
+        embedding_settings = self.settings.embedding
+        rate_limiter = None
+        if embedding_settings.rate_limit_rps > 0:
+            rate_limiter = TokenBucketRateLimiter(
+                rate=embedding_settings.rate_limit_rps,
+                capacity=embedding_settings.rate_limit_burst,
+            )
+
+        logger.info(
+            f"Embedding pipeline: batch_size={embedding_settings.batch_size}, "
+            f"max_in_flight={embedding_settings.max_in_flight}, "
+            f"rate_limit={embedding_settings.rate_limit_rps or 'disabled'} req/s"
+        )
+        return ConcurrentEmbeddingPipeline(
+            embed_fn=self.embed_model._get_text_embeddings,
+            batch_size=embedding_settings.batch_size,
+            max_in_flight=embedding_settings.max_in_flight,
+            rate_limiter=rate_limiter,
+        )
 
     def _write_nodes_batch_to_chroma(self, nodes: List[BaseNode]):
         """批量写入nodes到Chroma"""
@@ -231,7 +322,7 @@ class LargeRAGIndexerV2:
 
     def build_index_incremental(
         self,
-        documents: List[Document],
+        documents: Iterable[Document],
         batch_write_size: int = 500,
         show_progress: bool = True
     ) -> VectorStoreIndex:
@@ -239,7 +330,7 @@ class LargeRAGIndexerV2:
         增量构建索引（支持断点续传）
 
         Args:
-            documents: Document 对象列表
+            documents: Document 对象列表，或流式迭代器（如 DocumentProcessor.iter_from_folders()）
             batch_write_size: 每多少个nodes写一次Chroma（默认500）
             show_progress: 是否显示进度
 
@@ -248,11 +339,21 @@ class LargeRAGIndexerV2:
 
         特性：
         - Document-level 缓存：每个文档单独缓存，真正的断点续传
-        - 自动跳过已处理：检查Chroma中的doc_hash
+        - 自动跳过已处理：读取文档清单中的doc_hash（O(文献数)，不扫描Chroma元数据）
+        - 清单事务：文献写入Chroma前标记 pending，全部node写入后标记 complete，
+          中断后下次运行回滚未写完的文献并重新处理
         - 分批写入：每N个nodes写一次，降低中断风险
+        - 并发embedding：最多 embedding.max_in_flight 个请求在途，按 rate_limit_rps 限流，
+          文档按输入顺序交付给缓存和Chroma写入，中断后仍可从缓存/Chroma续传
+        - 流式输入：文档边解析边分块、embedding，预读窗口由 embedding 流水线限制，
+          内存占用与文献总数无关（无法预知总数，进度不显示 ETA）
         """
+        streaming = not isinstance(documents, list)
         logger.info(f"="*80)
-        logger.info(f"Starting incremental index build for {len(documents)} documents")
+        logger.info(
+            f"Starting incremental index build for "
+            f"{'streamed' if streaming else len(documents)} documents"
+        )
         logger.info(f"  Batch write size: {batch_write_size} nodes")
         logger.info(f"  Cache enabled: {self.doc_cache is not None}")
         logger.info(f"="*80)
@@ -262,94 +363,138 @@ class LargeRAGIndexerV2:
         # 1. 获取已处理的doc_hashes
         processed_doc_hashes = self._get_processed_doc_hashes()
 
-        # 2. 过滤未处理的documents
-        remaining_docs = [d for d in documents if d.metadata.get('doc_hash') not in processed_doc_hashes]
-        logger.info(f"\n文档统计:")
-        logger.info(f"  总文档数: {len(documents)}")
-        logger.info(f"  已处理: {len(processed_doc_hashes)}")
-        logger.info(f"  待处理: {len(remaining_docs)}")
-
-        if not remaining_docs:
-            logger.info("\n✓ 所有文档已处理完成！")
-            return self.load_index()
-
-        # 3. 逐个处理documents
+        # 2. 过滤未处理的documents（流式输入时在迭代过程中过滤）
+        if streaming:
+            remaining_docs = (d for d in documents if d.metadata.get('doc_hash') not in processed_doc_hashes)
+            total_remaining = None
+            logger.info(f"\n文档统计:")
+            logger.info(f"  已处理: {len(processed_doc_hashes)}")
+            logger.info(f"  待处理: 流式输入，边解析边处理")
+        else:
+            remaining_docs = [d for d in documents if d.metadata.get('doc_hash') not in processed_doc_hashes]
+            total_remaining = len({d.metadata.get('doc_hash') for d in remaining_docs})
+            logger.info(f"\n文档统计:")
+            logger.info(f"  总文档数: {len(documents)}")
+            logger.info(f"  已处理: {len(processed_doc_hashes)}")
+            logger.info(f"  待处理: {total_remaining}")
+
+            if not remaining_docs:
+                logger.info("\n✓ 所有文档已处理完成！")
+                self.last_build_stats = {"processed_docs": 0, "new_nodes": 0, "elapsed_seconds": time.time() - start_time}
+                return self.load_index()
+
+        # 3. 流水线处理documents：parsing（主线程）→ 并发embedding → 按顺序写入
         pending_nodes = []  # 待写入的nodes缓冲区
         total_new_nodes = 0
+        processed_docs = 0
         cache_hits = 0
         cache_misses = 0
 
-        logger.info(f"\n开始处理 {len(remaining_docs)} 个文档...\n")
+        logger.info(f"\n开始处理 {total_remaining if total_remaining is not None else '流式输入的'} 个文档...\n")
 
-        for i, doc in enumerate(remaining_docs):
-            if show_progress and (i + 1) % 10 == 0:
-                elapsed = time.time() - start_time
-                progress_pct = ((i + 1) / len(remaining_docs)) * 100
-                avg_time = elapsed / (i + 1)
-                eta = avg_time * (len(remaining_docs) - i - 1)
+        def iter_doc_nodes():
+            """按文献顺序产出 ((doc_hash, content_hash, from_cache), nodes)；缓存命中的nodes已带embedding"""
+            nonlocal cache_hits, cache_misses
 
-                logger.info(
-                    f"Progress: {i+1}/{len(remaining_docs)} ({progress_pct:.1f}%) | "
-                    f"Nodes: {total_new_nodes} | "
-                    f"Cache: {cache_hits} hits, {cache_misses} misses | "
-                    f"ETA: {eta/60:.1f}min"
-                )
+            # 同一文献的多个Document（未聚合JSON分块时）连续出现，按文献整体处理
+            for doc_hash, group in groupby(remaining_docs, key=lambda d: d.metadata.get('doc_hash')):
+                docs = list(group)
+                if not doc_hash:
+                    logger.warning(f"{len(docs)} documents missing doc_hash in metadata, skipping")
+                    continue
+                content_hash = compute_content_hash(docs)
 
-            doc_hash = doc.metadata.get('doc_hash')
-            if not doc_hash:
-                logger.warning(f"Document missing doc_hash in metadata, skipping")
-                continue
-
-            # 3.1 检查document-level缓存
-            nodes = None
-            if self.doc_cache:
-                nodes = self.doc_cache.get(doc_hash)
-                if nodes:
-                    cache_hits += 1
-                    # 确保缓存的nodes也有doc_hash
-                    for node in nodes:
-                        if 'doc_hash' not in node.metadata:
-                            node.metadata['doc_hash'] = doc_hash
+                # 3.1 检查document-level缓存
+                nodes = None
+                from_cache = False
+                if self.doc_cache:
+                    nodes = self.doc_cache.get(doc_hash, content_hash)
+                    if nodes:
+                        cache_hits += 1
+                        from_cache = True
 
-            # 3.2 缓存未命中：parsing + embedding
-            if nodes is None:
-                cache_misses += 1
+                # 3.2 缓存未命中：parsing（embedding交给流水线并发处理）
+                if nodes is None:
+                    cache_misses += 1
+                    nodes = self.splitter(docs)
 
-                # Parsing
-                nodes = self.splitter([doc])
+                    # 文本相同的chunk直接复用内容寻址存储中的embedding，不占用请求配额
+                    if self.embedding_store:
+                        self.embedding_store.fill_nodes(nodes)
 
                 # 确保nodes继承doc_hash（用于后续识别已处理文献）
                 for node in nodes:
                     if 'doc_hash' not in node.metadata:
                         node.metadata['doc_hash'] = doc_hash
 
-                # Embedding（分批处理，遵循API的batch_size限制）
-                batch_size = self.settings.embedding.batch_size  # 10
-                for i in range(0, len(nodes), batch_size):
-                    batch_nodes = nodes[i:i + batch_size]
-                    texts = [node.get_content() for node in batch_nodes]
-                    embeddings = self.embed_model._get_text_embeddings(texts)
+                yield (doc_hash, content_hash, from_cache), nodes
 
-                    for node, embedding in zip(batch_nodes, embeddings):
-                        node.embedding = embedding
+        # 缓冲区中尚未完全写入Chroma的文献：(doc_hash, 该文献最后一个node在本次运行中的序号)
+        unwritten_docs = deque()
+        nodes_written = 0
 
-                # 保存到document-level缓存
-                if self.doc_cache:
-                    self.doc_cache.put(doc_hash, nodes)
+        def flush(batch: List[BaseNode]):
+            """写入一批nodes，并将node已全部写入的文献标记为 complete"""
+            nonlocal nodes_written
+            self._write_nodes_batch_to_chroma(batch)
+            nodes_written += len(batch)
+            finished = []
+            while unwritten_docs and unwritten_docs[0][1] <= nodes_written:
+                finished.append(unwritten_docs.popleft()[0])
+            if finished:
+                self.manifest.complete(finished)
+
+        embedding_pipeline = self._create_embedding_pipeline()
+
+        for (doc_hash, content_hash, from_cache), nodes in embedding_pipeline.run(iter_doc_nodes()):
+            processed_docs += 1
+            if show_progress and processed_docs % 10 == 0:
+                elapsed = time.time() - start_time
+                if total_remaining is not None:
+                    progress_pct = (processed_docs / total_remaining) * 100
+                    avg_time = elapsed / processed_docs
+                    eta = avg_time * (total_remaining - processed_docs)
+                    progress = f"{processed_docs}/{total_remaining} ({progress_pct:.1f}%)"
+                    eta_text = f"ETA: {eta/60:.1f}min"
+                else:
+                    progress = f"{processed_docs}"
+                    eta_text = f"Elapsed: {elapsed/60:.1f}min"
+
+                logger.info(
+                    f"Progress: {progress} | "
+                    f"Nodes: {total_new_nodes} | "
+                    f"Cache: {cache_hits} hits, {cache_misses} misses | "
+                    f"{eta_text}"
+                )
 
-            # 3.3 添加到待写入缓冲区
+            # 3.3 新计算的embedding保存到document-level缓存（文档完整embedding后才交付）
+            if self.doc_cache and not from_cache:
+                self.doc_cache.put(doc_hash, nodes, content_hash)
+
+            # 3.4 在清单中标记为 pending，添加到待写入缓冲区
+            self.manifest.begin([{
+                "doc_hash": doc_hash,
+                "node_ids": [node.node_id for node in nodes],
+                "content_hash": content_hash,
+                "chunker_config": self.chunker_config,
+                "embed_model": self.embed_model_id,
+            }])
             pending_nodes.extend(nodes)
             total_new_nodes += len(nodes)
+            unwritten_docs.append((doc_hash, total_new_nodes))
 
-            # 3.4 达到batch_write_size，写入Chroma
+            # 3.5 达到batch_write_size，写入Chroma
             if len(pending_nodes) >= batch_write_size:
                 write_batch = pending_nodes[:batch_write_size]
-                self._write_nodes_batch_to_chroma(write_batch)
+                flush(write_batch)
                 pending_nodes = pending_nodes[batch_write_size:]
 
         # 4. 写入剩余nodes
-        if pending_nodes:
-            self._write_nodes_batch_to_chroma(pending_nodes)
+        if pending_nodes or unwritten_docs:
+            flush(pending_nodes)
+
+        if self.embedding_store:
+            self.embedding_store.flush()
 
         # 5. 完成统计
         total_time = time.time() - start_time
@@ -357,16 +502,171 @@ class LargeRAGIndexerV2:
         logger.info(f"✅ Index build completed!")
         logger.info(f"{'='*80}")
         logger.info(f"\n统计:")
-        logger.info(f"  处理文档数: {len(remaining_docs)}")
+        logger.info(f"  处理文档数: {processed_docs}")
         logger.info(f"  新增nodes: {total_new_nodes:,}")
         logger.info(f"  缓存命中率: {cache_hits}/{cache_hits+cache_misses} ({100*cache_hits/(cache_hits+cache_misses):.1f}%)" if (cache_hits+cache_misses) > 0 else "  缓存: N/A")
         logger.info(f"  总耗时: {total_time/60:.1f}分钟 ({total_time/3600:.2f}小时)")
-        logger.info(f"  平均速度: {len(remaining_docs)/(total_time/60):.1f} 文档/分钟")
+        logger.info(f"  平均速度: {processed_docs/(total_time/60):.1f} 文档/分钟")
+        logger.info(f"  Embedding: {embedding_pipeline.get_stats()}")
+        self.last_build_stats = {
+            "processed_docs": processed_docs,
+            "new_nodes": total_new_nodes,
+            "elapsed_seconds": total_time,
+            "cache_hits": cache_hits,
+            "cache_misses": cache_misses,
+        }
 
         # 6. 加载并返回索引
         logger.info(f"\n加载完整索引...")
         return self.load_index()
 
+    def sync_from_folders(
+        self,
+        literature_dir: str,
+        doc_processor: Optional[DocumentProcessor] = None,
+        batch_write_size: int = 500,
+        show_progress: bool = True
+    ) -> Dict[str, Any]:
+        """
+        增量同步文献目录与索引
+
+        Args:
+            literature_dir: 文献目录（结构同 DocumentProcessor.process_from_folders）
+            doc_processor: 文档处理器（默认按配置新建）
+            batch_write_size: 每多少个nodes写一次Chroma
+            show_progress: 是否显示进度
+
+        Returns:
+            差异摘要：added / modified / removed / unchanged 文献数、删除和新增的 node 数、
+            耗时及相对全量构建节省的时间（估算）
+
+        流程：
+        1. 按源文件指纹（文件名 + 大小 + 修改时间）筛出可能变化的文件夹，未变化的不解析
+        2. 解析候选文件夹，内容哈希、分块配置、embedding 模型都未变的只更新指纹（如文件被复制/touch）
+        3. 从 Chroma 删除已删除和已修改文献的 node（按清单中的 node ids，不扫描元数据）
+        4. 只为新增和修改的文献分块、计算 embedding 并写入（复用 build_index_incremental）
+
+        清单从旧 collection 重建（内容哈希未知）的文献，首次同步时认为已有索引与当前文件一致，
+        只补全内容哈希，不重新计算 embedding。
+        """
+        start_time = time.time()
+        literature_path = Path(literature_dir)
+        if not literature_path.exists():
+            raise FileNotFoundError(f"Literature directory not found: {literature_dir}")
+        doc_processor = doc_processor or DocumentProcessor()
+
+        collection = self._get_collection()
+        self.manifest.reconcile(collection)
+        entries = self.manifest.get_entries()
+        fingerprints = self.manifest.get_fingerprints()
+
+        # 1. 按指纹分类
+        current: Dict[str, str] = {}
+        added_folders, candidate_folders = [], []
+        unchanged = 0
+        for folder in sorted(literature_path.iterdir()):
+            if not folder.is_dir():
+                continue
+            fingerprint = folder_fingerprint(folder)
+            if fingerprint is None:
+                continue
+            current[folder.name] = fingerprint
+
+            entry = entries.get(folder.name)
+            if entry is None:
+                added_folders.append(str(folder))
+            elif (
+                fingerprints.get(folder.name) == fingerprint
+                and entry["chunker_config"] == self.chunker_config
+                and entry["embed_model"] == self.embed_model_id
+            ):
+                unchanged += 1
+            else:
+                candidate_folders.append(str(folder))
+        removed = [doc_hash for doc_hash in entries if doc_hash not in current]
+
+        # 2. 解析候选文件夹，按内容哈希确认是否真的变化
+        modified, modified_docs = [], []
+        touched = adopted = 0
+        seen = set()
+        candidate_docs = doc_processor.iter_documents(candidate_folders)
+        for doc_hash, group in groupby(candidate_docs, key=lambda d: d.metadata.get('doc_hash')):
+            docs = list(group)
+            seen.add(doc_hash)
+            content_hash = compute_content_hash(docs)
+            entry = entries[doc_hash]
+
+            if entry["content_hash"] is None:
+                self.manifest.update_hashes(doc_hash, content_hash, self.chunker_config, self.embed_model_id)
+                adopted += 1
+            elif self.manifest.is_current(doc_hash, content_hash, self.chunker_config, self.embed_model_id):
+                touched += 1
+            else:
+                modified.append(doc_hash)
+                modified_docs.extend(docs)
+        # 解析后没有任何文本的文件夹：旧 node 同样过期
+        modified.extend(Path(f).name for f in candidate_folders if Path(f).name not in seen)
+
+        logger.info(f"\n同步差异:")
+        logger.info(f"  新增: {len(added_folders)}")
+        logger.info(f"  修改: {len(modified)}")
+        logger.info(f"  删除: {len(removed)}")
+        logger.info(f"  未变化: {unchanged + touched + adopted}（其中仅指纹变化 {touched}，补全内容哈希 {adopted}）")
+
+        # 3. 删除过期 node：清单标记 pending → 从 Chroma 删除 → 移除清单记录
+        #    任一步后中断，下次 reconcile() 回滚 pending 文献（删除残留 node），这些文献随后视为新增
+        stale = removed + modified
+        deleted_nodes = self.manifest.mark_pending(stale)
+        if collection is not None and deleted_nodes:
+            delete_from_collection(collection, deleted_nodes)
+            logger.info(f"✓ Deleted {len(deleted_nodes)} stale nodes from Chroma")
+        self.manifest.remove(stale)
+        if self.doc_cache:
+            for doc_hash in removed:
+                self.doc_cache.remove(doc_hash)
+
+        # 4. 只处理新增和修改的文献
+        self.last_build_stats = {"processed_docs": 0, "new_nodes": 0, "elapsed_seconds": 0.0}
+        if added_folders or modified_docs:
+            documents = chain(modified_docs, doc_processor.iter_documents(added_folders))
+            self.build_index_incremental(documents, batch_write_size=batch_write_size, show_progress=show_progress)
+
+        completed = self.manifest.completed_doc_hashes()
+        self.manifest.set_fingerprints({h: fp for h, fp in current.items() if h in completed})
+
+        # 5. 差异摘要（全量构建耗时按每篇文献的平均处理时间估算）
+        elapsed = time.time() - start_time
+        build_stats = self.last_build_stats
+        if build_stats["processed_docs"] > 0:
+            self.manifest.set_meta(
+                "seconds_per_doc", str(build_stats["elapsed_seconds"] / build_stats["processed_docs"])
+            )
+        seconds_per_doc = self.manifest.get_meta("seconds_per_doc")
+        estimated_full = float(seconds_per_doc) * len(current) if seconds_per_doc else None
+
+        summary = {
+            "added": len(added_folders),
+            "modified": len(modified),
+            "removed": len(removed),
+            "unchanged": unchanged + touched + adopted,
+            "deleted_nodes": len(deleted_nodes),
+            "new_nodes": build_stats["new_nodes"],
+            "elapsed_seconds": round(elapsed, 2),
+            "estimated_full_build_seconds": round(estimated_full, 2) if estimated_full is not None else None,
+            "time_saved_seconds": round(max(estimated_full - elapsed, 0.0), 2) if estimated_full is not None else None,
+        }
+
+        logger.info(f"\n{'='*80}")
+        logger.info(f"✅ Sync completed")
+        logger.info(f"  新增nodes: {summary['new_nodes']:,} | 删除nodes: {summary['deleted_nodes']:,}")
+        logger.info(f"  耗时: {elapsed/60:.1f}分钟")
+        if estimated_full is not None:
+            logger.info(
+                f"  全量构建估算: {estimated_full/60:.1f}分钟（节省 {summary['time_saved_seconds']/60:.1f}分钟）"
+            )
+        logger.info(f"{'='*80}")
+        return summary
+
     def load_index(self) -> Optional[VectorStoreIndex]:
         """从持久化存储加载索引"""
         try:
@@ -399,6 +699,9 @@ class LargeRAGIndexerV2:
             # 添加缓存统计
             if self.doc_cache:
                 stats["cache_stats"] = self.doc_cache.get_stats()
+            if self.embedding_store:
+                stats["embedding_store_stats"] = self.embedding_store.get_stats()
+            stats["manifest_stats"] = self.manifest.get_stats()
 
             return stats
         except:
@@ -0,0 +1,236 @@
+"""
+LlamaIndex 向量存储适配器：基于 VectorSnapshot 的进程内检索
+要求：
+1. 作为 vector_store.type = "numpy" / "hnsw" 的后端，替代查询路径上的 ChromaVectorStore
+2. 与 VectorIndexRetriever 兼容（返回 nodes + similarities）
+3. 只读：写入仍走 Chroma，写入后重新导出快照
+4. 多查询批量检索（numpy 快照和 Chroma 均为一次调用，共享候选只还原一次）
+"""
+
+from typing import Any, List, Optional, Sequence
+from pathlib import Path
+import logging
+import math
+
+import numpy as np
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.schema import BaseNode, TextNode
+from llama_index.core.vector_stores.types import (
+    BasePydanticVectorStore,
+    FilterOperator,
+    MetadataFilters,
+    VectorStoreQuery,
+    VectorStoreQueryResult,
+)
+from llama_index.core.vector_stores.utils import (
+    legacy_metadata_dict_to_node,
+    metadata_dict_to_node,
+)
+
+from .vector_snapshot import VectorSnapshot, export_chroma_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+def record_to_node(record: dict) -> BaseNode:
+    """将快照记录还原为 node（与 ChromaVectorStore 的还原逻辑一致）"""
+    metadata = record.get("metadata") or {}
+    text = record.get("text") or ""
+    try:
+        return metadata_dict_to_node(metadata, text=text)
+    except Exception:
+        metadata, node_info, relationships = legacy_metadata_dict_to_node(metadata)
+        return TextNode(
+            text=text,
+            id_=record["id"],
+            metadata=metadata,
+            start_char_idx=node_info.get("start", None),
+            end_char_idx=node_info.get("end", None),
+            relationships=relationships,
+        )
+
+
+class NumpyVectorStore(BasePydanticVectorStore):
+    """
+    进程内只读向量存储
+
+    检索 = 一次矩阵乘法 + argpartition（或 HNSW），只为 top-k 命中读取文本和元数据
+    """
+
+    stores_text: bool = True
+    is_embedding_query: bool = True
+
+    _snapshot: VectorSnapshot = PrivateAttr()
+
+    def __init__(self, snapshot: VectorSnapshot, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._snapshot = snapshot
+
+    @classmethod
+    def from_snapshot_dir(
+        cls,
+        snapshot_dir: str,
+        use_hnsw: bool = False,
+        hnsw_ef_search: int = 64,
+    ) -> "NumpyVectorStore":
+        return cls(VectorSnapshot(snapshot_dir, use_hnsw=use_hnsw, hnsw_ef_search=hnsw_ef_search))
+
+    @property
+    def client(self) -> Any:
+        return self._snapshot
+
+    @property
+    def snapshot(self) -> VectorSnapshot:
+        return self._snapshot
+
+    def add(self, nodes: Sequence[BaseNode], **add_kwargs: Any) -> List[str]:
+        raise NotImplementedError(
+            "NumpyVectorStore is read-only. Write to Chroma and re-export the snapshot."
+        )
+
+    def delete(self, ref_doc_id: str, **delete_kwargs: Any) -> None:
+        raise NotImplementedError(
+            "NumpyVectorStore is read-only. Delete from Chroma and re-export the snapshot."
+        )
+
+    def _filters_to_mask(self, filters: MetadataFilters) -> np.ndarray:
+        """将等值元数据过滤转换为布尔掩码（需逐行读取元数据，较慢）"""
+        for f in filters.filters:
+            if getattr(f, "operator", FilterOperator.EQ) != FilterOperator.EQ:
+                raise NotImplementedError("NumpyVectorStore only supports EQ metadata filters")
+
+        mask = np.zeros(len(self._snapshot), dtype=bool)
+        for row in range(len(self._snapshot)):
+            metadata = self._snapshot.get_record(row).get("metadata") or {}
+            matches = [metadata.get(f.key) == f.value for f in filters.filters]
+            mask[row] = all(matches) if filters.condition == "and" else any(matches)
+        return mask
+
+    def query(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
+        """向量检索"""
+        if query.query_embedding is None:
+            raise ValueError("NumpyVectorStore requires query_embedding")
+
+        mask = self._filters_to_mask(query.filters) if query.filters else None
+        rows, similarities = self._snapshot.search(
+            np.asarray(query.query_embedding, dtype=np.float32),
+            top_k=query.similarity_top_k,
+            mask=mask,
+        )
+
+        nodes, scores, ids = [], [], []
+        for row, score in zip(rows[0], similarities[0]):
+            if mask is not None and not mask[row]:
+                continue
+            record = self._snapshot.get_record(int(row))
+            nodes.append(record_to_node(record))
+            scores.append(float(score))
+            ids.append(record["id"])
+
+        return VectorStoreQueryResult(nodes=nodes, similarities=scores, ids=ids)
+
+    def query_batch(
+        self,
+        query_embeddings: Sequence[Sequence[float]],
+        similarity_top_k: int,
+    ) -> List[VectorStoreQueryResult]:
+        """
+        多查询检索：一次矩阵乘法为所有查询打分
+
+        多个查询共享的候选只读取和还原一次（返回的 node 对象在结果间共享）
+        """
+        rows, similarities = self._snapshot.search(
+            np.asarray(query_embeddings, dtype=np.float32),
+            top_k=similarity_top_k,
+        )
+
+        nodes_by_row = {}
+        results = []
+        for query_rows, query_sims in zip(rows, similarities):
+            nodes, scores, ids = [], [], []
+            for row, score in zip(query_rows, query_sims):
+                row = int(row)
+                if row not in nodes_by_row:
+                    record = self._snapshot.get_record(row)
+                    nodes_by_row[row] = (record["id"], record_to_node(record))
+                node_id, node = nodes_by_row[row]
+                nodes.append(node)
+                scores.append(float(score))
+                ids.append(node_id)
+            results.append(VectorStoreQueryResult(nodes=nodes, similarities=scores, ids=ids))
+        return results
+
+
+def chroma_query_batch(
+    collection,
+    query_embeddings: Sequence[Sequence[float]],
+    n_results: int,
+) -> List[VectorStoreQueryResult]:
+    """
+    Chroma 多查询检索：一次 collection.query 完成所有查询
+
+    相似度与 ChromaVectorStore 一致（exp(-distance)），共享候选只还原一次
+    """
+    results = collection.query(
+        query_embeddings=[list(map(float, e)) for e in query_embeddings],
+        n_results=n_results,
+        include=["documents", "metadatas", "distances"],
+    )
+
+    nodes_by_id = {}
+    batch_results = []
+    for ids, texts, metadatas, distances in zip(
+        results["ids"], results["documents"], results["metadatas"], results["distances"]
+    ):
+        nodes, scores = [], []
+        for node_id, text, metadata, distance in zip(ids, texts, metadatas, distances):
+            if node_id not in nodes_by_id:
+                nodes_by_id[node_id] = record_to_node(
+                    {"id": node_id, "text": text, "metadata": metadata}
+                )
+            nodes.append(nodes_by_id[node_id])
+            scores.append(math.exp(-distance))
+        batch_results.append(VectorStoreQueryResult(nodes=nodes, similarities=scores, ids=list(ids)))
+    return batch_results
+
+
+def get_snapshot_dir(settings, collection_name: str) -> Path:
+    """快照目录（未配置 snapshot_dir 时放在 Chroma 持久化目录下）"""
+    vs_settings = settings.vector_store
+    root = vs_settings.snapshot_dir or str(Path(vs_settings.persist_directory) / "snapshots")
+    return Path(root) / collection_name
+
+
+def load_snapshot_vector_store(settings, chroma_client, collection_name: str) -> NumpyVectorStore:
+    """
+    按配置加载快照向量存储（快照不存在时从 Chroma collection 自动导出）
+
+    快照目录：{vector_store.snapshot_dir}/{collection_name}
+    """
+    vs_settings = settings.vector_store
+    snapshot_dir = get_snapshot_dir(settings, collection_name)
+
+    collection = chroma_client.get_collection(name=collection_name)
+    if not (snapshot_dir / "snapshot.json").exists():
+        logger.info(f"No vector snapshot for '{collection_name}', exporting from Chroma...")
+        export_chroma_snapshot(
+            collection,
+            str(snapshot_dir),
+            metric=vs_settings.distance_metric,
+            dtype=vs_settings.dtype,
+            dimension=settings.embedding.dimension,
+        )
+
+    store = NumpyVectorStore.from_snapshot_dir(
+        str(snapshot_dir),
+        use_hnsw=(vs_settings.type == "hnsw"),
+        hnsw_ef_search=vs_settings.hnsw_ef_search,
+    )
+
+    chroma_count = collection.count()
+    if chroma_count != len(store.snapshot):
+        logger.warning(
+            f"Vector snapshot is stale ({len(store.snapshot)} vectors, Chroma has {chroma_count}). "
+            f"Re-export with scripts/export_vector_snapshot.py"
+        )
+    return store
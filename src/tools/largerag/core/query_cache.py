@@ -0,0 +1,311 @@
+"""
+查询缓存模块（两级）
+要求：
+1. 一级：查询文本 → 查询 embedding
+2. 二级：(查询, 候选 node id 集合, top_n) → Reranker 分数
+3. 内存有界（LRU + TTL 淘汰），可选磁盘持久化（LocalFileCache 分段存储），命中率统计
+4. 向量库内容变化（generation 变化）时整体失效
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from collections import OrderedDict
+from pathlib import Path
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from .cache import LocalFileCache
+from .embedding_store import normalize_text
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = "__generation__"
+
+
+class TTLLRUCache:
+    """
+    有界 LRU 缓存（条目带过期时间）
+
+    - 超过 max_entries 时淘汰最久未使用的条目
+    - 读取时发现过期的条目视为未命中并删除
+    - 可选 disk：内存未命中时回落到磁盘，写入时同步写磁盘（重启后仍有效）
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl: float = 86400,
+        disk: Optional[LocalFileCache] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk = disk
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl > 0 and time.time() - created_at > self.ttl
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[0]):
+                del self._entries[key]
+                entry = None
+
+            if entry is None and self.disk is not None:
+                entry = self.disk.get(key)
+                if entry is not None and self._expired(entry[0]):
+                    self.disk.delete(key)
+                    entry = None
+                if entry is not None:
+                    self.disk_hits += 1
+                    self._insert(key, tuple(entry))
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, value: Any) -> None:
+        entry = (time.time(), value)
+        with self._lock:
+            self._insert(key, entry)
+            if self.disk is not None:
+                self.disk.set(key, entry)
+
+    def _insert(self, key: str, entry: Tuple[float, Any]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self.disk is not None:
+                self.disk.clear()
+
+    def flush(self) -> None:
+        if self.disk is not None:
+            self.disk.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class QueryCache:
+    """
+    LargeRAG 查询缓存
+
+    使用示例：
+        cache = QueryCache(model="text-embedding-v3", generation_fn=lambda: "count:123")
+        embedding = cache.get_embedding(query)
+        if embedding is None:
+            embedding = embed(query)
+            cache.put_embedding(query, embedding)
+
+    失效：
+        generation_fn 返回向量库当前版本标识（如 Chroma 条目数 + 数据文件修改时间），
+        每 check_interval 秒检查一次，变化时清空两级缓存（含磁盘）
+    """
+
+    def __init__(
+        self,
+        model: str,
+        rerank_model: str = "",
+        max_entries: int = 10000,
+        ttl: float = 86400,
+        persist_dir: Optional[str] = None,
+        generation_fn: Optional[Callable[[], str]] = None,
+        check_interval: float = 30.0,
+    ):
+        self.model = model
+        self.rerank_model = rerank_model
+        self.generation_fn = generation_fn
+        self.check_interval = check_interval
+
+        embedding_disk = rerank_disk = None
+        self._meta = None
+        if persist_dir:
+            root = Path(persist_dir)
+            embedding_disk = LocalFileCache(str(root), "query_embeddings")
+            rerank_disk = LocalFileCache(str(root), "rerank_scores")
+            self._meta = LocalFileCache(str(root), "meta")
+
+        self.embeddings = TTLLRUCache(max_entries, ttl, embedding_disk)
+        self.rerank = TTLLRUCache(max_entries, ttl, rerank_disk)
+
+        self._generation = self._meta.get(GENERATION_KEY) if self._meta else None
+        self._last_check = 0.0
+        self._check_lock = threading.Lock()
+        self.invalidations = 0
+
+    # ============ 失效 ============
+    def refresh(self, force: bool = False) -> bool:
+        """
+        检查向量库版本，变化时清空缓存
+
+        Returns:
+            是否发生了失效
+        """
+        if self.generation_fn is None:
+            return False
+
+        with self._check_lock:
+            now = time.monotonic()
+            if not force and now - self._last_check < self.check_interval:
+                return False
+            self._last_check = now
+
+            try:
+                generation = self.generation_fn()
+            except Exception as e:
+                logger.warning(f"Failed to read collection generation: {e}")
+                return False
+
+            if generation == self._generation:
+                return False
+
+            invalidated = self._generation is not None
+            if invalidated:
+                logger.info(f"Collection changed ({self._generation} -> {generation}), clearing query cache")
+                self.clear()
+                self.invalidations += 1
+            self._generation = generation
+            if self._meta is not None:
+                self._meta.set(GENERATION_KEY, generation)
+            return invalidated
+
+    def set_generation_fn(self, generation_fn: Optional[Callable[[], str]]) -> None:
+        """改用新的版本函数（查询引擎重建后），下次查询时立即检查"""
+        with self._check_lock:
+            self.generation_fn = generation_fn
+            self._last_check = 0.0
+
+    def clear(self) -> None:
+        self.embeddings.clear()
+        self.rerank.clear()
+
+    # ============ 一级：查询 embedding ============
+    def _embedding_key(self, query: str) -> str:
+        return f"{self.model}:{normalize_text(query)}"
+
+    def get_embedding(self, query: str) -> Optional[List[float]]:
+        return self.embeddings.get(self._embedding_key(query))
+
+    def put_embedding(self, query: str, embedding: Sequence[float]) -> None:
+        self.embeddings.put(self._embedding_key(query), [float(x) for x in embedding])
+
+    # ============ 二级：Reranker 分数 ============
+    def _rerank_key(self, query: str, candidate_ids: Sequence[str], top_n: int) -> str:
+        payload = json.dumps(
+            [self.rerank_model, normalize_text(query), sorted(candidate_ids), top_n],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_rerank(
+        self,
+        query: str,
+        candidate_ids: Sequence[str],
+        top_n: int,
+    ) -> Optional[List[Tuple[str, float]]]:
+        """返回 [(node_id, score)]（按分数降序），未命中返回 None"""
+        return self.rerank.get(self._rerank_key(query, candidate_ids, top_n))
+
+    def put_rerank(
+        self,
+        query: str,
+        candidate_ids: Sequence[str],
+        top_n: int,
+        scores: Sequence[Tuple[str, float]],
+    ) -> None:
+        self.rerank.put(
+            self._rerank_key(query, candidate_ids, top_n),
+            [(node_id, float(score)) for node_id, score in scores],
+        )
+
+    # ============ 统计 / 资源 ============
+    def flush(self) -> None:
+        self.embeddings.flush()
+        self.rerank.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "embedding": self.embeddings.get_stats(),
+            "rerank": self.rerank.get_stats(),
+            "generation": self._generation,
+            "invalidations": self.invalidations,
+            "persistent": self._meta is not None,
+        }
+
+
+# 持久化查询缓存按目录共享：查询引擎重建（sync_from_folders / index_from_folders）
+# 时复用同一实例，不在同一目录上再打开一组分段存储
+_persistent_caches: Dict[str, QueryCache] = {}
+_persistent_lock = threading.Lock()
+
+
+def create_query_cache(
+    settings,
+    generation_fn: Optional[Callable[[], str]] = None,
+) -> Optional[QueryCache]:
+    """
+    按配置创建查询缓存（cache.query_cache 关闭时返回 None）
+
+    持久化缓存每个目录在进程内只创建一次，之后返回同一实例并改用新的
+    generation_fn（下次查询时立即检查向量库版本）
+    """
+    cache_settings = settings.cache
+    if not cache_settings.query_cache:
+        return None
+
+    persist_dir = None
+    if cache_settings.query_cache_persist and cache_settings.local_cache_dir:
+        persist_dir = str((Path(cache_settings.local_cache_dir) / "query_cache").resolve())
+
+    def build() -> QueryCache:
+        return QueryCache(
+            model=f"{settings.embedding.model}:{settings.embedding.dimension}",
+            rerank_model=settings.reranker.model,
+            max_entries=cache_settings.query_cache_max_entries,
+            ttl=cache_settings.query_cache_ttl,
+            persist_dir=persist_dir,
+            generation_fn=generation_fn,
+        )
+
+    if persist_dir is None:
+        return build()
+
+    with _persistent_lock:
+        cache = _persistent_caches.get(persist_dir)
+        if cache is None:
+            cache = _persistent_caches[persist_dir] = build()
+        else:
+            cache.set_generation_fn(generation_fn)
+            logger.debug(f"Reusing persistent query cache at {persist_dir}")
+        return cache
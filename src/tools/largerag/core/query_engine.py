@@ -4,19 +4,25 @@
 1. 两阶段检索：向量召回 → Reranker 精排
 2. 支持自定义查询参数（top_k, threshold）
 3. 返回格式化结果（含来源信息）
+4. 多查询批量检索：一次 embedding 请求 + 一次向量召回，Reranker 按查询并发
+5. 检索组件只创建一次（复用 HTTP 会话），记录分阶段延迟
+6. 查询 embedding / Reranker 分数两级缓存，向量库变化时失效
 """
 
 from typing import List, Dict, Any, Optional
+from pathlib import Path
 from llama_index.core import VectorStoreIndex
 from llama_index.core.query_engine import RetrieverQueryEngine
 from llama_index.core.retrievers import VectorIndexRetriever
 from llama_index.core.postprocessor.types import BaseNodePostprocessor
 from llama_index.core.schema import NodeWithScore, QueryBundle
-from llama_index.postprocessor.dashscope_rerank import DashScopeRerank
 from llama_index.llms.dashscope import DashScope
 import logging
 
 from ..config.settings import SETTINGS, DASHSCOPE_API_KEY
+from .numpy_vector_store import NumpyVectorStore
+from .query_cache import create_query_cache
+from .retrieval_pipeline import DashScopeRerankClient, RetrievalPipeline, SessionDashScopeRerank
 
 logger = logging.getLogger(__name__)
 
@@ -78,15 +84,33 @@ class LargeRAGQueryEngine:
             max_tokens=self.settings.llm.max_tokens,
         )
 
-        # 初始化 Reranker
+        # 初始化 Reranker（共享 keep-alive HTTP 会话，查询时按需指定 top_n）
         self.reranker = None
         if self.settings.reranker.enabled:
-            self.reranker = DashScopeRerank(
-                model=self.settings.reranker.model,
-                api_key=self.api_key,
+            self.reranker = SessionDashScopeRerank(
+                client=DashScopeRerankClient(
+                    api_key=self.api_key,
+                    model=self.settings.reranker.model,
+                    timeout=self.settings.reranker.timeout,
+                    pool_size=self.settings.retrieval.batch_rerank_workers,
+                ),
                 top_n=self.settings.retrieval.rerank_top_n,
             )
 
+        # 查询缓存（查询 embedding + Reranker 分数）
+        self.query_cache = create_query_cache(self.settings, generation_fn=self._collection_generation)
+
+        # 检索流水线（get_similar_documents 使用，所有查询复用）
+        self.pipeline = RetrievalPipeline(
+            index=self.index,
+            reranker=self.reranker,
+            similarity_top_k=self.settings.retrieval.similarity_top_k,
+            rerank_top_n=self.settings.retrieval.rerank_top_n,
+            rerank_threshold=self.settings.retrieval.rerank_threshold,
+            rerank_workers=self.settings.retrieval.batch_rerank_workers,
+            cache=self.query_cache,
+        )
+
         # 构建查询引擎
         self._build_query_engine()
 
@@ -159,64 +183,62 @@ class LargeRAGQueryEngine:
             文档列表，格式：[{"text": ..., "score": ..., "metadata": ...}]
 
         工作流程：
-            1. 向量召回 similarity_top_k 个候选文档
+            1. 向量召回候选文档（至少 similarity_top_k 个，且不少于 top_k 的 2 倍）
             2. Reranker 精排（如果启用）
             3. 返回前 top_k 个结果
         """
-        # 确定最终返回数量
-        final_top_k = top_k or self.settings.retrieval.rerank_top_n
-
-        # 动态调整候选池大小（确保足够）
-        # 如果用户要的数量超过配置的候选池，自动扩大候选池
-        required_candidates = max(
-            final_top_k * 2,  # 候选池至少是最终返回数的2倍（给 Reranker 足够选择空间）
-            self.settings.retrieval.similarity_top_k
-        )
+        nodes = self.pipeline.retrieve(query_text, top_k)
+        return self._format_nodes(nodes)
 
-        # 向量召回（支持相似度阈值）
-        retriever_kwargs = {
-            "index": self.index,
-            "similarity_top_k": required_candidates,
-        }
+    def get_similar_documents_batch(
+        self,
+        queries: List[str],
+        top_k: Optional[int] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        批量获取相似文档（多个查询一次完成）
 
-        # 如果动态调整了候选池，记录日志
-        if required_candidates > self.settings.retrieval.similarity_top_k:
-            logger.info(
-                f"Auto-adjusted similarity_top_k from {self.settings.retrieval.similarity_top_k} "
-                f"to {required_candidates} to satisfy top_k={final_top_k}"
-            )
+        Args:
+            queries: 查询文本列表
+            top_k: 每个查询的最终返回数量（默认使用 rerank_top_n 配置值）
 
-        # 如果设置了相似度阈值（> 0），则启用过滤
-        if self.settings.retrieval.similarity_threshold > 0:
-            retriever_kwargs["similarity_cutoff"] = self.settings.retrieval.similarity_threshold
+        Returns:
+            与 queries 一一对应的文档列表
 
-        retriever = VectorIndexRetriever(**retriever_kwargs)
-        nodes = retriever.retrieve(query_text)
+        工作流程：
+            1. 去重后的查询一次请求完成 embedding
+            2. 一次向量召回（numpy 快照：一次矩阵运算；Chroma：一次 collection.query）
+            3. 各查询的 Reranker 请求并发执行
+        """
+        results = self.pipeline.retrieve_batch(queries, top_k)
+        logger.info(f"Batch retrieval: {len(queries)} queries ({len(set(queries))} unique)")
+        return [self._format_nodes(nodes) for nodes in results]
 
-        # Reranker 精排（如果启用）
-        if self.reranker:
-            # 创建临��� reranker 实例，确保返回足够多的结果
-            from llama_index.postprocessor.dashscope_rerank import DashScopeRerank
-            reranker = DashScopeRerank(
-                model=self.settings.reranker.model,
-                api_key=self.api_key,
-                top_n=max(final_top_k, self.settings.retrieval.rerank_top_n),
-            )
-            nodes = reranker.postprocess_nodes(nodes, query_str=query_text)
-
-            # 如果启用了 rerank_threshold，对 Reranker 分数进行过滤
-            if self.settings.retrieval.rerank_threshold > 0:
-                original_count = len(nodes)
-                nodes = [n for n in nodes if n.score >= self.settings.retrieval.rerank_threshold]
-                if len(nodes) < original_count:
-                    logger.info(
-                        f"Filtered {original_count - len(nodes)} nodes by rerank score threshold "
-                        f"(threshold: {self.settings.retrieval.rerank_threshold})"
-                    )
-
-        # 格式化结果并返回前 top_k 个
+    def get_stats(self) -> Dict[str, Any]:
+        """检索统计（查询数、分阶段延迟、缓存命中率）"""
+        return self.pipeline.get_stats()
+
+    def _collection_generation(self) -> str:
+        """
+        向量库版本标识（变化时查询缓存失效）
+
+        - numpy / hnsw 快照：导出时间 + 条目数
+        - Chroma：条目数 + chroma.sqlite3 修改时间（写入、删除都会更新）
+        """
+        vector_store = self.index.vector_store
+        if isinstance(vector_store, NumpyVectorStore):
+            manifest = vector_store.snapshot.manifest
+            return f"snapshot:{manifest['collection_name']}:{manifest['count']}:{manifest['created_at']}"
+
+        collection = vector_store.client
+        data_file = Path(self.settings.vector_store.persist_directory) / "chroma.sqlite3"
+        mtime = data_file.stat().st_mtime_ns if data_file.exists() else 0
+        return f"chroma:{collection.name}:{collection.count()}:{mtime}"
+
+    def _format_nodes(self, nodes: List[NodeWithScore]) -> List[Dict[str, Any]]:
+        """格式化结果"""
         results = []
-        for node in nodes[:final_top_k]:
+        for node in nodes:
             results.append({
                 "text": node.get_content(),
                 "score": node.score,
@@ -0,0 +1,414 @@
+"""
+可复用检索流水线
+要求：
+1. 检索组件只创建一次，按调用参数化（top_k / top_n），不再每次查询重建 retriever 和 reranker
+2. Reranker 使用 keep-alive HTTP 会话，查询之间复用连接
+3. 分阶段延迟统计：embed / vector_search / rerank / filter
+4. 可选查询缓存：命中的查询 embedding 和 Reranker 分数不再请求 API
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import logging
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.postprocessor.types import BaseNodePostprocessor
+from llama_index.core.schema import MetadataMode, NodeWithScore, QueryBundle
+from llama_index.core.vector_stores.types import VectorStoreQuery
+from llama_index.vector_stores.chroma import ChromaVectorStore
+
+from .numpy_vector_store import NumpyVectorStore, chroma_query_batch
+from .query_cache import QueryCache
+
+logger = logging.getLogger(__name__)
+
+DASHSCOPE_RERANK_URL = "https://dashscope.aliyuncs.com/api/v1/services/rerank/text-rerank/text-rerank"
+
+
+class LatencyStats:
+    """分阶段延迟统计（线程安全，每个阶段保留最近 window 个样本）"""
+
+    def __init__(self, stages: Sequence[str], window: int = 1000):
+        self._lock = threading.Lock()
+        self._samples = {stage: deque(maxlen=window) for stage in stages}
+        self._counts = {stage: 0 for stage in stages}
+        self._totals = {stage: 0.0 for stage in stages}
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            self._samples[stage].append(seconds)
+            self._counts[stage] += 1
+            self._totals[stage] += seconds
+
+    @contextmanager
+    def time(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """各阶段：调用次数、平均 / p50 / p95 / 最大延迟（毫秒）"""
+        with self._lock:
+            stats = {}
+            for stage, samples in self._samples.items():
+                ordered = sorted(samples)
+                count = self._counts[stage]
+                stats[stage] = {
+                    "count": count,
+                    "mean_ms": round(self._totals[stage] / count * 1000, 2) if count else 0.0,
+                    "p50_ms": round(self._percentile(ordered, 0.50) * 1000, 2),
+                    "p95_ms": round(self._percentile(ordered, 0.95) * 1000, 2),
+                    "max_ms": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+                }
+            return stats
+
+    @staticmethod
+    def _percentile(ordered: List[float], q: float) -> float:
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class DashScopeRerankClient:
+    """
+    DashScope 文本重排 HTTP 客户端
+
+    所有请求共享一个 requests.Session（连接池 + keep-alive），
+    避免每次查询重新建立 TLS 连接
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        timeout: float = 30.0,
+        pool_size: int = 8,
+        base_url: str = DASHSCOPE_RERANK_URL,
+    ):
+        self.model = model
+        self.timeout = timeout
+        self.base_url = base_url
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        })
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def rerank(self, query: str, documents: List[str], top_n: int) -> List[Tuple[int, float]]:
+        """
+        重排文档
+
+        Returns:
+            [(文档下标, relevance_score)]，按分数降序
+        """
+        response = self.session.post(
+            self.base_url,
+            json={
+                "model": self.model,
+                "input": {"query": query, "documents": documents},
+                "parameters": {"top_n": top_n, "return_documents": False},
+            },
+            timeout=self.timeout,
+        )
+        if response.status_code != 200:
+            raise ValueError(
+                f"DashScope rerank failed ({response.status_code}): {response.text[:200]}"
+            )
+        results = response.json()["output"]["results"]
+        return [(r["index"], r["relevance_score"]) for r in results]
+
+    def close(self):
+        self.session.close()
+
+
+class SessionDashScopeRerank(BaseNodePostprocessor):
+    """
+    基于共享 HTTP 会话的 DashScope Reranker
+
+    既可作为 RetrieverQueryEngine 的 postprocessor（使用默认 top_n），
+    也可由 RetrievalPipeline 按调用指定 top_n
+    """
+
+    top_n: int
+
+    _client: Any = PrivateAttr()
+
+    def __init__(self, client: DashScopeRerankClient, top_n: int, **kwargs: Any):
+        super().__init__(top_n=top_n, **kwargs)
+        self._client = client
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "SessionDashScopeRerank"
+
+    @property
+    def client(self) -> DashScopeRerankClient:
+        return self._client
+
+    def rerank(
+        self,
+        nodes: List[NodeWithScore],
+        query_str: str,
+        top_n: Optional[int] = None,
+    ) -> List[NodeWithScore]:
+        if not nodes:
+            return []
+
+        texts = [n.node.get_content(metadata_mode=MetadataMode.EMBED) for n in nodes]
+        results = self._client.rerank(query_str, texts, top_n=top_n or self.top_n)
+        return [NodeWithScore(node=nodes[index].node, score=score) for index, score in results]
+
+    def _postprocess_nodes(
+        self,
+        nodes: List[NodeWithScore],
+        query_bundle: Optional[QueryBundle] = None,
+    ) -> List[NodeWithScore]:
+        if query_bundle is None:
+            raise ValueError("Missing query bundle in extra info.")
+        return self.rerank(nodes, query_bundle.query_str)
+
+
+class RetrievalPipeline:
+    """
+    检索流水线：embed → vector_search → rerank → filter
+
+    组件在初始化时创建一次，之后所有查询（单条 / 批量）复用
+    """
+
+    STAGES = ("embed", "vector_search", "rerank", "filter")
+
+    def __init__(
+        self,
+        index,
+        reranker: Optional[SessionDashScopeRerank] = None,
+        similarity_top_k: int = 20,
+        rerank_top_n: int = 10,
+        rerank_threshold: float = 0.0,
+        rerank_workers: int = 4,
+        cache: Optional[QueryCache] = None,
+    ):
+        self.embed_model = index._embed_model
+        self.vector_store = index.vector_store
+        self.reranker = reranker
+        self.similarity_top_k = similarity_top_k
+        self.rerank_top_n = rerank_top_n
+        self.rerank_threshold = rerank_threshold
+        self.rerank_workers = max(1, rerank_workers)
+        self.cache = cache
+        self.latency = LatencyStats(self.STAGES)
+
+        self._executor = None
+        self._lock = threading.Lock()
+        self._query_count = 0
+
+    # ============ 单条查询 ============
+    def retrieve(self, query_text: str, top_k: Optional[int] = None) -> List[NodeWithScore]:
+        """检索单条查询，返回重排、过滤后的前 top_k 个节点"""
+        return self.retrieve_batch([query_text], top_k)[0]
+
+    # ============ 批量查询 ============
+    def retrieve_batch(
+        self,
+        queries: List[str],
+        top_k: Optional[int] = None,
+    ) -> List[List[NodeWithScore]]:
+        """
+        批量检索（相同查询只检索一次）
+
+        Returns:
+            与 queries 一一对应的节点列表
+        """
+        if not queries:
+            return []
+
+        final_top_k = top_k or self.rerank_top_n
+        required_candidates = self.required_candidates(final_top_k)
+        unique_queries = list(dict.fromkeys(queries))
+        with self._lock:
+            self._query_count += len(queries)
+        if self.cache is not None:
+            self.cache.refresh()
+
+        with self.latency.time("embed"):
+            query_embeddings = self._embed_queries(unique_queries)
+
+        with self.latency.time("vector_search"):
+            candidates = self._vector_search(query_embeddings, required_candidates)
+
+        if self.reranker:
+            with self.latency.time("rerank"):
+                ranked = self._rerank_all(unique_queries, candidates, final_top_k)
+        else:
+            ranked = candidates
+
+        with self.latency.time("filter"):
+            results_by_query = {
+                q: self._filter(nodes, final_top_k, reranked=self.reranker is not None)
+                for q, nodes in zip(unique_queries, ranked)
+            }
+        return [results_by_query[q] for q in queries]
+
+    def required_candidates(self, final_top_k: int) -> int:
+        """候选池大小（如果用户要的数量超过配置的候选池，自动扩大候选池）"""
+        required_candidates = max(
+            final_top_k * 2,  # 候选池至少是最终返回数的2倍（给 Reranker 足够选择空间）
+            self.similarity_top_k
+        )
+
+        # 如果动态调整了候选池，记录日志
+        if required_candidates > self.similarity_top_k:
+            logger.info(
+                f"Auto-adjusted similarity_top_k from {self.similarity_top_k} "
+                f"to {required_candidates} to satisfy top_k={final_top_k}"
+            )
+        return required_candidates
+
+    # ============ 各阶段 ============
+    def _embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """查询 embedding（先查缓存，未命中的查询合并为一次请求）"""
+        embeddings = [None] * len(queries)
+        if self.cache is not None:
+            embeddings = [self.cache.get_embedding(q) for q in queries]
+
+        missing = [i for i, e in enumerate(embeddings) if e is None]
+        if not missing:
+            return embeddings
+
+        missing_queries = [queries[i] for i in missing]
+        if len(missing_queries) > 1 and hasattr(self.embed_model, "get_query_embedding_batch"):
+            computed = self.embed_model.get_query_embedding_batch(missing_queries)
+        else:
+            computed = [self.embed_model.get_query_embedding(q) for q in missing_queries]
+
+        for i, embedding in zip(missing, computed):
+            embeddings[i] = embedding
+            if self.cache is not None:
+                self.cache.put_embedding(queries[i], embedding)
+        return embeddings
+
+    def _vector_search(
+        self,
+        query_embeddings: List[List[float]],
+        similarity_top_k: int,
+    ) -> List[List[NodeWithScore]]:
+        """按查询后端执行向量召回（numpy 快照 / Chroma 多查询均为一次调用）"""
+        if len(query_embeddings) > 1 and isinstance(self.vector_store, NumpyVectorStore):
+            results = self.vector_store.query_batch(query_embeddings, similarity_top_k)
+        elif len(query_embeddings) > 1 and isinstance(self.vector_store, ChromaVectorStore):
+            results = chroma_query_batch(self.vector_store.client, query_embeddings, similarity_top_k)
+        else:
+            results = [
+                self.vector_store.query(VectorStoreQuery(
+                    query_embedding=embedding,
+                    similarity_top_k=similarity_top_k,
+                ))
+                for embedding in query_embeddings
+            ]
+
+        return [
+            [NodeWithScore(node=node, score=score) for node, score in zip(r.nodes, r.similarities)]
+            for r in results
+        ]
+
+    def _rerank_all(
+        self,
+        queries: List[str],
+        candidates: List[List[NodeWithScore]],
+        final_top_k: int,
+    ) -> List[List[NodeWithScore]]:
+        """各查询的 Reranker 请求并发执行（共享 HTTP 会话，先查缓存）"""
+        top_n = max(final_top_k, self.rerank_top_n)
+        ranked = [None] * len(queries)
+        if self.cache is not None:
+            for i, (q, nodes) in enumerate(zip(queries, candidates)):
+                ranked[i] = self._cached_rerank(q, nodes, top_n)
+
+        missing = [i for i, r in enumerate(ranked) if r is None]
+        if len(missing) <= 1 or self.rerank_workers == 1:
+            computed = [self.reranker.rerank(candidates[i], queries[i], top_n=top_n) for i in missing]
+        else:
+            computed = list(self._get_executor().map(
+                lambda i: self.reranker.rerank(candidates[i], queries[i], top_n=top_n),
+                missing,
+            ))
+
+        for i, nodes in zip(missing, computed):
+            ranked[i] = nodes
+            if self.cache is not None:
+                self.cache.put_rerank(
+                    queries[i],
+                    [n.node.node_id for n in candidates[i]],
+                    top_n,
+                    [(n.node.node_id, n.score) for n in nodes],
+                )
+        return ranked
+
+    def _cached_rerank(
+        self,
+        query_text: str,
+        nodes: List[NodeWithScore],
+        top_n: int,
+    ) -> Optional[List[NodeWithScore]]:
+        """从缓存的 (node_id, score) 还原重排结果"""
+        scores = self.cache.get_rerank(query_text, [n.node.node_id for n in nodes], top_n)
+        if scores is None:
+            return None
+        nodes_by_id = {n.node.node_id: n.node for n in nodes}
+        return [NodeWithScore(node=nodes_by_id[node_id], score=score) for node_id, score in scores]
+
+    def _filter(
+        self,
+        nodes: List[NodeWithScore],
+        final_top_k: int,
+        reranked: bool,
+    ) -> List[NodeWithScore]:
+        """Reranker 分数阈值过滤（如果启用），返回前 top_k 个"""
+        if reranked and self.rerank_threshold > 0:
+            original_count = len(nodes)
+            nodes = [n for n in nodes if n.score is not None and n.score >= self.rerank_threshold]
+            if len(nodes) < original_count:
+                logger.info(
+                    f"Filtered {original_count - len(nodes)} nodes by rerank score threshold "
+                    f"(threshold: {self.rerank_threshold})"
+                )
+        return nodes[:final_top_k]
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.rerank_workers,
+                    thread_name_prefix="largerag-rerank",
+                )
+            return self._executor
+
+    # ============ 统计 / 资源 ============
+    def get_stats(self) -> Dict[str, Any]:
+        """检索统计：查询数、分阶段延迟和缓存命中率"""
+        stats = {
+            "query_count": self._query_count,
+            "latency": self.latency.get_stats(),
+        }
+        if self.cache is not None:
+            stats["cache"] = self.cache.get_stats()
+        return stats
+
+    def close(self):
+        if self.cache is not None:
+            self.cache.flush()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        if self.reranker is not None:
+            self.reranker.client.close()
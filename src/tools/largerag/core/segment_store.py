@@ -0,0 +1,557 @@
+"""
+分段式（Segment）本地存储模块
+要求：
+1. 追加写入（append-only），避免“一个 key 一个文件”带来的海量 inode
+2. 向量以 float32 连续存放，读取时通过内存映射（mmap）零拷贝访问
+3. 紧凑的 key → (segment, offset) 索引，启动时按段回放重建
+4. 段滚动（rollover）和压缩（compaction）通过原子替换 MANIFEST 完成
+5. 同一目录可被多个实例（含其他进程）同时写入：每次追加都持有进程间锁，
+   偏移量取自文件真实末尾；其他实例改写 MANIFEST 后自动重新加载索引
+   （各实例只看到打开/重新加载时已有的记录和自己写入的记录）
+
+目录结构：
+    {root_dir}/
+    ├── MANIFEST.json        # {"version": 1, "segments": [1, 2], "active": 2}
+    ├── LOCK                 # 进程间锁：打开/写入/滚动/压缩/清空时持有
+    ├── seg-000001.f32       # float32 向量（连续数组）
+    ├── seg-000001.blob      # 其他值（pickle 字节）
+    ├── seg-000001.idx       # 索引日志：kind \\t offset \\t length \\t json(key)
+    └── ...
+"""
+
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from pathlib import Path
+import json
+import logging
+import os
+import pickle
+import threading
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "MANIFEST.json"
+LOCK_NAME = "LOCK"
+
+KIND_VECTOR = "v"
+KIND_BLOB = "b"
+KIND_DELETE = "d"
+
+# 索引项：(segment_id, kind, offset, length)
+# - 向量：offset/length 以 float32 元素为单位
+# - blob：offset/length 以字节为单位
+IndexEntry = Tuple[int, str, int, int]
+
+
+def _is_vector(value: Any) -> bool:
+    """判断值是否按向量存储（一维浮点数组）"""
+    if isinstance(value, np.ndarray):
+        return value.ndim == 1 and value.dtype.kind == "f" and value.size > 0
+    return (
+        isinstance(value, (list, tuple))
+        and len(value) > 0
+        and all(isinstance(x, float) for x in value)
+    )
+
+
+class _SegmentWriter:
+    """当前活跃段的追加写入句柄"""
+
+    def __init__(self, root: Path, segment_id: int):
+        self.segment_id = segment_id
+        self.vec_file = open(root / SegmentStore.segment_file(segment_id, "f32"), "ab")
+        self.blob_file = open(root / SegmentStore.segment_file(segment_id, "blob"), "ab")
+        self.idx_file = open(root / SegmentStore.segment_file(segment_id, "idx"), "a+b")
+
+    # 其他实例可能在同一段文件末尾追加过数据，偏移量一律取文件真实大小
+    # （而不是本句柄的 tell()）；调用方持有进程间锁，保证取大小与写入之间无人追加
+    @staticmethod
+    def _end(f) -> int:
+        f.flush()
+        return os.fstat(f.fileno()).st_size
+
+    @property
+    def data_bytes(self) -> int:
+        return self._end(self.vec_file) + self._end(self.blob_file)
+
+    def append_vector(self, vector: np.ndarray) -> Tuple[int, int]:
+        size = self._end(self.vec_file)
+        if size % 4:
+            # 其他进程写入中途崩溃留下的残缺向量，截断以保持 float32 对齐
+            self.vec_file.truncate(size - size % 4)
+        offset = size // 4
+        self.vec_file.write(vector.tobytes())
+        self.vec_file.flush()
+        return offset, int(vector.size)
+
+    def append_blob(self, data: bytes) -> Tuple[int, int]:
+        offset = self._end(self.blob_file)
+        self.blob_file.write(data)
+        self.blob_file.flush()
+        return offset, len(data)
+
+    def append_index(self, kind: str, offset: int, length: int, key: str) -> None:
+        # 数据先于索引落盘：索引中出现的记录一定有完整数据
+        self._repair_index_tail()
+        line = f"{kind}\t{offset}\t{length}\t{json.dumps(key, ensure_ascii=False)}\n"
+        self.idx_file.write(line.encode("utf-8"))
+        self.idx_file.flush()
+
+    def _repair_index_tail(self) -> None:
+        """截掉其他进程崩溃留下的半行索引，否则新记录会接在半行之后、回放时被丢弃"""
+        size = self._end(self.idx_file)
+        if size == 0 or os.pread(self.idx_file.fileno(), 1, size - 1) == b"\n":
+            return
+        start = max(0, size - 64 * 1024)
+        tail = os.pread(self.idx_file.fileno(), size - start, start)
+        cut = tail.rfind(b"\n")
+        self.idx_file.truncate(start + cut + 1 if cut >= 0 else start)
+
+    def sync(self) -> None:
+        for f in (self.vec_file, self.blob_file, self.idx_file):
+            f.flush()
+            os.fsync(f.fileno())
+
+    def close(self) -> None:
+        for f in (self.vec_file, self.blob_file, self.idx_file):
+            f.close()
+
+
+class SegmentStore:
+    """
+    追加写入的分段 KV 存储
+
+    - put/get/delete 为 O(1)，索引常驻内存
+    - 一维浮点向量存为 float32，可通过 get_vector() 获得 mmap 视图
+    - 其他值以 pickle 存入 blob 文件
+    - 重复写入/删除产生的失效记录通过 compact() 回收
+    """
+
+    def __init__(self, root_dir: str, max_segment_bytes: int = 256 * 1024 * 1024):
+        """
+        Args:
+            root_dir: 存储目录
+            max_segment_bytes: 活跃段数据超过该大小后滚动到新段
+        """
+        self.root = Path(root_dir)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_segment_bytes = max_segment_bytes
+
+        self._lock = threading.RLock()
+        self._index: Dict[str, IndexEntry] = {}
+        self._segments: List[int] = []
+        self._writer: Optional[_SegmentWriter] = None
+        self._vector_maps: Dict[int, np.memmap] = {}
+        self._blob_fds: Dict[int, int] = {}
+        self._manifest_sig: Optional[Tuple[int, int, int]] = None
+        self.dead_records = 0
+
+        self._load()
+
+    # ============ 文件与 MANIFEST ============
+    @contextmanager
+    def _interprocess_lock(self):
+        """
+        目录级排他锁（fcntl/msvcrt）
+
+        滚动/压缩先创建新段文件、再原子写入 MANIFEST；另一进程若在两步之间
+        打开存储，会把新段当作孤儿删除。因此打开（含孤儿清理）、追加写入与
+        所有修改 MANIFEST 的操作都在该锁内进行。
+
+        flock 锁属于打开的文件描述，同一进程内的两个实例也互斥；
+        不可在已持有该锁时再次进入（会自锁）。
+        """
+        with open(self.root / LOCK_NAME, "a+b") as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    @staticmethod
+    def segment_file(segment_id: int, suffix: str) -> str:
+        return f"seg-{segment_id:06d}.{suffix}"
+
+    def _write_manifest(self, segments: List[int]) -> None:
+        """原子写入 MANIFEST（tmp + fsync + os.replace）"""
+        manifest = {
+            "version": FORMAT_VERSION,
+            "segments": segments,
+            "active": segments[-1],
+        }
+        tmp_path = self.root / (MANIFEST_NAME + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.root / MANIFEST_NAME)
+        self._manifest_sig = self._manifest_signature()
+
+    def _manifest_signature(self) -> Optional[Tuple[int, int, int]]:
+        """MANIFEST 的 (inode, mtime, size)；每次原子替换都会改变"""
+        try:
+            st = os.stat(self.root / MANIFEST_NAME)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _read_manifest(self) -> List[int]:
+        manifest_path = self.root / MANIFEST_NAME
+        if not manifest_path.exists():
+            return []
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") != FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported segment store version {manifest.get('version')} in {self.root}"
+            )
+        return list(manifest["segments"])
+
+    def _remove_segment_files(self, segment_id: int) -> None:
+        for suffix in ("f32", "blob", "idx"):
+            path = self.root / self.segment_file(segment_id, suffix)
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    # ============ 加载与回放 ============
+    def _load(self) -> None:
+        with self._interprocess_lock():
+            self._load_locked()
+
+    def _load_locked(self) -> None:
+        self._segments = self._read_manifest()
+
+        # 清理未登记在 MANIFEST 中的段（滚动/压缩中断的残留）
+        known = set(self._segments)
+        for path in self.root.glob("seg-*.*"):
+            try:
+                segment_id = int(path.stem.split("-")[1])
+            except (IndexError, ValueError):
+                continue
+            if segment_id not in known:
+                logger.warning(f"Removing orphan segment file: {path.name}")
+                path.unlink()
+
+        if not self._segments:
+            self._segments = [1]
+            self._writer = _SegmentWriter(self.root, 1)
+            self._write_manifest(self._segments)
+            return
+
+        for segment_id in self._segments:
+            self._replay_segment(segment_id, truncate=(segment_id == self._segments[-1]))
+
+        self._writer = _SegmentWriter(self.root, self._segments[-1])
+        self._manifest_sig = self._manifest_signature()
+        logger.debug(f"Segment store loaded: {len(self._index)} keys, {len(self._segments)} segments")
+
+    def _refresh_locked(self, force: bool = False) -> None:
+        """
+        其他实例滚动/压缩/清空过（MANIFEST 已变化）时重新加载（调用方持有两把锁）
+
+        否则本实例会继续写入已封存或已删除的段，或用过期的段号滚动。
+        force=True 时总是按磁盘回放（压缩前需要看到其他实例追加的记录）。
+        """
+        if not force and self._manifest_signature() == self._manifest_sig:
+            return
+        if not force:
+            logger.info(f"Segment store changed by another writer, reloading ({self.root})")
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self._close_readers()
+        self._index = {}
+        self.dead_records = 0
+        self._load_locked()
+
+    def _replay_segment(self, segment_id: int, truncate: bool) -> None:
+        """回放段索引日志；遇到不完整/越界记录即停止（崩溃时的残缺尾部）"""
+        idx_path = self.root / self.segment_file(segment_id, "idx")
+        vec_size = self._file_size(segment_id, "f32") // 4
+        blob_size = self._file_size(segment_id, "blob")
+
+        valid_bytes = 0
+        if idx_path.exists():
+            with open(idx_path, "rb") as f:
+                for raw_line in f:
+                    if not raw_line.endswith(b"\n"):
+                        break
+                    try:
+                        kind, offset, length, key_json = raw_line.decode("utf-8").rstrip("\n").split("\t", 3)
+                        offset, length = int(offset), int(length)
+                        key = json.loads(key_json)
+                    except (ValueError, UnicodeDecodeError):
+                        break
+
+                    if kind == KIND_VECTOR and offset + length > vec_size:
+                        break
+                    if kind == KIND_BLOB and offset + length > blob_size:
+                        break
+
+                    if key in self._index:
+                        self.dead_records += 1
+                    if kind == KIND_DELETE:
+                        self._index.pop(key, None)
+                        self.dead_records += 1
+                    else:
+                        self._index[key] = (segment_id, kind, offset, length)
+                    valid_bytes += len(raw_line)
+
+        if truncate:
+            if idx_path.exists() and idx_path.stat().st_size > valid_bytes:
+                logger.warning(f"Truncating torn tail of {idx_path.name} at byte {valid_bytes}")
+                with open(idx_path, "r+b") as f:
+                    f.truncate(valid_bytes)
+
+            # 保证后续追加的向量按 float32 对齐
+            vec_path = self.root / self.segment_file(segment_id, "f32")
+            if vec_path.exists() and vec_path.stat().st_size % 4:
+                with open(vec_path, "r+b") as f:
+                    f.truncate(vec_size * 4)
+
+    def _file_size(self, segment_id: int, suffix: str) -> int:
+        path = self.root / self.segment_file(segment_id, suffix)
+        return path.stat().st_size if path.exists() else 0
+
+    # ============ 读取 ============
+    def _vector_view(self, segment_id: int, offset: int, length: int) -> np.ndarray:
+        """返回 float32 向量的 mmap 视图（活跃段增长后自动重新映射）"""
+        mapped = self._vector_maps.get(segment_id)
+        if mapped is None or offset + length > mapped.shape[0]:
+            if self._writer is not None and self._writer.segment_id == segment_id:
+                self._writer.vec_file.flush()
+            path = self.root / self.segment_file(segment_id, "f32")
+            mapped = np.memmap(path, dtype=np.float32, mode="r")
+            self._vector_maps[segment_id] = mapped
+        return mapped[offset:offset + length]
+
+    def _read_blob(self, segment_id: int, offset: int, length: int) -> bytes:
+        fd = self._blob_fds.get(segment_id)
+        if fd is None:
+            fd = os.open(self.root / self.segment_file(segment_id, "blob"), os.O_RDONLY)
+            self._blob_fds[segment_id] = fd
+        return os.pread(fd, length, offset)
+
+    def _read_entry(self, entry: IndexEntry) -> Any:
+        segment_id, kind, offset, length = entry
+        if kind == KIND_VECTOR:
+            return self._vector_view(segment_id, offset, length)
+        return pickle.loads(self._read_blob(segment_id, offset, length))
+
+    def _read_key(self, key: str, kind: Optional[str] = None) -> Optional[Any]:
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None or (kind is not None and entry[1] != kind):
+                return None
+            try:
+                return self._read_entry(entry)
+            except FileNotFoundError:
+                # 段已被其他实例压缩/清空：重新加载，本次按未命中处理
+                with self._interprocess_lock():
+                    self._refresh_locked()
+                return None
+
+    def get(self, key: str) -> Optional[Any]:
+        """获取值；向量返回 List[float]，其他值返回反序列化对象"""
+        value = self._read_key(key)
+        return value.tolist() if isinstance(value, np.ndarray) else value
+
+    def get_vector(self, key: str) -> Optional[np.ndarray]:
+        """获取向量的 float32 只读视图（零拷贝）；非向量值返回 None"""
+        return self._read_key(key, KIND_VECTOR)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._index.keys())
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        """遍历所有 (key, value)"""
+        for key in self.keys():
+            value = self.get(key)
+            if value is not None:
+                yield key, value
+
+    # ============ 写入 ============
+    def put(self, key: str, value: Any) -> None:
+        """写入值（覆盖旧值，旧记录成为失效记录）"""
+        # 序列化放在锁外，缩短持有进程间锁的时间
+        if _is_vector(value):
+            kind, data = KIND_VECTOR, np.asarray(value, dtype=np.float32).ravel()
+        else:
+            kind, data = KIND_BLOB, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+        with self._lock, self._interprocess_lock():
+            self._refresh_locked()
+            if kind == KIND_VECTOR:
+                offset, length = self._writer.append_vector(data)
+            else:
+                offset, length = self._writer.append_blob(data)
+            self._writer.append_index(kind, offset, length, key)
+
+            if key in self._index:
+                self.dead_records += 1
+            self._index[key] = (self._writer.segment_id, kind, offset, length)
+
+            if self._writer.data_bytes >= self.max_segment_bytes:
+                self._rollover()
+
+    def delete(self, key: str) -> bool:
+        """删除 key（写入删除标记）"""
+        with self._lock, self._interprocess_lock():
+            self._refresh_locked()
+            if key not in self._index:
+                return False
+            self._writer.append_index(KIND_DELETE, 0, 0, key)
+            del self._index[key]
+            self.dead_records += 2
+            return True
+
+    def flush(self) -> None:
+        """fsync 活跃段（批量写入结束后调用）"""
+        with self._lock:
+            if self._writer is not None:
+                self._writer.sync()
+
+    def _rollover(self) -> None:
+        """封存活跃段并切换到新段（MANIFEST 原子更新，调用方持有进程间锁）"""
+        self._writer.sync()
+        self._writer.close()
+
+        new_id = self._segments[-1] + 1
+        self._writer = _SegmentWriter(self.root, new_id)
+        self._segments.append(new_id)
+        self._write_manifest(self._segments)
+        logger.info(f"Segment store rolled over to segment {new_id} ({self.root})")
+
+    # ============ 压缩与清理 ============
+    def _close_readers(self) -> None:
+        self._vector_maps.clear()
+        for fd in self._blob_fds.values():
+            os.close(fd)
+        self._blob_fds.clear()
+
+    def compact(self) -> Dict[str, int]:
+        """
+        压缩：只保留有效记录，重写到新段，原子切换 MANIFEST 后删除旧段
+
+        Returns:
+            压缩前后的记录和字节统计
+        """
+        with self._lock, self._interprocess_lock():
+            self._refresh_locked(force=True)
+            old_segments = list(self._segments)
+            bytes_before = self._total_bytes()
+
+            self._writer.sync()
+            self._writer.close()
+            self._writer = None
+
+            new_id = old_segments[-1] + 1
+            new_segments = [new_id]
+            writer = _SegmentWriter(self.root, new_id)
+            new_index: Dict[str, IndexEntry] = {}
+
+            for key, entry in self._index.items():
+                kind = entry[1]
+                if kind == KIND_VECTOR:
+                    offset, length = writer.append_vector(np.array(self._read_entry(entry)))
+                else:
+                    offset, length = writer.append_blob(self._read_blob(entry[0], entry[2], entry[3]))
+                writer.append_index(kind, offset, length, key)
+                new_index[key] = (writer.segment_id, kind, offset, length)
+
+                if writer.data_bytes >= self.max_segment_bytes:
+                    writer.sync()
+                    writer.close()
+                    new_id += 1
+                    new_segments.append(new_id)
+                    writer = _SegmentWriter(self.root, new_id)
+
+            writer.sync()
+            self._write_manifest(new_segments)
+
+            self._close_readers()
+            for segment_id in old_segments:
+                self._remove_segment_files(segment_id)
+
+            self._writer = writer
+            self._segments = new_segments
+            self._index = new_index
+            self.dead_records = 0
+
+            result = {
+                "live_records": len(new_index),
+                "bytes_before": bytes_before,
+                "bytes_after": self._total_bytes(),
+            }
+            logger.info(f"Segment store compacted ({self.root}): {result}")
+            return result
+
+    def clear(self) -> int:
+        """删除所有数据，返回删除的 key 数量"""
+        with self._lock, self._interprocess_lock():
+            self._refresh_locked(force=True)
+            count = len(self._index)
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            self._close_readers()
+            for segment_id in self._segments:
+                self._remove_segment_files(segment_id)
+
+            self._index = {}
+            self.dead_records = 0
+            self._segments = [self._segments[-1] + 1]
+            self._writer = _SegmentWriter(self.root, self._segments[0])
+            self._write_manifest(self._segments)
+            return count
+
+    def close(self) -> None:
+        with self._lock:
+            if self._writer is not None:
+                self._writer.sync()
+                self._writer.close()
+                self._writer = None
+            self._close_readers()
+
+    def _total_bytes(self) -> int:
+        return sum(
+            self._file_size(segment_id, suffix)
+            for segment_id in self._segments
+            for suffix in ("f32", "blob", "idx")
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取存储统计（不扫描目录）"""
+        with self._lock:
+            return {
+                "entry_count": len(self._index),
+                "segment_count": len(self._segments),
+                "dead_records": self.dead_records,
+                "total_size_mb": round(self._total_bytes() / (1024 * 1024), 2),
+            }
@@ -0,0 +1,344 @@
+"""
+向量快照与进程内检索模块
+要求：
+1. 将 Chroma collection 导出为内存映射快照（单个 float32/float16 矩阵）
+2. top-k 检索 = 一次矩阵乘法 + argpartition，无 SQLite 元数据读取
+3. 文本和元数据按行偏移存储，只读取命中的 top-k 记录
+4. 可选 HNSW 近似检索（需安装 hnswlib）
+
+快照目录结构：
+    {snapshot_dir}/
+    ├── snapshot.json        # 快照清单（数量、维度、dtype、距离度量）
+    ├── embeddings.npy       # [N, D] 向量矩阵（cosine 时已归一化）
+    ├── ids.json             # 行号 → node id
+    ├── records.jsonl        # 每行一条 {"text": ..., "metadata": ...}
+    ├── records.offsets.npy  # 每条记录在 records.jsonl 中的字节偏移
+    └── hnsw.bin             # 可选，HNSW 索引
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from datetime import datetime
+from pathlib import Path
+import json
+import logging
+import os
+import shutil
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# HNSW 作为可选依赖，仅在需要时导入
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    HNSWLIB_AVAILABLE = False
+
+SNAPSHOT_VERSION = 1
+SUPPORTED_METRICS = ("cosine", "ip", "l2")
+SUPPORTED_DTYPES = ("float32", "float16")
+
+# float16 矩阵分块转换为 float32 计算（CPU BLAS 不支持 float16）
+_SCORE_BLOCK_ROWS = 65536
+
+
+class VectorSnapshot:
+    """
+    只读向量快照（进程内精确 / HNSW 检索）
+
+    相似度与 ChromaVectorStore 保持一致：similarity = exp(-distance)，
+    其中 cosine 距离 = 1 - cos，ip 距离 = 1 - ip，l2 距离 = 平方欧氏距离，
+    因此 retrieval.similarity_threshold 的含义不随后端改变。
+    """
+
+    def __init__(self, snapshot_dir: str, use_hnsw: bool = False, hnsw_ef_search: int = 64):
+        self.snapshot_dir = Path(snapshot_dir)
+        manifest_path = self.snapshot_dir / "snapshot.json"
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"Vector snapshot not found: {self.snapshot_dir}")
+
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version: {self.manifest.get('version')}")
+
+        self.metric = self.manifest["metric"]
+        self.matrix = np.load(self.snapshot_dir / "embeddings.npy", mmap_mode="r")
+        with open(self.snapshot_dir / "ids.json", "r", encoding="utf-8") as f:
+            self.ids: List[str] = json.load(f)
+        self._offsets = np.load(self.snapshot_dir / "records.offsets.npy")
+        self._records_fd = os.open(self.snapshot_dir / "records.jsonl", os.O_RDONLY)
+        self._records_size = os.fstat(self._records_fd).st_size
+
+        # l2 需要行范数平方：||q - x||^2 = ||q||^2 - 2 q·x + ||x||^2
+        self._row_sq_norms = None
+        if self.metric == "l2":
+            self._row_sq_norms = self._compute_row_sq_norms()
+
+        self.hnsw = None
+        if use_hnsw and len(self) > 0:
+            self.hnsw = self._load_hnsw(hnsw_ef_search)
+
+        logger.info(
+            f"Vector snapshot loaded: {len(self)} vectors, dim={self.dimension}, "
+            f"dtype={self.matrix.dtype}, metric={self.metric}, hnsw={self.hnsw is not None}"
+        )
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    @property
+    def dimension(self) -> int:
+        return self.matrix.shape[1]
+
+    def close(self) -> None:
+        if self._records_fd is not None:
+            os.close(self._records_fd)
+            self._records_fd = None
+
+    # ============ 检索 ============
+    def _prepare_queries(self, queries: np.ndarray) -> np.ndarray:
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        # 空快照（旧版本导出为 (0, 0) 矩阵）没有可比较的维度，直接返回空结果
+        if len(self) > 0 and queries.shape[1] != self.dimension:
+            raise ValueError(
+                f"Query dimension {queries.shape[1]} does not match snapshot dimension {self.dimension}"
+            )
+        if self.metric == "cosine":
+            norms = np.linalg.norm(queries, axis=1, keepdims=True)
+            queries = queries / np.maximum(norms, 1e-12)
+        return queries
+
+    def _compute_row_sq_norms(self) -> np.ndarray:
+        sq_norms = np.empty(len(self), dtype=np.float32)
+        for start in range(0, len(self), _SCORE_BLOCK_ROWS):
+            block = np.asarray(self.matrix[start:start + _SCORE_BLOCK_ROWS], dtype=np.float32)
+            sq_norms[start:start + len(block)] = np.einsum("ij,ij->i", block, block)
+        return sq_norms
+
+    def _dot(self, queries: np.ndarray) -> np.ndarray:
+        """[Q, D] x [N, D]^T → [Q, N]"""
+        if self.matrix.dtype == np.float32:
+            return queries @ self.matrix.T
+
+        scores = np.empty((queries.shape[0], len(self)), dtype=np.float32)
+        for start in range(0, len(self), _SCORE_BLOCK_ROWS):
+            block = np.asarray(self.matrix[start:start + _SCORE_BLOCK_ROWS], dtype=np.float32)
+            scores[:, start:start + len(block)] = queries @ block.T
+        return scores
+
+    def _to_distances(self, dots: np.ndarray, queries: np.ndarray) -> np.ndarray:
+        """按 Chroma 的距离定义换算（越小越相似）"""
+        if self.metric == "l2":
+            q_sq = np.einsum("ij,ij->i", queries, queries)[:, None]
+            return np.maximum(q_sq - 2.0 * dots + self._row_sq_norms[None, :], 0.0)
+        return 1.0 - dots
+
+    def search(
+        self,
+        queries: np.ndarray,
+        top_k: int,
+        mask: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        批量 top-k 检索
+
+        Args:
+            queries: [D] 或 [Q, D] 查询向量
+            top_k: 每个查询返回的数量
+            mask: 可选的 [N] 布尔数组，False 的行不参与排序
+
+        Returns:
+            (rows, similarities)：形状均为 [Q, k]，按相似度降序
+        """
+        queries = self._prepare_queries(queries)
+        top_k = min(top_k, len(self))
+        if top_k <= 0:
+            empty = np.empty((queries.shape[0], 0))
+            return empty.astype(np.int64), empty.astype(np.float32)
+
+        if self.hnsw is not None and mask is None:
+            # hnswlib 的 cosine / ip / l2 距离定义与 Chroma 相同
+            rows, distances = self.hnsw.knn_query(queries, k=top_k)
+            return rows.astype(np.int64), np.exp(-np.asarray(distances, dtype=np.float32))
+
+        distances = self._to_distances(self._dot(queries), queries)
+        if mask is not None:
+            distances = np.where(mask[None, :], distances, np.inf)
+
+        if top_k < distances.shape[1]:
+            part = np.argpartition(distances, top_k - 1, axis=1)[:, :top_k]
+        else:
+            part = np.tile(np.arange(distances.shape[1]), (distances.shape[0], 1))
+        part_dist = np.take_along_axis(distances, part, axis=1)
+        order = np.argsort(part_dist, axis=1, kind="stable")
+
+        rows = np.take_along_axis(part, order, axis=1)
+        sorted_dist = np.take_along_axis(part_dist, order, axis=1)
+        return rows.astype(np.int64), np.exp(-sorted_dist).astype(np.float32)
+
+    # ============ 记录读取 ============
+    def get_record(self, row: int) -> Dict[str, Any]:
+        """读取单条记录：{"id", "text", "metadata"}"""
+        start = int(self._offsets[row])
+        end = int(self._offsets[row + 1]) if row + 1 < len(self._offsets) else self._records_size
+        record = json.loads(os.pread(self._records_fd, end - start, start))
+        record["id"] = self.ids[row]
+        return record
+
+    def get_records(self, rows: Sequence[int]) -> List[Dict[str, Any]]:
+        return [self.get_record(int(row)) for row in rows]
+
+    # ============ HNSW ============
+    def _load_hnsw(self, ef_search: int):
+        if not HNSWLIB_AVAILABLE:
+            logger.warning("HNSW requested but hnswlib is not installed. Falling back to exact search.")
+            return None
+
+        index_path = self.snapshot_dir / "hnsw.bin"
+        space = {"cosine": "cosine", "ip": "ip", "l2": "l2"}[self.metric]
+        index = hnswlib.Index(space=space, dim=self.dimension)
+
+        if index_path.exists():
+            index.load_index(str(index_path), max_elements=len(self))
+        else:
+            logger.info(f"Building HNSW index for {len(self)} vectors...")
+            index.init_index(max_elements=len(self), ef_construction=200, M=16)
+            for start in range(0, len(self), _SCORE_BLOCK_ROWS):
+                block = np.asarray(self.matrix[start:start + _SCORE_BLOCK_ROWS], dtype=np.float32)
+                index.add_items(block, np.arange(start, start + len(block)))
+            index.save_index(str(index_path))
+            logger.info(f"HNSW index saved to {index_path}")
+
+        index.set_ef(max(ef_search, 1))
+        return index
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "snapshot_dir": str(self.snapshot_dir),
+            "vectors": len(self),
+            "dimension": self.dimension,
+            "dtype": str(self.matrix.dtype),
+            "metric": self.metric,
+            "hnsw": self.hnsw is not None,
+            "created_at": self.manifest.get("created_at"),
+        }
+
+
+def export_chroma_snapshot(
+    collection,
+    snapshot_dir: str,
+    metric: str = "cosine",
+    dtype: str = "float32",
+    page_size: int = 5000,
+    dimension: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    将 Chroma collection 导出为向量快照（先写临时目录，完成后原子替换）
+
+    Args:
+        collection: chromadb Collection
+        snapshot_dir: 快照目录
+        metric: 距离度量（与 collection 的 hnsw:space 一致）
+        dtype: 矩阵存储精度（float32 / float16）
+        page_size: 每次从 Chroma 读取的条数
+        dimension: 向量维度（collection 为空时用于确定矩阵形状，否则以实际向量为准）
+
+    Returns:
+        快照清单
+    """
+    if metric not in SUPPORTED_METRICS:
+        raise ValueError(f"Unsupported metric '{metric}', expected one of {SUPPORTED_METRICS}")
+    if dtype not in SUPPORTED_DTYPES:
+        raise ValueError(f"Unsupported dtype '{dtype}', expected one of {SUPPORTED_DTYPES}")
+
+    target = Path(snapshot_dir)
+    tmp_dir = target.with_name(target.name + ".tmp")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+
+    total = collection.count()
+    logger.info(f"Exporting {total} vectors from Chroma collection '{collection.name}' to {target}")
+
+    matrix = None
+    ids: List[str] = []
+    offsets = np.zeros(total, dtype=np.int64)
+    row = 0
+
+    with open(tmp_dir / "records.jsonl", "wb") as records_file:
+        for offset in range(0, total, page_size):
+            page = collection.get(
+                limit=page_size,
+                offset=offset,
+                include=["embeddings", "documents", "metadatas"],
+            )
+            embeddings = np.asarray(page["embeddings"], dtype=np.float32)
+            if len(embeddings) == 0:
+                break
+
+            if matrix is None:
+                matrix = np.lib.format.open_memmap(
+                    tmp_dir / "embeddings.npy",
+                    mode="w+",
+                    dtype=np.dtype(dtype),
+                    shape=(total, embeddings.shape[1]),
+                )
+
+            if metric == "cosine":
+                norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+                embeddings = embeddings / np.maximum(norms, 1e-12)
+
+            count = min(len(embeddings), total - row)
+            matrix[row:row + count] = embeddings[:count]
+
+            for i in range(count):
+                offsets[row + i] = records_file.tell()
+                record = {"text": page["documents"][i], "metadata": page["metadatas"][i]}
+                records_file.write(json.dumps(record, ensure_ascii=False).encode("utf-8"))
+                records_file.write(b"\n")
+            ids.extend(page["ids"][:count])
+            row += count
+
+    if matrix is None:
+        matrix = np.lib.format.open_memmap(
+            tmp_dir / "embeddings.npy", mode="w+", dtype=np.dtype(dtype), shape=(0, dimension or 0)
+        )
+    dimension = int(matrix.shape[1])
+    matrix.flush()
+    del matrix
+
+    np.save(tmp_dir / "records.offsets.npy", offsets[:row])
+    with open(tmp_dir / "ids.json", "w", encoding="utf-8") as f:
+        json.dump(ids, f)
+
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "collection_name": collection.name,
+        "count": row,
+        "dimension": dimension,
+        "metric": metric,
+        "dtype": dtype,
+        "created_at": datetime.now().isoformat(),
+    }
+    with open(tmp_dir / "snapshot.json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    if row != total:
+        # 如果导出时 collection 被修改，embeddings.npy 中末尾会有未填充的行
+        raise RuntimeError(f"Collection changed during export: expected {total} vectors, read {row}")
+
+    # 替换旧快照
+    if target.exists():
+        old_dir = target.with_name(target.name + ".old")
+        if old_dir.exists():
+            shutil.rmtree(old_dir)
+        os.replace(target, old_dir)
+        os.replace(tmp_dir, target)
+        shutil.rmtree(old_dir)
+    else:
+        os.replace(tmp_dir, target)
+
+    logger.info(f"Vector snapshot exported: {row} vectors → {target}")
+    return manifest
@@ -12,6 +12,7 @@ import logging
 
 from .core.document_processor import DocumentProcessor
 from .core.indexer import LargeRAGIndexer
+from .core.indexer_v2 import LargeRAGIndexerV2
 from .core.query_engine import LargeRAGQueryEngine
 from .config.settings import SETTINGS
 
@@ -70,6 +71,7 @@ class LargeRAG:
         注意：
         - 如果索引已存在，将覆盖旧索引
         - 使用缓存，重复运行时只计算新增文档的 embedding
+        - 文献有增删改时可使用 sync_from_folders() 增量同步
         """
         try:
             logger.info(f"Starting indexing process from {literature_dir}...")
@@ -96,6 +98,43 @@ class LargeRAG:
             logger.error(f"Indexing failed: {e}", exc_info=True)
             return False
 
+    def sync_from_folders(self, literature_dir: str) -> Optional[Dict[str, Any]]:
+        """
+        增量同步文献目录与索引（只处理新增、修改和删除的文献）
+
+        Args:
+            literature_dir: 文献目录路径
+
+        Returns:
+            差异摘要（见 LargeRAGIndexerV2.sync_from_folders），失败时返回 None
+
+        注意：
+        - 与 index_from_folders 不同，未变化的文献不会重新解析或计算 embedding
+        - 进程内检索后端（numpy / hnsw）在同步后重新导出快照
+        """
+        try:
+            logger.info(f"Starting incremental sync from {literature_dir}...")
+
+            # 复用已打开的 Embedding 存储，不在同一目录上再开一个写入实例
+            indexer = LargeRAGIndexerV2(
+                collection_name=self.collection_name,
+                embedding_store=self.indexer.embedding_store,
+            )
+            summary = indexer.sync_from_folders(literature_dir, doc_processor=self.doc_processor)
+
+            if SETTINGS.vector_store.type != "chroma":
+                self.indexer.export_snapshot()
+            index = self.indexer.load_index()
+            if index:
+                self.query_engine = LargeRAGQueryEngine(index)
+
+            logger.info(f"Sync completed: {summary}")
+            return summary
+
+        except Exception as e:
+            logger.error(f"Sync failed: {e}", exc_info=True)
+            return None
+
     def query(self, query_text: str, **kwargs) -> str:
         """
         执行查询并生成回答
@@ -139,9 +178,32 @@ class LargeRAG:
 
         return self.query_engine.get_similar_documents(query_text, top_k)
 
+    def get_similar_docs_batch(
+        self,
+        queries: List[str],
+        top_k: int = 5
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        批量获取相似文档（一次 embedding 请求 + 一次向量召回，Reranker 并发）
+
+        Args:
+            queries: 查询文本列表
+            top_k: 每个查询的返回数量
+
+        Returns:
+            与 queries 一一对应的文档列表
+        """
+        if self.query_engine is None:
+            raise RuntimeError(
+                "Index not initialized. Please run index_from_folders() first."
+            )
+
+        return self.query_engine.get_similar_documents_batch(queries, top_k)
+
     def get_stats(self) -> Dict[str, Any]:
         """获取系统统计信息"""
         return {
             "index_stats": self.indexer.get_index_stats(),
             "doc_processing_stats": self.doc_processor.get_statistics(),
+            "query_stats": self.query_engine.get_stats() if self.query_engine else None,
         }
@@ -165,6 +165,8 @@ def main():
                           help='语义缓冲区大小（默认: 1，仅semantic模式）')
     doc_group.add_argument('--aggregate-small-chunks', action='store_true',
                           help='聚合JSON文件内的所有片段为一个Document（默认: false）')
+    doc_group.add_argument('--parse-workers', type=int, default=0, metavar='N',
+                          help='JSON 解析进程数（默认: 0 → 按 CPU 核数，最多 8；1 = 串行）')
 
     # 向量存储配置
     vector_group = parser.add_argument_group('向量存储配置')
@@ -222,6 +224,10 @@ def main():
         SETTINGS.document_processing.aggregate_small_chunks = True
         overrides_applied.append(f"document_processing.aggregate_small_chunks = True")
 
+    # 批量构建默认启用多进程解析（settings.yaml 默认为串行）
+    SETTINGS.document_processing.parse_workers = args.parse_workers
+    overrides_applied.append(f"document_processing.parse_workers = {args.parse_workers}")
+
     # 向量存储配置
     if args.collection_name is not None:
         SETTINGS.vector_store.collection_name = args.collection_name
@@ -19,6 +19,13 @@ sys.path.insert(0, str(project_root))
 
 from src.tools.largerag.core.document_processor import DocumentProcessor
 from src.tools.largerag.core.indexer import LargeRAGIndexer
+from src.tools.largerag.core.doc_manifest import (
+    DocumentManifest,
+    chunker_fingerprint,
+    compute_content_hash,
+    embed_model_id,
+    get_manifest_path,
+)
 from src.tools.largerag.config.settings import SETTINGS
 
 import chromadb
@@ -33,23 +40,6 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def get_processed_doc_hashes(collection) -> set:
-    """从现有collection中提取已处理的文献哈希"""
-    try:
-        # 获取所有documents的metadata
-        results = collection.get(include=['metadatas'])
-        metadatas = results.get('metadatas', [])
-
-        doc_hashes = set()
-        for meta in metadatas:
-            if meta and 'doc_hash' in meta:
-                doc_hashes.add(meta['doc_hash'])
-
-        return doc_hashes
-    except:
-        return set()
-
-
 def main():
     parser = argparse.ArgumentParser(description='分批构建向量索引')
     parser.add_argument('--literature-dir', required=True, help='文献目录')
@@ -83,18 +73,24 @@ def main():
     doc_processor = DocumentProcessor(aggregate_small_chunks=args.aggregate_small_chunks)
     indexer = LargeRAGIndexer(collection_name=args.collection_name)
 
-    # 检查已处理的文献
+    # 检查已处理的文献（读取文档清单，不扫描Chroma元数据）
     chroma_client = chromadb.PersistentClient(path=SETTINGS.vector_store.persist_directory)
+    manifest = DocumentManifest(str(get_manifest_path(SETTINGS, args.collection_name)))
+    chunker_config = chunker_fingerprint(SETTINGS)
+    model_id = embed_model_id(SETTINGS)
 
     try:
         collection = chroma_client.get_collection(name=args.collection_name)
-        existing_count = collection.count()
-        processed_hashes = get_processed_doc_hashes(collection)
+    except:
+        collection = None
+
+    manifest.reconcile(collection)
+    processed_hashes = manifest.completed_doc_hashes()
+    if collection is not None:
         logger.info(f"\n检测到已有索引:")
-        logger.info(f"  现有向量数: {existing_count:,}")
+        logger.info(f"  现有向量数: {collection.count():,}")
         logger.info(f"  已处理文献: {len(processed_hashes)} 篇")
-    except:
-        processed_hashes = set()
+    else:
         logger.info(f"\n未检测到已有索引，将从头构建")
 
     # 筛选未处理的文献
@@ -126,6 +122,7 @@ def main():
 
         # 处理本批文献
         batch_documents = []
+        batch_content_hashes = {}
         for folder in batch_folders:
             content_file = folder / "content_list_process.json"
             article_file = folder / "article.json"
@@ -133,10 +130,12 @@ def main():
             try:
                 if content_file.exists():
                     docs = doc_processor._load_from_content_list(content_file, folder.name)
-                    batch_documents.extend(docs)
                 elif article_file.exists():
                     docs = doc_processor._load_from_article(article_file, folder.name)
-                    batch_documents.extend(docs)
+                else:
+                    continue
+                batch_documents.extend(docs)
+                batch_content_hashes[folder.name] = compute_content_hash(docs)
             except Exception as e:
                 logger.error(f"处理文献 {folder.name} 失败: {e}")
                 continue
@@ -156,8 +155,23 @@ def main():
             logger.info("已处理的批次已保存，可以重新运行继续")
             return False
 
-        # 写入Chroma
+        # 写入Chroma（写入前在清单中标记 pending，写入成功后标记 complete）
         logger.info(f"写入Chroma数据库...")
+        batch_node_ids = {doc_hash: [] for doc_hash in batch_content_hashes}
+        for node in nodes:
+            batch_node_ids.setdefault(node.metadata.get('doc_hash'), []).append(node.node_id)
+        manifest.begin([
+            {
+                "doc_hash": doc_hash,
+                "node_ids": node_ids,
+                "content_hash": batch_content_hashes.get(doc_hash),
+                "chunker_config": chunker_config,
+                "embed_model": model_id,
+            }
+            for doc_hash, node_ids in batch_node_ids.items()
+            if doc_hash
+        ])
+
         try:
             # 获取或创建collection
             collection = chroma_client.get_or_create_collection(
@@ -176,6 +190,7 @@ def main():
                 show_progress=False,
             )
 
+            manifest.complete(batch_node_ids)
             total_new_nodes += len(nodes)
 
         except Exception as e:
@@ -4,6 +4,9 @@
 
 运行方式：
     python scripts/build_index_v2.py --literature-dir data/DES_v1_7445 --collection-name des_prod_v1 --batch-size 500
+
+增量同步（检测新增 / 修改 / 删除的文献，只处理变化部分）：
+    python scripts/build_index_v2.py --literature-dir data/DES_v1_7445 --collection-name des_prod_v1 --sync
 """
 
 import sys
@@ -32,6 +35,8 @@ def main():
     parser.add_argument('--collection-name', default='des_prod_v1', help='Collection名称')
     parser.add_argument('--batch-size', type=int, default=500, help='每批写入的nodes数量（非文献数）')
     parser.add_argument('--aggregate-small-chunks', action='store_true', help='聚合JSON chunks')
+    parser.add_argument('--parse-workers', type=int, default=0, help='JSON 解析进程数（0 = 按 CPU 核数，最多 8；1 = 串行）')
+    parser.add_argument('--sync', action='store_true', help='增量同步：删除已删除/已修改文献的旧nodes，只处理变化的文献')
 
     args = parser.parse_args()
 
@@ -43,6 +48,7 @@ def main():
     logger.info(f"  Collection: {args.collection_name}")
     logger.info(f"  批量写入: 每{args.batch_size}个nodes写一次")
     logger.info(f"  聚合chunks: {args.aggregate_small_chunks}")
+    logger.info(f"  解析进程数: {args.parse_workers or '自动'}")
 
     # 验证文献目录
     lit_path = Path(args.literature_dir)
@@ -52,20 +58,32 @@ def main():
 
     # 初始化组件
     logger.info("\n初始化组件...")
-    doc_processor = DocumentProcessor(aggregate_small_chunks=args.aggregate_small_chunks)
+    doc_processor = DocumentProcessor(
+        aggregate_small_chunks=args.aggregate_small_chunks,
+        parse_workers=args.parse_workers,
+    )
     indexer = LargeRAGIndexerV2(collection_name=args.collection_name)
 
-    # 加载所有文档
-    logger.info("\n加载文献文档...")
-    documents = doc_processor.process_from_folders(str(lit_path))
-    logger.info(f"加载完成: {len(documents)} 个文档")
-
-    # 增量构建索引
-    index = indexer.build_index_incremental(
-        documents=documents,
-        batch_write_size=args.batch_size,
-        show_progress=True
-    )
+    if args.sync:
+        # 增量同步（按文件夹指纹和内容哈希检测变化）
+        logger.info("\n增量同步文献目录...")
+        summary = indexer.sync_from_folders(
+            str(lit_path),
+            doc_processor=doc_processor,
+            batch_write_size=args.batch_size,
+            show_progress=True
+        )
+        logger.info(f"\n🔄 同步摘要: {summary}")
+    else:
+        # 流式加载文档并增量构建索引（解析、分块、embedding 重叠进行）
+        logger.info("\n流式加载文献文档...")
+        documents = doc_processor.iter_from_folders(str(lit_path))
+
+        indexer.build_index_incremental(
+            documents=documents,
+            batch_write_size=args.batch_size,
+            show_progress=True
+        )
 
     # 最终统计
     stats = indexer.get_index_stats()
@@ -75,6 +93,11 @@ def main():
     logger.info(f"  总向量数: {stats['document_count']:,}")
     logger.info(f"  数据库位置: {stats['persist_directory']}")
 
+    load_stats = doc_processor.get_statistics()
+    logger.info(f"\n📄 文档加载统计:")
+    logger.info(f"  已加载文档块: {load_stats['processed']}")
+    logger.info(f"  跳过文件夹: {load_stats['skipped']}")
+
     if 'cache_stats' in stats:
         cache_stats = stats['cache_stats']
         logger.info(f"\n📦 缓存统计:")
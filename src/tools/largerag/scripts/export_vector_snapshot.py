@@ -0,0 +1,82 @@
+"""
+导出向量快照脚本 - 供 vector_store.type = "numpy" / "hnsw" 的进程内检索后端使用
+索引构建（写入 Chroma）完成后运行一次即可
+
+运行方式：
+    python scripts/export_vector_snapshot.py --collection-name des_prod_v3 --dtype float16
+"""
+
+import sys
+import argparse
+from pathlib import Path
+import logging
+
+# 添加项目路径
+project_root = Path(__file__).resolve().parents[4]
+sys.path.insert(0, str(project_root))
+
+from src.tools.largerag.config.settings import SETTINGS
+from src.tools.largerag.core.numpy_vector_store import get_snapshot_dir
+from src.tools.largerag.core.vector_snapshot import VectorSnapshot, export_chroma_snapshot
+
+import chromadb
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='从 Chroma collection 导出向量快照')
+    parser.add_argument('--collection-name', default=SETTINGS.vector_store.collection_name, help='Collection名称')
+    parser.add_argument('--dtype', default=SETTINGS.vector_store.dtype, choices=['float32', 'float16'], help='矩阵精度')
+    parser.add_argument('--build-hnsw', action='store_true', help='同时构建 HNSW 索引（需要 hnswlib）')
+
+    args = parser.parse_args()
+
+    snapshot_dir = get_snapshot_dir(SETTINGS, args.collection_name)
+    logger.info("="*80)
+    logger.info("  导出向量快照")
+    logger.info("="*80)
+    logger.info(f"  Collection: {args.collection_name}")
+    logger.info(f"  快照目录: {snapshot_dir}")
+    logger.info(f"  精度: {args.dtype}")
+
+    chroma_client = chromadb.PersistentClient(path=SETTINGS.vector_store.persist_directory)
+    try:
+        collection = chroma_client.get_collection(name=args.collection_name)
+    except Exception as e:
+        logger.error(f"Collection 不存在: {args.collection_name} ({e})")
+        return False
+
+    manifest = export_chroma_snapshot(
+        collection,
+        str(snapshot_dir),
+        metric=SETTINGS.vector_store.distance_metric,
+        dtype=args.dtype,
+        dimension=SETTINGS.embedding.dimension,
+    )
+
+    snapshot = VectorSnapshot(str(snapshot_dir), use_hnsw=args.build_hnsw)
+    logger.info(f"\n✓ 导出完成: {manifest['count']:,} 个向量")
+    logger.info(f"  {snapshot.get_stats()}")
+    snapshot.close()
+
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        success = main()
+        sys.exit(0 if success else 1)
+    except KeyboardInterrupt:
+        logger.warning("\n\n⚠️  用户中断（旧快照保持不变）")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"\n❌ 错误: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,203 @@
+"""
+分段缓存存储单元测试
+"""
+
+import pickle
+import hashlib
+import pytest
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.segment_store import SegmentStore
+from core.cache import LocalFileCache, LlamaIndexLocalCache
+
+
+class TestSegmentStore:
+    """SegmentStore 单元测试"""
+
+    @pytest.fixture
+    def store_dir(self, tmp_path):
+        return str(tmp_path / "segments")
+
+    def test_vector_and_blob_roundtrip(self, store_dir):
+        """测试：向量按 float32 存储，其他值按 pickle 存储"""
+        store = SegmentStore(store_dir)
+        store.put("vec", [0.25, 0.5, 0.75])
+        store.put("blob", {"nodes": [{"text": "DES"}]})
+
+        assert store.get("vec") == [0.25, 0.5, 0.75]
+        assert store.get_vector("vec").dtype == np.float32
+        assert store.get("blob") == {"nodes": [{"text": "DES"}]}
+        assert store.get_vector("blob") is None
+        assert store.get("missing") is None
+
+    def test_reopen_replays_index(self, store_dir):
+        """测试：重新打开后索引从段日志恢复，覆盖和删除生效"""
+        store = SegmentStore(store_dir)
+        store.put("a", [1.0, 2.0])
+        store.put("b", [3.0, 4.0])
+        store.put("a", [5.0, 6.0])
+        store.delete("b")
+        store.close()
+
+        reopened = SegmentStore(store_dir)
+        assert reopened.get("a") == [5.0, 6.0]
+        assert reopened.get("b") is None
+        assert len(reopened) == 1
+        assert reopened.dead_records == 3
+
+    def test_torn_index_tail_is_ignored(self, store_dir):
+        """测试：索引日志尾部不完整（崩溃）时忽略该记录"""
+        store = SegmentStore(store_dir)
+        store.put("a", [1.0, 2.0])
+        store.close()
+
+        idx_path = Path(store_dir) / SegmentStore.segment_file(1, "idx")
+        with open(idx_path, "ab") as f:
+            f.write(b'v\t2\t2\t"b')
+
+        reopened = SegmentStore(store_dir)
+        assert reopened.keys() == ["a"]
+        reopened.put("c", [7.0, 8.0])
+        reopened.close()
+
+        assert SegmentStore(store_dir).get("c") == [7.0, 8.0]
+
+    def test_rollover_and_compact(self, store_dir):
+        """测试：段滚动后压缩，数据不丢失且失效记录被回收"""
+        store = SegmentStore(store_dir, max_segment_bytes=64)
+        for i in range(20):
+            store.put(f"k{i}", [float(i)] * 8)
+        for i in range(10):
+            store.delete(f"k{i}")
+
+        assert store.get_stats()["segment_count"] > 1
+
+        result = store.compact()
+        assert result["live_records"] == 10
+        assert store.dead_records == 0
+        assert store.get("k15") == [15.0] * 8
+
+        store.close()
+        reopened = SegmentStore(store_dir)
+        assert sorted(reopened.keys()) == sorted(f"k{i}" for i in range(10, 20))
+
+    def test_clear(self, store_dir):
+        """测试：清空后计数归零"""
+        store = SegmentStore(store_dir)
+        store.put("a", [1.0])
+        assert store.clear() == 1
+        assert len(store) == 0
+        assert store.get("a") is None
+
+    def test_clear_after_close(self, store_dir):
+        """测试：close() 之后仍可 clear()"""
+        store = SegmentStore(store_dir)
+        store.put("a", [1.0])
+        store.close()
+        assert store.clear() == 1
+        store.close()
+
+    def test_open_waits_for_rollover_in_other_process(self, store_dir):
+        """测试：另一进程滚动段期间打开存储会等待，不会把新段当作孤儿删除"""
+        store = SegmentStore(store_dir)
+        new_segment = Path(store_dir) / SegmentStore.segment_file(2, "f32")
+        opened = []
+
+        with store._interprocess_lock():
+            # 模拟滚动的前半步：新段文件已创建，MANIFEST 尚未更新
+            new_segment.touch()
+            opener = threading.Thread(target=lambda: opened.append(SegmentStore(store_dir)))
+            opener.start()
+            opener.join(timeout=0.2)
+            assert opener.is_alive()
+            store._write_manifest([1, 2])
+
+        opener.join(timeout=5)
+        assert opened and opened[0].get_stats()["segment_count"] == 2
+        assert new_segment.exists()
+
+    def test_two_writers_same_directory(self, store_dir):
+        """测试：两个实例交替写入同一目录，偏移量按文件真实末尾计算，互不覆盖"""
+        first = SegmentStore(store_dir)
+        second = SegmentStore(store_dir)
+        for i in range(20):
+            writer = first if i % 2 == 0 else second
+            writer.put(f"v{i}", [float(i)] * 3)
+            writer.put(f"b{i}", {"n": i})
+
+        assert first.get("v2") == [2.0] * 3 and second.get("b3") == {"n": 3}
+        reader = SegmentStore(store_dir)
+        for i in range(20):
+            assert reader.get(f"v{i}") == [float(i)] * 3
+            assert reader.get(f"b{i}") == {"n": i}
+
+    def test_writer_follows_rollover_and_compact_of_other(self, store_dir):
+        """测试：另一实例滚动/压缩后，本实例重新加载并写入新的活跃段"""
+        first = SegmentStore(store_dir, max_segment_bytes=64)
+        second = SegmentStore(store_dir, max_segment_bytes=64)
+        for i in range(10):
+            first.put(f"a{i}", [float(i)] * 4)  # 每 4 条滚动一次
+        second.put("b", [9.0] * 4)
+        first.put("a0", [0.5] * 4)
+        first.compact()
+        second.put("c", [7.0] * 4)
+
+        assert second.get("a0") == [0.5] * 4
+        assert second.get("b") == [9.0] * 4
+        reader = SegmentStore(store_dir)
+        assert len(reader) == 12
+        assert reader.get("a9") == [9.0] * 4
+        assert reader.get("c") == [7.0] * 4
+
+    def test_write_after_crashed_writer(self, store_dir):
+        """测试：另一进程写入中途崩溃留下的残缺向量/半行索引不会破坏后续写入"""
+        store = SegmentStore(store_dir)
+        store.put("a", [1.0, 2.0])
+        with open(Path(store_dir) / SegmentStore.segment_file(1, "f32"), "ab") as f:
+            f.write(b"\x00\x01")
+        with open(Path(store_dir) / SegmentStore.segment_file(1, "idx"), "ab") as f:
+            f.write(b"v\t2\t2\t\"to")
+
+        store.put("b", [3.0, 4.0])
+        reopened = SegmentStore(store_dir)
+        assert reopened.get("a") == [1.0, 2.0]
+        assert reopened.get("b") == [3.0, 4.0]
+
+
+class TestLocalFileCache:
+    """LocalFileCache / LlamaIndexLocalCache 单元测试"""
+
+    def test_legacy_pickle_migration(self, tmp_path):
+        """测试：旧版 {md5}.pkl 缓存在首次命中时迁移"""
+        legacy_dir = tmp_path / "cache"
+        legacy_dir.mkdir(parents=True)
+        legacy_path = legacy_dir / (hashlib.md5(b"old-key").hexdigest() + ".pkl")
+        with open(legacy_path, "wb") as f:
+            pickle.dump([0.5, 0.25], f)
+
+        cache = LocalFileCache(str(tmp_path), "cache")
+        assert cache.get("old-key") == [0.5, 0.25]
+        assert not legacy_path.exists()
+        assert cache.get("old-key") == [0.5, 0.25]
+
+    def test_kvstore_get_all(self, tmp_path):
+        """测试：KVStore 适配器支持 get_all 和 delete"""
+        kv = LlamaIndexLocalCache(str(tmp_path), "ingestion_cache")
+        kv.put("k1", {"nodes": [1]})
+        kv.put("k2", {"nodes": [2]})
+
+        assert kv.get_all() == {"k1": {"nodes": [1]}, "k2": {"nodes": [2]}}
+        assert kv.delete("k1") is True
+        assert kv.delete("k1") is False
+        assert kv.stats["entry_count"] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,186 @@
+"""
+文档清单单元测试
+使用假的 Chroma collection，不依赖 chromadb
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.doc_manifest import DocumentManifest, compute_content_hash
+
+
+class FakeDocument:
+    def __init__(self, text, metadata):
+        self.text = text
+        self.metadata = metadata
+
+
+class FakeCollection:
+    """模拟 chromadb Collection 的 count/get/delete 接口"""
+
+    def __init__(self, records=None):
+        self.records = dict(records or {})  # node_id -> metadata
+        self.get_calls = 0
+
+    def count(self):
+        return len(self.records)
+
+    def get(self, limit, offset, include):
+        self.get_calls += 1
+        ids = sorted(self.records)[offset:offset + limit]
+        return {"ids": ids, "metadatas": [self.records[i] for i in ids]}
+
+    def delete(self, ids):
+        for node_id in ids:
+            self.records.pop(node_id, None)
+
+
+def entry(doc_hash, node_ids, content_hash="c"):
+    return {
+        "doc_hash": doc_hash,
+        "node_ids": node_ids,
+        "content_hash": content_hash,
+        "chunker_config": "cfg",
+        "embed_model": "m",
+    }
+
+
+class TestDocumentManifest:
+    """DocumentManifest 单元测试"""
+
+    @pytest.fixture
+    def manifest(self, tmp_path):
+        return DocumentManifest(str(tmp_path / "manifest.sqlite3"))
+
+    def test_pending_not_reported_until_complete(self, manifest):
+        """测试：只有 complete 的文献才算已处理"""
+        manifest.begin([entry("a", ["a1", "a2"]), entry("b", ["b1"])])
+        assert manifest.completed_doc_hashes() == set()
+
+        manifest.complete(["a"])
+        assert manifest.completed_doc_hashes() == {"a"}
+        assert manifest.node_ids("a") == ["a1", "a2"]
+        assert manifest.get_stats()["pending_documents"] == 1
+
+    def test_is_current(self, manifest):
+        """测试：内容哈希、分块配置或模型变化时不再视为最新"""
+        manifest.begin([entry("a", ["a1"], content_hash="h1")])
+        manifest.complete(["a"])
+
+        assert manifest.is_current("a", "h1", "cfg", "m")
+        assert not manifest.is_current("a", "h2", "cfg", "m")
+        assert not manifest.is_current("a", "h1", "other", "m")
+        assert not manifest.is_current("missing", "h1", "cfg", "m")
+
+    def test_reconcile_rolls_back_pending(self, manifest):
+        """测试：上次中断时未写完的文献从 Chroma 删除并清除记录"""
+        collection = FakeCollection({"a1": {"doc_hash": "a"}, "b1": {"doc_hash": "b"}})
+        manifest.begin([entry("a", ["a1"]), entry("b", ["b1", "b2"])])
+        manifest.complete(["a"])
+
+        stats = manifest.reconcile(collection)
+
+        assert stats["rolled_back_docs"] == 1
+        assert set(collection.records) == {"a1"}
+        assert manifest.completed_doc_hashes() == {"a"}
+        assert stats["rebuilt"] == 0
+        assert collection.get_calls == 0
+
+    def test_mark_pending_is_rolled_back(self, manifest):
+        """测试：删除中断（已标记 pending、Chroma 已删除）后对账清除记录，不触发重建"""
+        collection = FakeCollection({"a1": {"doc_hash": "a"}, "b1": {"doc_hash": "b"}})
+        manifest.begin([entry("a", ["a1"]), entry("b", ["b1"])])
+        manifest.complete(["a", "b"])
+
+        assert manifest.mark_pending(["b"]) == ["b1"]
+        assert manifest.completed_doc_hashes() == {"a"}
+        collection.delete(["b1"])
+
+        stats = manifest.reconcile(collection)
+        assert stats["rolled_back_docs"] == 1 and stats["rebuilt"] == 0
+        assert manifest.get("b") is None
+
+    def test_reconcile_rebuilds_when_out_of_sync(self, manifest):
+        """测试：清单为空而 collection 已有向量时从元数据重建一次"""
+        records = {f"n{i}": {"doc_hash": f"d{i % 3}"} for i in range(2500)}
+        records["orphan"] = {}
+        collection = FakeCollection(records)
+
+        assert manifest.reconcile(collection)["rebuilt"] == 3
+        assert manifest.completed_doc_hashes() == {"d0", "d1", "d2"}
+        assert manifest.total_nodes() == 2501
+
+        calls = collection.get_calls
+        assert manifest.reconcile(collection)["rebuilt"] == 0
+        assert collection.get_calls == calls
+
+    def test_rebuild_keeps_content_hash_of_unchanged_docs(self, manifest):
+        """测试：重建时 node 集合未变的文献保留内容哈希"""
+        manifest.begin([entry("a", ["a1"], content_hash="h1")])
+        manifest.complete(["a"])
+        collection = FakeCollection({"a1": {"doc_hash": "a"}, "x1": {"doc_hash": "x"}})
+
+        manifest.reconcile(collection)
+
+        assert manifest.get("a")["content_hash"] == "h1"
+        assert manifest.get("x")["content_hash"] is None
+
+    def test_fingerprints_follow_documents(self, manifest):
+        """测试：删除文献时同时删除指纹；重建时保留 node 未变文献的指纹"""
+        manifest.begin([entry("a", ["a1"]), entry("b", ["b1"])])
+        manifest.complete(["a", "b"])
+        manifest.set_fingerprints({"a": "fa", "b": "fb"})
+
+        assert manifest.remove(["b"]) == ["b1"]
+        assert manifest.get_fingerprints() == {"a": "fa"}
+
+        manifest.reconcile(FakeCollection({"a1": {"doc_hash": "a"}, "c1": {"doc_hash": "c"}}))
+        assert manifest.get_fingerprints() == {"a": "fa"}
+
+    def test_update_hashes_and_entries(self, manifest):
+        """测试：补全内容哈希后 get_entries 返回最新记录"""
+        manifest.begin([entry("a", ["a1"], content_hash=None)])
+        manifest.complete(["a"])
+        manifest.update_hashes("a", "h1", "cfg2", "m2")
+
+        entries = manifest.get_entries()
+        assert list(entries) == ["a"]
+        assert (entries["a"]["content_hash"], entries["a"]["chunker_config"]) == ("h1", "cfg2")
+
+    def test_missing_collection_clears_manifest(self, manifest):
+        """测试：collection 不存在时清单被清空"""
+        manifest.begin([entry("a", ["a1"])])
+        manifest.complete(["a"])
+
+        manifest.reconcile(None)
+        assert len(manifest) == 0
+
+    def test_persisted_across_instances(self, tmp_path):
+        """测试：清单重新打开后仍然有效"""
+        path = str(tmp_path / "manifest.sqlite3")
+        manifest = DocumentManifest(path)
+        manifest.begin([entry("a", ["a1"])])
+        manifest.complete(["a"])
+        manifest.close()
+
+        assert DocumentManifest(path).completed_doc_hashes() == {"a"}
+
+
+class TestContentHash:
+    """compute_content_hash 单元测试"""
+
+    def test_depends_on_text_and_metadata(self):
+        """测试：内容哈希随文本和元数据变化，与元数据键顺序无关"""
+        base = compute_content_hash([FakeDocument("text", {"doc_hash": "a", "page_idx": 0})])
+
+        assert base == compute_content_hash([FakeDocument("text", {"page_idx": 0, "doc_hash": "a"})])
+        assert base != compute_content_hash([FakeDocument("text2", {"doc_hash": "a", "page_idx": 0})])
+        assert base != compute_content_hash([FakeDocument("text", {"doc_hash": "a", "page_idx": 1})])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -2,14 +2,19 @@
 文档处理器单元测试
 """
 
+import json
 import pytest
 import sys
 from pathlib import Path
 
-# 添加项目路径
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# 添加项目根目录（document_processor 使用相对导入，需按包导入）
+sys.path.insert(0, str(Path(__file__).resolve().parents[4]))
 
-from core.document_processor import DocumentProcessor
+pytest.importorskip("llama_index.embeddings.dashscope")
+pytest.importorskip("llama_index.vector_stores.chroma")
+pytest.importorskip("chromadb")
+
+from src.tools.largerag.core.document_processor import DocumentProcessor, folder_fingerprint
 
 
 class TestDocumentProcessor:
@@ -22,8 +27,11 @@ class TestDocumentProcessor:
 
     @pytest.fixture
     def test_literature_dir(self):
-        """测试数据目录"""
-        return str(Path(__file__).parent.parent / "data" / "literature")
+        """测试数据目录（文献数据不随仓库分发，缺失时跳过）"""
+        path = Path(__file__).parent.parent / "data" / "literature"
+        if not path.exists():
+            pytest.skip(f"Literature data not found: {path}")
+        return str(path)
 
     def test_process_from_folders_success(self, processor, test_literature_dir):
         """测试：成功从文件夹加载文档"""
@@ -84,6 +92,65 @@ class TestDocumentProcessor:
             assert len(doc.text.strip()) > 0, "text 不应为空字符串"
 
 
+class TestStreamingDocumentProcessor:
+    """流式 / 并行解析单元测试（使用临时目录构造文献文件夹）"""
+
+    @pytest.fixture
+    def literature_dir(self, tmp_path):
+        for i in range(6):
+            folder = tmp_path / f"doc{i}"
+            folder.mkdir()
+            content = [
+                {"type": "text", "text": f"Paper {i} introduction", "text_level": 1, "page_idx": 0},
+                {"type": "image", "img_path": "fig1.png", "page_idx": 0},
+                {"type": "text", "text": f"Paper {i} results", "page_idx": 1},
+            ]
+            (folder / "content_list_process.json").write_text(json.dumps(content), encoding="utf-8")
+        (tmp_path / "empty").mkdir()
+        return str(tmp_path)
+
+    def test_parallel_matches_serial(self, literature_dir):
+        """测试：多进程解析结果与串行一致（顺序和元数据都相同）"""
+        serial = DocumentProcessor(parse_workers=1).process_from_folders(literature_dir)
+        parallel_processor = DocumentProcessor(parse_workers=2)
+        parallel = parallel_processor.process_from_folders(literature_dir)
+
+        assert [(d.text, d.metadata) for d in parallel] == [(d.text, d.metadata) for d in serial]
+        assert len(parallel) == 12
+        assert parallel_processor.get_statistics() == {"processed": 12, "skipped": 1, "total": 13}
+
+    def test_iter_is_lazy(self, literature_dir):
+        """测试：iter_from_folders 按需产出文档"""
+        documents = DocumentProcessor(parse_workers=1).iter_from_folders(literature_dir)
+        first = next(documents)
+
+        assert first.metadata["doc_hash"] == "doc0"
+        assert first.text == "Paper 0 introduction"
+        documents.close()
+
+    def test_iter_documents_only_given_folders(self, literature_dir):
+        """测试：iter_documents 只解析指定的文件夹，并保持输入顺序"""
+        folders = [str(Path(literature_dir) / name) for name in ("doc4", "doc1")]
+        documents = list(DocumentProcessor(parse_workers=1).iter_documents(folders))
+
+        assert [d.metadata["doc_hash"] for d in documents] == ["doc4", "doc4", "doc1", "doc1"]
+
+    def test_folder_fingerprint(self, literature_dir):
+        """测试：指纹随源文件变化，无源文件时为 None"""
+        folder = Path(literature_dir) / "doc0"
+        before = folder_fingerprint(folder)
+        (folder / "content_list_process.json").write_text("[]", encoding="utf-8")
+
+        assert before.startswith("content_list_process.json:")
+        assert folder_fingerprint(folder) != before
+        assert folder_fingerprint(Path(literature_dir) / "empty") is None
+
+    def test_iter_nonexistent_directory_raises_eagerly(self):
+        """测试：目录不存在时调用 iter_from_folders 即抛出异常"""
+        with pytest.raises(FileNotFoundError):
+            DocumentProcessor().iter_from_folders("/nonexistent/path")
+
+
 if __name__ == "__main__":
     # 直接运行测试
     pytest.main([__file__, "-v"])
@@ -0,0 +1,144 @@
+"""
+并发 Embedding 流水线单元测试
+不依赖 DashScope API，使用假的 embedding 函数
+"""
+
+import pytest
+import sys
+import threading
+import time
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.embedding_pipeline import ConcurrentEmbeddingPipeline, TokenBucketRateLimiter
+
+
+class FakeNode:
+    """模拟 LlamaIndex node（只需 get_content 和 embedding）"""
+
+    def __init__(self, text, embedding=None):
+        self.text = text
+        self.embedding = embedding
+
+    def get_content(self):
+        return self.text
+
+
+class TestTokenBucketRateLimiter:
+    """TokenBucketRateLimiter 单元测试"""
+
+    def test_disabled_does_not_wait(self):
+        """测试：rate <= 0 时不限流"""
+        limiter = TokenBucketRateLimiter(rate=0)
+        assert not limiter.enabled
+        assert limiter.acquire() == 0.0
+
+    def test_burst_then_throttle(self):
+        """测试：突发容量用完后按速率等待"""
+        limiter = TokenBucketRateLimiter(rate=50, capacity=2)
+        start = time.monotonic()
+        for _ in range(4):
+            limiter.acquire()
+        elapsed = time.monotonic() - start
+
+        # 2 个突发 + 2 个需等待约 1/50 秒
+        assert elapsed >= 0.03
+
+
+class TestConcurrentEmbeddingPipeline:
+    """ConcurrentEmbeddingPipeline 单元测试"""
+
+    def test_ordered_delivery(self):
+        """测试：即使后面的请求先完成，文档仍按输入顺序交付"""
+        def embed_fn(texts):
+            # 第一个文档最慢
+            if texts[0].startswith("doc0"):
+                time.sleep(0.05)
+            return [[float(len(t))] for t in texts]
+
+        pipeline = ConcurrentEmbeddingPipeline(embed_fn, batch_size=2, max_in_flight=4)
+        items = [
+            (f"doc{i}", [FakeNode(f"doc{i}-{j}") for j in range(3)])
+            for i in range(5)
+        ]
+
+        delivered = list(pipeline.run(items))
+
+        assert [key for key, _ in delivered] == [f"doc{i}" for i in range(5)]
+        for _, nodes in delivered:
+            assert all(node.embedding is not None for node in nodes)
+        assert pipeline.get_stats()["texts_embedded"] == 15
+
+    def test_bounded_in_flight(self):
+        """测试：同时在途的请求数不超过 max_in_flight"""
+        lock = threading.Lock()
+        state = {"current": 0, "peak": 0}
+
+        def embed_fn(texts):
+            with lock:
+                state["current"] += 1
+                state["peak"] = max(state["peak"], state["current"])
+            time.sleep(0.01)
+            with lock:
+                state["current"] -= 1
+            return [[0.0] for _ in texts]
+
+        pipeline = ConcurrentEmbeddingPipeline(embed_fn, batch_size=1, max_in_flight=3)
+        items = [(i, [FakeNode(str(i)) for _ in range(4)]) for i in range(6)]
+
+        list(pipeline.run(items))
+
+        assert state["peak"] <= 3
+        assert pipeline.get_stats()["requests_sent"] == 24
+
+    def test_skips_nodes_with_embedding(self):
+        """测试：已有 embedding 的 node（缓存命中）不会再次请求"""
+        calls = []
+
+        def embed_fn(texts):
+            calls.append(list(texts))
+            return [[1.0] for _ in texts]
+
+        pipeline = ConcurrentEmbeddingPipeline(embed_fn, batch_size=10)
+        items = [
+            ("cached", [FakeNode("a", embedding=[0.5])]),
+            ("new", [FakeNode("b"), FakeNode("c", embedding=[0.5])]),
+        ]
+
+        delivered = dict(pipeline.run(items))
+
+        assert calls == [["b"]]
+        assert delivered["cached"][0].embedding == [0.5]
+        assert delivered["new"][0].embedding == [1.0]
+
+    def test_failure_stops_delivery(self):
+        """测试：请求失败时异常向上抛出，失败文档及之后的文档不会被交付"""
+        def embed_fn(texts):
+            if texts[0] == "bad":
+                raise ConnectionError("boom")
+            return [[0.0] for _ in texts]
+
+        pipeline = ConcurrentEmbeddingPipeline(embed_fn, batch_size=1, max_in_flight=1)
+        items = [
+            ("ok", [FakeNode("good")]),
+            ("fail", [FakeNode("bad")]),
+            ("after", [FakeNode("good")]),
+        ]
+
+        delivered = []
+        with pytest.raises(ConnectionError):
+            for key, _ in pipeline.run(items):
+                delivered.append(key)
+
+        assert delivered == ["ok"]
+
+    def test_invalid_batch_size(self):
+        """测试：batch_size 非法时抛出异常"""
+        with pytest.raises(ValueError):
+            ConcurrentEmbeddingPipeline(lambda texts: [], batch_size=0)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,73 @@
+"""
+内容寻址 Embedding 存储单元测试
+不依赖 DashScope API，使用假的 embedding 函数
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.embedding_store import EmbeddingStore, normalize_text
+
+
+class TestEmbeddingStore:
+    """EmbeddingStore 单元测试"""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        """创建临时目录下的 EmbeddingStore"""
+        return EmbeddingStore(str(tmp_path), model="text-embedding-v4", dimension=4)
+
+    @pytest.fixture
+    def counting_embed_fn(self):
+        """记录请求文本的假 embedding 函数"""
+        calls = []
+
+        def embed_fn(texts):
+            calls.append(list(texts))
+            return [[float(len(t)), 0.0, 0.0, 1.0] for t in texts]
+
+        embed_fn.calls = calls
+        return embed_fn
+
+    def test_normalize_text(self):
+        """测试：空白差异不影响规范化结果"""
+        assert normalize_text("  Deep  eutectic\n\nsolvents ") == "Deep eutectic solvents"
+
+    def test_only_new_text_is_embedded(self, store, counting_embed_fn):
+        """测试：第二次只请求新文本"""
+        store.get_or_embed(["chunk a", "chunk b"], counting_embed_fn)
+        result = store.get_or_embed(["chunk b", "chunk  a", "chunk c"], counting_embed_fn)
+
+        assert counting_embed_fn.calls == [["chunk a", "chunk b"], ["chunk c"]]
+        assert len(result) == 3
+        assert result[0] == [7.0, 0.0, 0.0, 1.0]
+
+    def test_key_depends_on_model_and_dimension(self, tmp_path):
+        """测试：不同模型或维度互不命中"""
+        base = EmbeddingStore(str(tmp_path), model="m1", dimension=4)
+        other_model = EmbeddingStore(str(tmp_path), model="m2", dimension=4)
+        other_dim = EmbeddingStore(str(tmp_path), model="m1", dimension=8)
+
+        base.put_many(["text"], [[1.0, 2.0, 3.0, 4.0]])
+
+        assert base.get("text") == [1.0, 2.0, 3.0, 4.0]
+        assert other_model.get("text") is None
+        assert other_dim.get("text") is None
+
+    def test_stats(self, store, counting_embed_fn):
+        """测试：命中率统计"""
+        store.get_or_embed(["x"], counting_embed_fn)
+        store.get_or_embed(["x"], counting_embed_fn)
+
+        stats = store.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
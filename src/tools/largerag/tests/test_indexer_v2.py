@@ -0,0 +1,154 @@
+"""
+增量同步（LargeRAGIndexerV2.sync_from_folders）单元测试
+使用假的 Chroma collection、分块器和 embedding 流水线，不调用 DashScope
+"""
+
+import json
+import shutil
+import pytest
+import sys
+from pathlib import Path
+
+# 添加项目根目录（indexer_v2 使用相对导入，需按包导入）
+sys.path.insert(0, str(Path(__file__).resolve().parents[4]))
+
+pytest.importorskip("llama_index.embeddings.dashscope")
+pytest.importorskip("llama_index.vector_stores.chroma")
+pytest.importorskip("chromadb")
+
+from llama_index.core.schema import TextNode
+
+from src.tools.largerag.core import indexer_v2
+from src.tools.largerag.core.doc_manifest import DocumentManifest
+from src.tools.largerag.core.document_processor import DocumentProcessor
+from src.tools.largerag.core.indexer_v2 import LargeRAGIndexerV2
+
+
+class FakeCollection:
+    """模拟 chromadb Collection 的 count/get/delete 接口（add 由索引器的写入方法代替）"""
+
+    def __init__(self):
+        self.records = {}  # node_id -> {"text", "metadata"}
+        self.crash_on_delete = None  # "before" / "after"：模拟删除前后进程中断
+
+    def count(self):
+        return len(self.records)
+
+    def get(self, limit, offset, include):
+        ids = sorted(self.records)[offset:offset + limit]
+        return {"ids": ids, "metadatas": [self.records[i]["metadata"] for i in ids]}
+
+    def delete(self, ids):
+        if self.crash_on_delete == "before":
+            raise RuntimeError("simulated crash before Chroma delete")
+        for node_id in ids:
+            self.records.pop(node_id, None)
+        if self.crash_on_delete == "after":
+            raise RuntimeError("simulated crash after Chroma delete")
+
+    def texts(self, doc_hash):
+        return sorted(r["text"] for r in self.records.values() if r["metadata"]["doc_hash"] == doc_hash)
+
+
+class PassthroughPipeline:
+    """不计算 embedding 的流水线（假 collection 不需要向量）"""
+
+    def run(self, items):
+        return iter(items)
+
+    def get_stats(self):
+        return {}
+
+
+def write_paper(root: Path, doc_hash: str, *texts: str):
+    folder = root / doc_hash
+    folder.mkdir(exist_ok=True)
+    content = [{"type": "text", "text": text, "page_idx": 0} for text in texts]
+    (folder / "content_list_process.json").write_text(json.dumps(content), encoding="utf-8")
+
+
+class TestSyncFromFolders:
+    """sync_from_folders 单元测试"""
+
+    @pytest.fixture
+    def collection(self):
+        return FakeCollection()
+
+    @pytest.fixture
+    def indexer(self, tmp_path, collection):
+        """不经过 __init__ 构造索引器（无需 API Key / Chroma 客户端）"""
+        indexer = object.__new__(LargeRAGIndexerV2)
+        indexer.settings = indexer_v2.SETTINGS
+        indexer.collection_name = "test"
+        indexer.doc_cache = None
+        indexer.embedding_store = None
+        indexer.manifest = DocumentManifest(str(tmp_path / "manifest.sqlite3"))
+        indexer.chunker_config = "cfg"
+        indexer.embed_model_id = "model"
+        indexer.last_build_stats = {}
+        indexer.splitter = lambda docs: [TextNode(text=d.text, metadata=dict(d.metadata)) for d in docs]
+        indexer._get_collection = lambda: collection
+        indexer._write_nodes_batch_to_chroma = lambda nodes: collection.records.update(
+            {node.node_id: {"text": node.text, "metadata": node.metadata} for node in nodes}
+        )
+        indexer._create_embedding_pipeline = PassthroughPipeline
+        indexer.load_index = lambda: None
+        return indexer
+
+    @pytest.fixture
+    def literature_dir(self, tmp_path):
+        root = tmp_path / "literature"
+        root.mkdir()
+        write_paper(root, "a", "Paper A")
+        write_paper(root, "b", "Paper B")
+        write_paper(root, "c", "Paper C")
+        return root
+
+    def sync(self, indexer, literature_dir):
+        processor = DocumentProcessor(aggregate_small_chunks=False, separator="\n\n", parse_workers=1)
+        return indexer.sync_from_folders(str(literature_dir), doc_processor=processor, show_progress=False)
+
+    def test_added_modified_removed(self, indexer, collection, literature_dir):
+        """测试：只删除/重建变化的文献，未变化的文献保留原有 node"""
+        assert self.sync(indexer, literature_dir)["added"] == 3
+        nodes_of_a = set(indexer.manifest.node_ids("a"))
+
+        write_paper(literature_dir, "b", "Paper B, revised edition")
+        shutil.rmtree(literature_dir / "c")
+        write_paper(literature_dir, "d", "Paper D")
+        summary = self.sync(indexer, literature_dir)
+
+        assert (summary["added"], summary["modified"], summary["removed"], summary["unchanged"]) == (1, 1, 1, 1)
+        assert collection.texts("b") == ["Paper B, revised edition"]
+        assert collection.texts("c") == []
+        assert collection.texts("d") == ["Paper D"]
+        assert set(indexer.manifest.node_ids("a")) == nodes_of_a
+        assert indexer.manifest.completed_doc_hashes() == {"a", "b", "d"}
+        assert indexer.manifest.total_nodes() == collection.count()
+
+        summary = self.sync(indexer, literature_dir)
+        assert summary["unchanged"] == 3 and summary["new_nodes"] == 0
+
+    @pytest.mark.parametrize("crash", ["before", "after"])
+    def test_interrupted_delete_reindexes_modified_doc(self, indexer, collection, literature_dir, crash):
+        """测试：删除过期 node 时中断，下次同步仍会重建修改过的文献，而不是保留旧向量"""
+        self.sync(indexer, literature_dir)
+
+        write_paper(literature_dir, "b", "Paper B, revised edition")
+        shutil.rmtree(literature_dir / "c")
+        collection.crash_on_delete = crash
+        with pytest.raises(RuntimeError):
+            self.sync(indexer, literature_dir)
+
+        collection.crash_on_delete = None
+        summary = self.sync(indexer, literature_dir)
+
+        assert summary["added"] == 1  # b：回滚后视为新增
+        assert collection.texts("b") == ["Paper B, revised edition"]
+        assert collection.texts("c") == []
+        assert indexer.manifest.completed_doc_hashes() == {"a", "b"}
+        assert indexer.manifest.total_nodes() == collection.count()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,140 @@
+"""
+查询缓存单元测试
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core import query_cache
+from core.query_cache import QueryCache, TTLLRUCache
+
+
+class TestTTLLRUCache:
+    """TTLLRUCache 单元测试"""
+
+    def test_lru_eviction(self):
+        """测试：超过上限时淘汰最久未使用的条目"""
+        cache = TTLLRUCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_ttl_expiry(self, monkeypatch):
+        """测试：过期条目视为未命中"""
+        now = [1000.0]
+        monkeypatch.setattr(query_cache.time, "time", lambda: now[0])
+        cache = TTLLRUCache(ttl=10)
+        cache.put("a", 1)
+
+        now[0] += 5
+        assert cache.get("a") == 1
+        now[0] += 10
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_hit_rate(self):
+        """测试：命中率统计"""
+        cache = TTLLRUCache()
+        cache.put("a", 1)
+        cache.get("a")
+        cache.get("missing")
+
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+class TestQueryCache:
+    """QueryCache 单元测试"""
+
+    def test_embedding_key_normalizes_whitespace(self):
+        """测试：查询文本空白差异不影响命中"""
+        cache = QueryCache(model="m")
+        cache.put_embedding("choline chloride  urea", [0.1, 0.2])
+        assert cache.get_embedding(" choline chloride urea") == pytest.approx([0.1, 0.2])
+
+    def test_rerank_key_ignores_candidate_order(self):
+        """测试：候选集合相同（顺序不同）时命中，top_n 不同时不命中"""
+        cache = QueryCache(model="m")
+        cache.put_rerank("q", ["n1", "n2"], 5, [("n2", 0.9), ("n1", 0.4)])
+
+        assert cache.get_rerank("q", ["n2", "n1"], 5) == [("n2", 0.9), ("n1", 0.4)]
+        assert cache.get_rerank("q", ["n2", "n1"], 3) is None
+        assert cache.get_rerank("q", ["n1", "n3"], 5) is None
+
+    def test_generation_change_invalidates(self):
+        """测试：向量库版本变化时清空两级缓存"""
+        generation = ["v1"]
+        cache = QueryCache(model="m", generation_fn=lambda: generation[0], check_interval=0)
+        cache.refresh()
+        cache.put_embedding("q", [1.0])
+        cache.put_rerank("q", ["n1"], 1, [("n1", 0.5)])
+
+        assert cache.refresh() is False
+        generation[0] = "v2"
+        assert cache.refresh() is True
+
+        assert cache.get_embedding("q") is None
+        assert cache.get_rerank("q", ["n1"], 1) is None
+        assert cache.get_stats()["invalidations"] == 1
+
+    def test_persistence_survives_restart(self, tmp_path):
+        """测试：持久化后重启仍可命中；重启期间版本变化则失效"""
+        cache = QueryCache(model="m", persist_dir=str(tmp_path), generation_fn=lambda: "v1")
+        cache.refresh()
+        cache.put_embedding("q", [0.5, 0.25])
+        cache.flush()
+
+        reopened = QueryCache(model="m", persist_dir=str(tmp_path), generation_fn=lambda: "v1")
+        reopened.refresh()
+        assert reopened.get_embedding("q") == [0.5, 0.25]
+        assert reopened.get_stats()["embedding"]["disk_hits"] == 1
+
+        changed = QueryCache(model="m", persist_dir=str(tmp_path), generation_fn=lambda: "v2")
+        assert changed.refresh() is True
+        assert changed.get_embedding("q") is None
+
+
+class TestCreateQueryCache:
+    """create_query_cache 单元测试"""
+
+    @staticmethod
+    def _settings(cache_dir, persist=True):
+        from types import SimpleNamespace
+        return SimpleNamespace(
+            cache=SimpleNamespace(
+                query_cache=True, query_cache_persist=persist, local_cache_dir=str(cache_dir),
+                query_cache_max_entries=100, query_cache_ttl=0,
+            ),
+            embedding=SimpleNamespace(model="m", dimension=4),
+            reranker=SimpleNamespace(model="r"),
+        )
+
+    def test_persistent_cache_shared_per_directory(self, tmp_path):
+        """测试：同一目录的持久化缓存只打开一次，引擎重建后复用并改用新的版本函数"""
+        first = query_cache.create_query_cache(self._settings(tmp_path), generation_fn=lambda: "v1")
+        first.refresh()
+        first.put_embedding("q", [0.5])
+
+        second = query_cache.create_query_cache(self._settings(tmp_path), generation_fn=lambda: "v2")
+        assert second is first
+        assert second.refresh() is True  # 立即检查，不等 check_interval
+        assert second.get_embedding("q") is None
+
+        other = query_cache.create_query_cache(self._settings(tmp_path / "other"))
+        assert other is not first
+        memory_only = query_cache.create_query_cache(self._settings(tmp_path, persist=False))
+        assert memory_only is not first and not memory_only.get_stats()["persistent"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,170 @@
+"""
+检索流水线单元测试
+使用假的 embedding 模型、向量存储和 reranker，不依赖 DashScope / Chroma 服务
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from llama_index.core.schema import NodeWithScore, TextNode
+from llama_index.core.vector_stores.types import VectorStoreQueryResult
+
+from core.query_cache import QueryCache
+from core.retrieval_pipeline import LatencyStats, RetrievalPipeline, SessionDashScopeRerank
+
+
+class FakeEmbedModel:
+    """把查询文本映射为一维向量 [len(text)]"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_query_embedding(self, query):
+        self.calls += 1
+        return [float(len(query))]
+
+
+class FakeVectorStore:
+    """返回固定的 10 个节点，相似度递减"""
+
+    def __init__(self):
+        self.nodes = [TextNode(id_=f"n{i}", text=f"doc {i}") for i in range(10)]
+        self.requested_top_k = []
+
+    def query(self, query, **kwargs):
+        self.requested_top_k.append(query.similarity_top_k)
+        nodes = self.nodes[:query.similarity_top_k]
+        return VectorStoreQueryResult(
+            nodes=nodes,
+            similarities=[1.0 - i * 0.05 for i in range(len(nodes))],
+            ids=[n.node_id for n in nodes],
+        )
+
+
+class FakeIndex:
+    def __init__(self):
+        self._embed_model = FakeEmbedModel()
+        self.vector_store = FakeVectorStore()
+
+
+class FakeRerankClient:
+    """按文本逆序打分（doc 9 得分最高），记录每次请求的 top_n"""
+
+    def __init__(self):
+        self.top_ns = []
+
+    def rerank(self, query, documents, top_n):
+        self.top_ns.append(top_n)
+        scored = sorted(
+            ((i, int(text.split()[-1]) / 10) for i, text in enumerate(documents)),
+            key=lambda x: x[1],
+            reverse=True,
+        )
+        return scored[:top_n]
+
+    def close(self):
+        pass
+
+
+class TestLatencyStats:
+    """LatencyStats 单元测试"""
+
+    def test_percentiles(self):
+        """测试：平均值、分位数和最大值"""
+        stats = LatencyStats(["embed"])
+        for ms in range(1, 101):
+            stats.record("embed", ms / 1000)
+
+        result = stats.get_stats()["embed"]
+        assert result["count"] == 100
+        assert result["mean_ms"] == pytest.approx(50.5)
+        assert result["p95_ms"] == pytest.approx(96.0)
+        assert result["max_ms"] == pytest.approx(100.0)
+
+    def test_window_keeps_total_count(self):
+        """测试：样本窗口有界，但调用次数累计"""
+        stats = LatencyStats(["rerank"], window=3)
+        for _ in range(5):
+            with stats.time("rerank"):
+                pass
+        assert stats.get_stats()["rerank"]["count"] == 5
+
+
+class TestRetrievalPipeline:
+    """RetrievalPipeline 单元测试"""
+
+    @pytest.fixture
+    def index(self):
+        return FakeIndex()
+
+    @pytest.fixture
+    def rerank_client(self):
+        return FakeRerankClient()
+
+    def test_without_reranker(self, index):
+        """测试：未启用 reranker 时按向量相似度返回前 top_k 个"""
+        pipeline = RetrievalPipeline(index, similarity_top_k=4, rerank_top_n=3)
+        nodes = pipeline.retrieve("cellulose", top_k=2)
+
+        assert [n.node.node_id for n in nodes] == ["n0", "n1"]
+        # 候选池至少 similarity_top_k 个
+        assert index.vector_store.requested_top_k == [4]
+
+    def test_reranker_reused_with_per_call_top_n(self, index, rerank_client):
+        """测试：同一个 reranker 实例按调用参数化 top_n"""
+        reranker = SessionDashScopeRerank(client=rerank_client, top_n=3)
+        pipeline = RetrievalPipeline(index, reranker=reranker, similarity_top_k=4, rerank_top_n=3)
+
+        assert [n.node.node_id for n in pipeline.retrieve("q", top_k=2)] == ["n3", "n2"]
+        assert [n.node.node_id for n in pipeline.retrieve("q", top_k=5)][0] == "n9"
+        assert rerank_client.top_ns == [3, 5]
+
+    def test_rerank_threshold_filter(self, index, rerank_client):
+        """测试：Reranker 分数阈值过滤"""
+        reranker = SessionDashScopeRerank(client=rerank_client, top_n=10)
+        pipeline = RetrievalPipeline(
+            index, reranker=reranker, similarity_top_k=10, rerank_top_n=10, rerank_threshold=0.75
+        )
+        nodes = pipeline.retrieve("q")
+        assert [n.node.node_id for n in nodes] == ["n9", "n8"]
+
+    def test_batch_dedupes_queries_and_records_latency(self, index, rerank_client):
+        """测试：批量检索中相同查询只检索一次，各阶段延迟都有记录"""
+        reranker = SessionDashScopeRerank(client=rerank_client, top_n=3)
+        pipeline = RetrievalPipeline(index, reranker=reranker, similarity_top_k=4, rerank_workers=2)
+
+        results = pipeline.retrieve_batch(["a", "bb", "a"], top_k=2)
+
+        assert len(results) == 3
+        assert results[0] == results[2]
+        assert index._embed_model.calls == 2
+        assert len(rerank_client.top_ns) == 2
+
+        stats = pipeline.get_stats()
+        assert stats["query_count"] == 3
+        assert set(stats["latency"]) == {"embed", "vector_search", "rerank", "filter"}
+        assert stats["latency"]["rerank"]["count"] == 1
+        pipeline.close()
+
+    def test_query_cache_skips_embed_and_rerank(self, index, rerank_client):
+        """测试：重复查询命中缓存，不再请求 embedding 和 Reranker"""
+        reranker = SessionDashScopeRerank(client=rerank_client, top_n=3)
+        pipeline = RetrievalPipeline(
+            index, reranker=reranker, similarity_top_k=4, cache=QueryCache(model="fake")
+        )
+
+        first = pipeline.retrieve("cellulose", top_k=2)
+        second = pipeline.retrieve("cellulose", top_k=2)
+
+        assert [(n.node.node_id, n.score) for n in first] == [(n.node.node_id, n.score) for n in second]
+        assert index._embed_model.calls == 1
+        assert len(rerank_client.top_ns) == 1
+        assert pipeline.get_stats()["cache"]["rerank"]["hits"] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
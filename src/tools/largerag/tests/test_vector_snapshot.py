@@ -0,0 +1,170 @@
+"""
+向量快照（进程内检索）单元测试
+使用假的 Chroma collection，不依赖 chromadb
+"""
+
+import math
+import pytest
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.vector_snapshot import VectorSnapshot, export_chroma_snapshot
+from core.numpy_vector_store import NumpyVectorStore, chroma_query_batch
+
+
+class FakeCollection:
+    """模拟 chromadb Collection 的 count/get 分页接口"""
+
+    name = "fake"
+
+    def __init__(self, embeddings):
+        self.embeddings = [list(map(float, e)) for e in embeddings]
+
+    def count(self):
+        return len(self.embeddings)
+
+    def get(self, limit, offset, include):
+        rows = range(offset, min(offset + limit, len(self.embeddings)))
+        return {
+            "ids": [f"node-{i}" for i in rows],
+            "embeddings": [self.embeddings[i] for i in rows],
+            "documents": [f"text {i}" for i in rows],
+            "metadatas": [{"doc_hash": f"doc{i % 3}"} for i in rows],
+        }
+
+    def query(self, query_embeddings, n_results, include):
+        """余弦距离暴力检索（与 Chroma 的 distance 定义一致）"""
+        matrix = np.asarray(self.embeddings)
+        matrix = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+        result = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for q in query_embeddings:
+            distances = 1 - matrix @ (np.asarray(q) / np.linalg.norm(q))
+            rows = np.argsort(distances)[:n_results]
+            result["ids"].append([f"node-{i}" for i in rows])
+            result["documents"].append([f"text {i}" for i in rows])
+            result["metadatas"].append([{"doc_hash": f"doc{i % 3}"} for i in rows])
+            result["distances"].append([float(distances[i]) for i in rows])
+        return result
+
+
+class TestVectorSnapshot:
+    """VectorSnapshot 单元测试"""
+
+    @pytest.fixture
+    def embeddings(self):
+        rng = np.random.default_rng(0)
+        return rng.normal(size=(50, 16)).astype(np.float32)
+
+    @pytest.fixture
+    def snapshot_dir(self, tmp_path, embeddings):
+        path = tmp_path / "snapshot"
+        export_chroma_snapshot(FakeCollection(embeddings), str(path), metric="cosine", page_size=7)
+        return str(path)
+
+    def test_exact_topk_matches_bruteforce(self, snapshot_dir, embeddings):
+        """测试：top-k 结果与暴力计算的余弦相似度一致"""
+        snapshot = VectorSnapshot(snapshot_dir)
+        query = embeddings[3] + 0.01
+
+        rows, sims = snapshot.search(query, top_k=5)
+
+        normed = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+        cos = normed @ (query / np.linalg.norm(query))
+        expected = np.argsort(-cos)[:5]
+
+        assert rows[0].tolist() == expected.tolist()
+        assert rows[0][0] == 3
+        # 与 ChromaVectorStore 一致：similarity = exp(-(1 - cos))
+        assert sims[0][0] == pytest.approx(math.exp(-(1 - cos[3])), rel=1e-4)
+
+    def test_batch_queries_and_mask(self, snapshot_dir, embeddings):
+        """测试：批量查询和布尔掩码"""
+        snapshot = VectorSnapshot(snapshot_dir)
+        mask = np.zeros(len(snapshot), dtype=bool)
+        mask[10:20] = True
+
+        rows, sims = snapshot.search(embeddings[[0, 15]], top_k=3, mask=mask)
+
+        assert rows.shape == (2, 3)
+        assert all(10 <= r < 20 for r in rows.ravel())
+        assert rows[1][0] == 15
+
+    def test_records_are_read_by_row(self, snapshot_dir):
+        """测试：按行读取文本和元数据"""
+        snapshot = VectorSnapshot(snapshot_dir)
+        record = snapshot.get_record(49)
+
+        assert record == {"id": "node-49", "text": "text 49", "metadata": {"doc_hash": "doc1"}}
+
+    def test_float16_snapshot(self, tmp_path, embeddings):
+        """测试：float16 快照检索结果与 float32 一致"""
+        path = tmp_path / "snapshot16"
+        export_chroma_snapshot(FakeCollection(embeddings), str(path), dtype="float16")
+        snapshot = VectorSnapshot(str(path))
+
+        assert snapshot.matrix.dtype == np.float16
+        rows, _ = snapshot.search(embeddings[7], top_k=1)
+        assert rows[0][0] == 7
+
+    def test_reexport_replaces_snapshot(self, snapshot_dir, embeddings):
+        """测试：重新导出替换旧快照"""
+        export_chroma_snapshot(FakeCollection(embeddings[:10]), snapshot_dir)
+        assert len(VectorSnapshot(snapshot_dir)) == 10
+
+    def test_empty_collection(self, tmp_path):
+        """测试：空 collection 导出后检索返回空结果，而不是维度错误"""
+        path = tmp_path / "empty"
+        manifest = export_chroma_snapshot(FakeCollection([]), str(path), dimension=16)
+        assert manifest["dimension"] == 16
+
+        snapshot = VectorSnapshot(str(path))
+        assert snapshot.dimension == 16
+        rows, similarities = snapshot.search(np.ones((2, 16)), top_k=5)
+        assert rows.shape == (2, 0) and similarities.shape == (2, 0)
+
+        # 未提供维度（旧版本快照为 (0, 0) 矩阵）时同样返回空结果
+        export_chroma_snapshot(FakeCollection([]), str(path))
+        rows, _ = VectorSnapshot(str(path)).search(np.ones(16), top_k=5)
+        assert rows.shape == (1, 0)
+
+
+class TestBatchQuery:
+    """多查询批量检索单元测试"""
+
+    @pytest.fixture
+    def embeddings(self):
+        rng = np.random.default_rng(1)
+        return rng.normal(size=(30, 8)).astype(np.float32)
+
+    def test_numpy_batch_matches_single_queries(self, tmp_path, embeddings):
+        """测试：批量检索结果与逐条检索一致，共享候选只还原一次"""
+        from llama_index.core.vector_stores.types import VectorStoreQuery
+
+        export_chroma_snapshot(FakeCollection(embeddings), str(tmp_path / "snapshot"))
+        store = NumpyVectorStore.from_snapshot_dir(str(tmp_path / "snapshot"))
+        queries = [embeddings[2], embeddings[2] + 0.01, embeddings[9]]
+
+        results = store.query_batch(queries, similarity_top_k=4)
+
+        for q, result in zip(queries, results):
+            single = store.query(VectorStoreQuery(query_embedding=q.tolist(), similarity_top_k=4))
+            assert result.ids == single.ids
+            assert result.similarities == pytest.approx(single.similarities, rel=1e-5)
+        assert results[0].nodes[0] is results[1].nodes[0]
+
+    def test_chroma_batch_query(self, embeddings):
+        """测试：Chroma 批量检索一次调用，相似度为 exp(-distance)"""
+        results = chroma_query_batch(FakeCollection(embeddings), embeddings[[4, 5]], n_results=3)
+
+        assert [r.ids[0] for r in results] == ["node-4", "node-5"]
+        assert results[0].similarities[0] == pytest.approx(1.0, rel=1e-5)
+        assert results[1].nodes[0].get_content() == "text 5"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -11,6 +11,7 @@ from fastapi import APIRouter, HTTPException, Query, Path, status
 from models.schemas import (
     RecommendationListResponse,
     RecommendationDetailResponse,
+    TrajectoryResponse,
     BaseResponse,
     ErrorResponse
 )
@@ -177,6 +178,10 @@ async def get_recommendation_detail(
         ...,
         description="Recommendation ID",
         example="REC_20251016_123456_task_001"
+    ),
+    include_trajectory: bool = Query(
+        True,
+        description="Include trajectory steps and tool calls (set false and use /{recommendation_id}/trajectory to load them on demand)"
     )
 ):
     """
@@ -185,16 +190,22 @@ async def get_recommendation_detail(
     Path parameters:
     - recommendation_id: The ID of the recommendation
 
+    Query parameters:
+    - include_trajectory: Whether to include the trajectory (default true)
+
     Returns complete recommendation details including:
     - Formulation details
     - Reasoning and supporting evidence
-    - Full trajectory of generation process
+    - Full trajectory of generation process (unless include_trajectory=false)
     - Experimental results (if feedback submitted)
     """
     try:
         # Call service
         rec_service = get_recommendation_service()
-        detail = rec_service.get_recommendation_detail(recommendation_id)
+        detail = rec_service.get_recommendation_detail(
+            recommendation_id,
+            include_trajectory=include_trajectory
+        )
 
         # Return success response
         return RecommendationDetailResponse(
@@ -223,6 +234,65 @@ async def get_recommendation_detail(
         )
 
 
+@router.get(
+    "/{recommendation_id}/trajectory",
+    response_model=TrajectoryResponse,
+    summary="Get recommendation trajectory",
+    description="Get the trajectory (steps and tool calls) of a recommendation",
+    responses={
+        200: {"description": "Trajectory retrieved successfully", "model": TrajectoryResponse},
+        404: {"description": "Recommendation not found", "model": ErrorResponse},
+        500: {"description": "Internal server error", "model": ErrorResponse}
+    }
+)
+async def get_recommendation_trajectory(
+    recommendation_id: str = Path(
+        ...,
+        description="Recommendation ID",
+        example="REC_20251016_123456_task_001"
+    )
+):
+    """
+    Get the trajectory of a recommendation.
+
+    Path parameters:
+    - recommendation_id: The ID of the recommendation
+
+    Loads the stored trajectory payload only; use together with
+    GET /{recommendation_id}?include_trajectory=false.
+    """
+    try:
+        # Call service
+        rec_service = get_recommendation_service()
+        trajectory = rec_service.get_recommendation_trajectory(recommendation_id)
+
+        # Return success response
+        return TrajectoryResponse(
+            status="success",
+            data=trajectory
+        )
+
+    except ValueError as e:
+        # Recommendation not found
+        logger.warning(f"Recommendation not found: {recommendation_id}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=error_response(message=str(e))
+        )
+    except RuntimeError as e:
+        logger.error(f"Failed to get recommendation trajectory: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=error_response(message=str(e))
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=error_response(message=f"Unexpected error: {str(e)}")
+        )
+
+
 @router.patch(
     "/{recommendation_id}/cancel",
     response_model=BaseResponse,
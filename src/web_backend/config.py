@@ -30,6 +30,14 @@ class WebConfig(BaseSettings):
     recommendations_path: str = "../../data/recommendations"
     memory_path: str = "../../data/memory"
 
+    # Task Queue (background recommendation generation)
+    task_queue_path: str = "../../data/tasks/task_queue.db"
+    task_workers: int = 2
+    task_per_material_limit: int = 1      # 0 = no limit
+    task_per_user_limit: int = 0          # 0 = no limit
+    task_max_attempts: int = 2
+    task_resume_on_restart: bool = True   # False: fail interrupted tasks instead of re-running them
+
     # Logging
     log_level: str = "INFO"
 
@@ -60,6 +68,11 @@ class WebConfig(BaseSettings):
         base_path = Path(__file__).parent
         return (base_path / self.memory_path).resolve()
 
+    def get_task_queue_path(self) -> Path:
+        """Get absolute path to task queue database"""
+        base_path = Path(__file__).parent
+        return (base_path / self.task_queue_path).resolve()
+
 
 # Global config instance
 _config: Optional[WebConfig] = None
@@ -14,8 +14,9 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from config import get_web_config
-from utils.agent_loader import initialize_agent
+from utils.agent_loader import initialize_agent, get_agent
 from utils.logging_config import setup_logging
+from services.task_service import get_task_service
 from api import tasks, recommendations, feedback, statistics, memories
 
 # Configure logging
@@ -31,8 +32,8 @@ async def lifespan(app: FastAPI):
     Lifespan context manager for FastAPI app.
 
     Handles startup and shutdown events:
-    - Startup: Initialize DESAgent
-    - Shutdown: Cleanup resources
+    - Startup: Initialize DESAgent, recover and start the task queue
+    - Shutdown: Stop task workers, cleanup resources
     """
     # Startup
     logger.info("Starting DES Formulation System Web Backend...")
@@ -43,10 +44,23 @@ async def lifespan(app: FastAPI):
         logger.error(f"✗ Failed to initialize DESAgent: {e}")
         raise
 
+    get_task_service().start()
+    logger.info("✓ Task queue started")
+
     yield
 
     # Shutdown
     logger.info("Shutting down DES Formulation System Web Backend...")
+    get_task_service().shutdown()
+    try:
+        agent = get_agent()
+        memory_config = agent.config.get("memory", {})
+        if memory_config.get("auto_save", False):
+            # Writes changes not yet logged (e.g. retrieval counts)
+            agent.memory.persist(memory_config["persist_path"])
+        agent.memory.flush()
+    except Exception as e:
+        logger.warning(f"Failed to persist memory bank on shutdown: {e}")
 
 
 # Create FastAPI app
@@ -126,12 +140,14 @@ async def health_check():
     Health check endpoint.
 
     Returns:
-        JSON response with system health status
+        JSON response with system health status and task queue metrics
+        (queue depth, running tasks, wait times)
     """
     return {
         "status": "healthy",
         "service": "DES Formulation System API",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "task_queue": get_task_service().get_queue_metrics()
     }
 
 
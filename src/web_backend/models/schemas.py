@@ -72,6 +72,19 @@ class TaskRequest(BaseModel):
         description="Optional task ID (auto-generated if not provided)",
         json_schema_extra={"example": "task_001"}
     )
+    priority: int = Field(
+        default=0,
+        ge=-10,
+        le=10,
+        description="Queue priority (higher runs first)",
+        json_schema_extra={"example": 0}
+    )
+    user_id: Optional[str] = Field(
+        None,
+        max_length=100,
+        description="Optional submitter ID (subject to the per-user concurrency limit)",
+        json_schema_extra={"example": "lab_user_01"}
+    )
 
     @field_validator('target_material')
     @classmethod
@@ -232,6 +245,12 @@ class RecommendationDetailResponse(BaseResponse):
     data: RecommendationDetail
 
 
+class TrajectoryResponse(BaseResponse):
+    """Response model for a recommendation trajectory"""
+    status: str = Field(default="success")
+    data: Trajectory
+
+
 # ===== Feedback Management Models =====
 
 class ExperimentResultRequest(BaseModel):
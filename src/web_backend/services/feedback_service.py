@@ -60,17 +60,17 @@ class FeedbackService:
         try:
             # Validate recommendation exists and is in valid state
             rec_manager = get_rec_manager()
-            rec = rec_manager.get_recommendation(recommendation_id)
+            rec = rec_manager.get_fields(recommendation_id, ["status"])  # header only
 
             if not rec:
                 raise ValueError(f"Recommendation {recommendation_id} not found")
 
-            if rec.status == "CANCELLED":
+            if rec["status"] == "CANCELLED":
                 raise ValueError(
                     f"Cannot submit feedback for cancelled recommendation {recommendation_id}"
                 )
 
-            if rec.status == "COMPLETED":
+            if rec["status"] == "COMPLETED":
                 logger.warning(
                     f"Recommendation {recommendation_id} already has feedback. "
                     "This will update the existing feedback."
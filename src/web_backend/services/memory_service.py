@@ -52,14 +52,19 @@ class MemoryService:
         try:
             # Get agent's memory bank
             agent = get_agent()
-            all_memories = agent.memory.get_all_memories()
 
-            # Apply filters
-            filtered_memories = all_memories
+            # Build filters
+            filters = {}
             if is_from_success is not None:
-                filtered_memories = [m for m in filtered_memories if m.is_from_success == is_from_success]
+                filters["is_from_success"] = is_from_success
             if source_task_id:
-                filtered_memories = [m for m in filtered_memories if m.source_task_id == source_task_id]
+                filters["source_task_id"] = source_task_id
+
+            # Apply filters (indexed lookups in the memory bank)
+            if filters:
+                filtered_memories = agent.memory.filter_memories(filters)
+            else:
+                filtered_memories = agent.memory.get_all_memories()
 
             # Sort by created_at descending
             filtered_memories.sort(key=lambda m: m.created_at, reverse=True)
@@ -85,13 +90,6 @@ class MemoryService:
                 for m in page_memories
             ]
 
-            # Build filters info
-            filters = {}
-            if is_from_success is not None:
-                filters["is_from_success"] = is_from_success
-            if source_task_id:
-                filters["source_task_id"] = source_task_id
-
             return MemoryListData(
                 items=items,
                 pagination={
@@ -191,7 +189,7 @@ class MemoryService:
             # Save if auto_save is enabled
             if agent.config.get("memory", {}).get("auto_save", False):
                 save_path = agent.config["memory"]["persist_path"]
-                agent.memory.save(save_path)
+                agent.memory.persist(save_path)
                 logger.info(f"Auto-saved memory bank to {save_path}")
 
             return MemoryItemDetail(
@@ -237,23 +235,26 @@ class MemoryService:
             if not memory:
                 raise ValueError(f"Memory with title '{title}' not found")
 
-            # Update fields
+            # Update fields (through the bank so the change is logged for auto-save)
+            fields = {}
             if update_data.description is not None:
-                memory.description = update_data.description
+                fields["description"] = update_data.description
             if update_data.content is not None:
-                memory.content = update_data.content
+                fields["content"] = update_data.content
             if update_data.is_from_success is not None:
-                memory.is_from_success = update_data.is_from_success
+                fields["is_from_success"] = update_data.is_from_success
             if update_data.metadata is not None:
                 # Merge metadata
-                memory.metadata.update(update_data.metadata)
+                fields["metadata"] = {**memory.metadata, **update_data.metadata}
+            agent.memory.update_memory(memory, **fields)
 
             # If content changed, recompute embedding
             if update_data.description is not None or update_data.content is not None:
                 if agent.memory.embedding_func:
                     try:
-                        embed_text = f"{memory.title}. {memory.description}"
-                        memory.embedding = agent.memory.embedding_func(embed_text)
+                        # Served from the embedding cache when the text is unchanged
+                        embed_text = agent.memory.embedding_text(memory)
+                        agent.memory.update_embedding(memory, agent.memory.embedding_func(embed_text))
                         logger.debug(f"Recomputed embedding for updated memory: {memory.title}")
                     except Exception as e:
                         logger.warning(f"Failed to recompute embedding: {e}")
@@ -261,7 +262,7 @@ class MemoryService:
             # Save if auto_save is enabled
             if agent.config.get("memory", {}).get("auto_save", False):
                 save_path = agent.config["memory"]["persist_path"]
-                agent.memory.save(save_path)
+                agent.memory.persist(save_path)
                 logger.info(f"Auto-saved memory bank to {save_path}")
 
             return MemoryItemDetail(
@@ -315,7 +316,7 @@ class MemoryService:
             # Save if auto_save is enabled
             if agent.config.get("memory", {}).get("auto_save", False):
                 save_path = agent.config["memory"]["persist_path"]
-                agent.memory.save(save_path)
+                agent.memory.persist(save_path)
                 logger.info(f"Auto-saved memory bank to {save_path}")
 
             return {
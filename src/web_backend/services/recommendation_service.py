@@ -21,6 +21,7 @@ from models.schemas import (
     MemoryItemSummary
 )
 from utils.agent_loader import get_rec_manager, get_agent
+from agent.reasoningbank.memory import Trajectory as TrajectoryRecord
 
 logger = logging.getLogger(__name__)
 
@@ -140,7 +141,8 @@ class RecommendationService:
             all_recs = rec_manager.list_recommendations(
                 status=status,
                 target_material=material,
-                limit=10000  # Get all for manual pagination
+                limit=10000,  # Get all for manual pagination
+                include_trajectory=False
             )
 
             # Calculate pagination
@@ -218,12 +220,19 @@ class RecommendationService:
             logger.error(f"Failed to list recommendations: {e}", exc_info=True)
             raise RuntimeError(f"Failed to list recommendations: {str(e)}")
 
-    def get_recommendation_detail(self, recommendation_id: str) -> RecommendationDetail:
+    def get_recommendation_detail(
+        self,
+        recommendation_id: str,
+        include_trajectory: bool = True
+    ) -> RecommendationDetail:
         """
         Get detailed information for a recommendation.
 
         Args:
             recommendation_id: Recommendation ID
+            include_trajectory: Include trajectory steps and tool calls (if False,
+                the trajectory is returned empty; fetch it with
+                get_recommendation_trajectory() when needed)
 
         Returns:
             RecommendationDetail
@@ -239,7 +248,7 @@ class RecommendationService:
             rec_manager = get_rec_manager()
 
             # Get recommendation
-            rec = rec_manager.get_recommendation(recommendation_id)
+            rec = rec_manager.get_recommendation(recommendation_id, include_trajectory=include_trajectory)
             if not rec:
                 raise ValueError(f"Recommendation {recommendation_id} not found")
 
@@ -271,31 +280,10 @@ class RecommendationService:
                 )
 
             # Convert trajectory
-            trajectory_steps = []
-            for step in rec.trajectory.steps:
-                # Convert formulation in step if exists
-                step_formulation = None
-                if "formulation" in step and step["formulation"]:
-                    f = step["formulation"]
-                    step_formulation = FormulationData(
-                        HBD=f.get("HBD", "Unknown"),
-                        HBA=f.get("HBA", "Unknown"),
-                        molar_ratio=f.get("molar_ratio", "Unknown")
-                    )
-
-                traj_step = TrajectoryStep(
-                    action=step.get("action", "unknown"),
-                    reasoning=step.get("reasoning", ""),
-                    tool=step.get("tool"),
-                    num_memories=step.get("num_memories"),
-                    formulation=step_formulation
-                )
-                trajectory_steps.append(traj_step)
-
-            trajectory = Trajectory(
-                steps=trajectory_steps,
-                tool_calls=rec.trajectory.metadata.get("tool_calls", [])
-            )
+            if include_trajectory:
+                trajectory = self._convert_trajectory(rec.trajectory)
+            else:
+                trajectory = Trajectory(steps=[], tool_calls=[])
 
             # Convert experiment result if exists
             experiment_result = None
@@ -359,6 +347,73 @@ class RecommendationService:
             logger.error(f"Failed to get recommendation detail: {e}", exc_info=True)
             raise RuntimeError(f"Failed to get recommendation detail: {str(e)}")
 
+    def get_recommendation_trajectory(self, recommendation_id: str) -> Trajectory:
+        """
+        Get only the trajectory (steps and tool calls) of a recommendation.
+
+        Args:
+            recommendation_id: Recommendation ID
+
+        Returns:
+            Trajectory
+
+        Raises:
+            ValueError: If recommendation not found
+            RuntimeError: If retrieval fails
+        """
+        logger.info(f"Getting recommendation trajectory: {recommendation_id}")
+
+        try:
+            rec_manager = get_rec_manager()
+            fields = rec_manager.get_fields(recommendation_id, ["trajectory"])
+            if not fields:
+                raise ValueError(f"Recommendation {recommendation_id} not found")
+
+            return self._convert_trajectory(TrajectoryRecord.from_dict(fields["trajectory"]))
+
+        except ValueError as e:
+            # Re-raise ValueError (not found)
+            raise
+        except Exception as e:
+            logger.error(f"Failed to get recommendation trajectory: {e}", exc_info=True)
+            raise RuntimeError(f"Failed to get recommendation trajectory: {str(e)}")
+
+    def _convert_trajectory(self, agent_trajectory) -> Trajectory:
+        """
+        Convert an agent Trajectory to the API Trajectory model.
+
+        Args:
+            agent_trajectory: agent.reasoningbank.memory.Trajectory (with steps loaded)
+
+        Returns:
+            Trajectory
+        """
+        trajectory_steps = []
+        for step in agent_trajectory.steps:
+            # Convert formulation in step if exists
+            step_formulation = None
+            if "formulation" in step and step["formulation"]:
+                f = step["formulation"]
+                step_formulation = FormulationData(
+                    HBD=f.get("HBD", "Unknown"),
+                    HBA=f.get("HBA", "Unknown"),
+                    molar_ratio=f.get("molar_ratio", "Unknown")
+                )
+
+            traj_step = TrajectoryStep(
+                action=step.get("action", "unknown"),
+                reasoning=step.get("reasoning", ""),
+                tool=step.get("tool"),
+                num_memories=step.get("num_memories"),
+                formulation=step_formulation
+            )
+            trajectory_steps.append(traj_step)
+
+        return Trajectory(
+            steps=trajectory_steps,
+            tool_calls=agent_trajectory.metadata.get("tool_calls", [])
+        )
+
     def cancel_recommendation(self, recommendation_id: str) -> Dict[str, Any]:
         """
         Cancel a recommendation.
@@ -379,18 +434,18 @@ class RecommendationService:
             # Get recommendation manager
             rec_manager = get_rec_manager()
 
-            # Get recommendation
-            rec = rec_manager.get_recommendation(recommendation_id)
+            # Get status (header only)
+            rec = rec_manager.get_fields(recommendation_id, ["status"])
             if not rec:
                 raise ValueError(f"Recommendation {recommendation_id} not found")
 
             # Check if can be cancelled
-            if rec.status == "COMPLETED":
+            if rec["status"] == "COMPLETED":
                 raise ValueError(
                     f"Cannot cancel recommendation {recommendation_id}: already completed"
                 )
 
-            if rec.status == "CANCELLED":
+            if rec["status"] == "CANCELLED":
                 raise ValueError(
                     f"Recommendation {recommendation_id} is already cancelled"
                 )
@@ -398,13 +453,13 @@ class RecommendationService:
             # Update status
             rec_manager.update_status(recommendation_id, "CANCELLED")
 
-            # Get updated recommendation
-            updated_rec = rec_manager.get_recommendation(recommendation_id)
+            # Get updated fields
+            updated = rec_manager.get_fields(recommendation_id, ["status", "updated_at"])
 
             return {
-                "recommendation_id": updated_rec.recommendation_id,
-                "status": updated_rec.status,
-                "updated_at": updated_rec.updated_at
+                "recommendation_id": recommendation_id,
+                "status": updated["status"],
+                "updated_at": updated["updated_at"]
             }
 
         except ValueError as e:
@@ -6,8 +6,7 @@ Business logic for generating system statistics and performance analytics.
 
 import logging
 from typing import Dict, List, Any
-from datetime import datetime, timedelta
-from collections import defaultdict
+from datetime import datetime
 
 from models.schemas import (
     StatisticsData,
@@ -40,24 +39,15 @@ class StatisticsService:
         logger.info("Generating system statistics")
 
         try:
-            # Get all recommendations
+            # Materialized aggregates (maintained on every save, no per-recommendation I/O)
             rec_manager = get_rec_manager()
-            all_recs = rec_manager.list_recommendations(limit=10000)
+            stats = rec_manager.statistics
 
-            # Calculate summary statistics
-            summary = self._calculate_summary(all_recs)
-
-            # Calculate by-material statistics
-            by_material = self._calculate_by_material(all_recs)
-
-            # Calculate by-status statistics
-            by_status = self._calculate_by_status(all_recs)
-
-            # Calculate performance trend
-            performance_trend = self._calculate_performance_trend(all_recs)
-
-            # Calculate top formulations
-            top_formulations = self._calculate_top_formulations(all_recs)
+            summary = self._build_summary(stats.summary())
+            by_material = dict(stats.by_material)
+            by_status = dict(stats.by_status)
+            performance_trend = [PerformanceTrendPoint(**point) for point in stats.trend()]
+            top_formulations = self._build_top_formulations(stats.top_formulations(limit=10))
 
             # Build statistics data
             stats_data = StatisticsData(
@@ -108,18 +98,14 @@ class StatisticsService:
             if start_dt > end_dt:
                 raise ValueError("start_date must be before end_date")
 
-            # Get all recommendations
+            # Filter the materialized daily buckets by date range
             rec_manager = get_rec_manager()
-            all_recs = rec_manager.list_recommendations(limit=10000)
-
-            # Filter by date range and calculate trend
-            filtered_recs = [
-                rec for rec in all_recs
-                if start_dt <= datetime.fromisoformat(rec.created_at[:10]) <= end_dt
+            trend = [
+                PerformanceTrendPoint(**point)
+                for point in rec_manager.statistics.trend()
+                if start_dt <= datetime.fromisoformat(point["date"]) <= end_dt
             ]
 
-            trend = self._calculate_performance_trend(filtered_recs)
-
             logger.info(f"Trend calculated: {len(trend)} data points")
 
             return trend
@@ -131,176 +117,31 @@ class StatisticsService:
             logger.error(f"Failed to calculate performance trend: {e}", exc_info=True)
             raise RuntimeError(f"Failed to calculate performance trend: {str(e)}")
 
-    def _calculate_summary(self, all_recs: List[Any]) -> SummaryStatistics:
-        """Calculate summary statistics"""
-        total = len(all_recs)
-        pending = sum(1 for rec in all_recs if rec.status == "PENDING")
-        completed = sum(1 for rec in all_recs if rec.status == "COMPLETED")
-        cancelled = sum(1 for rec in all_recs if rec.status == "CANCELLED")
-
-        # Calculate average performance score (only for completed)
-        completed_recs = [rec for rec in all_recs if rec.status == "COMPLETED" and rec.experiment_result]
-        if completed_recs:
-            avg_performance = sum(
-                rec.experiment_result.get_performance_score()
-                for rec in completed_recs
-            ) / len(completed_recs)
-
-            # Calculate liquid formation rate
-            liquid_formed_count = sum(
-                1 for rec in completed_recs
-                if rec.experiment_result.is_liquid_formed
-            )
-            liquid_formation_rate = liquid_formed_count / len(completed_recs)
-        else:
-            avg_performance = 0.0
-            liquid_formation_rate = 0.0
-
+    def _build_summary(self, summary: Dict[str, Any]) -> SummaryStatistics:
+        """Build summary statistics from the materialized summary"""
+        by_status = summary["by_status"]
         return SummaryStatistics(
-            total_recommendations=total,
-            pending_experiments=pending,
-            completed_experiments=completed,
-            cancelled=cancelled,
-            average_performance_score=avg_performance,
-            liquid_formation_rate=liquid_formation_rate
+            total_recommendations=summary["total"],
+            pending_experiments=by_status.get("PENDING", 0),
+            completed_experiments=by_status.get("COMPLETED", 0),
+            cancelled=by_status.get("CANCELLED", 0),
+            average_performance_score=summary["average_performance_score"],
+            liquid_formation_rate=summary["liquid_formation_rate"]
         )
 
-    def _calculate_by_material(self, all_recs: List[Any]) -> Dict[str, int]:
-        """Calculate count by material"""
-        by_material = defaultdict(int)
-        for rec in all_recs:
-            material = rec.task.get("target_material", "unknown")
-            by_material[material] += 1
-        return dict(by_material)
-
-    def _calculate_by_status(self, all_recs: List[Any]) -> Dict[str, int]:
-        """Calculate count by status"""
-        by_status = defaultdict(int)
-        for rec in all_recs:
-            by_status[rec.status] += 1
-        return dict(by_status)
-
-    def _calculate_performance_trend(self, all_recs: List[Any]) -> List[PerformanceTrendPoint]:
-        """Calculate performance trend by date"""
-        # Group by date
-        by_date = defaultdict(list)
-        for rec in all_recs:
-            if rec.status == "COMPLETED" and rec.experiment_result:
-                # Extract date (YYYY-MM-DD)
-                date_str = rec.created_at[:10]
-                by_date[date_str].append(rec)
-
-        # Calculate statistics for each date
-        trend_points = []
-        for date_str in sorted(by_date.keys()):
-            recs = by_date[date_str]
-
-            # Calculate averages
-            solubilities = [
-                rec.experiment_result.solubility
-                for rec in recs
-                if rec.experiment_result.solubility is not None
-            ]
-            avg_solubility = sum(solubilities) / len(solubilities) if solubilities else 0.0
-
-            # Determine most common solubility unit
-            units = [
-                rec.experiment_result.solubility_unit
-                for rec in recs
-                if rec.experiment_result.solubility is not None
-            ]
-            # Use most common unit, default to "g/L"
-            common_unit = max(set(units), key=units.count) if units else "g/L"
-
-            performances = [
-                rec.experiment_result.get_performance_score()
-                for rec in recs
-            ]
-            avg_performance = sum(performances) / len(performances) if performances else 0.0
-
-            liquid_formed_count = sum(
-                1 for rec in recs
-                if rec.experiment_result.is_liquid_formed
-            )
-            liquid_formation_rate = liquid_formed_count / len(recs) if recs else 0.0
-
-            trend_point = PerformanceTrendPoint(
-                date=date_str,
-                avg_solubility=avg_solubility,
-                solubility_unit=common_unit,
-                avg_performance_score=avg_performance,
-                experiment_count=len(recs),
-                liquid_formation_rate=liquid_formation_rate
-            )
-            trend_points.append(trend_point)
-
-        return trend_points
-
-    def _calculate_top_formulations(self, all_recs: List[Any]) -> List[TopFormulation]:
-        """Calculate top performing formulations"""
-        # Group by formulation string
-        by_formulation = defaultdict(list)
-        for rec in all_recs:
-            if rec.status == "COMPLETED" and rec.experiment_result:
-                # Build formulation string using the same logic as RecommendationManager
-                f = rec.formulation
-                if "components" in f and f.get("components"):
-                    # Multi-component formulation
-                    names = [c.get("name", "Unknown") for c in f["components"]]
-                    molar_ratio = f.get("molar_ratio", "?")
-                    formulation_str = f"{' + '.join(names)} ({molar_ratio})"
-                else:
-                    # Binary formulation
-                    hbd = f.get("HBD", "?")
-                    hba = f.get("HBA", "?")
-                    molar_ratio = f.get("molar_ratio", "?")
-                    formulation_str = f"{hbd} : {hba} ({molar_ratio})"
-                by_formulation[formulation_str].append(rec)
-
-        # Calculate average solubility for each formulation
-        formulation_stats = []
-        for formulation_str, recs in by_formulation.items():
-            # Use average solubility instead of performance score
-            solubilities = [
-                rec.experiment_result.solubility
-                for rec in recs
-                if rec.experiment_result.solubility is not None
-            ]
-            avg_solubility = sum(solubilities) / len(solubilities) if solubilities else 0.0
-
-            # Determine most common solubility unit
-            units = [
-                rec.experiment_result.solubility_unit
-                for rec in recs
-                if rec.experiment_result.solubility is not None
-            ]
-            common_unit = max(set(units), key=units.count) if units else "g/L"
-
-            formulation_stats.append((
-                formulation_str,
-                avg_solubility,
-                common_unit,
-                len(recs)
-            ))
-
-        # Sort by average solubility (descending) and take top 10
-        formulation_stats.sort(key=lambda x: x[1], reverse=True)
-        top_10 = formulation_stats[:10]
-
-        # Build TopFormulation objects
+    def _build_top_formulations(self, ranked: List[Dict[str, Any]]) -> List[TopFormulation]:
+        """Build top formulations (ranked by average solubility)"""
         # Note: avg_performance field name kept for API compatibility, but contains avg solubility
-        top_formulations = [
+        return [
             TopFormulation(
-                formulation=f_str,
-                avg_performance=avg_sol,  # Contains avg solubility (API field name kept for compatibility)
-                solubility_unit=unit,
-                success_count=count
+                formulation=item["formulation"],
+                avg_performance=item["avg_solubility"],  # Contains avg solubility (API field name kept for compatibility)
+                solubility_unit=item["solubility_unit"],
+                success_count=item["experiment_count"]
             )
-            for f_str, avg_sol, unit, count in top_10
+            for item in ranked
         ]
 
-        return top_formulations
-
 
 # Singleton instance
 _service: StatisticsService = None
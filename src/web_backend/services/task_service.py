@@ -5,12 +5,13 @@ Business logic for creating and managing DES formulation tasks.
 """
 
 import logging
-import threading
 from typing import Dict, Any
 from datetime import datetime
 
+from config import get_web_config
 from models.schemas import TaskRequest, TaskData, FormulationData, ComponentData
 from utils.agent_loader import get_agent, get_rec_manager
+from utils.task_queue import TaskQueue
 
 logger = logging.getLogger(__name__)
 
@@ -19,8 +20,60 @@ class TaskService:
     """Service for managing DES formulation tasks"""
 
     def __init__(self):
-        """Initialize task service"""
-        pass
+        """Initialize task service and its persistent task queue"""
+        config = get_web_config()
+        self.resume_on_restart = config.task_resume_on_restart
+        self.queue = TaskQueue(
+            config.get_task_queue_path(),
+            max_workers=config.task_workers,
+            per_material_limit=config.task_per_material_limit,
+            per_user_limit=config.task_per_user_limit,
+            max_attempts=config.task_max_attempts,
+        )
+
+    def start(self):
+        """
+        Recover interrupted tasks and start the worker pool.
+
+        Called once at application startup, after the agent is initialized:
+        1. Jobs that were running when the previous process stopped are
+           re-queued (or failed once they have used up their attempts)
+        2. GENERATING recommendations without a queued job (e.g. created
+           before the queue existed) are re-queued from their stored task,
+           or failed if task_resume_on_restart is disabled
+        3. Workers start draining the queue
+        """
+        for job in self.queue.recover():
+            self._mark_failed(job["job_id"], "服务重启导致任务中断，且已达到最大重试次数")
+
+        rec_manager = get_rec_manager()
+        orphans = [
+            rec for rec in rec_manager.list_recommendations(
+                status="GENERATING", limit=10000, include_trajectory=False
+            )
+            if not self.queue.has_job(rec.recommendation_id)
+        ]
+        for rec in orphans:
+            if self.resume_on_restart and rec.task:
+                self.queue.submit(
+                    rec.recommendation_id,
+                    {"task": rec.task},
+                    material=rec.task.get("target_material"),
+                )
+            else:
+                self._mark_failed(rec.recommendation_id, "服务重启导致任务中断")
+        if orphans:
+            logger.info(f"Recovered {len(orphans)} orphaned GENERATING recommendations")
+
+        self.queue.start(self._run_job)
+
+    def shutdown(self):
+        """Stop the worker pool (running tasks resume on next start)"""
+        self.queue.shutdown()
+
+    def get_queue_metrics(self) -> Dict[str, Any]:
+        """Queue depth and wait-time metrics (see TaskQueue.get_metrics)"""
+        return self.queue.get_metrics()
 
     def create_task(self, task_request: TaskRequest) -> TaskData:
         """
@@ -28,7 +81,7 @@ class TaskService:
 
         This method:
         1. Creates a GENERATING recommendation immediately
-        2. Starts background thread to execute Agent
+        2. Queues the agent run on the persistent task queue
         3. Returns the GENERATING recommendation to user
         4. Updates to PENDING when generation completes
 
@@ -100,14 +153,14 @@ class TaskService:
             rec_manager.save_recommendation(rec)
             logger.info(f"Created GENERATING recommendation: {rec_id}")
 
-            # Start background thread to execute agent
-            thread = threading.Thread(
-                target=self._execute_task_async,
-                args=(task_dict, rec_id),
-                daemon=True
+            # Queue agent execution (the recommendation ID doubles as job ID)
+            self.queue.submit(
+                rec_id,
+                {"task": task_dict},
+                material=task_dict["target_material"],
+                user_id=task_request.user_id,
+                priority=task_request.priority,
             )
-            thread.start()
-            logger.info(f"Started background task for {rec_id}")
 
             # Return GENERATING status immediately
             task_data = TaskData(
@@ -133,9 +186,63 @@ class TaskService:
             logger.error(f"Failed to create task: {e}", exc_info=True)
             raise RuntimeError(f"Task creation failed: {str(e)}")
 
+    def _run_job(self, rec_id: str, payload: Dict[str, Any]):
+        """
+        Task queue handler: run the queued task unless it was cancelled meanwhile.
+
+        Raises:
+            Exception: Re-raised from the agent so the job is recorded as FAILED
+        """
+        rec = get_rec_manager().get_fields(rec_id, ["status"])
+        if not rec or rec["status"] != "GENERATING":
+            logger.info(f"[Background] Skipping {rec_id}: no longer GENERATING")
+            return
+
+        # A retried job may have been interrupted after the agent saved its
+        # recommendation but before it replaced the placeholder
+        if self.queue.get_attempts(rec_id) > 1 and self._adopt_saved_result(rec_id):
+            return
+
+        self._execute_task_async(payload["task"], rec_id)
+
+    def _adopt_saved_result(self, rec_id: str) -> bool:
+        """
+        Replace the placeholder with a recommendation the agent already saved.
+
+        Looks for a PENDING recommendation with the placeholder's task_id that
+        was created after the placeholder.
+
+        Returns:
+            True if such a recommendation was found and moved onto rec_id
+        """
+        rec_manager = get_rec_manager()
+        placeholder = rec_manager.get_fields(rec_id, ["task_id", "created_at", "target_material"])
+        if not placeholder or not placeholder["task_id"]:
+            return False
+
+        page = 1
+        while True:
+            result = rec_manager.list_recommendations_fast(
+                status="PENDING",
+                target_material=placeholder["target_material"],
+                page=page,
+                page_size=100,
+            )
+            for header in result["items"]:  # newest first
+                if header["created_at"] < placeholder["created_at"]:
+                    return False
+                if header["task_id"] == placeholder["task_id"] and header["recommendation_id"] != rec_id:
+                    agent_rec_id = header["recommendation_id"]
+                    rec_manager.replace_placeholder(rec_id, agent_rec_id)
+                    logger.info(f"[Background] Adopted {agent_rec_id} saved before {rec_id} was interrupted")
+                    return True
+            if page >= result["pagination"]["total_pages"]:
+                return False
+            page += 1
+
     def _execute_task_async(self, task_dict: Dict[str, Any], rec_id: str):
         """
-        Execute agent task asynchronously in background thread.
+        Execute agent task in a task queue worker.
 
         This method:
         1. Calls agent.solve_task()
@@ -158,56 +265,40 @@ class TaskService:
 
             logger.info(f"[Background] Task {rec_id} completed successfully")
 
-            # Agent created a new recommendation, we need to:
-            # 1. Delete the GENERATING placeholder
-            # 2. Rename agent's recommendation to our rec_id
+            # Agent created a new recommendation; it replaces the GENERATING
+            # placeholder under our rec_id in one atomic step
             rec_manager = get_rec_manager()
 
             agent_rec_id = result.get("recommendation_id")
             if agent_rec_id and agent_rec_id != rec_id:
-                # Load agent's recommendation
-                agent_rec = rec_manager.get_recommendation(agent_rec_id)
-
-                if agent_rec:
-                    # Update its ID to match our placeholder ID
-                    agent_rec.recommendation_id = rec_id
-                    agent_rec.updated_at = datetime.now().isoformat()
-
-                    # Save with new ID
-                    rec_manager.save_recommendation(agent_rec)
-
-                    # Delete agent's original recommendation file
-                    import os
-                    agent_rec_file = rec_manager.storage_path / f"{agent_rec_id}.json"
-                    if agent_rec_file.exists():
-                        os.remove(agent_rec_file)
-
-                    # Remove from index
-                    if agent_rec_id in rec_manager.index:
-                        del rec_manager.index[agent_rec_id]
-                        rec_manager._save_index()
-
-                    logger.info(f"[Background] Replaced GENERATING {rec_id} with completed recommendation")
-                else:
+                try:
+                    if rec_manager.replace_placeholder(rec_id, agent_rec_id):
+                        logger.info(f"[Background] Replaced GENERATING {rec_id} with completed recommendation")
+                    else:
+                        logger.info(f"[Background] {rec_id} is no longer GENERATING, discarded {agent_rec_id}")
+                except ValueError:
                     logger.warning(f"[Background] Agent recommendation {agent_rec_id} not found")
             else:
                 logger.info(f"[Background] Recommendation IDs match, no replacement needed")
 
         except Exception as e:
             logger.error(f"[Background] Task {rec_id} failed: {e}", exc_info=True)
+            self._mark_failed(rec_id, f"配方生成失败: {str(e)}")
+            raise
 
-            # Update recommendation to FAILED status
-            try:
-                rec_manager = get_rec_manager()
-                rec = rec_manager.get_recommendation(rec_id)
-                if rec:
+    def _mark_failed(self, rec_id: str, reason: str):
+        """Update a GENERATING recommendation to FAILED status"""
+        try:
+            def mark_failed(rec):
+                # Leave results that were saved before the task was interrupted
+                if rec.status == "GENERATING":
                     rec.status = "FAILED"
-                    rec.reasoning = f"配方生成失败: {str(e)}"
-                    rec.updated_at = datetime.now().isoformat()
-                    rec_manager.save_recommendation(rec)
-                    logger.info(f"[Background] Updated {rec_id} to FAILED status")
-            except Exception as update_error:
-                logger.error(f"[Background] Failed to update recommendation status: {update_error}")
+                    rec.reasoning = reason
+
+            get_rec_manager().update_recommendation(rec_id, mark_failed)
+            logger.info(f"[Background] Updated {rec_id} to FAILED status")
+        except Exception as update_error:
+            logger.error(f"[Background] Failed to update recommendation status: {update_error}")
 
     def _convert_agent_result(self, result: Dict[str, Any]) -> TaskData:
         """
@@ -0,0 +1,312 @@
+"""
+Unit tests for the durable task queue and TaskService recovery
+
+Run with: python -m pytest test_task_queue.py -v
+"""
+
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))         # web_backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))  # agent package
+
+from utils.task_queue import TaskQueue, QUEUED, RUNNING, DONE, FAILED
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("Timed out waiting for the task queue")
+        time.sleep(0.01)
+
+
+def job_status(db_path, job_id):
+    with sqlite3.connect(str(db_path)) as conn:
+        return conn.execute("SELECT status FROM jobs WHERE job_id = ?", (job_id,)).fetchone()[0]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "task_queue.db"
+
+
+class TestScheduling:
+    """Test dequeue order and concurrency limits"""
+
+    def test_priority_then_fifo(self, db_path):
+        """Test that higher priority runs first, then oldest first"""
+        queue = TaskQueue(db_path, max_workers=1)
+        queue.submit("low", {}, priority=0)
+        queue.submit("high_1", {}, priority=5)
+        queue.submit("normal", {}, priority=1)
+        queue.submit("high_2", {}, priority=5)
+
+        order = []
+        queue.start(lambda job_id, payload: order.append(job_id))
+        wait_until(lambda: queue.get_metrics()["done"] == 4)
+        queue.close()
+
+        assert order == ["high_1", "high_2", "normal", "low"]
+
+    def test_duplicate_job_id(self, db_path):
+        """Test that a job ID can only be submitted once"""
+        queue = TaskQueue(db_path)
+        queue.submit("job", {"n": 1})
+        with pytest.raises(ValueError):
+            queue.submit("job", {"n": 2})
+        queue.close()
+
+    @pytest.mark.parametrize("limit_arg, key", [
+        ("per_material_limit", "material"),
+        ("per_user_limit", "user_id"),
+    ])
+    def test_concurrency_limits(self, db_path, limit_arg, key):
+        """Test that one material/user never occupies more than its share of workers"""
+        queue = TaskQueue(db_path, max_workers=3, **{limit_arg: 1})
+        release = threading.Event()
+        lock = threading.Lock()
+        running = {}
+        peak = {}
+
+        def handler(job_id, payload):
+            owner = payload["owner"]
+            with lock:
+                running[owner] = running.get(owner, 0) + 1
+                peak[owner] = max(peak.get(owner, 0), running[owner])
+            release.wait(5)
+            with lock:
+                running[owner] -= 1
+
+        for i in range(3):
+            queue.submit(f"busy_{i}", {"owner": "busy"}, **{key: "busy"})
+        queue.submit("other", {"owner": "other"}, **{key: "other"})
+
+        queue.start(handler)
+        # One job per owner can run; the other busy jobs wait despite idle workers
+        wait_until(lambda: queue.get_metrics()["running"] == 2)
+        time.sleep(0.1)
+        assert queue.get_metrics()["running"] == 2
+
+        release.set()
+        wait_until(lambda: queue.get_metrics()["done"] == 4)
+        queue.close()
+
+        assert peak == {"busy": 1, "other": 1}
+
+    def test_failed_handler(self, db_path):
+        """Test that a raising handler marks the job FAILED and frees its slot"""
+        queue = TaskQueue(db_path, max_workers=1, per_material_limit=1)
+        queue.submit("bad", {}, material="m")
+        queue.submit("good", {}, material="m")
+
+        def handler(job_id, payload):
+            if job_id == "bad":
+                raise RuntimeError("boom")
+
+        queue.start(handler)
+        wait_until(lambda: queue.get_metrics()["done"] == 1)
+        queue.close()
+
+        assert job_status(db_path, "bad") == FAILED
+        assert job_status(db_path, "good") == DONE
+
+
+class TestRecovery:
+    """Test restart handling"""
+
+    def _interrupt(self, db_path, job_id, attempts):
+        """Simulate a process that died while the job was running"""
+        with sqlite3.connect(str(db_path)) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = ?, started_at = ? WHERE job_id = ?",
+                (RUNNING, attempts, time.time(), job_id),
+            )
+
+    def test_requeue_or_fail(self, db_path):
+        """Test that interrupted jobs are re-queued until max_attempts is used up"""
+        queue = TaskQueue(db_path, max_attempts=2)
+        queue.submit("retry", {"task": "a"})
+        queue.submit("give_up", {"task": "b"})
+        queue.submit("waiting", {"task": "c"})
+        queue.close()
+        self._interrupt(db_path, "retry", attempts=1)
+        self._interrupt(db_path, "give_up", attempts=2)
+
+        queue = TaskQueue(db_path, max_workers=1, max_attempts=2)
+        failed = queue.recover()
+
+        assert failed == [{"job_id": "give_up", "payload": {"task": "b"}, "attempts": 2}]
+        assert job_status(db_path, "retry") == QUEUED
+        assert job_status(db_path, "waiting") == QUEUED
+        assert queue.has_job("retry") and not queue.has_job("give_up")
+
+        started = []
+        queue.start(lambda job_id, payload: started.append(job_id))
+        wait_until(lambda: queue.get_metrics()["done"] == 2)
+        queue.close()
+
+        assert sorted(started) == ["retry", "waiting"]
+        assert TaskQueue(db_path).get_attempts("retry") == 2
+
+    def test_retention(self, db_path):
+        """Test that recover() purges finished jobs past the retention period"""
+        queue = TaskQueue(db_path)
+        queue.submit("old", {})
+        queue.submit("recent", {})
+        queue.cancel("old")
+        queue.cancel("recent")
+        queue.close()
+        with sqlite3.connect(str(db_path)) as conn:
+            conn.execute("UPDATE jobs SET finished_at = ? WHERE job_id = 'old'", (time.time() - 8 * 86400,))
+
+        queue = TaskQueue(db_path, retention_days=7)
+        queue.recover()
+        metrics = queue.get_metrics()
+        queue.close()
+
+        assert metrics["failed"] == 1
+
+
+class TestCancelAndMetrics:
+    """Test cancellation and queue metrics"""
+
+    def test_cancel_only_queued(self, db_path):
+        """Test that only jobs that have not started can be cancelled"""
+        queue = TaskQueue(db_path, max_workers=1)
+        release = threading.Event()
+        queue.submit("running", {}, priority=1)
+        queue.submit("queued", {})
+
+        queue.start(lambda job_id, payload: release.wait(5))
+        wait_until(lambda: queue.get_metrics()["running"] == 1)
+
+        assert queue.cancel("queued")
+        assert not queue.cancel("queued")
+        assert not queue.cancel("running")
+        assert not queue.cancel("missing")
+        assert not queue.has_job("queued")
+
+        release.set()
+        wait_until(lambda: queue.get_metrics()["done"] == 1)
+        metrics = queue.get_metrics()
+        queue.close()
+
+        assert (metrics["queued"], metrics["running"], metrics["done"], metrics["failed"]) == (0, 0, 1, 1)
+
+    def test_metrics(self, db_path):
+        """Test queue depth per material and wait-time metrics"""
+        queue = TaskQueue(db_path, max_workers=2)
+        queue.submit("a1", {}, material="a")
+        queue.submit("a2", {}, material="a")
+        queue.submit("b1", {}, material="b")
+        queue.submit("x1", {})
+
+        metrics = queue.get_metrics()
+        assert metrics["queued"] == 4
+        assert metrics["queued_by_material"] == {"a": 2, "b": 1, "unknown": 1}
+        assert metrics["oldest_queued_seconds"] >= 0
+        assert metrics["avg_wait_seconds"] == 0.0
+        assert metrics["workers"] == 2 and metrics["active_workers"] == 0
+
+        time.sleep(0.05)
+        queue.start(lambda job_id, payload: None)
+        wait_until(lambda: queue.get_metrics()["done"] == 4)
+        metrics = queue.get_metrics()
+        assert metrics["active_workers"] == 2
+        queue.close()
+
+        assert metrics["queued"] == 0 and metrics["queued_by_material"] == {}
+        assert metrics["oldest_queued_seconds"] == 0.0
+        assert metrics["max_wait_seconds"] >= metrics["avg_wait_seconds"] >= 0.05
+
+
+class TestTaskServiceRetry:
+    """Test that a retried task reuses a result saved before the interruption"""
+
+    @pytest.fixture
+    def service(self, tmp_path, db_path, monkeypatch):
+        pytest.importorskip("pydantic_settings")
+        from agent.reasoningbank import RecommendationManager
+        from services import task_service
+
+        rec_manager = RecommendationManager(str(tmp_path / "recommendations"))
+        agent_calls = []
+
+        class FakeAgent:
+            def solve_task(self, task):
+                agent_calls.append(task)
+                return {"recommendation_id": None}
+
+        monkeypatch.setattr(task_service, "get_rec_manager", lambda: rec_manager)
+        monkeypatch.setattr(task_service, "get_agent", lambda: FakeAgent())
+
+        service = object.__new__(task_service.TaskService)
+        service.queue = TaskQueue(db_path, max_attempts=3)
+        service.agent_calls = agent_calls
+        service.rec_manager = rec_manager
+        yield service
+        service.queue.close()
+        rec_manager.close()
+
+    def _save(self, rec_manager, rec_id, status, created_at, task_id="task_1"):
+        from agent.reasoningbank import Recommendation
+        from agent.reasoningbank.memory import Trajectory
+
+        task = {"task_id": task_id, "target_material": "cellulose", "description": "d"}
+        rec_manager.save_recommendation(Recommendation(
+            recommendation_id=rec_id,
+            task=task,
+            task_id=task_id,
+            formulation={"HBD": "urea", "HBA": "ChCl", "molar_ratio": "1:2"},
+            reasoning="r",
+            confidence=0.5,
+            trajectory=Trajectory(
+                task_id=task_id, task_description="d", steps=[], outcome="pending", final_result={}
+            ),
+            status=status,
+            created_at=created_at.isoformat(),
+            updated_at=created_at.isoformat(),
+        ))
+        return task
+
+    def test_retry_adopts_saved_result(self, service):
+        """Test that the agent is not run again when its result was already saved"""
+        now = datetime.now()
+        task = self._save(service.rec_manager, "REC_placeholder", "GENERATING", now)
+        self._save(service.rec_manager, "REC_older_run", "PENDING", now - timedelta(days=1))
+        self._save(service.rec_manager, "REC_agent", "PENDING", now + timedelta(minutes=3))
+        service.queue.submit("REC_placeholder", {"task": task})
+        with sqlite3.connect(str(service.queue.db_path)) as conn:
+            conn.execute("UPDATE jobs SET attempts = 2 WHERE job_id = 'REC_placeholder'")
+
+        service._run_job("REC_placeholder", {"task": task})
+
+        assert service.agent_calls == []
+        assert service.rec_manager.get_recommendation("REC_placeholder").status == "PENDING"
+        assert service.rec_manager.get_recommendation("REC_agent") is None
+        assert service.rec_manager.get_recommendation("REC_older_run") is not None
+
+    def test_retry_without_saved_result_reruns(self, service):
+        """Test that a retry with nothing saved runs the agent again"""
+        now = datetime.now()
+        task = self._save(service.rec_manager, "REC_placeholder", "GENERATING", now)
+        self._save(service.rec_manager, "REC_older_run", "PENDING", now - timedelta(days=1))
+        service.queue.submit("REC_placeholder", {"task": task})
+        with sqlite3.connect(str(service.queue.db_path)) as conn:
+            conn.execute("UPDATE jobs SET attempts = 2 WHERE job_id = 'REC_placeholder'")
+
+        service._run_job("REC_placeholder", {"task": task})
+
+        assert service.agent_calls == [task]
+        assert service.rec_manager.get_recommendation("REC_older_run") is not None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -21,8 +21,8 @@ from agent.reasoningbank import (
     RecommendationManager
 )
 from agent.des_agent import DESAgent
-from agent.utils.llm_client import LLMClient
-from agent.utils.embedding_client import EmbeddingClient
+from agent.utils.llm_client import LLMClient, create_response_cache_from_config
+from agent.utils.embedding_client import EmbeddingClient, create_embedding_cache_from_config
 from agent.config import get_config
 from agent.tools.largerag_adapter import create_largerag_adapter
 from agent.tools.corerag_adapter import CoreRAGAdapter
@@ -76,7 +76,11 @@ class AgentLoader:
                 model=llm_config["model"],
                 temperature=llm_config["temperature"],
                 max_tokens=llm_config["max_tokens"],
-                base_url=llm_config.get("api_base")
+                base_url=llm_config.get("api_base"),
+                pool_size=llm_config.get("pool_size", 20),
+                max_concurrency=llm_config.get("max_concurrency", 8),
+                max_retries=llm_config.get("max_retries", 3),
+                response_cache=create_response_cache_from_config(llm_config)  # temperature-0 calls (judge)
             )
 
             agent_llm_client = LLMClient(
@@ -84,7 +88,11 @@ class AgentLoader:
                 model=agent_llm_config["model"],
                 temperature=agent_llm_config["temperature"],
                 max_tokens=agent_llm_config["max_tokens"],
-                base_url=agent_llm_config.get("api_base")
+                base_url=agent_llm_config.get("api_base"),
+                pool_size=agent_llm_config.get("pool_size", 20),
+                max_concurrency=agent_llm_config.get("max_concurrency", 8),
+                max_retries=agent_llm_config.get("max_retries", 3),
+                response_cache=create_response_cache_from_config(agent_llm_config)
             )
 
             logger.info(f"LLM initialized: {llm_config['provider']}/{llm_config['model']}")
@@ -95,7 +103,8 @@ class AgentLoader:
             embedding_client = EmbeddingClient(
                 provider=embedding_config["provider"],
                 model=embedding_config["model"],
-                base_url=embedding_config.get("api_base")
+                base_url=embedding_config.get("api_base"),
+                cache=create_embedding_cache_from_config(embedding_config)  # shared by bank, retriever and scripts
             )
             logger.info(f"Embedding client initialized: {embedding_config['provider']}/{embedding_config['model']}")
 
@@ -110,11 +119,23 @@ class AgentLoader:
             # CRITICAL: Pass embedding_func to enable automatic embedding generation
             memory_bank = ReasoningBank(
                 embedding_func=embedding_client.embed,  # Enable embedding for new memories
-                max_items=memory_config.get("max_items", 1000)
+                max_items=memory_config.get("max_items", 1000),
+                embedding_batch_func=embedding_client.embed_batch,  # add_memories/consolidate
+                embedding_batch_size=embedding_client.max_batch_size,
+                embedding_workers=memory_config.get("embedding_workers", 4),
+                embedding_dtype=memory_config.get("embedding_dtype", "float16"),
+                wal_fsync_interval=memory_config.get("wal_fsync_interval", 1.0),
+                wal_compact_threshold=memory_config.get("wal_compact_threshold", 500),
+                dedup_policy=memory_config.get("dedup_policy", "append"),
+                dedup_threshold=memory_config.get("dedup_threshold", 0.95),
+                cluster_threshold=memory_config.get("cluster_threshold", 0.85),
+                eviction_policy=memory_config.get("eviction_policy", "fifo"),
+                eviction_half_life_days=memory_config.get("eviction_half_life_days", 30.0)
             )
             retriever = MemoryRetriever(
                 bank=memory_bank,
-                embedding_func=embedding_client.embed  # Use embedding client's embed method
+                embedding_func=embedding_client.embed,  # Use embedding client's embed method
+                diversify_clusters=memory_config.get("retrieval_diversify", False)
             )
             extractor = MemoryExtractor(llm_client, temperature=extractor_temp)
             judge = LLMJudge(llm_client)  # Not used in v1, but required
@@ -122,8 +143,12 @@ class AgentLoader:
             # Initialize RecommendationManager
             rec_dir = web_config.get_recommendations_dir()
             rec_dir.mkdir(parents=True, exist_ok=True)
-            self._rec_manager = RecommendationManager(storage_path=str(rec_dir))
-            logger.info(f"RecommendationManager initialized: {rec_dir}")
+            rec_config = agent_config.get_recommendations_config()
+            self._rec_manager = RecommendationManager(
+                storage_path=str(rec_dir),
+                backend=rec_config.get("backend", "sqlite")
+            )
+            logger.info(f"RecommendationManager initialized: {rec_dir} ({self._rec_manager.backend})")
 
             # Initialize tool clients
             logger.info("Initializing LargeRAG adapter...")
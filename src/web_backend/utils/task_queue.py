@@ -0,0 +1,351 @@
+"""
+Durable Task Queue
+
+SQLite-backed job queue with a bounded worker pool, used by TaskService to
+run agent.solve_task in the background.
+
+- Jobs survive restarts: everything is persisted in one SQLite file (WAL)
+- At most `max_workers` jobs run at once; optional per-material and
+  per-user limits keep one material/user from occupying every worker
+- Higher priority first, then first-in first-out
+- recover() re-queues jobs that were RUNNING when the process died
+  (or fails them once they have used up max_attempts)
+- get_metrics() reports queue depth and wait times for /health
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "QUEUED"
+RUNNING = "RUNNING"
+DONE = "DONE"
+FAILED = "FAILED"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    material TEXT,
+    user_id TEXT,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    enqueued_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_dequeue ON jobs (status, priority DESC, enqueued_at);
+"""
+
+# Number of recent queue waits kept for avg/max wait metrics
+WAIT_WINDOW = 100
+
+
+class TaskQueue:
+    """
+    Persistent priority queue drained by a bounded pool of worker threads.
+
+    The handler is called as handler(job_id, payload) in a worker thread.
+    A job is DONE when the handler returns and FAILED when it raises.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        max_workers: int = 2,
+        per_material_limit: int = 0,
+        per_user_limit: int = 0,
+        max_attempts: int = 2,
+        retention_days: float = 7.0,
+    ):
+        """
+        Args:
+            db_path: SQLite database file (created if missing)
+            max_workers: Number of worker threads
+            per_material_limit: Max concurrently running jobs per material (0 = no limit)
+            per_user_limit: Max concurrently running jobs per user (0 = no limit)
+            max_attempts: Times a job may be started before recover() fails it
+            retention_days: Finished jobs older than this are purged on start
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max(1, max_workers)
+        self.per_material_limit = per_material_limit
+        self.per_user_limit = per_user_limit
+        self.max_attempts = max(1, max_attempts)
+        self.retention_days = retention_days
+
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(_SCHEMA)
+
+        # Guards the connection and the running-job bookkeeping below
+        self._cond = threading.Condition(threading.RLock())
+        self._running_materials: Dict[str, int] = {}
+        self._running_users: Dict[str, int] = {}
+        self._recent_waits: deque = deque(maxlen=WAIT_WINDOW)
+
+        self._handler: Optional[Callable[[str, Dict[str, Any]], None]] = None
+        self._workers: List[threading.Thread] = []
+        self._stopping = False
+
+    # ===== Producer side =====
+
+    def submit(
+        self,
+        job_id: str,
+        payload: Dict[str, Any],
+        material: Optional[str] = None,
+        user_id: Optional[str] = None,
+        priority: int = 0,
+    ):
+        """
+        Persist a job and wake a worker.
+
+        Args:
+            job_id: Unique job ID (TaskService uses the recommendation ID)
+            payload: JSON-serializable job arguments
+            material: Material the per-material limit applies to
+            user_id: User the per-user limit applies to
+            priority: Higher runs first
+
+        Raises:
+            ValueError: If a job with this ID already exists
+        """
+        with self._cond:
+            try:
+                self._conn.execute(
+                    "INSERT INTO jobs (job_id, payload, material, user_id, priority, status, enqueued_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, json.dumps(payload, ensure_ascii=False), material, user_id,
+                     priority, QUEUED, time.time()),
+                )
+            except sqlite3.IntegrityError:
+                raise ValueError(f"Job {job_id} already exists")
+            self._cond.notify()
+        logger.info(f"Queued job {job_id} (material={material}, user={user_id}, priority={priority})")
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Drop a job that has not started yet.
+
+        Returns:
+            True if a queued job was removed
+        """
+        with self._cond:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, error = 'cancelled' "
+                "WHERE job_id = ? AND status = ?",
+                (FAILED, time.time(), job_id, QUEUED),
+            )
+            return cursor.rowcount > 0
+
+    def has_job(self, job_id: str) -> bool:
+        """Whether the job is queued or running"""
+        with self._cond:
+            row = self._conn.execute(
+                "SELECT 1 FROM jobs WHERE job_id = ? AND status IN (?, ?)",
+                (job_id, QUEUED, RUNNING),
+            ).fetchone()
+        return row is not None
+
+    def get_attempts(self, job_id: str) -> int:
+        """Number of times the job has been started (0 if unknown)"""
+        with self._cond:
+            row = self._conn.execute("SELECT attempts FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return row[0] if row else 0
+
+    # ===== Lifecycle =====
+
+    def recover(self) -> List[Dict[str, Any]]:
+        """
+        Re-queue jobs left RUNNING by a previous process.
+
+        Must be called before start(). Jobs that have already been started
+        max_attempts times are marked FAILED instead.
+
+        Returns:
+            The failed jobs as {"job_id", "payload", "attempts"} dicts, so the
+            caller can update whatever the jobs were producing
+        """
+        with self._cond:
+            rows = self._conn.execute(
+                "SELECT job_id, payload, attempts FROM jobs WHERE status = ?", (RUNNING,)
+            ).fetchall()
+
+            failed = []
+            for job_id, payload, attempts in rows:
+                if attempts >= self.max_attempts:
+                    self._finish(job_id, FAILED, "interrupted by restart")
+                    failed.append({"job_id": job_id, "payload": json.loads(payload), "attempts": attempts})
+                else:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, started_at = NULL WHERE job_id = ?",
+                        (QUEUED, job_id),
+                    )
+
+            if self.retention_days > 0:
+                self._conn.execute(
+                    "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                    (DONE, FAILED, time.time() - self.retention_days * 86400),
+                )
+
+        if rows:
+            logger.info(
+                f"Recovered {len(rows)} interrupted jobs "
+                f"({len(rows) - len(failed)} re-queued, {len(failed)} failed)"
+            )
+        return failed
+
+    def start(self, handler: Callable[[str, Dict[str, Any]], None]):
+        """Start the worker pool (no-op if already running)"""
+        with self._cond:
+            if self._workers:
+                return
+            self._handler = handler
+            self._stopping = False
+            self._workers = [
+                threading.Thread(target=self._worker_loop, name=f"task-worker-{i}", daemon=True)
+                for i in range(self.max_workers)
+            ]
+        for worker in self._workers:
+            worker.start()
+        logger.info(f"Task queue started with {self.max_workers} workers ({self.db_path})")
+
+    def shutdown(self, timeout: float = 5.0):
+        """
+        Stop the workers.
+
+        Running jobs are not interrupted; any still RUNNING after `timeout`
+        are picked up by recover() on the next start.
+        """
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        deadline = time.monotonic() + timeout
+        for worker in self._workers:
+            worker.join(max(0.0, deadline - time.monotonic()))
+        self._workers = []
+
+    def close(self):
+        """Stop the workers and close the database"""
+        self.shutdown()
+        with self._cond:
+            self._conn.close()
+
+    # ===== Workers =====
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                job = None
+                while not self._stopping:
+                    job = self._claim()
+                    if job:
+                        break
+                    self._cond.wait(timeout=1.0)
+                if self._stopping:
+                    return
+
+            job_id, payload = job["job_id"], job["payload"]
+            try:
+                self._handler(job_id, payload)
+                status, error = DONE, None
+            except Exception as e:
+                logger.error(f"Job {job_id} failed: {e}", exc_info=True)
+                status, error = FAILED, str(e)
+
+            with self._cond:
+                self._finish(job_id, status, error)
+                self._release(job)
+                self._cond.notify_all()
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        """Mark the next eligible job RUNNING (caller holds the lock)"""
+        sql = "SELECT job_id, payload, material, user_id, enqueued_at FROM jobs WHERE status = ?"
+        params: List[Any] = [QUEUED]
+        for column, limit, running in (
+            ("material", self.per_material_limit, self._running_materials),
+            ("user_id", self.per_user_limit, self._running_users),
+        ):
+            saturated = [key for key, count in running.items() if limit and count >= limit]
+            if saturated:
+                sql += f" AND ({column} IS NULL OR {column} NOT IN ({','.join('?' * len(saturated))}))"
+                params.extend(saturated)
+        sql += " ORDER BY priority DESC, enqueued_at LIMIT 1"
+
+        row = self._conn.execute(sql, params).fetchone()
+        if row is None:
+            return None
+
+        job_id, payload, material, user_id, enqueued_at = row
+        now = time.time()
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, started_at = ?, attempts = attempts + 1 WHERE job_id = ?",
+            (RUNNING, now, job_id),
+        )
+        self._recent_waits.append(now - enqueued_at)
+        if material:
+            self._running_materials[material] = self._running_materials.get(material, 0) + 1
+        if user_id:
+            self._running_users[user_id] = self._running_users.get(user_id, 0) + 1
+        return {"job_id": job_id, "payload": json.loads(payload), "material": material, "user_id": user_id}
+
+    def _release(self, job: Dict[str, Any]):
+        for key, running in ((job["material"], self._running_materials), (job["user_id"], self._running_users)):
+            if key:
+                running[key] -= 1
+                if running[key] <= 0:
+                    del running[key]
+
+    def _finish(self, job_id: str, status: str, error: Optional[str]):
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE job_id = ?",
+            (status, time.time(), error, job_id),
+        )
+
+    # ===== Metrics =====
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Queue depth and wait-time metrics.
+
+        Returns:
+            Dictionary with queued/running/done/failed counts, the queued
+            count per material, the age of the oldest queued job and the
+            average/max wait of the last WAIT_WINDOW started jobs (seconds)
+        """
+        with self._cond:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            by_material = dict(self._conn.execute(
+                "SELECT COALESCE(material, 'unknown'), COUNT(*) FROM jobs WHERE status = ? GROUP BY material",
+                (QUEUED,),
+            ).fetchall())
+            oldest = self._conn.execute(
+                "SELECT MIN(enqueued_at) FROM jobs WHERE status = ?", (QUEUED,)
+            ).fetchone()[0]
+            waits = list(self._recent_waits)
+
+        return {
+            "workers": self.max_workers,
+            "active_workers": sum(worker.is_alive() for worker in self._workers),
+            "queued": counts.get(QUEUED, 0),
+            "running": counts.get(RUNNING, 0),
+            "done": counts.get(DONE, 0),
+            "failed": counts.get(FAILED, 0),
+            "queued_by_material": by_material,
+            "oldest_queued_seconds": round(time.time() - oldest, 3) if oldest else 0.0,
+            "avg_wait_seconds": round(sum(waits) / len(waits), 3) if waits else 0.0,
+            "max_wait_seconds": round(max(waits), 3) if waits else 0.0,
+        }